@@ -1,15 +1,32 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+import time
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
 from app.models import QueryRequest, QueryResponse
+from app.llm.bedrock_client import LLM_METRICS
 from app.llm.intent_resolver import IntentResolver
+from app.cache.invalidation import DATA_VERSIONS
+from app.cache.results import RESULT_CACHE, cache_key
+from app.cache.speculative import TRANSITIONS, Speculation, SpeculativeExecutor
 from app.context.memory import (
     get_or_create_context, 
     save_context, 
     ConversationTurn,
     SessionContext
 )
-from app.db.executor import execute_query
-from app.queries.sql_templates import *  # Import all SQL templates
+from app.db.admission import ADMISSION, AdmissionTimeout, QueryTooExpensive
+from app.db.executor import QUERY_METRICS, CancellableQuery, QueryTimeout
+from app.db.calendar import calendar_template
+from app.db.stitched import stitched_sql
+from app.queries.approximate import APPROXIMATE_QUERIES, execute_approximate, supports_approximate
+from app.queries.downsampling import downsample
+from app.queries.export import EXPORT_MEDIA_TYPES, cursor_batches, encode, row_batches
 from app.queries.query_registry import QUERY_REGISTRY
+from app.queries.sampling import bind_path_count, execute_sampled, plan_sample, sample_sql, supports_sampling
+from app.queries.templates import get_sql_template, statement_timeout_ms
+from app.utils.responses import dumps, fast_response, model_content
 from app.utils.sql_guard import validate_sql
 
 router = APIRouter()
@@ -19,8 +36,92 @@ resolver = IntentResolver()
 MAX_DATA_PREVIEW_ROWS = 5
 
 
+def prepare_params(query_info: dict, params: dict, context: SessionContext | None) -> tuple[dict, list]:
+    """
+    Fill a registry entry's parameters from the LLM params, then the session's
+    last_params, then registry defaults.
+
+    Returns (prepared_params, missing_params) where missing_params lists
+    (name, description) for required params that could not be filled.
+    """
+    prepared_params = {}
+    missing_params = []
+    context_last_params = context.last_params if context else {}
+    
+    for param_name, param_info in query_info["parameters"].items():
+        if param_name in params:
+            param_value = params[param_name]
+            # Check if the LLM flagged this param as needing more info
+            if param_value == "NEED_MORE_INFO":
+                # Try to get from context first
+                if param_name in context_last_params:
+                    prepared_params[param_name] = context_last_params[param_name]
+                elif param_info.get("required"):
+                    missing_params.append((param_name, param_info['description']))
+                elif "default" in param_info:
+                    prepared_params[param_name] = param_info["default"]
+            else:
+                prepared_params[param_name] = param_value
+        elif param_name in context_last_params:
+            # Parameter not in LLM response but available in context - reuse it
+            prepared_params[param_name] = context_last_params[param_name]
+        elif param_info.get("required"):
+            # Required parameter is missing entirely
+            missing_params.append((param_name, param_info['description']))
+        elif "default" in param_info:
+            prepared_params[param_name] = param_info["default"]
+
+        # A value outside a param's "choices" would silently change the query's meaning: ask instead
+        choices = param_info.get("choices")
+        if choices and param_name in prepared_params and prepared_params[param_name] not in choices:
+            missing_params.append((param_name, f"{param_info['description']} (one of: {', '.join(choices)}; "
+                                               f"got {prepared_params.pop(param_name)!r})"))
+    return prepared_params, missing_params
+
+
+def plan_exact(query_id: str, params: dict, context: SessionContext | None) -> tuple[str, dict] | None:
+    """
+    SQL and params /query runs on the cached exact path for an EXECUTE of
+    ``query_id`` with LLM ``params``; None if required params are missing.
+    """
+    prepared_params, missing_params = prepare_params(QUERY_REGISTRY[query_id], params, context)
+    if missing_params:
+        return None
+    versions = DATA_VERSIONS.table_versions()
+    sql = stitched_sql(query_id, prepared_params, versions) or calendar_template(
+        query_id, get_sql_template(query_id), prepared_params, versions)
+    return sql, bind_path_count(sql, prepared_params)
+
+
+# Runs likely next queries into RESULT_CACHE while the LLM resolves intent
+speculator = SpeculativeExecutor(plan_exact)
+
+
+# How often /query checks for a client disconnect while the question is answered
+DISCONNECT_POLL_SECONDS = 0.1
+
+
 @router.post("/query", response_model=QueryResponse)
-def query(req: QueryRequest):
+async def query_route(req: QueryRequest, request: Request):
+    # Answered on a worker thread; if the client goes away, the running SQL statement is cancelled
+    running = CancellableQuery()
+    task = asyncio.ensure_future(run_in_threadpool(query, req, running))
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())  # cancelled runs raise
+    while not task.done():
+        await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+        if not task.done() and await request.is_disconnected():
+            print("🛑 Client disconnected; cancelling query")
+            QUERY_METRICS.record("disconnects")
+            running.cancel()
+            return Response(status_code=499)  # nobody is listening; closes the exchange
+    response = task.result()
+    if isinstance(response, StreamingResponse):  # format=arrow / parquet
+        return response
+    # orjson straight from the model: no second validation / encoding pass over ``data``
+    return fast_response(response)
+
+
+def query(req: QueryRequest, running: CancellableQuery | None = None) -> QueryResponse | StreamingResponse:
     # 🔍 Log input
     print("📥 Incoming question:", req.question)
     print("🧠 Session ID:", req.session_id)
@@ -32,12 +133,34 @@ def query(req: QueryRequest):
         print("📚 Context last_params:", context.last_params)
         print("📚 Context history length:", len(context.history))
 
-    # Resolve intent with context
-    decision = resolver.resolve(req.question, context)
+    # Exact-path requests: start the likely next queries while the LLM thinks
+    exact = not (req.approximate or req.tolerance or req.sample_size)
+    speculation = speculator.start(context) if exact else None
+    try:
+        # Resolve intent with context
+        decision = resolver.resolve(req.question, context)
+
+        # 🔍 Log raw LLM output
+        print("🤖 LLM decision:", decision)
+
+        return respond(req, context, decision, running=running, speculation=speculation)
+    finally:
+        if speculation is not None:
+            speculation.cancel()
 
-    # 🔍 Log raw LLM output
-    print("🤖 LLM decision:", decision)
 
+def respond(req: QueryRequest, context: SessionContext | None, decision: dict,
+            running: CancellableQuery | None = None,
+            speculation: Speculation | None = None) -> QueryResponse | StreamingResponse:
+    """
+    Turn a resolver decision into a QueryResponse, executing the query with
+    ``running`` (a CancellableQuery the caller can cancel; its statement
+    timeout is set from the template) for EXECUTE decisions and recording
+    the turn. A speculative run of the same query is adopted instead of
+    rerunning it.
+    With req.format arrow / parquet, an EXECUTE result comes back as a
+    streamed file instead (see export_response).
+    """
     decision_type = decision.get("decision")
 
     # ---- OUT OF SCOPE ----
@@ -52,7 +175,7 @@ def query(req: QueryRequest):
             save_context(req.session_id, context)
         
         response = QueryResponse(decision="OUT_OF_SCOPE")
-        print("📤 API response:", response.dict())
+        print("📤 API response:", response.model_dump())
         return response
 
     # ---- NEED MORE INFO ----
@@ -75,7 +198,7 @@ def query(req: QueryRequest):
             decision="NEED_MORE_INFO",
             clarification_question=clarification
         )
-        print("📤 API response:", response.dict())
+        print("📤 API response:", response.model_dump())
         return response
 
     # ---- EXECUTE QUERY ----
@@ -89,40 +212,13 @@ def query(req: QueryRequest):
             raise HTTPException(status_code=400, detail=f"Unknown query_id: {query_id}")
 
         query_info = QUERY_REGISTRY[query_id]
-        sql_template_name = query_info["sql_template_name"]
-        sql = globals()[sql_template_name]  # Get SQL template by name
 
         if not params:
             params = {}
 
         # Validate and prepare parameters
         # Also check context.last_params for missing required params (follow-up support)
-        prepared_params = {}
-        missing_params = []
-        context_last_params = context.last_params if context else {}
-        
-        for param_name, param_info in query_info["parameters"].items():
-            if param_name in params:
-                param_value = params[param_name]
-                # Check if the LLM flagged this param as needing more info
-                if param_value == "NEED_MORE_INFO":
-                    # Try to get from context first
-                    if param_name in context_last_params:
-                        prepared_params[param_name] = context_last_params[param_name]
-                    elif param_info.get("required"):
-                        missing_params.append((param_name, param_info['description']))
-                    elif "default" in param_info:
-                        prepared_params[param_name] = param_info["default"]
-                else:
-                    prepared_params[param_name] = param_value
-            elif param_name in context_last_params:
-                # Parameter not in LLM response but available in context - reuse it
-                prepared_params[param_name] = context_last_params[param_name]
-            elif param_info.get("required"):
-                # Required parameter is missing entirely
-                missing_params.append((param_name, param_info['description']))
-            elif "default" in param_info:
-                prepared_params[param_name] = param_info["default"]
+        prepared_params, missing_params = prepare_params(query_info, params, context)
         
         # If any required params are missing, ask for clarification
         if missing_params:
@@ -143,16 +239,71 @@ def query(req: QueryRequest):
                 decision="NEED_MORE_INFO",
                 clarification_question=clarification
             )
-            print("📤 API response:", response.dict())
+            print("📤 API response:", response.model_dump())
             return response
-        
+
+        # Registry-selected variant of the template (base while the calendar lags the data)
+        sql = calendar_template(query_id, get_sql_template(query_id), prepared_params, DATA_VERSIONS.table_versions())
+
+        # Planner estimate only: what the exact query would cost, without running it
+        if req.explain_only:
+            return explain(req, context, query_id, sql, prepared_params)
+
+        # Approximate mode: merge hourly quantile sketches instead of sorting raw values
+        approximate = req.approximate and supports_approximate(query_id)
+        # Sampled mode: probabilities from a stratified subset of paths, with intervals
+        sampled = bool(req.tolerance or req.sample_size) and not approximate and supports_sampling(query_id, sql)
+        sampling = None
+        staleness = None
+        export = req.format != "json"
+        if export and (approximate or sampled):
+            raise HTTPException(status_code=400,
+                                detail=f"format={req.format} exports exact results only (no approximate / tolerance / "
+                                       f"sample_size).")
+        batches = None
+        if approximate:
+            sql = APPROXIMATE_QUERIES[query_id][0]
+        elif not sampled:
+            # Pre-stitched forecast + seasonal series, while materialized and current for this init pair
+            sql = stitched_sql(query_id, prepared_params, DATA_VERSIONS.table_versions()) or sql
+
         validate_sql(sql)
 
         # Execute the query
-        data = execute_query(sql, prepared_params)
+        if approximate:
+            data = execute_approximate(query_id, prepared_params)
+        elif sampled:
+            plan = plan_sample(prepared_params, tolerance=req.tolerance, sample_size=req.sample_size)
+            data = execute_sampled(query_id, sql, prepared_params, plan)
+            sql = sample_sql(sql)
+            sampling = {k: v for k, v in plan.items() if k != "sample_paths"}
+        else:
+            prepared_params = bind_path_count(sql, prepared_params)
+            key = cache_key(query_id, sql, prepared_params)
+            if speculation is not None:
+                speculation.adopt(key)
+            try:
+                if export and not req.max_points and key not in RESULT_CACHE:
+                    # Not cached: batches straight from a server-side cursor, never held in full
+                    batches = cursor_batches(query_id, sql, prepared_params)
+                    data = None
+                else:
+                    running = running or CancellableQuery()
+                    running.statement_timeout_ms, running.label = statement_timeout_ms(query_id), query_id
+                    # Cost-based admission for whatever actually runs (not for cache hits)
+                    data, staleness = RESULT_CACHE.cached_run(query_id, sql, prepared_params,
+                                                              ADMISSION.admitted(query_id, running.run))
+            except QueryTimeout as e:
+                raise HTTPException(status_code=504, detail=str(e))
+            except QueryTooExpensive as e:
+                return too_expensive(req, context, query_id, prepared_params, e)
+            except AdmissionTimeout as e:
+                raise HTTPException(status_code=503, detail=str(e),
+                                    headers={"Retry-After": str(int(ADMISSION.queue_timeout))})
 
         # Save successful turn with full context
         if req.session_id and context:
+            TRANSITIONS.observe(context.last_query_id, context.last_params, query_id, prepared_params)
             # Store a preview of the data for follow-up reference
             data_preview = data[:MAX_DATA_PREVIEW_ROWS] if data else None
             
@@ -160,22 +311,48 @@ def query(req: QueryRequest):
                 question=req.question,
                 query_id=query_id,
                 params=prepared_params,
-                summary=f"Returned {len(data)} records from {query_id}.",
+                summary=(f"Returned {len(data)} records from {query_id}." if data is not None
+                         else f"Exported {query_id} as {req.format}."),
                 data_preview=data_preview
             )
             context.add_turn(turn)
             save_context(req.session_id, context)
 
-        response = QueryResponse(
+        if export:
+            if batches is None:
+                data, _ = downsample(query_id, data, req.max_points)
+                batches = row_batches(query_id, data)
+            return export_response(req.format, query_id, prepared_params, batches,
+                                   source="cursor" if data is None else "cache")
+
+        # Thin long series / path sets for charts; the cache and the session keep the full result
+        rows = len(data)
+        data, downsampling = downsample(query_id, data, req.max_points)
+        summary = f"Successfully executed query '{query_id}' and returned {len(data)} records."
+        if downsampling and "reason" in downsampling:
+            summary = (f"Successfully executed query '{query_id}' and returned {len(data)} records "
+                       f"(not downsampled to {req.max_points}: {downsampling['reason']}).")
+        elif downsampling:
+            summary = (f"Successfully executed query '{query_id}' and returned {len(data)} of {rows} records "
+                       f"(downsampled: {downsampling['method']}).")
+
+        # Every field is built here: skip validating (copying) the data rows
+        response = QueryResponse.model_construct(
             decision="EXECUTE",
             query_id=query_id,
             sql=sql.strip(),
             params=prepared_params,
             data=data,
-            summary=f"Successfully executed query '{query_id}' and returned {len(data)} records."
+            approximate=approximate,
+            sampling=sampling,
+            staleness=staleness,
+            downsampling=downsampling,
+            summary=summary
         )
 
-        print("📤 API response:", response.dict())
+        # Not the model: dumping every data row costs more than encoding the response
+        print(f"📤 API response: EXECUTE {query_id}, {len(data)} rows"
+              + (f", downsampling {downsampling}" if downsampling else ""))
         return response
 
     # ---- FALLBACK ----
@@ -183,5 +360,181 @@ def query(req: QueryRequest):
         decision="ERROR",
         summary="Unable to interpret the request. Please rephrase."
     )
-    print("📤 API response:", response.dict())
+    print("📤 API response:", response.model_dump())
+    return response
+
+
+def explain(req: QueryRequest, context: SessionContext | None, query_id: str, sql: str,
+            params: dict) -> QueryResponse:
+    """explain_only: the planner's estimate for the exact query and the lane it would run in."""
+    params = bind_path_count(sql, params)
+    estimate = ADMISSION.estimate(query_id, sql, params)
+    summary = (f"Estimated cost {estimate.cost:,.0f} and about {estimate.rows:,} rows for '{query_id}' "
+               f"({estimate.lane} lane; not executed).")
+    if req.session_id and context:
+        context.add_turn(ConversationTurn(question=req.question, query_id=query_id, params=params, summary=summary))
+        save_context(req.session_id, context)
+    response = QueryResponse(decision="EXPLAIN", query_id=query_id, sql=sql.strip(), params=params,
+                             admission=estimate.as_dict(), summary=summary)
+    print("📤 API response:", response.model_dump())
     return response
+
+
+def too_expensive(req: QueryRequest, context: SessionContext | None, query_id: str, params: dict,
+                  error: QueryTooExpensive) -> QueryResponse:
+    """Ask for narrower params when the planner puts a query above the admission ceiling."""
+    types = {name: info.get("type") for name, info in QUERY_REGISTRY[query_id]["parameters"].items()}
+    narrowing = [name for name in QUERY_REGISTRY[query_id]["parameters"] if types[name] != "timestamptz"]
+    clarification = (f"That query is too expensive to run as asked (estimated cost {error.estimate.cost:,.0f}, "
+                     f"limit {error.ceiling:,.0f}). Could you narrow it down"
+                     + (f", e.g. with a smaller or more specific {', '.join(narrowing)}?" if narrowing else "?"))
+    if req.session_id and context:
+        context.add_turn(ConversationTurn(question=req.question, query_id=query_id, params=params,
+                                          summary=f"Too expensive to run: {error}"))
+        save_context(req.session_id, context)
+    response = QueryResponse(decision="NEED_MORE_INFO", query_id=query_id, params=params,
+                             clarification_question=clarification,
+                             admission={**error.estimate.as_dict(), "max_cost": error.ceiling})
+    print("📤 API response:", response.model_dump())
+    return response
+
+
+def export_response(fmt: str, query_id: str, params: dict, batches, source: str) -> StreamingResponse:
+    """Row batches as an Arrow IPC stream or Parquet file, one chunk per batch."""
+    print(f"📦 Exporting {query_id} as {fmt} (from {source})")
+    return StreamingResponse(
+        encode(query_id, batches, fmt),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="{query_id}.{fmt}"',
+            "X-Query-Id": query_id,
+            "X-Query-Params": dumps(params).decode(),
+            "X-Result-Source": source,
+        },
+    )
+
+
+@router.get("/cache/stats")
+def cache_stats():
+    return RESULT_CACHE.stats()
+
+
+@router.get("/admission/stats")
+def admission_stats():
+    return ADMISSION.stats()
+
+
+@router.get("/execution/stats")
+def execution_stats():
+    return QUERY_METRICS.snapshot()
+
+
+@router.get("/speculation/stats")
+def speculation_stats():
+    return speculator.stats()
+
+
+@router.get("/llm/stats")
+def llm_stats():
+    stats = LLM_METRICS.snapshot()
+    if hasattr(resolver, "stats"):  # bench resolvers stand in without one
+        stats["resolver"] = resolver.stats()
+    if hasattr(resolver.llm, "stats"):  # LLM_RECORD / LLM_REPLAY
+        stats["record_replay"] = resolver.llm.stats()
+    return stats
+
+
+# ---- Progressive results (Server-Sent Events) ----
+
+# Tolerance of the sampled estimate sent before the exact answer
+STREAM_SAMPLE_TOLERANCE = 0.05
+# A sample reading more of the ensemble than this is not worth sending first
+STREAM_MAX_SAMPLE_FRACTION = 0.5
+# How often to check for a client disconnect while the exact query runs
+STREAM_POLL_SECONDS = 0.1
+
+
+def _sse(event: str, payload: dict) -> str:
+    return f"event: {event}\ndata: {dumps(payload).decode()}\n\n"
+
+
+def estimate(query_id: str, sql: str, params: dict) -> dict | None:
+    """Sketch- or sample-based first answer for a query, or None if it has none."""
+    if supports_approximate(query_id):
+        return {"method": "sketch", "data": execute_approximate(query_id, params)}
+    if supports_sampling(query_id, sql):
+        plan = plan_sample(params, tolerance=STREAM_SAMPLE_TOLERANCE)
+        if 0 < plan["sample_size"] <= plan["path_count"] * STREAM_MAX_SAMPLE_FRACTION:
+            return {
+                "method": "sampled",
+                "sampling": {k: v for k, v in plan.items() if k != "sample_paths"},
+                "data": execute_sampled(query_id, sql, params, plan),
+            }
+    return None
+
+
+@router.post("/query/stream")
+async def query_stream(req: QueryRequest, request: Request):
+    """
+    Same question as /query, answered progressively as Server-Sent Events:
+
+    - ``decision``: the resolver decision, as soon as the LLM returns
+    - ``estimate``: a sketch or sampled result (EXECUTE with a fast path only)
+    - ``exact``: the full QueryResponse, as /query would return it
+    - ``error``: anything that stopped the stream
+
+    Each data payload carries ``elapsed_ms`` since the request arrived. If the
+    client disconnects, the running SQL statement is cancelled.
+    """
+    if req.format != "json":
+        raise HTTPException(status_code=400, detail=f"format={req.format} is served by /query, not /query/stream.")
+    started = time.perf_counter()
+
+    def elapsed() -> float:
+        return round((time.perf_counter() - started) * 1000, 1)
+
+    async def events():
+        print("📥 Incoming question (stream):", req.question)
+        context = get_or_create_context(req.session_id) if req.session_id else None
+        decision = await run_in_threadpool(resolver.resolve, req.question, context)
+        print("🤖 LLM decision:", decision)
+        yield _sse("decision", {**decision, "elapsed_ms": elapsed()})
+
+        # Exact answer starts right away; cancelled if the client goes away
+        running = CancellableQuery()
+        task = asyncio.ensure_future(run_in_threadpool(respond, req, context, decision, running))
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())  # cancelled runs raise
+        try:
+            query_id = decision.get("query_id")
+            if decision.get("decision") == "EXECUTE" and query_id in QUERY_REGISTRY and not req.approximate:
+                prepared_params, missing_params = prepare_params(
+                    QUERY_REGISTRY[query_id], decision.get("params") or {}, context
+                )
+                first = None
+                if not missing_params:
+                    try:
+                        sql = await run_in_threadpool(calendar_template, query_id, get_sql_template(query_id),
+                                                      prepared_params, DATA_VERSIONS.table_versions())
+                        first = await run_in_threadpool(estimate, query_id, sql, prepared_params)
+                    except Exception as e:
+                        print("⚠️  Estimate failed:", e)
+                if first and not task.done():
+                    yield _sse("estimate", {**first, "query_id": query_id, "elapsed_ms": elapsed()})
+
+            while not task.done():
+                await asyncio.wait({task}, timeout=STREAM_POLL_SECONDS)
+                if not task.done() and await request.is_disconnected():
+                    print("🛑 Client disconnected; cancelling query")
+                    running.cancel()
+                    return
+            response = task.result()
+            yield _sse("exact", {**model_content(response), "elapsed_ms": elapsed()})
+        except HTTPException as e:
+            yield _sse("error", {"detail": e.detail, "elapsed_ms": elapsed()})
+        except Exception as e:
+            yield _sse("error", {"detail": str(e), "elapsed_ms": elapsed()})
+        finally:
+            if not task.done():
+                running.cancel()
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -0,0 +1,179 @@
+"""
+Data versions for cache invalidation.
+
+A cached result depends on (table, initialization) pairs: each ensemble
+table its SQL reads, with the initializations its predicates filter that
+table on (``[alias.]initialization = :param``, or the stitched table's init
+columns). A table read without such a predicate gets every initialization
+in the params. Two levels of change detection:
+
+- Table versions, checked on every cache hit: insert/update/delete counters
+  and relfilenodes from pg_stat_user_tables (summed over partitions), one
+  catalog read per VERSION_TTL_SECONDS. A TRUNCATE changes the relfilenode.
+  Postgres flushes these counters with a short delay (about a second, at
+  most ~10 s for an idle backend), so a write is noticed shortly after it
+  commits, not instantly.
+- Initialization fingerprints, only computed off the request path: row count
+  and MAX(valid_datetime) of one initialization in one table. When a table
+  version moves, an entry is still valid if the fingerprints of its own
+  initializations did not change (ingest touched another initialization).
+  The last CACHE_FINGERPRINT_MEMO fingerprints are memoized (LRU).
+
+The stitched series table (app.db.stitched) is tracked like the ensemble
+tables; its rows belong to an initialization through either init column.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+
+from app.db.connection import ENGINE
+from app.db.schema import ENSEMBLE_TABLES
+from app.db.stitched import STITCHED_TABLE
+
+VERSION_TTL_SECONDS = float(os.environ.get("CACHE_VERSION_TTL_SECONDS", 1.0))
+FINGERPRINT_MEMO = int(os.environ.get("CACHE_FINGERPRINT_MEMO", 1024))
+
+INIT_PARAMS = ("initialization", "forecast_init", "seasonal_init")
+
+TRACKED_TABLES = ENSEMBLE_TABLES + [STITCHED_TABLE]
+
+_TABLE_PATTERNS = {table: re.compile(rf"\b{table}\b") for table in TRACKED_TABLES}
+_TABLE_ALIAS = re.compile(rf"\b(?:FROM|JOIN)\s+({'|'.join(TRACKED_TABLES)})\s+(?:AS\s+)?(\w+)", re.IGNORECASE)
+_INIT_PREDICATE = re.compile(r"\b(?:(\w+)\.)?(?:initialization|forecast_init|seasonal_init)\s*=\s*:(\w+)")
+_NOT_ALIASES = {"where", "join", "on", "inner", "left", "right", "full", "cross", "group", "order", "union", "limit"}
+
+# Counters of a table and, if partitioned, of its partitions
+_VERSIONS_SQL = """
+SELECT COALESCE(parent.relname, s.relname) AS table_name,
+       SUM(s.n_tup_ins + s.n_tup_upd + s.n_tup_del) AS changes,
+       SUM(c.relfilenode::bigint) AS files,
+       COUNT(*) AS relations
+FROM pg_stat_user_tables s
+JOIN pg_class c ON c.oid = s.relid
+LEFT JOIN pg_inherits i ON i.inhrelid = s.relid
+LEFT JOIN pg_class parent ON parent.oid = i.inhparent
+WHERE COALESCE(parent.relname, s.relname) = ANY(:tables)
+GROUP BY 1
+"""
+
+_FINGERPRINT_SQL = "SELECT COUNT(*), MAX(valid_datetime) FROM {table} WHERE {init_filter}"
+_INIT_FILTERS = {STITCHED_TABLE: "forecast_init = :init OR seasonal_init = :init"}
+
+
+def normalize_init(value) -> str | None:
+    """UTC ISO form of an initialization param (naive values are UTC)."""
+    if value is None:
+        return None
+    try:
+        ts = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    except ValueError:
+        return str(value)
+    ts = ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(timezone.utc).isoformat()
+
+
+def _init_params_by_table(sql: str) -> dict:
+    """{table: init params its predicates compare an init column with}; unqualified columns go to the nearest table before them."""
+    aliases = {alias: table for table, alias in _TABLE_ALIAS.findall(sql) if alias.lower() not in _NOT_ALIASES}
+    mentions = sorted((m.start(), table) for table, pattern in _TABLE_PATTERNS.items() for m in pattern.finditer(sql))
+    by_table: dict = {}
+    for predicate in _INIT_PREDICATE.finditer(sql):
+        alias, param = predicate.groups()
+        if param not in INIT_PARAMS:
+            continue
+        table = aliases.get(alias) if alias else None
+        if table is None and not alias:
+            before = [t for position, t in mentions if position < predicate.start()]
+            table = before[-1] if before else None
+        if table:
+            by_table.setdefault(table, set()).add(param)
+    return by_table
+
+
+def dependencies(sql: str, params: dict) -> tuple:
+    """(table, initialization) pairs a result depends on."""
+    tables = [table for table, pattern in _TABLE_PATTERNS.items() if pattern.search(sql)]
+    by_table = _init_params_by_table(sql)
+    pairs = set()
+    for table in tables:
+        for name in by_table.get(table, INIT_PARAMS):
+            if params.get(name):
+                pairs.add((table, normalize_init(params[name])))
+    return tuple(sorted(pairs))
+
+
+class DataVersions:
+    """Table versions (cached for VERSION_TTL_SECONDS) and memoized initialization fingerprints."""
+
+    def __init__(self, ttl_seconds: float = VERSION_TTL_SECONDS, memo_size: int = FINGERPRINT_MEMO):
+        self.ttl_seconds = ttl_seconds
+        self.memo_size = memo_size
+        self._versions: dict = {}
+        self._read_at = 0.0
+        self._fingerprints: OrderedDict = OrderedDict()  # (table, init) -> (table version, fingerprint), LRU
+        self._lock = threading.Lock()
+
+    def table_versions(self, refresh: bool = False) -> dict:
+        """{table: version}; a version is any hashable that changes when the table is written."""
+        with self._lock:
+            if not refresh and time.monotonic() - self._read_at < self.ttl_seconds:
+                return self._versions
+        with ENGINE.connect() as conn:
+            rows = conn.execute(text(_VERSIONS_SQL), {"tables": TRACKED_TABLES}).fetchall()
+        versions = {row.table_name: (int(row.changes), int(row.files), int(row.relations)) for row in rows}
+        with self._lock:
+            self._versions, self._read_at = versions, time.monotonic()
+        return versions
+
+    def snapshot(self, deps: tuple) -> dict:
+        """Current versions of the tables in ``deps``."""
+        versions = self.table_versions()
+        return {table: versions.get(table) for table, _ in deps}
+
+    def changed_tables(self, versions: dict) -> list:
+        """Tables whose version moved since ``versions`` was taken."""
+        current = self.table_versions()
+        return sorted(table for table, version in versions.items() if current.get(table) != version)
+
+    def memoized_fingerprint(self, table: str, init: str) -> tuple | None:
+        """The memoized fingerprint of one initialization if the table has not moved since; never scans."""
+        current = self.table_versions().get(table)
+        with self._lock:
+            memo = self._fingerprints.get((table, init))
+        return memo if memo and memo[0] == current else None
+
+    def fingerprint(self, table: str, init: str) -> tuple | None:
+        """
+        (table version, (row count, max valid_datetime)) of one initialization.
+        Scans the initialization, so keep it off the request path. Returns None
+        if the table was written while counting.
+        """
+        before = self.table_versions(refresh=True).get(table)
+        with self._lock:
+            memo = self._fingerprints.get((table, init))
+            if memo:
+                self._fingerprints.move_to_end((table, init))
+        if memo and memo[0] == before:
+            return memo
+
+        with ENGINE.connect() as conn:
+            count, latest = conn.execute(text(_FINGERPRINT_SQL.format(
+                table=table, init_filter=_INIT_FILTERS.get(table, "initialization = :init"))), {"init": init}).one()
+        if self.table_versions(refresh=True).get(table) != before:
+            return None
+        memo = (before, (count, latest.isoformat() if latest else None))
+        with self._lock:
+            self._fingerprints[(table, init)] = memo
+            self._fingerprints.move_to_end((table, init))
+            while len(self._fingerprints) > self.memo_size:
+                self._fingerprints.popitem(last=False)
+        return memo
+
+
+DATA_VERSIONS = DataVersions()
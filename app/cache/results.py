@@ -0,0 +1,302 @@
+"""
+In-process result cache for executed templates.
+
+Results for a fixed initialization rarely change, so an entry is keyed by
+the exact SQL text plus its params, normalized using the registry's
+parameter types: '2026-01-15 12:00' and '2026-01-15 12:00+0000' are the
+same initialization, "0.6" and 0.6 the same threshold. The cache is a
+bounded LRU; RESULT_CACHE_SIZE sets the number of entries.
+
+Entries are tagged with the (table, initialization) pairs they read (see
+app.cache.invalidation). When one of those tables is written (late rows,
+forecast hours rolling over into the base tables), the entry is served
+stale-while-revalidate: returned immediately, marked stale, and refreshed in
+the background, as long as it was last confirmed current within
+STALE_WHILE_REVALIDATE_SECONDS. Older entries are revalidated inline, but
+only against fingerprints already memoized: the request thread never scans
+an initialization to fingerprint it, and reruns the query instead.
+
+Computations are single-flight per key (SINGLE_FLIGHT=0 turns it off):
+concurrent misses for the same SQL and params, e.g. everyone opening the
+morning report at once, run it once and share the result. Speculative runs
+have flights of their own, which real requests never wait on.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from app.cache.invalidation import DATA_VERSIONS, DataVersions, dependencies
+from app.cache.shared import SHARED_WAYS, SharedSlots, shared_slots
+from app.cache.singleflight import SingleFlight
+from app.db.executor import QueryCancelled
+from app.queries.query_registry import QUERY_REGISTRY
+
+DEFAULT_CACHE_SIZE = 2048
+STALE_WHILE_REVALIDATE_SECONDS = float(os.environ.get("STALE_WHILE_REVALIDATE_SECONDS", 600))
+SHARED_RESULT_SLOTS = int(os.environ.get("SHARED_RESULT_SLOTS", 1024))
+SHARED_RESULT_SLOT_KB = int(os.environ.get("SHARED_RESULT_SLOT_KB", 128))
+SINGLE_FLIGHT = os.environ.get("SINGLE_FLIGHT", "1") != "0"
+
+
+@dataclass
+class CacheEntry:
+    """A cached result set."""
+    query_id: str
+    data: list
+    created_at: float = field(default_factory=time.time)
+    hits: int = 0
+    deps: tuple = ()  # (table, initialization) pairs
+    versions: dict = field(default_factory=dict)  # table -> version the result was computed at
+    fingerprints: dict = field(default_factory=dict)  # (table, initialization) -> fingerprint
+    verified_at: float = field(default_factory=time.time)  # last time known to be current
+
+
+def _normalize(value, param_type: str | None):
+    if value is None:
+        return None
+    if param_type == "timestamptz":
+        try:
+            ts = datetime.fromisoformat(str(value))
+        except ValueError:
+            return str(value)
+        ts = ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+        return ts.astimezone(timezone.utc).isoformat()
+    if param_type == "float":
+        return float(value)
+    if param_type == "int":
+        return int(value)
+    return value
+
+
+def cache_key(query_id: str, sql: str, params: dict) -> str:
+    types = {name: info.get("type") for name, info in QUERY_REGISTRY.get(query_id, {}).get("parameters", {}).items()}
+    normalized = {name: _normalize(value, types.get(name)) for name, value in params.items()}
+    payload = json.dumps([query_id, " ".join(sql.split()), normalized], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Thread-safe LRU of CacheEntry objects, revalidated against DataVersions,
+    optionally backed by a SharedSlots store other processes also read.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE, versions: DataVersions | None = DATA_VERSIONS,
+                 stale_seconds: float = STALE_WHILE_REVALIDATE_SECONDS, shared: SharedSlots | None = None,
+                 single_flight: bool = SINGLE_FLIGHT):
+        self.max_entries = max_entries
+        self.versions = versions
+        self.stale_seconds = stale_seconds
+        self.shared = shared
+        # A cancelled leader (its client went away) is rerun by a waiting caller, not failed onto it
+        self.flights = SingleFlight(retry_on=(QueryCancelled,), enabled=single_flight)
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing: set = set()
+        self._background: ThreadPoolExecutor | None = None
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.refreshes = 0
+        self.revalidated = 0
+        self.shared_hits = 0
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry.hits += 1
+                self.hits += 1
+                return entry
+        entry = self.shared.get(key) if self.shared is not None else None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            # Computed by another worker: keep a local copy
+            entry.hits += 1
+            self.hits += 1
+            self.shared_hits += 1
+        self._put_local(key, entry)
+        return entry
+
+    def _put_local(self, key: str, entry: CacheEntry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def put(self, key: str, entry: CacheEntry):
+        self._put_local(key, entry)
+        self._publish(key, entry)
+
+    def _publish(self, key: str, entry: CacheEntry):
+        """Write ``entry`` through to the shared store, if there is one."""
+        if self.shared is None:
+            return
+        try:
+            self.shared.put(key, entry)
+        except Exception as e:
+            print(f"⚠️  Shared cache write for {entry.query_id} failed: {e}")
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            if key in self._entries:
+                return True
+        return self.shared is not None and key in self.shared
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {"entries": len(self._entries), "max_entries": self.max_entries,
+                     "hits": self.hits, "misses": self.misses, "stale_hits": self.stale_hits,
+                     "refreshes": self.refreshes, "revalidated": self.revalidated,
+                     "refreshing": len(self._refreshing), "pid": os.getpid()}
+        stats["single_flight"] = self.flights.stats()
+        if self.shared is not None:
+            stats["shared"] = {**self.shared.stats(), "entry_hits": self.shared_hits}
+        return stats
+
+    def drain(self):
+        """Wait for background refreshes and fingerprinting, and stop their thread (e.g. before fork)."""
+        with self._lock:
+            pool, self._background = self._background, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    # ---- Background work ----
+
+    def _submit(self, fn, *args):
+        with self._lock:
+            if self._background is None:
+                self._background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache-refresh")
+            pool = self._background
+        pool.submit(fn, *args)
+
+    def _record_fingerprints(self, key: str, entry: CacheEntry):
+        """Fingerprint the entry's initializations at the table versions it was computed at."""
+        try:
+            fingerprints = {}
+            for dep in entry.deps:
+                memo = self.versions.fingerprint(*dep)
+                if memo is not None and memo[0] == entry.versions.get(dep[0]):
+                    fingerprints[dep] = memo[1]
+            entry.fingerprints = fingerprints
+            self._publish(key, entry)
+        except Exception as e:
+            print(f"⚠️  Fingerprinting {entry.query_id} failed: {e}")
+
+    def _refresh(self, key: str, entry: CacheEntry, query_id: str, sql: str, params: dict, run, flight: str):
+        try:
+            self._revalidate(key, entry, query_id, sql, params, run, flight, scan=True)
+        except Exception as e:
+            print(f"⚠️  Background refresh of {query_id} failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    # ---- Compute / revalidate ----
+
+    def _compute(self, key: str, query_id: str, sql: str, params: dict, run, flight: str) -> CacheEntry:
+        """Run and store the entry; callers computing the same ``flight`` meanwhile share this run."""
+        return self.flights.do(flight, lambda: self._run_and_store(key, query_id, sql, params, run))
+
+    def _run_and_store(self, key: str, query_id: str, sql: str, params: dict, run) -> CacheEntry:
+        deps = dependencies(sql, params) if self.versions else ()
+        # Versions are read before running, so a write racing the query marks it stale
+        versions = self.versions.snapshot(deps) if deps else {}
+        entry = CacheEntry(query_id=query_id, data=run(sql, params), deps=deps, versions=versions)
+        self.put(key, entry)
+        if deps:
+            self._submit(self._record_fingerprints, key, entry)
+        return entry
+
+    def _revalidate(self, key: str, entry: CacheEntry, query_id: str, sql: str, params: dict, run,
+                    flight: str, scan: bool = False) -> CacheEntry:
+        """
+        Keep ``entry`` if its own initializations did not change, else rerun it.
+        Fingerprints are computed (a scan per initialization) only with
+        ``scan``, i.e. off the request path; otherwise only memoized ones count.
+        """
+        self.versions.table_versions(refresh=True)
+        changed = set(self.versions.changed_tables(entry.versions))
+        fingerprint = self.versions.fingerprint if scan else self.versions.memoized_fingerprint
+        current = {dep: fingerprint(*dep) for dep in entry.deps if dep[0] in changed}
+        if all(memo is not None and entry.fingerprints.get(dep) == memo[1] for dep, memo in current.items()):
+            # The writes were to other initializations
+            entry.versions = {**entry.versions, **{dep[0]: memo[0] for dep, memo in current.items()}}
+            entry.verified_at = time.time()
+            with self._lock:
+                self.revalidated += 1
+            self._publish(key, entry)
+            return entry
+        with self._lock:
+            self.refreshes += 1
+        return self._compute(key, query_id, sql, params, run, flight)
+
+    def _staleness(self, entry: CacheEntry | None, changed: list = (), refreshing: bool = False) -> dict:
+        if entry is None:
+            return {"cached": False, "stale": False, "age_seconds": 0.0}
+        return {"cached": True, "stale": bool(changed), "age_seconds": round(time.time() - entry.verified_at, 1),
+                "changed_tables": list(changed), "refreshing": refreshing}
+
+    def cached_run(self, query_id: str, sql: str, params: dict, run, speculative: bool = False) -> tuple[list, dict]:
+        """
+        Result of ``run(sql, params)`` for (query_id, sql, params), cached.
+        Returns (data, staleness); staleness says whether data came from the
+        cache, how long ago it was last known current and whether it is stale.
+
+        ``speculative`` runs get flights of their own: they run under the
+        speculative timeout and without admission, so a real request must not
+        wait on one and inherit its timeout or error. Nor do they schedule
+        background refreshes of stale entries.
+        """
+        key = cache_key(query_id, sql, params)
+        flight = f"speculative:{key}" if speculative else key
+        entry = self.get(key)
+        if entry is None:
+            return self._compute(key, query_id, sql, params, run, flight).data, self._staleness(None)
+
+        changed = self.versions.changed_tables(entry.versions) if self.versions else []
+        if not changed:
+            entry.verified_at = time.time()
+            return entry.data, self._staleness(entry)
+
+        if time.time() - entry.verified_at <= self.stale_seconds:
+            if speculative:
+                # A refresh would run on the speculation's CancellableQuery, which
+                # is cancelled once the decision arrives; the real request schedules it
+                return entry.data, self._staleness(entry, changed)
+            with self._lock:
+                self.stale_hits += 1
+                schedule = key not in self._refreshing
+                self._refreshing.add(key)
+            if schedule:
+                self._submit(self._refresh, key, entry, query_id, sql, params, run, flight)
+            return entry.data, self._staleness(entry, changed, refreshing=True)
+
+        fresh = self._revalidate(key, entry, query_id, sql, params, run, flight)
+        return fresh.data, {**self._staleness(fresh), "revalidated": True}
+
+RESULT_CACHE = ResultCache(
+    int(os.environ.get("RESULT_CACHE_SIZE", DEFAULT_CACHE_SIZE)),
+    shared=shared_slots("results", SHARED_RESULT_SLOTS // SHARED_WAYS, SHARED_RESULT_SLOT_KB * 1024),
+)
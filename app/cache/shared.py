@@ -0,0 +1,189 @@
+"""
+Cross-process key/value slots in a memory-mapped file under /dev/shm.
+
+With several API worker processes (gunicorn.conf.py), every per-process
+cache would compute and hold its own copy. SharedSlots maps one file into
+each worker instead: ``n_sets`` sets of SHARED_WAYS slots of ``slot_bytes``.
+A key hashes to one set; a put reuses the key's slot, else an empty one,
+else evicts the oldest in the set. Values are pickled; values that do not fit
+a slot stay out of the shared tier. Access takes an fcntl lock on the file
+(and a thread lock within a process), so any process can attach by path,
+including ones started after the file was created.
+
+SHARED_CACHE=1 turns the shared tier on (the gunicorn preset sets it);
+SHARED_CACHE_DIR (default /dev/shm) holds the files.
+"""
+
+import fcntl
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+SHARED_CACHE = os.environ.get("SHARED_CACHE", "").lower() in ("1", "true", "yes")
+SHARED_CACHE_DIR = os.environ.get("SHARED_CACHE_DIR", "/dev/shm")
+SHARED_WAYS = 4
+
+_MAGIC = b"NLSQLSH1"
+_FILE_HEADER = struct.Struct("8sIII")  # magic, n_sets, ways, slot_bytes
+_FILE_HEADER_BYTES = 64
+_SLOT_HEADER = struct.Struct("16sId")  # key digest, payload length, stored_at
+_EMPTY = b"\0" * 16
+
+
+def _digest(key: str) -> bytes:
+    return hashlib.blake2b(key.encode(), digest_size=16).digest()
+
+
+class SharedSlots:
+    """Fixed-size, set-associative pickle store shared by every process mapping ``path``."""
+
+    def __init__(self, path: str, n_sets: int = 1024, slot_bytes: int = 128 * 1024):
+        self.path = path
+        self.n_sets = n_sets
+        self.slot_bytes = slot_bytes
+        self.hits = 0
+        self.misses = 0
+        self.puts = 0
+        self.too_large = 0
+        self._open()
+        # The file lock belongs to the open file, which a forked child would share
+        # with its parent: reopen in the child so the lock excludes them again.
+        os.register_at_fork(after_in_child=self._open)
+
+    def _open(self):
+        if getattr(self, "_fd", None) is not None:
+            self._map.close()
+            os.close(self._fd)
+        self._lock = threading.Lock()
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            size = self._attach(fd)
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        except Exception:
+            os.close(fd)  # also drops the lock
+            raise
+        self._fd = fd
+        self._map = mmap.mmap(fd, size)
+
+    def _attach(self, fd: int) -> int:
+        """Read the geometry of an existing file, or size and stamp a new one. Returns its size."""
+        size = os.fstat(fd).st_size
+        if size >= _FILE_HEADER_BYTES:
+            magic, n_sets, ways, slot_bytes = _FILE_HEADER.unpack(os.pread(fd, _FILE_HEADER.size, 0))
+            if magic != _MAGIC or ways != SHARED_WAYS:
+                raise ValueError(f"{self.path} is not a shared slot file")
+            self.n_sets, self.slot_bytes = n_sets, slot_bytes  # the creator's geometry wins
+            return size
+        size = _FILE_HEADER_BYTES + self.n_sets * SHARED_WAYS * self.slot_bytes
+        # Reserve the space now: writing a page of a sparse mapping on a full tmpfs is a SIGBUS
+        try:
+            os.posix_fallocate(fd, 0, size)
+        except OSError:
+            os.unlink(self.path)
+            raise
+        os.pwrite(fd, _FILE_HEADER.pack(_MAGIC, self.n_sets, SHARED_WAYS, self.slot_bytes), 0)
+        return size
+
+    def _slot_offset(self, set_index: int, way: int) -> int:
+        return _FILE_HEADER_BYTES + (set_index * SHARED_WAYS + way) * self.slot_bytes
+
+    @contextmanager
+    def _locked(self, exclusive: bool):
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _find(self, digest: bytes) -> tuple[int, int | None]:
+        """(set index, way holding ``digest`` or None). Caller holds the lock."""
+        set_index = int.from_bytes(digest[:8], "little") % self.n_sets
+        for way in range(SHARED_WAYS):
+            offset = self._slot_offset(set_index, way)
+            if self._map[offset:offset + 16] == digest:
+                return set_index, way
+        return set_index, None
+
+    def get(self, key: str):
+        """The value stored for ``key``, or None."""
+        digest = _digest(key)
+        with self._locked(exclusive=False):
+            set_index, way = self._find(digest)
+            payload = None
+            if way is not None:
+                offset = self._slot_offset(set_index, way)
+                _, length, _ = _SLOT_HEADER.unpack_from(self._map, offset)
+                start = offset + _SLOT_HEADER.size
+                payload = bytes(self._map[start:start + length])
+        if payload is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pickle.loads(payload)
+
+    def __contains__(self, key: str) -> bool:
+        with self._locked(exclusive=False):
+            return self._find(_digest(key))[1] is not None
+
+    def put(self, key: str, value) -> bool:
+        """Store ``value``; False if it does not fit a slot."""
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.slot_bytes - _SLOT_HEADER.size:
+            self.too_large += 1
+            self.delete(key)  # an older, smaller value would now be wrong
+            return False
+        digest = _digest(key)
+        with self._locked(exclusive=True):
+            set_index, way = self._find(digest)
+            if way is None:
+                # Empty slot, else the oldest in the set
+                slots = []
+                for candidate in range(SHARED_WAYS):
+                    offset = self._slot_offset(set_index, candidate)
+                    slot_digest, _, stored_at = _SLOT_HEADER.unpack_from(self._map, offset)
+                    slots.append((slot_digest != _EMPTY, stored_at, candidate))
+                way = min(slots)[2]
+            offset = self._slot_offset(set_index, way)
+            start = offset + _SLOT_HEADER.size
+            self._map[start:start + len(payload)] = payload
+            _SLOT_HEADER.pack_into(self._map, offset, digest, len(payload), time.time())
+        self.puts += 1
+        return True
+
+    def delete(self, key: str):
+        digest = _digest(key)
+        with self._locked(exclusive=True):
+            set_index, way = self._find(digest)
+            if way is not None:
+                _SLOT_HEADER.pack_into(self._map, self._slot_offset(set_index, way), _EMPTY, 0, 0.0)
+
+    def clear(self):
+        with self._locked(exclusive=True):
+            for set_index in range(self.n_sets):
+                for way in range(SHARED_WAYS):
+                    offset = self._slot_offset(set_index, way)
+                    if self._map[offset:offset + 16] != _EMPTY:  # leave untouched pages unallocated
+                        _SLOT_HEADER.pack_into(self._map, offset, _EMPTY, 0, 0.0)
+
+    def stats(self) -> dict:
+        """This process's counters; slots are shared, counters are not."""
+        return {"path": self.path, "slots": self.n_sets * SHARED_WAYS, "slot_bytes": self.slot_bytes,
+                "hits": self.hits, "misses": self.misses, "puts": self.puts, "too_large": self.too_large}
+
+
+def shared_slots(name: str, n_sets: int, slot_bytes: int) -> SharedSlots | None:
+    """The shared store ``name`` when SHARED_CACHE is on and there is room for it, else None."""
+    if not SHARED_CACHE:
+        return None
+    try:
+        return SharedSlots(os.path.join(SHARED_CACHE_DIR, f"nlsql-{name}"), n_sets=n_sets, slot_bytes=slot_bytes)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Shared store '{name}' unavailable ({e}); caches stay per process")
+        return None
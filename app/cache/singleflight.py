@@ -0,0 +1,102 @@
+"""
+Single-flight execution: concurrent calls for the same key share one run.
+
+The first caller for a key (the leader) runs the function; callers arriving
+while it runs (followers) wait on the same Future instead of running it
+again, from threads (do) or coroutines (do_async, which waits without
+holding a thread). A flight ends when its leader finishes, so later callers
+start a new one (by then the result cache normally answers them).
+
+- errors: the leader's exception is raised to every follower too
+- cancellation: if the leader's run raises one of ``retry_on`` (e.g.
+  QueryCancelled because the leader's client went away), followers are not
+  failed with it: one of them becomes the new leader and runs it again. A
+  follower coroutine that is cancelled just stops waiting; the flight goes
+  on for the others.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    def __init__(self, retry_on: tuple = (), enabled: bool = True):
+        self.retry_on = retry_on
+        self.enabled = enabled
+        self._flights: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.executions = 0  # runs by leaders
+        self.coalesced = 0  # calls that waited on another caller's run instead
+        self.retries = 0  # followers that took over after a cancelled leader
+        self.shared_errors = 0  # followers that got the leader's error
+
+    def _join(self, key: str) -> tuple[Future, bool]:
+        """(flight for ``key``, True if the caller is its leader)."""
+        with self._lock:
+            future = self._flights.get(key)
+            if future is not None and self.enabled:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            if self.enabled:
+                self._flights[key] = future
+            self.executions += 1
+            return future, True
+
+    def _end(self, key: str, future: Future):
+        with self._lock:
+            if self._flights.get(key) is future:
+                del self._flights[key]
+
+    def _lead(self, key: str, future: Future, fn):
+        try:
+            result = fn()
+        except BaseException as e:
+            # Ended first, so followers retrying after a cancellation start a new flight
+            self._end(key, future)
+            future.set_exception(e)
+            raise
+        # Result first: a caller joining before the flight ends still gets it
+        future.set_result(result)
+        self._end(key, future)
+        return result
+
+    def _followed(self, error: BaseException) -> bool:
+        """Count a follower's failure; True if it should retry (leader cancelled)."""
+        with self._lock:
+            if isinstance(error, self.retry_on):
+                self.retries += 1
+                return True
+            self.shared_errors += 1
+            return False
+
+    def do(self, key: str, fn):
+        """``fn()``, or the result of the run already in flight for ``key``."""
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                return self._lead(key, future, fn)
+            try:
+                return future.result()
+            except Exception as e:
+                if not self._followed(e):
+                    raise
+
+    async def do_async(self, key: str, fn):
+        """do() for coroutines: the leader runs ``fn`` on a worker thread, followers just await."""
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                # If this coroutine is cancelled, the thread still finishes the flight for the followers
+                return await asyncio.to_thread(self._lead, key, future, fn)
+            try:
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except Exception as e:
+                if not self._followed(e):
+                    raise
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"enabled": self.enabled, "executions": self.executions, "coalesced": self.coalesced,
+                    "retries": self.retries, "shared_errors": self.shared_errors, "in_flight": len(self._flights)}
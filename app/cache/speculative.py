@@ -0,0 +1,265 @@
+"""
+Speculative execution of the likely next query while the LLM resolves intent.
+
+Within a session the next question is usually the previous query_id with one
+parameter changed, or one of a few common follow-ups. TRANSITIONS counts,
+from executed session turns, which query_id follows which and, when a query
+is repeated, which parameter changed to what value. While
+IntentResolver.resolve runs, SpeculativeExecutor.start runs the top
+SPECULATE_TOP_K predictions into RESULT_CACHE. Once the decision is known,
+Speculation.adopt waits for the matching run (if any) so the request gets a
+cache hit, and cancels the rest in Postgres.
+
+Speculation stays out of the way of real requests: one worker thread
+(SPECULATE_WORKERS), a per-statement timeout (SPECULATE_TIMEOUT_MS), nothing
+launched while the connection pool has no idle connection, predictions
+already cached are skipped, and so is anything admission control would not
+run at once (planner estimate outside the light lane, see app.db.admission).
+SPECULATE=0 turns it off.
+"""
+
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from app.cache.results import RESULT_CACHE, ResultCache, cache_key
+from app.db.admission import ADMISSION
+from app.db.connection import ENGINE
+from app.db.executor import CancellableQuery
+
+SPECULATE = os.environ.get("SPECULATE", "1") != "0"
+SPECULATE_TOP_K = int(os.environ.get("SPECULATE_TOP_K", 2))
+SPECULATE_MIN_PROBABILITY = float(os.environ.get("SPECULATE_MIN_PROBABILITY", 0.1))
+SPECULATE_WORKERS = int(os.environ.get("SPECULATE_WORKERS", 1))
+SPECULATE_TIMEOUT_MS = int(os.environ.get("SPECULATE_TIMEOUT_MS", 5000))
+
+# Bound params the model should not learn from
+_IGNORED_PARAMS = {"path_count"}
+
+
+def _hashable(value) -> bool:
+    try:
+        hash(value)
+        return True
+    except TypeError:
+        return False
+
+
+class TransitionModel:
+    """Counts of next query_id per query_id, and of (param, value) changes on repeats."""
+
+    def __init__(self):
+        self.next_counts: dict[str, Counter] = defaultdict(Counter)
+        self.popular: Counter = Counter()  # every executed query_id, for unseen predecessors
+        self.changes: dict[str, Counter] = defaultdict(Counter)
+        self._lock = threading.Lock()
+
+    def observe(self, previous_query_id: str | None, previous_params: dict, query_id: str, params: dict):
+        """Record one executed turn following ``previous_query_id`` (None at session start)."""
+        with self._lock:
+            self.popular[query_id] += 1
+            if previous_query_id is None:
+                return
+            self.next_counts[previous_query_id][query_id] += 1
+            if previous_query_id == query_id:
+                for name, value in params.items():
+                    if name not in _IGNORED_PARAMS and previous_params.get(name) != value and _hashable(value):
+                        self.changes[query_id][(name, value)] += 1
+
+    def learn(self, history: list[dict]):
+        """Learn from one session's turns (ConversationTurn dicts, oldest first)."""
+        previous_query_id, previous_params = None, {}
+        for turn in history:
+            if not turn.get("query_id") or not turn.get("params"):
+                continue
+            self.observe(previous_query_id, previous_params, turn["query_id"], turn["params"])
+            previous_query_id, previous_params = turn["query_id"], {**previous_params, **turn["params"]}
+
+    def predict(self, query_id: str | None, current_params: dict) -> list[tuple[float, str, dict]]:
+        """
+        (probability, query_id, changed params) predictions, most likely first.
+        A repeat of ``query_id`` is split over its learned param changes.
+        """
+        with self._lock:
+            counts = dict(self.next_counts.get(query_id) or self.popular)
+            changes = dict(self.changes.get(query_id, {}))
+        total = sum(counts.values())
+        predictions = []
+        for next_query_id, count in counts.items():
+            probability = count / total
+            if next_query_id != query_id:
+                predictions.append((probability, next_query_id, {}))
+                continue
+            candidates = {change: n for change, n in changes.items() if current_params.get(change[0]) != change[1]}
+            changed_total = sum(changes.values())
+            for (name, value), n in candidates.items():
+                predictions.append((probability * n / changed_total, query_id, {name: value}))
+        return sorted(predictions, key=lambda p: -p[0])
+
+    def clear(self):
+        with self._lock:
+            self.next_counts.clear()
+            self.popular.clear()
+            self.changes.clear()
+
+
+TRANSITIONS = TransitionModel()
+
+
+@dataclass
+class _Job:
+    query_id: str
+    sql: str
+    params: dict
+    probability: float
+    query: CancellableQuery
+    future: object = None
+    started_at: float | None = None
+    finished_at: float | None = None
+    outcome: str = "queued"
+
+
+@dataclass
+class Speculation:
+    """The speculative runs launched for one request."""
+    executor: "SpeculativeExecutor"
+    jobs: dict = field(default_factory=dict)  # cache key -> _Job
+    settled: bool = False
+
+    def adopt(self, key: str | None) -> dict | None:
+        """
+        Cancel every run except the one for cache ``key`` and wait for that one,
+        so the caller's cached_run hits. Returns {query_id, saved_ms, outcome}
+        for an adopted run, else None.
+        """
+        if self.settled:
+            return None
+        self.settled = True
+        adopted = self.jobs.get(key) if key else None
+        for job in self.jobs.values():
+            if job is not adopted:
+                job.query.cancel()
+        if adopted is None:
+            self.executor._record(discarded=len(self.jobs))
+            return None
+
+        decided_at = time.perf_counter()
+        try:
+            adopted.future.result(timeout=SPECULATE_TIMEOUT_MS / 1000)
+        except Exception:
+            pass
+        # Work done before the decision arrived is latency the request does not pay
+        saved_ms = 0.0
+        if adopted.started_at is not None:
+            saved_ms = (min(adopted.finished_at or decided_at, decided_at) - adopted.started_at) * 1000
+        self.executor._record(discarded=len(self.jobs) - 1, adopted=1, saved_ms=saved_ms)
+        print(f"⚡ Speculative {adopted.query_id} adopted ({adopted.outcome}), saved {saved_ms:.0f} ms")
+        return {"query_id": adopted.query_id, "saved_ms": round(saved_ms, 1), "outcome": adopted.outcome}
+
+    def cancel(self):
+        self.adopt(None)
+
+
+class SpeculativeExecutor:
+    """
+    Launches predicted (query_id, params) runs into a ResultCache.
+
+    ``plan(query_id, params, context)`` returns the (sql, params) the API would
+    run on the cached exact path for an EXECUTE decision with ``params``, or
+    None if required params are missing.
+    """
+
+    def __init__(self, plan, model: TransitionModel = TRANSITIONS, cache: ResultCache = RESULT_CACHE,
+                 top_k: int = SPECULATE_TOP_K, min_probability: float = SPECULATE_MIN_PROBABILITY,
+                 workers: int = SPECULATE_WORKERS, enabled: bool = SPECULATE):
+        self.plan = plan
+        self.model = model
+        self.cache = cache
+        self.top_k = top_k
+        self.min_probability = min_probability
+        self.enabled = enabled
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="speculative")
+        self._lock = threading.Lock()
+        self.launched = 0
+        self.adopted = 0
+        self.discarded = 0
+        self.skipped_cached = 0
+        self.skipped_busy = 0
+        self.skipped_heavy = 0
+        self.saved_ms = 0.0
+
+    def _record(self, discarded: int = 0, adopted: int = 0, saved_ms: float = 0.0):
+        with self._lock:
+            self.discarded += discarded
+            self.adopted += adopted
+            self.saved_ms += saved_ms
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"enabled": self.enabled, "launched": self.launched, "adopted": self.adopted,
+                    "discarded": self.discarded, "skipped_cached": self.skipped_cached,
+                    "skipped_busy": self.skipped_busy, "skipped_heavy": self.skipped_heavy, "saved_ms": round(self.saved_ms, 1)}
+
+    @staticmethod
+    def _pool_busy() -> bool:
+        pool = ENGINE.pool
+        return hasattr(pool, "size") and pool.checkedout() >= pool.size()
+
+    def _run(self, job: _Job):
+        if job.query.cancelled:
+            job.outcome = "cancelled"
+            return
+        try:
+            # Heavy or over-the-ceiling statements only run for real requests, through admission
+            if ADMISSION.enabled and ADMISSION.estimate(job.query_id, job.sql, job.params).lane != "light":
+                job.outcome = "skipped_heavy"
+                with self._lock:
+                    self.skipped_heavy += 1
+                return
+            job.started_at = time.perf_counter()
+            self.cache.cached_run(job.query_id, job.sql, job.params, job.query.run, speculative=True)
+            job.outcome = "done"
+        except Exception as e:
+            job.outcome = "cancelled" if job.query.cancelled else "failed"
+            if not job.query.cancelled:
+                print(f"⚠️  Speculative {job.query_id} failed: {e}")
+        finally:
+            job.finished_at = time.perf_counter()
+
+    def start(self, context) -> Speculation:
+        """Launch the top predictions for a session's next turn; call before resolving intent."""
+        speculation = Speculation(self)
+        if not self.enabled or context is None or not context.last_query_id:
+            return speculation
+
+        for probability, query_id, changed in self.model.predict(context.last_query_id, context.last_params):
+            if len(speculation.jobs) >= self.top_k or probability < self.min_probability:
+                break
+            try:
+                planned = self.plan(query_id, changed, context)
+            except Exception as e:
+                print(f"⚠️  Speculative plan for {query_id} failed: {e}")
+                continue
+            if planned is None:
+                continue
+            sql, params = planned
+            key = cache_key(query_id, sql, params)
+            if key in speculation.jobs:
+                continue
+            if key in self.cache:
+                with self._lock:
+                    self.skipped_cached += 1
+                continue
+            if self._pool_busy():
+                with self._lock:
+                    self.skipped_busy += 1
+                break
+            job = _Job(query_id, sql, params, probability, CancellableQuery(SPECULATE_TIMEOUT_MS))
+            job.future = self._pool.submit(self._run, job)
+            speculation.jobs[key] = job
+            with self._lock:
+                self.launched += 1
+        return speculation
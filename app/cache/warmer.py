@@ -0,0 +1,201 @@
+"""
+Background cache warming for new initializations.
+
+A daemon thread polls the newest forecast and seasonal initializations
+(MAX(initialization) is an index lookup on every ensemble index). When
+either changes, it builds the hourly quantile sketches that are missing
+(app.db.sketches), the calendar hours (app.db.calendar) and the stitched
+forecast + seasonal series (app.db.stitched), then runs every QUERY_REGISTRY template with its
+default params into RESULT_CACHE, so the first analyst to ask about a new
+initialization gets a cache hit. The stitched pair is also rebuilt when a
+source table is written under an unchanged initialization.
+
+Warming uses a small bounded thread pool (WARMER_WORKERS, default 2), well
+under the engine's connection pool, so interactive requests always find a
+free connection. Templates run in priority order: GSI first, then the
+registry order.
+
+Enable in the API with WARM_CACHE=1. With several workers sharing the
+result cache (SHARED_CACHE=1), only the worker holding an flock on
+<SHARED_CACHE_DIR>/nlsql-warmer.lock polls; if it exits, the next worker to
+start takes over. One pass in a throwaway process, to time a warm-up:
+    python -m app.cache.warmer
+"""
+
+import argparse
+import fcntl
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import text
+
+from app.cache.invalidation import DATA_VERSIONS
+from app.cache.results import RESULT_CACHE, ResultCache
+from app.cache.shared import SHARED_CACHE, SHARED_CACHE_DIR
+from app.db.calendar import calendar_template, ensure_calendar
+from app.db.connection import ENGINE
+from app.db.executor import execute_query
+from app.db.sketches import build_sketches, has_sketches
+from app.db.stitched import build_stitched, drop_stitched, is_current, stitched_sql
+from app.queries.query_registry import QUERY_REGISTRY
+from app.queries.sampling import bind_path_count
+from app.queries.templates import get_sql_template
+
+WARMER_POLL_SECONDS = float(os.environ.get("WARMER_POLL_SECONDS", 60))
+WARMER_WORKERS = int(os.environ.get("WARMER_WORKERS", 2))
+
+
+def latest_initializations(conn) -> dict:
+    """Newest forecast/seasonal initializations, under the registry's param names."""
+    forecast = conn.execute(text("SELECT MAX(initialization) FROM energy_forecast_ensemble")).scalar()
+    seasonal = conn.execute(text("SELECT MAX(initialization) FROM energy_base_ensemble")).scalar()
+    return {"initialization": forecast, "forecast_init": forecast, "seasonal_init": seasonal}
+
+
+def template_priority(query_id: str) -> tuple:
+    """Lower sorts first: GSI templates, then registry order."""
+    position = list(QUERY_REGISTRY).index(query_id)
+    return (0 if "GSI" in query_id else 1, position)
+
+
+def warm_params(query_id: str, inits: dict) -> dict | None:
+    """Registry defaults plus initializations; None if a required param has no value."""
+    params = {}
+    for name, info in QUERY_REGISTRY[query_id]["parameters"].items():
+        if "default" in info:
+            params[name] = info["default"]
+        elif inits.get(name) is not None:
+            params[name] = inits[name]
+        else:
+            return None
+    return params
+
+
+class CacheWarmer:
+    """Polls for new initializations and precomputes templates into a ResultCache."""
+
+    def __init__(self, cache: ResultCache = RESULT_CACHE, workers: int = WARMER_WORKERS,
+                 poll_seconds: float = WARMER_POLL_SECONDS):
+        self.cache = cache
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.warmed_inits: dict | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._leader_fd: int | None = None
+
+    def _warm_one(self, query_id: str, params: dict) -> str:
+        try:
+            versions = DATA_VERSIONS.table_versions()
+            sql = (stitched_sql(query_id, params, versions)
+                   or calendar_template(query_id, get_sql_template(query_id), params, versions))
+            with ENGINE.connect() as conn:
+                params = bind_path_count(sql, params, conn=conn)
+            self.cache.cached_run(query_id, sql, params, execute_query)
+            return "warmed"
+        except Exception as e:
+            print(f"⚠️  Warming {query_id} failed: {e}")
+            return "failed"
+
+    def warm(self, inits: dict) -> dict:
+        """Run every template for ``inits`` into the cache. Returns counts and seconds."""
+        started = time.perf_counter()
+        counts = {"warmed": 0, "failed": 0, "skipped": 0}
+        jobs = []
+        for query_id in sorted(QUERY_REGISTRY, key=template_priority):
+            params = warm_params(query_id, inits)
+            if params is None:
+                counts["skipped"] += 1
+                continue
+            jobs.append((query_id, params))
+
+        # The executor runs submissions FIFO, so priority order is kept
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="cache-warmer") as pool:
+            for outcome in pool.map(lambda job: self._warm_one(*job), jobs):
+                counts[outcome] += 1
+        counts["seconds"] = round(time.perf_counter() - started, 2)
+        return counts
+
+    def refresh_stitched(self, conn, inits: dict):
+        """Build the newest init pair's stitched series if missing or out of date; drop older pairs."""
+        forecast_init, seasonal_init = inits["forecast_init"], inits["seasonal_init"]
+        versions = DATA_VERSIONS.table_versions(refresh=True)
+        if seasonal_init is None or is_current(forecast_init, seasonal_init, versions):
+            return
+        rows = build_stitched(conn, forecast_init, seasonal_init, versions)
+        dropped = drop_stitched(conn, (forecast_init, seasonal_init))
+        print(f"🧵 Stitched {forecast_init} + {seasonal_init}: {rows} rows ({dropped} older pairs dropped)")
+
+    def poll_once(self) -> dict | None:
+        """Warm if the newest initializations changed since the last warm; returns warm stats."""
+        with ENGINE.begin() as conn:
+            inits = latest_initializations(conn)
+            if inits["initialization"] is None:
+                return None
+            self.refresh_stitched(conn, inits)
+            if inits == self.warmed_inits:
+                return None
+            for init in {inits["forecast_init"], inits["seasonal_init"]} - {None}:
+                if not has_sketches(conn, init):
+                    print(f"📐 Building sketches for {init}")
+                    build_sketches(conn, init)
+                ensure_calendar(conn, init)
+
+        print(f"🔥 Warming cache for {inits['initialization']} / {inits['seasonal_init']}")
+        stats = self.warm(inits)
+        self.warmed_inits = inits
+        print(f"🔥 Cache warm: {stats}")
+        return stats
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"⚠️  Cache warmer poll failed: {e}")
+            self._stop.wait(self.poll_seconds)
+
+    def _elect(self) -> bool:
+        """With a shared cache, True only in the one process holding the warmer lock."""
+        if not SHARED_CACHE or self._leader_fd is not None:
+            return True
+        fd = os.open(os.path.join(SHARED_CACHE_DIR, "nlsql-warmer.lock"), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._leader_fd = fd  # held until the process exits
+        return True
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        if not self._elect():
+            print(f"🔥 Cache warmer runs in another worker (pid {os.getpid()} stands by)")
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="cache-warmer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_seconds)
+
+
+WARMER = CacheWarmer()
+
+
+def main(argv=None) -> int:
+    argparse.ArgumentParser(prog="python -m app.cache.warmer").parse_args(argv)
+    WARMER.poll_once()
+    print(f"📊 {RESULT_CACHE.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
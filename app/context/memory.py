@@ -5,13 +5,25 @@ Stores:
 - Conversation history (last N turns)
 - Last used parameters (for reuse in follow-ups)
 - Last query results summary
+
+With SHARED_CACHE=1 (multi-worker deployments) sessions live in a SharedSlots
+file every worker maps, so a follow-up finds its context whichever worker
+receives it. The shared copy is then the session: a worker's local copy may
+miss turns recorded elsewhere, so it is never used instead. A session too
+big for a slot (SHARED_SESSION_SLOT_KB) is trimmed to fit: data previews
+first, oldest turn first, then the oldest turns.
 """
 
+import os
 from typing import Optional
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 
+from app.cache.shared import SHARED_WAYS, shared_slots
+
 MAX_HISTORY_TURNS = 25  # Keep last 25 conversation turns for extended sessions
+SHARED_SESSION_SLOTS = int(os.environ.get("SHARED_SESSION_SLOTS", 2048))
+SHARED_SESSION_SLOT_KB = int(os.environ.get("SHARED_SESSION_SLOT_KB", 32))
 
 
 @dataclass
@@ -66,26 +78,65 @@ class SessionContext:
 
 # In-memory session store
 SESSION_STORE: dict[str, SessionContext] = {}
+# Cross-worker session store (None unless SHARED_CACHE=1)
+SHARED_SESSIONS = shared_slots("sessions", SHARED_SESSION_SLOTS // SHARED_WAYS, SHARED_SESSION_SLOT_KB * 1024)
 
 
 def get_context(session_id: str) -> Optional[SessionContext]:
     """Retrieve session context."""
+    if SHARED_SESSIONS is not None:
+        # Another worker may have recorded the latest turn, so the local copy is no fallback
+        data = SHARED_SESSIONS.get(session_id)
+        if data is None:
+            if SESSION_STORE.pop(session_id, None) is not None:
+                print(f"⚠️  Session {session_id} is no longer in the shared store (evicted); starting over")
+            return None
+        SESSION_STORE[session_id] = SessionContext.from_dict(data)
     return SESSION_STORE.get(session_id)
 
 
+def _trimmed(data: dict):
+    """Ever smaller copies of a session dict: data previews dropped oldest first, then the oldest turns."""
+    history = [dict(turn) for turn in data["history"]]
+    for turn in history:
+        if turn.get("data_preview"):
+            turn["data_preview"] = None
+            yield {**data, "history": list(history)}
+    while len(history) > 1:
+        history = history[1:]
+        yield {**data, "history": history}
+
+
 def save_context(session_id: str, context: SessionContext):
     """Save session context."""
     SESSION_STORE[session_id] = context
+    if SHARED_SESSIONS is None:
+        return
+    data = context.to_dict()
+    if SHARED_SESSIONS.put(session_id, data):
+        return
+    for smaller in _trimmed(data):
+        if SHARED_SESSIONS.put(session_id, smaller):
+            print(f"✂️  Session {session_id} trimmed to fit a {SHARED_SESSION_SLOT_KB} KB shared slot "
+                  f"({len(smaller['history'])} turns kept)")
+            SESSION_STORE[session_id] = SessionContext.from_dict(smaller)
+            return
+    SESSION_STORE.pop(session_id, None)
+    print(f"⚠️  Session {session_id} does not fit a {SHARED_SESSION_SLOT_KB} KB shared slot; "
+          f"its follow-ups will start without context")
 
 
 def get_or_create_context(session_id: str) -> SessionContext:
     """Get existing context or create a new one."""
-    if session_id not in SESSION_STORE:
-        SESSION_STORE[session_id] = SessionContext()
-    return SESSION_STORE[session_id]
+    context = get_context(session_id)
+    if context is None:
+        context = SESSION_STORE[session_id] = SessionContext()
+    return context
 
 
 def clear_context(session_id: str):
     """Clear a session's context."""
     if session_id in SESSION_STORE:
         del SESSION_STORE[session_id]
+    if SHARED_SESSIONS is not None:
+        SHARED_SESSIONS.delete(session_id)
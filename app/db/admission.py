@@ -0,0 +1,276 @@
+"""
+Cost-based admission control for template execution.
+
+Before a statement runs, the planner's estimate for it (``EXPLAIN (FORMAT
+JSON)``: planned, not run) decides how it runs:
+- total cost <= ADMISSION_LIGHT_COST (10,000): at once
+- up to ADMISSION_MAX_COST (1,000,000): the heavy lane, at most
+  ADMISSION_HEAVY_SLOTS (2) statements at a time; a statement waits up to
+  ADMISSION_QUEUE_TIMEOUT seconds (30) for a slot, then is turned away with
+  AdmissionTimeout
+- above ADMISSION_MAX_COST: not run (QueryTooExpensive); /query asks for
+  narrower params instead
+
+Costs are Postgres planner units (a sequential page read is 1). Estimates
+are cached (LRU, ADMISSION_ESTIMATE_CACHE entries) per SQL text and param
+shape: timestamps and dates by type only, ints by power-of-two bucket,
+floats to one significant digit, strings as they are. Widening days_ahead
+from 7 to 90 is a new shape; the next initialization is not.
+ADMISSION=0 turns the controller off (every statement runs at once).
+
+With SHARED_CACHE on (the multi-worker preset), the heavy-lane slots are
+shared by every worker: slot i is an flock on
+<SHARED_CACHE_DIR>/nlsql-heavy-<i>.lock, released when the statement ends or
+its process dies; waiters poll every HEAVY_SLOT_POLL_SECONDS. Otherwise they
+are a semaphore in this process.
+"""
+
+import fcntl
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+
+from sqlalchemy.sql import text
+
+from app.cache.shared import SHARED_CACHE, SHARED_CACHE_DIR
+from app.db.connection import ENGINE
+from app.queries.query_registry import QUERY_REGISTRY
+
+ADMISSION_ENABLED = os.environ.get("ADMISSION", "1") != "0"
+ADMISSION_LIGHT_COST = float(os.environ.get("ADMISSION_LIGHT_COST", 10_000))
+ADMISSION_MAX_COST = float(os.environ.get("ADMISSION_MAX_COST", 1_000_000))
+ADMISSION_HEAVY_SLOTS = int(os.environ.get("ADMISSION_HEAVY_SLOTS", 2))
+ADMISSION_QUEUE_TIMEOUT = float(os.environ.get("ADMISSION_QUEUE_TIMEOUT", 30))
+ADMISSION_ESTIMATE_CACHE = int(os.environ.get("ADMISSION_ESTIMATE_CACHE", 1024))
+HEAVY_SLOT_POLL_SECONDS = 0.02
+
+
+class QueryTooExpensive(Exception):
+    """The planner's estimate is above the admission ceiling."""
+
+    def __init__(self, query_id: str, estimate: "Estimate", ceiling: float):
+        super().__init__(f"{query_id}: estimated cost {estimate.cost:,.0f} is above the limit of {ceiling:,.0f}")
+        self.query_id = query_id
+        self.estimate = estimate
+        self.ceiling = ceiling
+
+
+class AdmissionTimeout(TimeoutError):
+    """No heavy-lane slot freed up within the queue timeout."""
+
+
+@dataclass
+class Estimate:
+    """Planner estimate for one statement and the lane it is admitted to."""
+    cost: float
+    rows: int
+    lane: str  # "light", "heavy" or "rejected"
+    cached: bool = False  # estimate came from the estimate cache
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def _shape(value, param_type: str | None):
+    if value is None or param_type in ("timestamptz", "date"):
+        return param_type
+    if isinstance(value, bool):
+        return value
+    if param_type == "int" or isinstance(value, int):
+        number = int(value)
+        return f"int:{'-' if number < 0 else ''}2^{math.ceil(math.log2(abs(number) + 1))}"
+    if param_type == "float" or isinstance(value, float):
+        return f"float:{float(value):.0e}"
+    return value
+
+
+def shape_key(query_id: str, sql: str, params: dict) -> str:
+    """Estimate-cache key: the SQL text plus the shape (not the values) of its params."""
+    types = {name: info.get("type") for name, info in QUERY_REGISTRY.get(query_id, {}).get("parameters", {}).items()}
+    shape = {name: _shape(value, types.get(name)) for name, value in params.items()}
+    return json.dumps([" ".join(sql.split()), shape], sort_keys=True, default=str)
+
+
+class _LocalSlots:
+    """Heavy-lane slots of this process."""
+
+    def __init__(self, n: int):
+        self._semaphore = threading.BoundedSemaphore(n)
+
+    def acquire(self, timeout: float):
+        return True if self._semaphore.acquire(timeout=timeout) else None
+
+    def release(self, token):
+        self._semaphore.release()
+
+
+class _FileSlots:
+    """Heavy-lane slots shared by every process: slot i is an flock on its own file."""
+
+    def __init__(self, n: int, directory: str = SHARED_CACHE_DIR):
+        self.paths = [os.path.join(directory, f"nlsql-heavy-{i}.lock") for i in range(n)]
+
+    def _try(self) -> int | None:
+        for path in self.paths:
+            # A new open file per attempt: flock excludes other open files, in this process too
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except BlockingIOError:
+                os.close(fd)
+        return None
+
+    def acquire(self, timeout: float) -> int | None:
+        deadline = time.monotonic() + timeout
+        while True:
+            fd = self._try()
+            if fd is not None or time.monotonic() >= deadline:
+                return fd
+            time.sleep(HEAVY_SLOT_POLL_SECONDS)
+
+    def release(self, fd: int):
+        os.close(fd)  # drops the lock
+
+
+def heavy_slots_for(n: int, shared: bool = SHARED_CACHE):
+    """Slots shared across workers when SHARED_CACHE is on (and the directory is usable), else per process."""
+    if shared:
+        try:
+            slots = _FileSlots(n)
+            os.close(os.open(slots.paths[0], os.O_RDWR | os.O_CREAT, 0o600))  # the directory is usable
+            return slots
+        except OSError as e:
+            print(f"⚠️  Shared heavy-lane slots unavailable ({e}); the limit is per process")
+    return _LocalSlots(n)
+
+
+class AdmissionController:
+    def __init__(self, light_cost: float = ADMISSION_LIGHT_COST, max_cost: float = ADMISSION_MAX_COST,
+                 heavy_slots: int = ADMISSION_HEAVY_SLOTS, queue_timeout: float = ADMISSION_QUEUE_TIMEOUT,
+                 cache_size: int = ADMISSION_ESTIMATE_CACHE, enabled: bool = ADMISSION_ENABLED, window: int = 1000,
+                 shared: bool = SHARED_CACHE):
+        self.light_cost = light_cost
+        self.max_cost = max_cost
+        self.heavy_slots = heavy_slots
+        self.queue_timeout = queue_timeout
+        self.cache_size = cache_size
+        self.enabled = enabled
+        self._heavy = heavy_slots_for(heavy_slots, shared)
+        self._estimates: OrderedDict[str, tuple[float, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=window)
+        self.counts = {"light": 0, "heavy": 0, "rejected": 0, "timeouts": 0}
+        self.estimates = 0
+        self.estimate_hits = 0
+        self.heavy_in_flight = 0
+        self.max_heavy_in_flight = 0
+
+    def lane_for(self, cost: float) -> str:
+        if cost <= self.light_cost:
+            return "light"
+        if cost <= self.max_cost:
+            return "heavy"
+        return "rejected"
+
+    def estimate(self, query_id: str, sql: str, params: dict) -> Estimate:
+        """Planner cost and rows for ``sql`` with ``params``, cached per param shape."""
+        key = shape_key(query_id, sql, params)
+        with self._lock:
+            cached = self._estimates.get(key)
+            if cached is not None:
+                self._estimates.move_to_end(key)
+                self.estimate_hits += 1
+        if cached is None:
+            with ENGINE.connect() as conn:
+                plan = conn.execute(text("EXPLAIN (FORMAT JSON) " + sql), params).scalar()[0]["Plan"]
+            cached = (float(plan["Total Cost"]), int(plan["Plan Rows"]))
+            with self._lock:
+                self.estimates += 1
+                self._estimates[key] = cached
+                while len(self._estimates) > self.cache_size:
+                    self._estimates.popitem(last=False)
+            return Estimate(cost=cached[0], rows=cached[1], lane=self.lane_for(cached[0]))
+        return Estimate(cost=cached[0], rows=cached[1], lane=self.lane_for(cached[0]), cached=True)
+
+    @contextmanager
+    def admit(self, query_id: str, sql: str, params: dict):
+        """
+        Hold admission for one run of ``sql``: yields its Estimate (None when
+        disabled) once it may run. Raises QueryTooExpensive above the ceiling
+        and AdmissionTimeout if the heavy lane stays full.
+        """
+        if not self.enabled:
+            yield None
+            return
+        estimate = self.estimate(query_id, sql, params)
+        if estimate.lane == "rejected":
+            with self._lock:
+                self.counts["rejected"] += 1
+            print(f"⛔ Admission: {query_id} rejected (cost {estimate.cost:,.0f})")
+            raise QueryTooExpensive(query_id, estimate, self.max_cost)
+        if estimate.lane == "light":
+            with self._lock:
+                self.counts["light"] += 1
+            yield estimate
+            return
+
+        queued = time.perf_counter()
+        slot = self._heavy.acquire(self.queue_timeout)
+        if slot is None:
+            with self._lock:
+                self.counts["timeouts"] += 1
+            raise AdmissionTimeout(f"No heavy-lane slot for {query_id} within {self.queue_timeout:g}s "
+                                   f"({self.heavy_slots} heavy queries running)")
+        with self._lock:
+            self.counts["heavy"] += 1
+            self._waits.append((time.perf_counter() - queued) * 1000)
+            self.heavy_in_flight += 1
+            self.max_heavy_in_flight = max(self.max_heavy_in_flight, self.heavy_in_flight)
+        try:
+            yield estimate
+        finally:
+            with self._lock:
+                self.heavy_in_flight -= 1
+            self._heavy.release(slot)
+
+    def admitted(self, query_id: str, run):
+        """``run(sql, params)`` wrapped so each call goes through admission first."""
+        def admitted_run(sql: str, params: dict):
+            with self.admit(query_id, sql, params):
+                return run(sql, params)
+        return admitted_run
+
+    @staticmethod
+    def _percentile(values: list, q: float) -> float | None:
+        if not values:
+            return None
+        ordered = sorted(values)
+        return round(ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))], 1)
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = list(self._waits)
+            stats = {
+                "enabled": self.enabled,
+                "light_cost": self.light_cost,
+                "max_cost": self.max_cost,
+                "heavy_slots": self.heavy_slots,
+                "heavy_slots_shared": isinstance(self._heavy, _FileSlots),
+                **self.counts,
+                "heavy_in_flight": self.heavy_in_flight,
+                "max_heavy_in_flight": self.max_heavy_in_flight,
+                "estimates": self.estimates,
+                "estimate_hits": self.estimate_hits,
+                "cached_estimates": len(self._estimates),
+            }
+        return {**stats, "heavy_wait_p50_ms": self._percentile(waits, 50),
+                "heavy_wait_p95_ms": self._percentile(waits, 95)}
+
+
+ADMISSION = AdmissionController()
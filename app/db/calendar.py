@@ -0,0 +1,215 @@
+"""
+Hourly US/Central calendar dimension, keyed by valid_datetime.
+
+Templates that filter or group on ``EXTRACT(HOUR/MONTH FROM valid_datetime
+AT TIME ZONE 'US/Central')`` evaluate the expression on every row the index
+range returns. Their "calendar" variants look the matching hours up in
+CALENDAR_TABLE instead and probe the ensemble index with
+``valid_datetime = ANY(...)``, so only the selected hours are read.
+
+Columns (local = US/Central):
+- hour_beginning, local_date, local_month, local_year, day_of_week (0 = Sunday)
+- utc_month: the month in UTC, for templates that extract it without a zone
+- is_dst, is_dst_transition (local date has 23 or 25 hours), is_weekend
+- peak_period: 'on_peak' for weekday hours beginning 06-21, else 'off_peak'
+
+The calendar must cover every valid_datetime of the data; ingest extends it
+to each loaded initialization (ensure_calendar). Hours missing from it would
+silently drop out of a calendar variant's result, so calendar_template only
+picks the calendar variant once the calendar covers the MIN..MAX
+valid_datetime of every (table, initialization) the query reads, and the
+base template otherwise (right after ingest, before the warmer extends it;
+data loaded some other way; no calendar table at all).
+
+Usage:
+    python -m app.db.calendar build [--start 2025-01-01 --end 2027-01-01]
+    python -m app.db.calendar status
+"""
+
+import argparse
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import text
+
+from app.cache.invalidation import dependencies
+from app.db.schema import ENSEMBLE_TABLES
+from app.queries.templates import BASE_VARIANT, active_variant, get_sql_template
+
+CALENDAR_TABLE = "calendar_hours"
+CALENDAR_VARIANT = "calendar"
+LOCAL_TIMEZONE = "US/Central"
+ON_PEAK_HOURS = (6, 21)  # hour-beginning, weekdays
+
+# How long a "not covered" answer is trusted before the calendar is checked again
+COVERAGE_TTL_SECONDS = 5.0
+COVERAGE_MEMO = 1024
+
+CALENDAR_DDL = f"""
+CREATE TABLE IF NOT EXISTS {CALENDAR_TABLE} (
+    valid_datetime timestamptz PRIMARY KEY,
+    hour_beginning smallint NOT NULL,
+    local_date date NOT NULL,
+    local_month smallint NOT NULL,
+    local_year smallint NOT NULL,
+    day_of_week smallint NOT NULL,
+    utc_month smallint NOT NULL,
+    is_dst boolean NOT NULL,
+    is_dst_transition boolean NOT NULL,
+    is_weekend boolean NOT NULL,
+    peak_period text NOT NULL
+);
+CREATE INDEX IF NOT EXISTS {CALENDAR_TABLE}_hour_idx ON {CALENDAR_TABLE} (hour_beginning, valid_datetime);
+CREATE INDEX IF NOT EXISTS {CALENDAR_TABLE}_month_hour_idx ON {CALENDAR_TABLE} (local_month, hour_beginning, valid_datetime);
+CREATE INDEX IF NOT EXISTS {CALENDAR_TABLE}_utc_month_idx ON {CALENDAR_TABLE} (utc_month, valid_datetime)
+"""
+
+_BUILD_SQL = f"""
+INSERT INTO {CALENDAR_TABLE}
+SELECT ts,
+       EXTRACT(HOUR FROM local_ts),
+       CAST(local_ts AS date),
+       EXTRACT(MONTH FROM local_ts),
+       EXTRACT(YEAR FROM local_ts),
+       EXTRACT(DOW FROM local_ts),
+       EXTRACT(MONTH FROM ts AT TIME ZONE 'UTC'),
+       local_ts - (ts AT TIME ZONE 'UTC') = interval '-5 hours',
+       (CAST(local_ts AS date) + 1)::timestamp AT TIME ZONE '{LOCAL_TIMEZONE}'
+           - CAST(local_ts AS date)::timestamp AT TIME ZONE '{LOCAL_TIMEZONE}' <> interval '24 hours',
+       EXTRACT(DOW FROM local_ts) IN (0, 6),
+       CASE WHEN EXTRACT(DOW FROM local_ts) NOT IN (0, 6)
+                 AND EXTRACT(HOUR FROM local_ts) BETWEEN {ON_PEAK_HOURS[0]} AND {ON_PEAK_HOURS[1]}
+            THEN 'on_peak' ELSE 'off_peak' END
+FROM (
+    SELECT ts, ts AT TIME ZONE '{LOCAL_TIMEZONE}' AS local_ts
+    FROM generate_series(date_trunc('hour', CAST(:start AS timestamptz)), CAST(:end AS timestamptz), interval '1 hour') ts
+) hours
+ON CONFLICT (valid_datetime) DO NOTHING
+"""
+
+
+def create_calendar_table(conn):
+    conn.execute(text(CALENDAR_DDL))
+
+
+def build_calendar(conn, start, end) -> int:
+    """Add every hour in [start, end] that is not in the calendar yet. Returns hours added."""
+    create_calendar_table(conn)
+    return conn.execute(text(_BUILD_SQL), {"start": start, "end": end}).rowcount
+
+
+def ensure_calendar(conn, initialization, tables: list[str] | None = None) -> int:
+    """Extend the calendar over every valid_datetime of one initialization."""
+    added = 0
+    for table in tables or ENSEMBLE_TABLES:
+        start, end = conn.execute(
+            text(f"SELECT MIN(valid_datetime), MAX(valid_datetime) FROM {table} WHERE initialization = :init"),
+            {"init": initialization},
+        ).one()
+        if start is not None:
+            added += build_calendar(conn, start, end)
+    return added
+
+
+# (table, init iso) -> (table version, covered, checked at), LRU of COVERAGE_MEMO; covered answers
+# hold until the table is written, and an answer for an older version is replaced, not kept
+_COVERAGE: OrderedDict = OrderedDict()
+_coverage_lock = threading.Lock()
+
+
+def _covers(conn, table: str, init) -> bool:
+    """calendar_hours has every hour from the first to the last valid_datetime of ``init`` in ``table``."""
+    if conn.execute(text("SELECT to_regclass(:table)"), {"table": CALENDAR_TABLE}).scalar() is None:
+        return False
+    start, end = conn.execute(
+        text(f"SELECT MIN(valid_datetime), MAX(valid_datetime) FROM {table} WHERE initialization = :init"),
+        {"init": init},
+    ).one()
+    if start is None:
+        return True  # nothing of this init to drop
+    hours = conn.execute(
+        text(f"SELECT COUNT(*) FROM {CALENDAR_TABLE} WHERE valid_datetime BETWEEN :start AND :end"),
+        {"start": start, "end": end},
+    ).scalar()
+    return hours >= int((end - start).total_seconds() // 3600) + 1
+
+
+def calendar_covers(deps: tuple, table_versions: dict) -> bool:
+    """calendar_hours covers every (table, initialization) in ``deps`` (see app.cache.invalidation.dependencies)."""
+    from app.db.connection import ENGINE
+
+    now = time.monotonic()
+    todo = []
+    with _coverage_lock:
+        for table, init in deps:
+            version = table_versions.get(table)
+            known = _COVERAGE.get((table, init))
+            if known is not None and known[0] == version:
+                _COVERAGE.move_to_end((table, init))
+            else:
+                known = None
+            if known is None or (not known[1] and now - known[2] >= COVERAGE_TTL_SECONDS):
+                todo.append((table, init, version))
+            elif not known[1]:
+                return False
+    if not todo:
+        return True
+    covered = True
+    with ENGINE.connect() as conn:
+        for table, init, version in todo:
+            ok = _covers(conn, table, init)
+            with _coverage_lock:
+                _COVERAGE[(table, init)] = (version, ok, now)
+                _COVERAGE.move_to_end((table, init))
+                while len(_COVERAGE) > COVERAGE_MEMO:
+                    _COVERAGE.popitem(last=False)
+            covered = covered and ok
+    return covered
+
+
+def calendar_template(query_id: str, sql: str, params: dict, table_versions: dict) -> str:
+    """
+    ``sql`` (the registry-selected template of ``query_id``), or the base
+    template if that is the calendar variant and calendar_hours does not
+    cover its data yet.
+    """
+    if active_variant(query_id) != CALENDAR_VARIANT:
+        return sql
+    if calendar_covers(dependencies(sql, params), table_versions):
+        return sql
+    print(f"📅 calendar_hours does not cover {query_id} yet; running its base template")
+    return get_sql_template(query_id, BASE_VARIANT)
+
+
+def main(argv=None) -> int:
+    from app.db.connection import ENGINE
+
+    parser = argparse.ArgumentParser(prog="python -m app.db.calendar")
+    parser.add_argument("command", choices=["build", "status"])
+    parser.add_argument("--start", help="Defaults to every loaded initialization's range")
+    parser.add_argument("--end")
+    args = parser.parse_args(argv)
+
+    with ENGINE.begin() as conn:
+        if args.command == "build":
+            if args.start and args.end:
+                added = build_calendar(conn, args.start, args.end)
+            else:
+                added = 0
+                for table in ENSEMBLE_TABLES:
+                    for (init,) in conn.execute(text(f"SELECT DISTINCT initialization FROM {table}")):
+                        added += ensure_calendar(conn, init, tables=[table])
+            print(f"📅 {added} hours added")
+
+        create_calendar_table(conn)
+        count, start, end = conn.execute(
+            text(f"SELECT COUNT(*), MIN(valid_datetime), MAX(valid_datetime) FROM {CALENDAR_TABLE}")
+        ).one()
+        print(f"📅 {CALENDAR_TABLE}: {count} hours, {start} .. {end}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
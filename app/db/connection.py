@@ -17,6 +17,8 @@ url = URL.create(
 ENGINE = create_engine(
     url,
     pool_pre_ping=True,
-    connect_args={"sslmode": "require"}
+    # Sessions in UTC: base templates EXTRACT(MONTH FROM valid_datetime) in the session zone, their
+    # calendar variants read calendar_hours.utc_month; both must mean the same month
+    connect_args={"sslmode": os.environ.get("DB_SSLMODE", "require"), "options": "-c timezone=UTC"}
 )
 
@@ -1,7 +1,158 @@
+import os
+import threading
+from collections import Counter
+
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.sql import text
 from .connection import ENGINE
 
+# statement_timeout for registry templates without their own "statement_timeout_ms"
+STATEMENT_TIMEOUT_MS = int(os.environ.get("STATEMENT_TIMEOUT_MS", 30000))
+
+# SQLSTATE query_canceled: raised for both statement_timeout and cancel requests
+QUERY_CANCELED = "57014"
+
+
 def execute_query(sql: str, params: dict):
     with ENGINE.connect() as conn:
         result = conn.execute(text(sql), params)
         return [dict(row._mapping) for row in result.fetchall()]
+
+
+class QueryCancelled(Exception):
+    """A CancellableQuery was cancelled, before its statement started or while it ran."""
+
+
+class QueryTimeout(TimeoutError):
+    """A statement ran past its statement_timeout."""
+
+
+class ExecutionMetrics:
+    """Counts of statements that timed out or were cancelled, in total and per template."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.totals = Counter()
+        self.by_query: dict[str, Counter] = {}
+
+    def record(self, outcome: str, label: str | None = None):
+        with self._lock:
+            self.totals[outcome] += 1
+            if label:
+                self.by_query.setdefault(label, Counter())[outcome] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                **{k: self.totals[k] for k in ("runs", "timeouts", "cancelled", "cancelled_before_start",
+                                               "disconnects")},
+                "by_query": {q: dict(c) for q, c in self.by_query.items() if set(c) - {"runs"}},
+            }
+
+    def reset(self):
+        with self._lock:
+            self.totals.clear()
+            self.by_query.clear()
+
+
+QUERY_METRICS = ExecutionMetrics()
+
+
+def _set_timeout(conn, statement_timeout_ms: int | None):
+    # SET LOCAL statement_timeout, as a bindable function: lasts until the transaction ends
+    if statement_timeout_ms:
+        conn.execute(text("SELECT set_config('statement_timeout', :ms, true)"),
+                     {"ms": str(int(statement_timeout_ms))})
+
+
+def _cancel_error(error: DBAPIError, cancelled: bool, statement_timeout_ms: int | None,
+                  label: str | None) -> Exception | None:
+    """QueryCancelled / QueryTimeout for a query_canceled error, None for any other error."""
+    if getattr(error.orig, "pgcode", None) != QUERY_CANCELED:
+        return None
+    if cancelled:
+        QUERY_METRICS.record("cancelled", label)
+        return QueryCancelled(f"{label or 'Query'} cancelled while running")
+    if "statement timeout" in str(error.orig):
+        QUERY_METRICS.record("timeouts", label)
+        print(f"⏱️  {label or 'Query'} hit its statement_timeout ({statement_timeout_ms} ms)")
+        return QueryTimeout(f"{label or 'Query'} ran past its statement timeout of {statement_timeout_ms} ms")
+    return None
+
+
+def stream_query(sql: str, params: dict, batch_rows: int, statement_timeout_ms: int | None = None,
+                 label: str | None = None):
+    """
+    Column names, then lists of up to ``batch_rows`` row tuples, read from a
+    server-side cursor; the connection is held until the generator finishes.
+    ``statement_timeout_ms`` bounds each statement (the query, every fetch).
+    """
+    with ENGINE.connect() as conn:
+        QUERY_METRICS.record("runs", label)
+        try:
+            _set_timeout(conn, statement_timeout_ms)
+            result = conn.execution_options(stream_results=True, max_row_buffer=batch_rows).execute(text(sql), params)
+            yield list(result.keys())
+            for partition in result.partitions(batch_rows):
+                yield [tuple(row) for row in partition]
+        except DBAPIError as e:
+            error = _cancel_error(e, False, statement_timeout_ms, label)
+            if error is None:
+                raise
+            raise error from e
+
+
+class CancellableQuery:
+    """
+    A query run on one thread that another thread can cancel.
+
+    cancel() sends a Postgres cancel request for the running statement
+    (psycopg2 ``connection.cancel()``); run() then raises QueryCancelled and
+    the connection goes back to the pool. ``statement_timeout_ms`` bounds the
+    statement for this transaction only (QueryTimeout past it). ``label``
+    (the query_id) names the query in QUERY_METRICS.
+    """
+
+    def __init__(self, statement_timeout_ms: int | None = None, label: str | None = None):
+        self.cancelled = False
+        self.statement_timeout_ms = statement_timeout_ms
+        self.label = label
+        self._dbapi_conn = None
+        self._lock = threading.Lock()
+
+    def run(self, sql: str, params: dict) -> list[dict]:
+        with ENGINE.connect() as conn:
+            with self._lock:
+                if self.cancelled:
+                    QUERY_METRICS.record("cancelled_before_start", self.label)
+                    raise QueryCancelled("Query cancelled before it started")
+                self._dbapi_conn = conn.connection.dbapi_connection
+            QUERY_METRICS.record("runs", self.label)
+            try:
+                _set_timeout(conn, self.statement_timeout_ms)
+                # A cancel() that landed while the backend was idle (before the
+                # statement started) cancels nothing server-side
+                with self._lock:
+                    if self.cancelled:
+                        QUERY_METRICS.record("cancelled_before_start", self.label)
+                        raise QueryCancelled("Query cancelled before it started")
+                result = conn.execute(text(sql), params)
+                rows = [dict(row._mapping) for row in result.fetchall()]
+                if self.cancelled:
+                    QUERY_METRICS.record("cancelled", self.label)
+                    raise QueryCancelled(f"{self.label or 'Query'} cancelled while running")
+                return rows
+            except DBAPIError as e:
+                error = _cancel_error(e, self.cancelled, self.statement_timeout_ms, self.label)
+                if error is None:
+                    raise
+                raise error from e
+            finally:
+                with self._lock:
+                    self._dbapi_conn = None
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            if self._dbapi_conn is not None:
+                self._dbapi_conn.cancel()
@@ -0,0 +1,263 @@
+"""
+Initialization-based partitioning for the ensemble tables.
+
+Each table becomes a partitioned parent keyed on ``initialization``:
+- strategy "list": one partition per initialization (FOR VALUES IN (init))
+- strategy "day":  one partition per UTC day of initializations (RANGE)
+
+Forecast rows are valid for 336 h and then belong in the seasonal tables.
+With partitions that move is metadata-only: the expired partition is
+DETACHed from energy_forecast_ensemble / weather_forecast_ensemble and
+ATTACHed to energy_base_ensemble / weather_seasonal_ensemble. Retention
+drops whole partitions instead of DELETEing rows, so nothing bloats.
+
+Usage:
+    python -m app.db.partitions convert [--strategy list|day]
+    python -m app.db.partitions list
+    python -m app.db.partitions maintain [--retention-days 400] [--dry-run]
+"""
+
+import argparse
+import re
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from app.db.schema import ENSEMBLE_TABLES, INDEXES, TABLE_DDL
+
+FORECAST_VALID_HOURS = 336
+
+# Forecast table -> table its partitions roll into once expired
+ROLLOVER_TARGETS = {
+    "energy_forecast_ensemble": "energy_base_ensemble",
+    "weather_forecast_ensemble": "weather_seasonal_ensemble",
+}
+
+STRATEGIES = ("list", "day")
+
+_BOUND_TS = re.compile(r"'([^']+)'")
+
+
+@dataclass
+class Partition:
+    """A child partition and the initialization range it holds: [lower, upper)."""
+    table: str
+    name: str
+    lower: datetime
+    upper: datetime
+
+
+def _parse_ts(value: str) -> datetime:
+    ts = datetime.fromisoformat(value.replace(" ", "T"))
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def _day_start(ts: datetime) -> datetime:
+    ts = ts.astimezone(timezone.utc)
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def partition_name(table: str, init: datetime, strategy: str) -> str:
+    init = init.astimezone(timezone.utc)
+    if strategy == "day":
+        return f"{table}_d{init:%Y%m%d}"
+    return f"{table}_p{init:%Y%m%dt%H%M}"
+
+
+def partition_bounds(init: datetime, strategy: str) -> str:
+    init = init.astimezone(timezone.utc)
+    if strategy == "day":
+        start = _day_start(init)
+        return f"FROM ('{start.isoformat()}') TO ('{(start + timedelta(days=1)).isoformat()}')"
+    return f"IN ('{init.isoformat()}')"
+
+
+class PartitionManager:
+    """
+    Creates, rolls over and expires initialization partitions.
+
+    All methods take an open SQLAlchemy connection; callers own the
+    transaction. The session time zone is pinned to UTC so partition bounds
+    render the same on every server.
+    """
+
+    def __init__(self, strategy: str = "list"):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown partition strategy: {strategy}")
+        self.strategy = strategy
+
+    # ---- DDL ----
+
+    def parent_ddl(self, table: str) -> str:
+        method = "LIST" if self.strategy == "list" else "RANGE"
+        return TABLE_DDL.format(table=table).strip() + f" PARTITION BY {method} (initialization)"
+
+    def create_parent(self, conn, table: str):
+        conn.execute(text(self.parent_ddl(table)))
+        for ix in INDEXES:
+            if ix.table == table and not ix.optional:
+                conn.execute(text(ix.create_sql(concurrently=False)))
+
+    def is_partitioned(self, conn, table: str) -> bool:
+        return bool(conn.execute(
+            text("SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = :t"),
+            {"t": table},
+        ).scalar())
+
+    def ensure_partition(self, conn, table: str, init: datetime) -> str:
+        """Create the partition holding ``init`` if it does not exist; returns its name."""
+        name = partition_name(table, init, self.strategy)
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+            f"FOR VALUES {partition_bounds(init, self.strategy)}"
+        ))
+        return name
+
+    def convert(self, conn, table: str) -> int:
+        """
+        Turn an existing plain table into a partitioned one, one partition per
+        initialization (or day). Returns the number of partitions created.
+        """
+        if self.is_partitioned(conn, table):
+            return 0
+        legacy = f"{table}_unpartitioned"
+        conn.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+        for ix in INDEXES:
+            if ix.table == table:
+                conn.execute(text(f"ALTER INDEX IF EXISTS {ix.name} RENAME TO {ix.name}_unpartitioned"))
+        self.create_parent(conn, table)
+
+        inits = [row[0] for row in conn.execute(text(f"SELECT DISTINCT initialization FROM {legacy}"))]
+        names = set()
+        for init in inits:
+            names.add(self.ensure_partition(conn, table, init))
+        conn.execute(text(f"INSERT INTO {table} SELECT * FROM {legacy}"))
+        conn.execute(text(f"DROP TABLE {legacy}"))
+        conn.execute(text(f"ANALYZE {table}"))
+        return len(names)
+
+    # ---- Introspection ----
+
+    def partitions(self, conn, table: str) -> list[Partition]:
+        # Bounds print in UTC; SET LOCAL ends with this transaction, so the pooled connection keeps its zone
+        conn.execute(text("SET LOCAL TIME ZONE 'UTC'"))
+        rows = conn.execute(text("""
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            WHERE p.relname = :table
+            ORDER BY c.relname
+        """), {"table": table}).fetchall()
+
+        result = []
+        for name, bound in rows:
+            stamps = [_parse_ts(s) for s in _BOUND_TS.findall(bound or "")]
+            if not stamps:
+                continue  # DEFAULT partition
+            if bound.startswith("FOR VALUES IN"):
+                lower, upper = min(stamps), max(stamps) + timedelta(microseconds=1)
+            else:
+                lower, upper = stamps[0], stamps[1]
+            result.append(Partition(table, name, lower, upper))
+        return result
+
+    # ---- Lifecycle ----
+
+    def _overlaps(self, conn, table: str, part: Partition) -> bool:
+        return any(p.lower < part.upper and part.lower < p.upper for p in self.partitions(conn, table))
+
+    def rollover(self, conn, now: datetime | None = None, dry_run: bool = False) -> list[tuple]:
+        """
+        Move every forecast partition whose newest initialization is older than
+        336 h into its seasonal table. Returns (source, target, partition) tuples.
+        """
+        now = now or datetime.now(timezone.utc)
+        moved = []
+        for source, target in ROLLOVER_TARGETS.items():
+            for part in self.partitions(conn, source):
+                newest_init = part.upper - timedelta(microseconds=1) if self.strategy == "list" else part.upper
+                if newest_init + timedelta(hours=FORECAST_VALID_HOURS) > now:
+                    continue
+                moved.append((source, target, part.name))
+                if dry_run:
+                    continue
+
+                conn.execute(text(f"ALTER TABLE {source} DETACH PARTITION {part.name}"))
+                if self._overlaps(conn, target, part):
+                    # The seasonal table already holds this range (e.g. a day
+                    # partition with a seasonal run); fall back to one set-based copy.
+                    print(f"⚠️  {target} already covers {part.name}; copying rows instead of attaching")
+                    conn.execute(text(f"INSERT INTO {target} SELECT * FROM {part.name}"))
+                    conn.execute(text(f"DROP TABLE {part.name}"))
+                    continue
+
+                new_name = part.name.replace(source, target, 1)
+                conn.execute(text(f"ALTER TABLE {part.name} RENAME TO {new_name}"))
+                bounds = self._bounds_for(part)
+                conn.execute(text(f"ALTER TABLE {target} ATTACH PARTITION {new_name} FOR VALUES {bounds}"))
+        return moved
+
+    def _bounds_for(self, part: Partition) -> str:
+        if self.strategy == "list":
+            return partition_bounds(part.lower, "list")
+        return f"FROM ('{part.lower.isoformat()}') TO ('{part.upper.isoformat()}')"
+
+    def drop_expired(self, conn, retention_days: int, now: datetime | None = None,
+                     tables: list[str] | None = None, dry_run: bool = False) -> list[str]:
+        """Drop partitions whose initializations are all older than the retention window."""
+        now = now or datetime.now(timezone.utc)
+        cutoff = now - timedelta(days=retention_days)
+        dropped = []
+        for table in tables or ENSEMBLE_TABLES:
+            for part in self.partitions(conn, table):
+                if part.upper > cutoff:
+                    continue
+                dropped.append(part.name)
+                if not dry_run:
+                    conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {part.name}"))
+                    conn.execute(text(f"DROP TABLE {part.name}"))
+        return dropped
+
+    def maintain(self, conn, retention_days: int, now: datetime | None = None, dry_run: bool = False) -> dict:
+        """Rollover followed by retention; the usual periodic job."""
+        return {
+            "rolled_over": self.rollover(conn, now=now, dry_run=dry_run),
+            "dropped": self.drop_expired(conn, retention_days, now=now, dry_run=dry_run),
+        }
+
+
+def main(argv=None) -> int:
+    from app.db.connection import ENGINE
+
+    parser = argparse.ArgumentParser(prog="python -m app.db.partitions")
+    parser.add_argument("command", choices=["convert", "list", "maintain"])
+    parser.add_argument("--strategy", choices=STRATEGIES, default="list")
+    parser.add_argument("--retention-days", type=int, default=400)
+    parser.add_argument("--now", help="Override the current time (ISO 8601), for testing")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    manager = PartitionManager(args.strategy)
+    now = _parse_ts(args.now) if args.now else None
+    with ENGINE.begin() as conn:
+        if args.command == "convert":
+            for table in ENSEMBLE_TABLES:
+                print(f"🧩 {table}: {manager.convert(conn, table)} partition(s) created")
+        elif args.command == "list":
+            for table in ENSEMBLE_TABLES:
+                for part in manager.partitions(conn, table):
+                    print(f"{table:28} {part.name:50} [{part.lower.isoformat()}, {part.upper.isoformat()})")
+        else:
+            result = manager.maintain(conn, args.retention_days, now=now, dry_run=args.dry_run)
+            for source, target, name in result["rolled_over"]:
+                print(f"🔁 {name}: {source} -> {target}")
+            for name in result["dropped"]:
+                print(f"🗑️  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""
+DDL and recommended indexes for the four ensemble tables.
+
+Every template filters on (initialization, project_name, location, variable)
+and then either ranges on valid_datetime or partitions by ensemble_path, so
+each table gets:
+- a covering btree in (..., valid_datetime, ensemble_path) order, which
+  serves hour-range scans as index-only scans
+- forecast tables only: a covering btree in (..., ensemble_path,
+  valid_datetime) order, which feeds the per-path LAG/LEAD window queries
+  pre-sorted
+- seasonal tables, optional: a BRIN on valid_datetime; rows arrive in time
+  order so it prunes month/date filters at a tiny size
+
+Usage:
+    python -m app.db.schema diff
+    python -m app.db.schema migrate [--with-brin] [--apply]
+"""
+
+import argparse
+import re
+import sys
+from dataclasses import dataclass
+
+from sqlalchemy import text
+
+ENSEMBLE_TABLES = [
+    "weather_forecast_ensemble",
+    "energy_forecast_ensemble",
+    "weather_seasonal_ensemble",
+    "energy_base_ensemble",
+]
+FORECAST_TABLES = ["weather_forecast_ensemble", "energy_forecast_ensemble"]
+SEASONAL_TABLES = ["weather_seasonal_ensemble", "energy_base_ensemble"]
+
+TABLE_DDL = """
+CREATE TABLE IF NOT EXISTS {table} (
+    initialization timestamptz NOT NULL,
+    project_name text NOT NULL,
+    location text NOT NULL,
+    variable text NOT NULL,
+    valid_datetime timestamptz NOT NULL,
+    ensemble_path int NOT NULL,
+    ensemble_value double precision
+)
+"""
+
+_FILTER_COLUMNS = ("initialization", "project_name", "location", "variable")
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """A declared index. ``optional`` indexes are only migrated on request."""
+    table: str
+    name: str
+    columns: tuple
+    include: tuple = ()
+    method: str = "btree"
+    storage: tuple = ()  # (("pages_per_range", "64"),)
+    optional: bool = False
+
+    def definition(self) -> str:
+        """Definition in the form pg_indexes.indexdef reports it."""
+        ddl = f"CREATE INDEX {self.name} ON public.{self.table} USING {self.method} ({', '.join(self.columns)})"
+        if self.include:
+            ddl += f" INCLUDE ({', '.join(self.include)})"
+        if self.storage:
+            ddl += " WITH (" + ", ".join(f"{k}='{v}'" for k, v in self.storage) + ")"
+        return ddl
+
+    def create_sql(self, concurrently: bool = True) -> str:
+        # Partitioned parents do not support CONCURRENTLY
+        prefix = "CREATE INDEX CONCURRENTLY IF NOT EXISTS" if concurrently else "CREATE INDEX IF NOT EXISTS"
+        return self.definition().replace("CREATE INDEX", prefix, 1) + ";"
+
+
+def _declare_indexes() -> list[IndexSpec]:
+    indexes = []
+    for table in ENSEMBLE_TABLES:
+        indexes.append(IndexSpec(
+            table=table,
+            name=f"{table}_hour_idx",
+            columns=_FILTER_COLUMNS + ("valid_datetime", "ensemble_path"),
+            include=("ensemble_value",),
+        ))
+    for table in FORECAST_TABLES:
+        indexes.append(IndexSpec(
+            table=table,
+            name=f"{table}_path_idx",
+            columns=_FILTER_COLUMNS + ("ensemble_path", "valid_datetime"),
+            include=("ensemble_value",),
+        ))
+    for table in SEASONAL_TABLES:
+        indexes.append(IndexSpec(
+            table=table,
+            name=f"{table}_valid_brin",
+            columns=("valid_datetime",),
+            method="brin",
+            storage=(("pages_per_range", "64"),),
+            optional=True,
+        ))
+    return indexes
+
+
+INDEXES: list[IndexSpec] = _declare_indexes()
+
+
+def _normalize(indexdef: str) -> str:
+    # Partitioned parents report "ON ONLY <table>"
+    normalized = re.sub(r"\s+", " ", indexdef.replace('"', "")).strip().lower()
+    return normalized.replace(" on only ", " on ")
+
+
+def live_indexes(conn, tables: list[str] | None = None) -> dict:
+    """{indexname: indexdef} from pg_indexes for the ensemble tables."""
+    rows = conn.execute(
+        text("SELECT indexname, indexdef FROM pg_indexes WHERE tablename = ANY(:tables)"),
+        {"tables": tables or ENSEMBLE_TABLES},
+    ).fetchall()
+    return {row.indexname: row.indexdef for row in rows}
+
+
+def partitioned_tables(conn) -> set:
+    """Ensemble tables that are partitioned parents (see app.db.partitions)."""
+    rows = conn.execute(text(
+        "SELECT c.relname FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = ANY(:tables)"
+    ), {"tables": ENSEMBLE_TABLES}).fetchall()
+    return {row.relname for row in rows}
+
+
+def diff_indexes(live: dict, with_optional: bool = False) -> dict:
+    """
+    Compare declared indexes with ``live`` ({indexname: indexdef}).
+
+    Returns {"missing": [IndexSpec], "changed": [IndexSpec], "unmanaged": [indexname]}.
+    Unmanaged indexes are reported only; migrations never drop them.
+    """
+    declared = [ix for ix in INDEXES if with_optional or not ix.optional]
+    declared_names = {ix.name for ix in INDEXES}
+    missing, changed = [], []
+    for ix in declared:
+        if ix.name not in live:
+            missing.append(ix)
+        elif _normalize(live[ix.name]) != _normalize(ix.definition()):
+            changed.append(ix)
+    unmanaged = sorted(name for name in live if name not in declared_names)
+    return {"missing": missing, "changed": changed, "unmanaged": unmanaged}
+
+
+def migration_sql(diff: dict, analyze: bool = True, partitioned: set = frozenset()) -> str:
+    """
+    Idempotent migration for a diff. Safe to re-run; uses CONCURRENTLY, so it
+    must run outside a transaction block (psql -f, or autocommit). Tables in
+    ``partitioned`` get plain CREATE INDEX, which cascades to partitions.
+    """
+    lines = ["-- Ensemble index migration (generated by app.db.schema)"]
+    for table in ENSEMBLE_TABLES:
+        if table not in partitioned:
+            lines.append(TABLE_DDL.format(table=table).strip() + ";")
+    for ix in diff["changed"]:
+        concurrently = ix.table not in partitioned
+        lines.append(f"DROP INDEX {'CONCURRENTLY ' if concurrently else ''}IF EXISTS {ix.name};")
+        lines.append(ix.create_sql(concurrently))
+    for ix in diff["missing"]:
+        lines.append(ix.create_sql(ix.table not in partitioned))
+    if analyze and (diff["changed"] or diff["missing"]):
+        touched = sorted({ix.table for ix in diff["changed"] + diff["missing"]})
+        lines.extend(f"ANALYZE {table};" for table in touched)
+    return "\n".join(lines) + "\n"
+
+
+def apply_migration(engine, sql: str):
+    """Run migration statements one by one in autocommit mode."""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for statement in sql.split(";\n"):
+            statement = re.sub(r"^--.*$", "", statement, flags=re.MULTILINE).strip()
+            if statement:
+                conn.execute(text(statement))
+
+
+def main(argv=None) -> int:
+    from app.db.connection import ENGINE
+
+    parser = argparse.ArgumentParser(prog="python -m app.db.schema")
+    parser.add_argument("command", choices=["diff", "migrate"])
+    parser.add_argument("--with-brin", action="store_true", help="Include optional BRIN indexes")
+    parser.add_argument("--apply", action="store_true", help="Execute the migration instead of printing it")
+    args = parser.parse_args(argv)
+
+    with ENGINE.connect() as conn:
+        diff = diff_indexes(live_indexes(conn), with_optional=args.with_brin)
+        partitioned = partitioned_tables(conn)
+
+    if args.command == "diff":
+        for ix in diff["missing"]:
+            print(f"missing    {ix.name}")
+        for ix in diff["changed"]:
+            print(f"changed    {ix.name}")
+        for name in diff["unmanaged"]:
+            print(f"unmanaged  {name}")
+        return 1 if diff["missing"] or diff["changed"] else 0
+
+    sql = migration_sql(diff, partitioned=partitioned)
+    if args.apply:
+        apply_migration(ENGINE, sql)
+        print(f"✅ Applied {len(diff['missing']) + len(diff['changed'])} index change(s)")
+    else:
+        print(sql, end="")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
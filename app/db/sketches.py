@@ -0,0 +1,207 @@
+"""
+Mergeable quantile sketches per (initialization, location, variable, hour).
+
+Each hourly cell (all ensemble paths of one valid_datetime) is summarized at
+ingest by its order statistics at a fixed probability grid
+(``percentile_disc(SKETCH_GRID)``), plus the cell's value count. The grid is
+dense in both tails, so P01/P99 of a single cell are exact.
+
+Cells merge across any hour, month or hour-of-day filter: every stored order
+statistic pins down how many values lie at or below it, and the unknown
+values between two neighbours are bounded by those neighbours. That gives an
+estimate plus a guaranteed [lower, upper] range for each merged quantile.
+
+Usage:
+    python -m app.db.sketches build [--initialization '2026-01-15 12:00']
+    python -m app.db.sketches status
+"""
+
+import argparse
+import math
+import sys
+
+import numpy as np
+from sqlalchemy import text
+
+from app.db.schema import ENSEMBLE_TABLES
+
+SKETCH_TABLE = "ensemble_quantile_sketch"
+
+# 0, 0.001..0.009, 0.01..0.99, 0.991..0.999, 1
+SKETCH_GRID = tuple(
+    [0.0]
+    + [round(0.001 * i, 3) for i in range(1, 10)]
+    + [round(0.01 * i, 2) for i in range(1, 100)]
+    + [round(0.99 + 0.001 * i, 3) for i in range(1, 10)]
+    + [1.0]
+)
+
+SKETCH_DDL = f"""
+CREATE TABLE IF NOT EXISTS {SKETCH_TABLE} (
+    initialization timestamptz NOT NULL,
+    project_name text NOT NULL,
+    location text NOT NULL,
+    variable text NOT NULL,
+    valid_datetime timestamptz NOT NULL,
+    n int NOT NULL,
+    quantiles double precision[] NOT NULL,
+    PRIMARY KEY (initialization, project_name, location, variable, valid_datetime)
+)
+"""
+
+# Sketches are keyed by initialization, not by source table, so they stay
+# valid when a forecast partition rolls over into the seasonal tables.
+_BUILD_SQL = """
+INSERT INTO {sketch} (initialization, project_name, location, variable, valid_datetime, n, quantiles)
+SELECT initialization, project_name, location, variable, valid_datetime,
+       COUNT(ensemble_value),
+       percentile_disc(CAST(:grid AS double precision[])) WITHIN GROUP (ORDER BY ensemble_value)
+FROM {table}
+WHERE initialization = :initialization AND ensemble_value IS NOT NULL
+GROUP BY 1, 2, 3, 4, 5
+ON CONFLICT (initialization, project_name, location, variable, valid_datetime)
+DO UPDATE SET n = EXCLUDED.n, quantiles = EXCLUDED.quantiles
+"""
+
+
+def create_sketch_table(conn):
+    conn.execute(text(SKETCH_DDL))
+
+
+def build_sketches(conn, initialization, tables: list[str] | None = None) -> int:
+    """(Re)build every hourly sketch of one initialization. Returns cells written."""
+    create_sketch_table(conn)
+    written = 0
+    for table in tables or ENSEMBLE_TABLES:
+        result = conn.execute(
+            text(_BUILD_SQL.format(sketch=SKETCH_TABLE, table=table)),
+            {"grid": list(SKETCH_GRID), "initialization": initialization},
+        )
+        written += result.rowcount
+    return written
+
+
+def sketch_table_exists(conn) -> bool:
+    """Read paths check for the table instead of creating it: DDL would queue behind an open build."""
+    return conn.execute(text("SELECT to_regclass(:table)"), {"table": SKETCH_TABLE}).scalar() is not None
+
+
+def has_sketches(conn, initialization) -> bool:
+    if not sketch_table_exists(conn):
+        return False
+    return bool(conn.execute(
+        text(f"SELECT 1 FROM {SKETCH_TABLE} WHERE initialization = :init LIMIT 1"), {"init": initialization}
+    ).scalar())
+
+
+def missing_initializations(conn, tables: list[str] | None = None) -> list:
+    """Initializations present in the ensemble tables but without sketches."""
+    exists = sketch_table_exists(conn)
+    missing = set()
+    for table in tables or ENSEMBLE_TABLES:
+        if not exists:
+            missing.update(row[0] for row in conn.execute(text(f"SELECT DISTINCT initialization FROM {table}")))
+            continue
+        rows = conn.execute(text(
+            f"SELECT DISTINCT initialization FROM {table} t "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {SKETCH_TABLE} s WHERE s.initialization = t.initialization)"
+        ))
+        missing.update(row[0] for row in rows)
+    return sorted(missing)
+
+
+# ---- Merging ----
+
+def _grid_ranks(n: np.ndarray) -> np.ndarray:
+    """1-based rank of each grid order statistic, as percentile_disc picks it."""
+    grid = np.asarray(SKETCH_GRID)
+    return np.maximum(np.ceil(np.round(grid[None, :] * n[:, None], 9)), 1).astype(np.int64)
+
+
+def cell_quantiles(counts, quantiles, p: float) -> dict:
+    """
+    Percentile ``p`` of each cell on its own, vectorized over cells. Returns
+    {"value", "lower", "upper"} arrays; exact whenever ``p`` is on SKETCH_GRID.
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    values = np.asarray(quantiles, dtype=np.float64).reshape(len(counts), len(SKETCH_GRID))
+    ranks = _grid_ranks(counts)
+    target = np.maximum(np.ceil(np.round(p * counts, 9)), 1).astype(np.int64)
+    rows = np.arange(len(counts))
+    above = np.argmax(ranks >= target[:, None], axis=1)  # first stat at or past the target rank
+    below = len(SKETCH_GRID) - 1 - np.argmax((ranks <= target[:, None])[:, ::-1], axis=1)
+    lower, upper = values[rows, below], values[rows, above]
+    span = ranks[rows, above] - ranks[rows, below]
+    weight = np.divide(target - ranks[rows, below], span, out=np.zeros(len(counts)), where=span > 0)
+    return {"value": lower + weight * (upper - lower), "lower": lower, "upper": upper}
+
+
+def merge_quantiles(counts, quantiles, probs) -> list[dict]:
+    """
+    Merge hourly sketches and read off ``probs`` with percentile_disc semantics.
+
+    ``counts`` is the per-cell value count, ``quantiles`` the per-cell order
+    statistics at SKETCH_GRID. Returns [{"p", "value", "lower", "upper"}];
+    the exact percentile_disc result always lies in [lower, upper].
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    values = np.asarray(quantiles, dtype=np.float64)
+    if counts.size == 0:
+        return [{"p": p, "value": None, "lower": None, "upper": None} for p in probs]
+
+    ranks = _grid_ranks(counts)
+    # Distinct order statistics of a cell (several grid points may share a rank)
+    keep = np.ones_like(ranks, dtype=bool)
+    keep[:, 1:] = ranks[:, 1:] != ranks[:, :-1]
+    gap = np.diff(ranks, axis=1, prepend=0) - 1  # unknown values below each stat
+    previous = np.concatenate([values[:, :1], values[:, :-1]], axis=1)
+
+    stat_values = values[keep]
+    stat_prev = previous[keep]
+    stat_gap = gap[keep]
+
+    # Each known order statistic has weight 1; the unknown values between it and
+    # its neighbour below sit anywhere in (prev, value]. Pushing them all down
+    # (up) gives the smallest (largest) possible quantile; the midpoint is the estimate.
+    layouts = {
+        "lower": np.concatenate([stat_values, stat_prev]),
+        "value": np.concatenate([stat_values, (stat_prev + stat_values) / 2]),
+        "upper": np.concatenate([stat_values, stat_values]),
+    }
+    weights = np.concatenate([np.ones_like(stat_gap), stat_gap])
+    total = int(counts.sum())
+
+    results = [{"p": p} for p in probs]
+    for name, points in layouts.items():
+        order = np.argsort(points, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        for entry in results:
+            rank = max(math.ceil(round(entry["p"] * total, 9)), 1)
+            idx = int(np.searchsorted(cumulative, rank))
+            entry[name] = float(points[order][min(idx, len(order) - 1)])
+    return results
+
+
+def main(argv=None) -> int:
+    from app.db.connection import ENGINE
+
+    parser = argparse.ArgumentParser(prog="python -m app.db.sketches")
+    parser.add_argument("command", choices=["build", "status"])
+    parser.add_argument("--initialization", help="Only (re)build this initialization")
+    args = parser.parse_args(argv)
+
+    with ENGINE.begin() as conn:
+        if args.command == "status":
+            missing = missing_initializations(conn)
+            for init in missing:
+                print(f"missing    {init.isoformat()}")
+            return 1 if missing else 0
+
+        inits = [args.initialization] if args.initialization else missing_initializations(conn)
+        for init in inits:
+            print(f"📐 {init}: {build_sketches(conn, init)} hourly sketches")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
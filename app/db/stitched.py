@@ -0,0 +1,222 @@
+"""
+Materialized stitched forecast + seasonal series per (forecast_init, seasonal_init).
+
+Seasonal templates read the forecast horizon of ``forecast_init`` followed by
+the seasonal hours of ``seasonal_init`` past forecast_init + 336 h, as a
+UNION ALL of two index scans. The builder writes that combined series once
+per init pair into STITCHED_TABLE, sorted by series and hour, for the series
+the stitched template variants read (STITCHED_SERIES).
+
+A build records the source tables' versions (app.cache.invalidation). The
+API only switches a template to its "stitched" variant while the pair is
+built and neither source table has been written since; otherwise the base
+template runs. The cache warmer rebuilds the newest pair when it changes or
+goes out of date, and drops superseded pairs.
+
+Usage:
+    python -m app.db.stitched build [--forecast-init ... --seasonal-init ...]
+    python -m app.db.stitched status
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+
+from sqlalchemy import text
+
+from app.queries.query_registry import QUERY_REGISTRY
+from app.queries.templates import get_sql_template, template_variants
+
+STITCHED_TABLE = "energy_stitched_ensemble"
+STITCHED_BUILDS_TABLE = "energy_stitched_builds"
+STITCHED_VARIANT = "stitched"
+STITCHED_SOURCES = ("energy_forecast_ensemble", "energy_base_ensemble")
+FORECAST_HOURS = 336
+
+# (location, variable) series read by the stitched variants
+STITCHED_SERIES = (("rto", "gsi"), ("rto", "load"), ("rto", "net_demand"))
+
+# Registry entries with a stitched variant
+STITCHED_QUERY_IDS = [q for q in QUERY_REGISTRY if STITCHED_VARIANT in template_variants(q)]
+
+BUILDS_TTL_SECONDS = 5.0
+
+STITCHED_DDL = f"""
+CREATE TABLE IF NOT EXISTS {STITCHED_TABLE} (
+    forecast_init timestamptz NOT NULL,
+    seasonal_init timestamptz NOT NULL,
+    project_name text NOT NULL,
+    location text NOT NULL,
+    variable text NOT NULL,
+    valid_datetime timestamptz NOT NULL,
+    ensemble_path int NOT NULL,
+    ensemble_value double precision
+);
+CREATE INDEX IF NOT EXISTS {STITCHED_TABLE}_hour_idx ON {STITCHED_TABLE}
+    (forecast_init, seasonal_init, project_name, location, variable, valid_datetime) INCLUDE (ensemble_value);
+CREATE TABLE IF NOT EXISTS {STITCHED_BUILDS_TABLE} (
+    forecast_init timestamptz NOT NULL,
+    seasonal_init timestamptz NOT NULL,
+    built_at timestamptz NOT NULL DEFAULT now(),
+    n_rows bigint NOT NULL,
+    source_versions jsonb NOT NULL,
+    PRIMARY KEY (forecast_init, seasonal_init)
+)
+"""
+
+_SERIES_FILTER = "project_name = 'ercot_generic' AND (location, variable) IN ({series})".format(
+    series=", ".join(f"('{location}', '{variable}')" for location, variable in STITCHED_SERIES)
+)
+
+_BUILD_SQL = f"""
+INSERT INTO {STITCHED_TABLE}
+    (forecast_init, seasonal_init, project_name, location, variable, valid_datetime, ensemble_path, ensemble_value)
+SELECT CAST(:forecast_init AS timestamptz), CAST(:seasonal_init AS timestamptz), *
+FROM (
+    SELECT project_name, location, variable, valid_datetime, ensemble_path, ensemble_value
+    FROM energy_forecast_ensemble
+    WHERE initialization = :forecast_init AND {_SERIES_FILTER}
+    UNION ALL
+    SELECT project_name, location, variable, valid_datetime, ensemble_path, ensemble_value
+    FROM energy_base_ensemble
+    WHERE initialization = :seasonal_init AND {_SERIES_FILTER}
+      AND valid_datetime > CAST(:forecast_init AS timestamptz) + interval '{FORECAST_HOURS} hours'
+) combined
+ORDER BY location, variable, valid_datetime, ensemble_path
+"""
+
+# (forecast_init iso, seasonal_init iso) -> {table: version}
+_BUILDS: dict = {}
+_builds_read_at = 0.0
+_builds_lock = threading.Lock()
+
+
+def create_stitched_tables(conn):
+    conn.execute(text(STITCHED_DDL))
+
+
+def _pair_key(forecast_init, seasonal_init) -> tuple:
+    from app.cache.invalidation import normalize_init
+    return normalize_init(forecast_init), normalize_init(seasonal_init)
+
+
+def build_stitched(conn, forecast_init, seasonal_init, source_versions: dict) -> int:
+    """
+    (Re)build one init pair. ``source_versions`` are the versions of
+    STITCHED_SOURCES read before the build. Returns rows written.
+    """
+    create_stitched_tables(conn)
+    pair = {"forecast_init": forecast_init, "seasonal_init": seasonal_init}
+    conn.execute(text(
+        f"DELETE FROM {STITCHED_TABLE} WHERE forecast_init = :forecast_init AND seasonal_init = :seasonal_init"
+    ), pair)
+    rows = conn.execute(text(_BUILD_SQL), pair).rowcount
+    versions = {table: list(source_versions.get(table) or ()) for table in STITCHED_SOURCES}
+    conn.execute(text(f"""
+        INSERT INTO {STITCHED_BUILDS_TABLE} (forecast_init, seasonal_init, n_rows, source_versions)
+        VALUES (:forecast_init, :seasonal_init, :n_rows, CAST(:versions AS jsonb))
+        ON CONFLICT (forecast_init, seasonal_init)
+        DO UPDATE SET built_at = now(), n_rows = EXCLUDED.n_rows, source_versions = EXCLUDED.source_versions
+    """), {**pair, "n_rows": rows, "versions": json.dumps(versions)})
+    invalidate_builds()
+    return rows
+
+
+def drop_stitched(conn, keep: tuple) -> int:
+    """Delete every pair except ``keep`` = (forecast_init, seasonal_init). Returns pairs dropped."""
+    create_stitched_tables(conn)
+    pair = {"forecast_init": keep[0], "seasonal_init": keep[1]}
+    conn.execute(text(
+        f"DELETE FROM {STITCHED_TABLE} WHERE (forecast_init, seasonal_init) <> (:forecast_init, :seasonal_init)"
+    ), pair)
+    dropped = conn.execute(text(
+        f"DELETE FROM {STITCHED_BUILDS_TABLE} WHERE (forecast_init, seasonal_init) <> (:forecast_init, :seasonal_init)"
+    ), pair).rowcount
+    invalidate_builds()
+    return dropped
+
+
+def load_builds(conn) -> dict:
+    """
+    {(forecast_init iso, seasonal_init iso): {table: version}} of every build;
+    empty if nothing was ever built. Read-only: this is on the request path,
+    so no DDL (it would queue behind an open build transaction).
+    """
+    if conn.execute(text("SELECT to_regclass(:table)"), {"table": STITCHED_BUILDS_TABLE}).scalar() is None:
+        return {}
+    rows = conn.execute(text(
+        f"SELECT forecast_init, seasonal_init, source_versions FROM {STITCHED_BUILDS_TABLE}"
+    )).fetchall()
+    return {
+        _pair_key(row.forecast_init, row.seasonal_init):
+            {table: tuple(version) for table, version in row.source_versions.items()}
+        for row in rows
+    }
+
+
+def invalidate_builds():
+    global _builds_read_at
+    with _builds_lock:
+        _builds_read_at = 0.0
+
+
+def _builds() -> dict:
+    global _BUILDS, _builds_read_at
+    with _builds_lock:
+        if time.monotonic() - _builds_read_at < BUILDS_TTL_SECONDS:
+            return _BUILDS
+    from app.db.connection import ENGINE
+    with ENGINE.connect() as conn:
+        builds = load_builds(conn)
+    with _builds_lock:
+        _BUILDS, _builds_read_at = builds, time.monotonic()
+    return builds
+
+
+def is_current(forecast_init, seasonal_init, table_versions: dict) -> bool:
+    """Pair is built and no source table was written since."""
+    built = _builds().get(_pair_key(forecast_init, seasonal_init))
+    return built is not None and all(built.get(t) == table_versions.get(t) for t in STITCHED_SOURCES)
+
+
+def stitched_sql(query_id: str, params: dict, table_versions: dict) -> str | None:
+    """The stitched variant of ``query_id`` if its init pair is materialized and current, else None."""
+    if query_id not in STITCHED_QUERY_IDS or not params.get("forecast_init") or not params.get("seasonal_init"):
+        return None
+    if not is_current(params["forecast_init"], params["seasonal_init"], table_versions):
+        return None
+    return get_sql_template(query_id, STITCHED_VARIANT)
+
+
+def main(argv=None) -> int:
+    from app.cache.invalidation import DATA_VERSIONS
+    from app.db.connection import ENGINE
+
+    parser = argparse.ArgumentParser(prog="python -m app.db.stitched")
+    parser.add_argument("command", choices=["build", "status"])
+    parser.add_argument("--forecast-init", help="Defaults to the newest forecast initialization")
+    parser.add_argument("--seasonal-init", help="Defaults to the newest seasonal initialization")
+    args = parser.parse_args(argv)
+
+    versions = DATA_VERSIONS.table_versions(refresh=True)
+    with ENGINE.begin() as conn:
+        if args.command == "status":
+            builds = load_builds(conn)
+            for (forecast_init, seasonal_init), built in sorted(builds.items()):
+                state = "current" if all(built.get(t) == versions.get(t) for t in STITCHED_SOURCES) else "stale"
+                print(f"{state:10} {forecast_init} + {seasonal_init}")
+            return 0
+
+        forecast_init = args.forecast_init or conn.execute(
+            text("SELECT MAX(initialization) FROM energy_forecast_ensemble")).scalar()
+        seasonal_init = args.seasonal_init or conn.execute(
+            text("SELECT MAX(initialization) FROM energy_base_ensemble")).scalar()
+        rows = build_stitched(conn, forecast_init, seasonal_init, versions)
+        print(f"🧵 {forecast_init} + {seasonal_init}: {rows} stitched rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Micro-batching of intent resolutions.
+
+With RESOLVER_BATCH_WINDOW_MS > 0, a question on its way to the LLM opens a
+batch (or joins the open one), which stays open for that window or until
+RESOLVER_BATCH_MAX questions have joined. The batch then goes out as one
+multi-question prompt (build_batch_user_prompt), answered with a JSON array
+of decisions, and each caller gets its own. The caller that opened the batch
+makes the call, so there is no background thread.
+
+A question that arrives alone pays the window on top of its LLM call; this
+pays off when many questions arrive together and Bedrock calls are the
+bottleneck (BEDROCK_MAX_CONCURRENCY, throttling, per-call overhead). Keep
+RESOLVER_BATCH_MAX decisions within BEDROCK_MAX_TOKENS.
+
+Isolation: a batch prompt carries several users' questions and session
+contexts (last query, params, recent questions and summaries) side by side,
+so a model that blurs requests could echo one user's context in another's
+decision. Result rows never go in: a question whose context holds data
+previews is asked on its own (``batchable=False``), and batch prompts format
+contexts without them. Leave RESOLVER_BATCH_WINDOW_MS at 0 where sessions
+must not share a prompt at all.
+
+If the answer is not a list with one decision per question, or the LLM cannot
+answer a batch prompt (invalid JSON, ReplayMiss), every caller falls back to
+its own single call. Other errors (timeouts, throttling past retries) are
+raised to every caller in the batch.
+"""
+
+import os
+import threading
+from concurrent.futures import Future
+
+# 0: off. On, unrelated sessions' questions and contexts (no data previews) share a prompt; see above
+RESOLVER_BATCH_WINDOW_MS = float(os.environ.get("RESOLVER_BATCH_WINDOW_MS", 0))
+RESOLVER_BATCH_MAX = int(os.environ.get("RESOLVER_BATCH_MAX", 4))
+
+_FALLBACK = object()  # a batch answer with nothing usable for this caller
+
+
+class _Batch:
+    def __init__(self):
+        self.items: list = []
+        self.futures: list[Future] = []
+        self.full = threading.Event()
+
+
+class MicroBatcher:
+    """
+    Groups ``submit`` calls arriving within ``window_ms`` into one
+    ``call_batch(items)``, which returns one answer per item.
+    """
+
+    def __init__(self, call_batch, window_ms: float = RESOLVER_BATCH_WINDOW_MS, max_batch: int = RESOLVER_BATCH_MAX):
+        self.call_batch = call_batch
+        self.window_ms = window_ms
+        self.max_batch = max_batch
+        self._open: _Batch | None = None
+        self._lock = threading.Lock()
+        self.batches = 0  # batched calls (2+ items)
+        self.batched = 0  # items answered by a batched call
+        self.solo = 0  # windows that closed with a single item
+        self.fallbacks = 0  # items re-asked on their own after an unusable batch answer
+        self.max_size = 0
+        self.kept_out = 0  # items asked on their own because they may not share a prompt
+
+    @property
+    def enabled(self) -> bool:
+        return self.window_ms > 0 and self.max_batch > 1
+
+    def submit(self, item, call_one, batchable: bool = True):
+        """``call_one(item)``, or this item's answer from a batch with whatever arrives within the window."""
+        if not self.enabled:
+            return call_one(item)
+        if not batchable:
+            with self._lock:
+                self.kept_out += 1
+            return call_one(item)
+        future = Future()
+        with self._lock:
+            batch = self._open
+            leader = batch is None
+            if leader:
+                batch = self._open = _Batch()
+            batch.items.append(item)
+            batch.futures.append(future)
+            if len(batch.items) >= self.max_batch:
+                self._open = None  # full: the next arrival opens a new batch
+                batch.full.set()
+        if leader:
+            batch.full.wait(self.window_ms / 1000)
+            with self._lock:
+                if self._open is batch:
+                    self._open = None
+            self._flush(batch, call_one)
+        answer = future.result()
+        if answer is _FALLBACK:
+            return call_one(item)
+        return answer
+
+    def _flush(self, batch: _Batch, call_one):
+        items, futures = batch.items, batch.futures
+        if len(items) == 1:
+            with self._lock:
+                self.solo += 1
+            try:
+                futures[0].set_result(call_one(items[0]))
+            except BaseException as e:
+                futures[0].set_exception(e)
+            return
+        try:
+            answers = self.call_batch(items)
+        except (ValueError, LookupError) as e:
+            print(f"⚠️  Batch of {len(items)} questions not answered ({e}); asking one by one")
+            answers = None
+        except BaseException as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+        if not isinstance(answers, list) or len(answers) != len(items):
+            answers = [None] * len(items)
+        answers = [answer if isinstance(answer, dict) else _FALLBACK for answer in answers]
+        with self._lock:
+            self.batches += 1
+            self.batched += len(items)
+            self.fallbacks += sum(answer is _FALLBACK for answer in answers)
+            self.max_size = max(self.max_size, len(items))
+        for future, answer in zip(futures, answers):
+            future.set_result(answer)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"enabled": self.enabled, "window_ms": self.window_ms, "max_batch": self.max_batch,
+                    "batches": self.batches, "batched": self.batched, "solo": self.solo,
+                    "fallbacks": self.fallbacks, "max_size": self.max_size, "kept_out": self.kept_out}
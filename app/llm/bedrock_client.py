@@ -1,23 +1,211 @@
-import boto3
+"""
+Bedrock runtime client for intent resolution.
+
+The boto3 client is built with an explicit botocore Config: a connection
+pool sized to the concurrency cap, connect/read timeouts, and "adaptive"
+retries (exponential backoff with jitter plus client-side rate limiting once
+Bedrock starts throttling). A process-wide semaphore caps in-flight calls so a
+burst of requests queues here instead of piling onto Bedrock, and every call
+is recorded in LLM_METRICS (latency, queue wait, retries, throttles).
+
+Settings come from the environment:
+    BEDROCK_REGION (us-east-1), BEDROCK_MODEL_ID, BEDROCK_MAX_TOKENS (800),
+    BEDROCK_TEMPERATURE (0), BEDROCK_MAX_CONCURRENCY (8),
+    BEDROCK_MAX_POOL_CONNECTIONS (defaults to the concurrency cap),
+    BEDROCK_CONNECT_TIMEOUT (3 s), BEDROCK_READ_TIMEOUT (30 s),
+    BEDROCK_MAX_ATTEMPTS (5), BEDROCK_QUEUE_TIMEOUT (30 s),
+    BEDROCK_ENDPOINT_URL (e.g. a local stub, see bench/bedrock_stub.py)
+"""
+
 import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+DEFAULT_MODEL_ID = "anthropic.claude-3-sonnet-20240229-v1:0"
+THROTTLE_CODES = {"ThrottlingException", "TooManyRequestsException", "ServiceUnavailableException"}
+
+
+@dataclass
+class BedrockSettings:
+    region: str = "us-east-1"
+    model_id: str = DEFAULT_MODEL_ID
+    max_tokens: int = 800
+    temperature: float = 0.0
+    max_concurrency: int = 8
+    max_pool_connections: int | None = None
+    connect_timeout: float = 3.0
+    read_timeout: float = 30.0
+    max_attempts: int = 5
+    queue_timeout: float = 30.0
+    endpoint_url: str | None = None
+
+    @classmethod
+    def from_env(cls) -> "BedrockSettings":
+        env = os.environ.get
+        pool = env("BEDROCK_MAX_POOL_CONNECTIONS")
+        return cls(
+            region=env("BEDROCK_REGION", cls.region),
+            model_id=env("BEDROCK_MODEL_ID", cls.model_id),
+            max_tokens=int(env("BEDROCK_MAX_TOKENS", cls.max_tokens)),
+            temperature=float(env("BEDROCK_TEMPERATURE", cls.temperature)),
+            max_concurrency=int(env("BEDROCK_MAX_CONCURRENCY", cls.max_concurrency)),
+            max_pool_connections=int(pool) if pool else None,
+            connect_timeout=float(env("BEDROCK_CONNECT_TIMEOUT", cls.connect_timeout)),
+            read_timeout=float(env("BEDROCK_READ_TIMEOUT", cls.read_timeout)),
+            max_attempts=int(env("BEDROCK_MAX_ATTEMPTS", cls.max_attempts)),
+            queue_timeout=float(env("BEDROCK_QUEUE_TIMEOUT", cls.queue_timeout)),
+            endpoint_url=env("BEDROCK_ENDPOINT_URL") or None,
+        )
+
+    def botocore_config(self) -> Config:
+        return Config(
+            region_name=self.region,
+            max_pool_connections=self.max_pool_connections or self.max_concurrency,
+            connect_timeout=self.connect_timeout,
+            read_timeout=self.read_timeout,
+            retries={"mode": "adaptive", "max_attempts": self.max_attempts},
+            tcp_keepalive=True,
+        )
+
+
+@dataclass
+class LLMMetrics:
+    """Per-call metrics over the last ``window`` calls, plus running totals."""
+    window: int = 1000
+    calls: int = 0
+    errors: int = 0
+    throttles: int = 0  # throttled attempts, including ones retried successfully
+    retries: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    _latencies: deque = field(default_factory=deque)
+    _queue_waits: deque = field(default_factory=deque)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def started(self, queue_ms: float):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self._queue_waits.append(queue_ms)
+            if len(self._queue_waits) > self.window:
+                self._queue_waits.popleft()
+
+    def finished(self, latency_ms: float, retries: int, error: bool):
+        with self._lock:
+            self.in_flight -= 1
+            self.calls += 1
+            self.errors += int(error)
+            self.retries += retries
+            self._latencies.append(latency_ms)
+            if len(self._latencies) > self.window:
+                self._latencies.popleft()
+
+    def throttled(self):
+        with self._lock:
+            self.throttles += 1
+
+    @staticmethod
+    def _percentile(values: list, q: float) -> float | None:
+        if not values:
+            return None
+        ordered = sorted(values)
+        return round(ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))], 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            latencies, waits = list(self._latencies), list(self._queue_waits)
+            totals = {"calls": self.calls, "errors": self.errors, "throttles": self.throttles,
+                      "retries": self.retries, "in_flight": self.in_flight, "max_in_flight": self.max_in_flight}
+        return {
+            **totals,
+            "latency_p50_ms": self._percentile(latencies, 50),
+            "latency_p95_ms": self._percentile(latencies, 95),
+            "latency_p99_ms": self._percentile(latencies, 99),
+            "queue_p50_ms": self._percentile(waits, 50),
+            "queue_p95_ms": self._percentile(waits, 95),
+        }
+
+    def reset(self):
+        with self._lock:
+            self.calls = self.errors = self.throttles = self.retries = self.max_in_flight = 0
+            self._latencies.clear()
+            self._queue_waits.clear()
+
+
+LLM_METRICS = LLMMetrics()
+
+# Process-wide cap on in-flight Bedrock calls, shared by every client instance
+_SEMAPHORES: dict[int, threading.BoundedSemaphore] = {}
+_SEMAPHORES_LOCK = threading.Lock()
+
+
+def _semaphore(limit: int) -> threading.BoundedSemaphore:
+    with _SEMAPHORES_LOCK:
+        if limit not in _SEMAPHORES:
+            _SEMAPHORES[limit] = threading.BoundedSemaphore(limit)
+        return _SEMAPHORES[limit]
+
 
 class BedrockClient:
-    def __init__(self, region="us-east-1"):
-        self.client = boto3.client("bedrock-runtime", region_name=region)
+    def __init__(self, region: str | None = None, settings: BedrockSettings | None = None,
+                 metrics: LLMMetrics = LLM_METRICS):
+        self.settings = settings or BedrockSettings.from_env()
+        if region:
+            self.settings.region = region
+        self.metrics = metrics
+        self._slots = _semaphore(self.settings.max_concurrency)
+        self.client = boto3.client(
+            "bedrock-runtime",
+            region_name=self.settings.region,
+            endpoint_url=self.settings.endpoint_url,
+            config=self.settings.botocore_config(),
+        )
+        # Every attempt's outcome, so throttles absorbed by retries are counted too
+        self.client.meta.events.register("response-received.bedrock-runtime.InvokeModel", self._on_response)
+
+    def _on_response(self, response_dict=None, parsed_response=None, **kwargs):
+        code = (parsed_response or {}).get("Error", {}).get("Code")
+        if code in THROTTLE_CODES or (response_dict or {}).get("status_code") == 429:
+            self.metrics.throttled()
 
     def invoke(self, system_prompt: str, user_prompt: str) -> dict:
-        response = self.client.invoke_model(
-            modelId="anthropic.claude-3-sonnet-20240229-v1:0",
-            body=json.dumps({
-                "anthropic_version": "bedrock-2023-05-31",
-                "system": system_prompt,
-                "messages": [
-                    {"role": "user", "content": user_prompt}
-                ],
-                "max_tokens": 800,
-                "temperature": 0
-            })
-        )
+        queued = time.perf_counter()
+        if not self._slots.acquire(timeout=self.settings.queue_timeout):
+            raise TimeoutError(
+                f"No Bedrock slot within {self.settings.queue_timeout}s "
+                f"({self.settings.max_concurrency} calls in flight)"
+            )
+        started = time.perf_counter()
+        self.metrics.started((started - queued) * 1000)
+        retries, error = 0, True
+        try:
+            response = self.client.invoke_model(
+                modelId=self.settings.model_id,
+                body=json.dumps({
+                    "anthropic_version": "bedrock-2023-05-31",
+                    "system": system_prompt,
+                    "messages": [
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    "max_tokens": self.settings.max_tokens,
+                    "temperature": self.settings.temperature
+                })
+            )
+            retries = response.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+            raw = json.loads(response["body"].read())
+            error = False
+        except ClientError as e:
+            retries = e.response.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+            raise
+        finally:
+            self.metrics.finished((time.perf_counter() - started) * 1000, retries, error)
+            self._slots.release()
 
-        raw = json.loads(response["body"].read())
         return json.loads(raw["content"][0]["text"])
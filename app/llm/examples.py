@@ -0,0 +1,159 @@
+"""
+Example questions per query_id, from the sample-question corpus
+("Avahi Sample Queries - Questions Only.md"). Question N is registry entry N.
+
+app.llm.retrieval indexes these next to each entry's description.
+"""
+
+EXAMPLE_QUESTIONS = {
+    "GSI_PEAK_PROBABILITY_14_DAYS": [
+        "What is the peak probability of a Grid Stress Index (GSI) > 0.60 occurring in any hour over the next 14 days?",
+    ],
+    "GSI_P99_PEAK_SEASONAL": [
+        "At what time does the P99 (extreme) Grid Stress Index peak over the seasonal horizon?",
+    ],
+    "GSI_PROBABILITY_EVENING_RAMP_NEXT_WEEK": [
+        "What is the probability of GSI exceeding 0.60 during the evening ramp (HB 17-20) for the next week?",
+    ],
+    "GSI_PATHS_ABOVE_THRESHOLD": [
+        "Which specific ensemble paths show a GSI > 0.75 in the next 336 hours? (Identifying \"Stress Scenarios\")",
+    ],
+    "GSI_P50_P90_MONTH": [
+        "How does the median (P50) GSI compare to the P90 GSI for the month of February?",
+    ],
+    "GSI_DURATION_WORST_PERCENT": [
+        "What is the expected duration (hours) of GSI > 0.70 in the worst 5% of outcomes for a specific date?",
+    ],
+    "AVG_NET_DEMAND_PLUS_OUTAGES_HIGH_GSI": [
+        "On days with GSI > 0.70, what is the average net_demand_plus_outages?",
+    ],
+    "LIKELIHOOD_NONRENEWABLE_OUTAGE_COLD_SNAP": [
+        "What is the likelihood that nonrenewable_outage_mw exceeds 15,000 MW during a cold snap?",
+    ],
+    "TIGHTEST_HOUR_GSI": [
+        "Identify the \"Tightest Hour\": The hour with the highest average GSI across all 1000 paths.",
+    ],
+    "GSI_PROBABILITY_LASTING_HOURS": [
+        "What is the probability of a GSI exceeding 0.65 longer than 4 consecutive hours?",
+    ],
+    "P01_EXTREME_COLD_TEMP_FORECAST": [
+        "What is the P01 (Extreme Cold) temperature forecast for the 'rto' over the next 10 days?",
+    ],
+    "AVG_LOAD_EXTREME_COLD": [
+        "In paths where RTO temperature drops below -5°C, what is the average total RTO Load?",
+    ],
+    "ZONE_HIGHEST_FREEZING_PROBABILITY": [
+        "Which load zone has the highest probability of seeing temperatures below 0°C next week?",
+    ],
+    "P99_RTO_LOAD_MORNING_PEAK": [
+        "What is the P99 RTO Load for the morning peak (HB 07-09) throughout February?",
+    ],
+    "CORRELATION_DEW_LOAD_HOUSTON": [
+        "What is the correlation between dew_2m and load in the Houston zone (checking for humidity-driven demand)?",
+    ],
+    "LOAD_SENSITIVITY_TEMP_DROP": [
+        "How much does P99 load increase for every 1°C drop in RTO temperature below 5°C?",
+    ],
+    "LOAD_RANGE_P99_P01_DATE": [
+        "What is the range (P99 - P01) of Load uncertainty for March 1st?",
+    ],
+    "PATHS_NORTH_COLDER_THAN_WEST": [
+        "Identify paths where North Zone temperature is 5°C colder than the West Zone.",
+    ],
+    "PROBABILITY_RTO_LOAD_EXCEEDS": [
+        "What is the probability of RTO Load exceeding 75,000 MW this winter?",
+    ],
+    "MEDIAN_OUTAGE_LOWEST_1_PERCENT_TEMP": [
+        "During the lowest 1% of temperature outcomes, what is the median nonrenewable_outage_mw?",
+    ],
+    "PROBABILITY_DUNKELFLAUTE": [
+        "What is the probability of \"Dunkelflaute\" (Wind Cap Factor < 5% AND Solar Cap Factor < 5%) during daylight hours?",
+    ],
+    "P10_LOW_WIND_EVENING_RAMP": [
+        "What is the P10 (Low Wind) forecast for wind_gen during the evening ramp?",
+    ],
+    "SOLAR_RAMP_P50_P90": [
+        "What is the expected solar ramp (MW change) between HB 07 and HB 09 in the P50 vs P90 scenarios?",
+    ],
+    "PROBABILITY_WEST_WIND_BELOW_CUTIN": [
+        "In the West zone, what is the probability of wind_100m_mps dropping below 3 m/s (cut-in speed)?",
+    ],
+    "SOLAR_GEN_AT_RISK_LOW_GHI": [
+        "How much solar_gen is at risk if GHI is 20% below the P50 forecast?",
+    ],
+    "MAX_DOWNWARD_WIND_RAMP": [
+        "What is the maximum 1-hour downward wind ramp observed in any of the 1000 paths?",
+    ],
+    "PROBABILITY_SOLAR_GEN_DURING_PEAK_GSI": [
+        "What is the probability that solar_gen contributes more than 15,000 MW during peak GSI hours?",
+    ],
+    "VARIANCE_WIND_VS_SOLAR_MONTH": [
+        "Compare the variance of wind_gen vs solar_gen for the month of February.",
+    ],
+    "PATH_MAX_RENEWABLE_CURTAILMENT_RISK": [
+        "Which ensemble path represents the \"Maximum Renewable Curtailment Risk\" (Highest wind + highest solar)?",
+    ],
+    "PROBABILITY_LOW_WIND_CAP_FAC_DURATION": [
+        "What is the probability of wind_cap_fac staying below 15% for more than 24 consecutive hours?",
+    ],
+    "NORTH_VS_WEST_LOAD_SPREAD_P99": [
+        "What is the difference between North Zone Load and West Zone Load in the P99 scenario?",
+    ],
+    "WEST_WIND_EXPORT_CONSTRAINT_RISK": [
+        "Identify hours where West Zone wind generation is > 80% of total RTO wind generation (Export Constraint Risk).",
+    ],
+    "PROBABILITY_HOUSTON_LOAD_SHARE": [
+        "What is the probability that Houston Load exceeds 25% of total RTO Load?",
+    ],
+    "PATHS_SOUTH_WARMER_THAN_NORTH": [
+        "Find paths where South Zone temperature is significantly warmer (>10°C) than North Zone.",
+    ],
+    "SOUTH_VS_WEST_WIND_CAP_FAC_P10": [
+        "Compare the wind_cap_fac in the South vs the West load zones during the P10 wind scenario.",
+    ],
+    "ZONE_HIGHEST_LOAD_VOLATILITY": [
+        "Which zone shows the highest volatility (Std Dev) in load over the next 30 days?",
+    ],
+    "PROBABILITY_NORTH_ZONE_WINTER_PEAK": [
+        "What is the probability of the North Zone reaching its all-time winter load peak?",
+    ],
+    "WEST_SOLAR_AND_WIND_ABOVE_P90": [
+        "Identify hours where West Zone Solar and West Zone Wind are both above their P90 values.",
+    ],
+    "CORRELATION_SOUTH_GHI_RTO_GSI": [
+        "How does the South Zone's GHI correlate with RTO-wide GSI?",
+    ],
+    "P50_RENEWABLE_GEN_PER_ZONE": [
+        "What is the P50 total renewable generation (Wind+Solar) for each individual load zone?",
+    ],
+    "PROBABILITY_NET_DEMAND_EXCEEDS_MONTH": [
+        "What is the probability of net_demand exceeding 60,000 MW in March?",
+    ],
+    "NET_DEMAND_UNCERTAINTY_P95_P05": [
+        "Calculate the \"Net Demand Uncertainty\": (P95 net_demand - P05 net_demand).",
+    ],
+    "AVG_WEST_WIND_TOP_GSI_PATHS": [
+        "In the top 10% of GSI paths, what is the average wind_100m_mps in the West zone?",
+    ],
+    "LIKELIHOOD_LOW_WIND_HIGH_OUTAGE": [
+        "What is the likelihood of a \"Low Wind, High Outage\" event occurring simultaneously?",
+    ],
+    "AVG_GSI_FREEZING_TRANSITION": [
+        "What is the average gsi when temp_2m is between -2°C and 2°C? (The \"Freezing Transition\").",
+    ],
+    "DATE_HIGHEST_TAIL_RISK": [
+        "Find the date with the highest \"Tail Risk\" (The largest gap between P50 and P99 GSI).",
+    ],
+    "PROBABILITY_ZERO_SOLAR_HIGH_GSI": [
+        "What is the probability that solar_cap_fac is 0 during an hour where GSI is > 0.80?",
+    ],
+    "EXPECTED_SHORTFALL_HIGH_GSI": [
+        "Calculate the expected \"Shortfall\" (MW) for paths where GSI >= 0.65.",
+    ],
+    "HOURS_HIGH_GSI_PROBABILITY": [
+        "How many hours in the next 3 months have a >5% probability of GSI > 0.60?",
+    ],
+    "VOLATILITY_PEAK_NET_DEMAND": [
+        "Identify the \"Volatility Peak\": The hour with the highest standard deviation in net_demand across all paths.",
+    ],
+}
@@ -1,19 +1,62 @@
-from app.llm.bedrock_client import BedrockClient
-from app.llm.prompts import SYSTEM_PROMPT, build_user_prompt
+from app.cache.singleflight import SingleFlight
+from app.llm.batching import RESOLVER_BATCH_MAX, RESOLVER_BATCH_WINDOW_MS, MicroBatcher
+from app.llm.prompts import SYSTEM_PROMPT, build_batch_user_prompt, build_user_prompt
+from app.llm.recording import llm_from_env
+from app.llm.retrieval import PROMPT_RETRIEVAL, PROMPT_TOP_K, REGISTRY_INDEX
 from app.queries.query_registry import QUERY_REGISTRY
 from app.context.memory import SessionContext
+from dataclasses import dataclass
+import copy
+import hashlib
 import json
+import os
+
+# Identical prompts in flight at once share one LLM call (RESOLVER_SINGLE_FLIGHT=0 turns it off)
+RESOLVER_SINGLE_FLIGHT = os.environ.get("RESOLVER_SINGLE_FLIGHT", "1") != "0"
+
+
+def resolution_key(system_prompt: str, user_prompt: str) -> str:
+    """Question + context fingerprint: a hash of the exact prompts (question, session context, candidates)."""
+    return hashlib.sha256(f"{system_prompt}\0{user_prompt}".encode()).hexdigest()
+
+
+@dataclass
+class _Pending:
+    """A question on its way to the LLM, with what a batch prompt needs to re-ask it."""
+    question: str
+    context: dict | None
+    query_ids: list[str] | None
+    system_prompt: str
+    user_prompt: str
+
+    @property
+    def batchable(self) -> bool:
+        """False if the context holds result rows, which must not share a prompt with other sessions."""
+        return not any(turn.get("data_preview") for turn in (self.context or {}).get("history", []))
 
 
 class IntentResolver:
-    def __init__(self, llm=None):
-        self.llm = llm or BedrockClient()
+    def __init__(self, llm=None, retrieval: bool = PROMPT_RETRIEVAL, top_k: int = PROMPT_TOP_K,
+                 single_flight: bool = RESOLVER_SINGLE_FLIGHT, batch_window_ms: float = RESOLVER_BATCH_WINDOW_MS,
+                 batch_max: int = RESOLVER_BATCH_MAX):
+        self.llm = llm or llm_from_env()
         self.query_registry = QUERY_REGISTRY
-
-    def _build_registry_for_llm(self) -> dict:
-        """Build a detailed registry representation for the LLM."""
+        self.retrieval = retrieval
+        self.top_k = top_k
+        self.flights = SingleFlight(enabled=single_flight)
+        self.batcher = MicroBatcher(self._invoke_batch, batch_window_ms, batch_max)
+
+    def candidate_ids(self, question: str, last_query_id: str | None = None) -> list[str] | None:
+        """Query_ids whose specs go in the prompt; None for the full registry."""
+        if not self.retrieval:
+            return None
+        return REGISTRY_INDEX.candidates(question, last_query_id, self.top_k)
+
+    def _build_registry_for_llm(self, query_ids: list[str] | None = None) -> dict:
+        """Build a detailed registry representation for the LLM (``query_ids`` only, if given)."""
         registry_for_llm = {}
-        for qid, qinfo in self.query_registry.items():
+        for qid in query_ids or self.query_registry:
+            qinfo = self.query_registry[qid]
             params_info = {}
             for pname, pinfo in qinfo["parameters"].items():
                 is_required = pinfo.get("required", False)
@@ -31,15 +74,27 @@ class IntentResolver:
             }
         return registry_for_llm
 
-    def _build_system_prompt(self) -> str:
+    def _build_system_prompt(self, query_ids: list[str] | None = None) -> str:
         """Build the system prompt with query registry information."""
-        registry_for_llm = self._build_registry_for_llm()
+        registry_for_llm = self._build_registry_for_llm(query_ids)
+
+        if query_ids is None:
+            heading = f"FULL QUERY REGISTRY ({len(registry_for_llm)} queries with parameters)"
+            others = ""
+        else:
+            heading = (f"CANDIDATE QUERIES ({len(registry_for_llm)} of {len(self.query_registry)}, "
+                       f"retrieved for this question, with parameters)")
+            other_ids = [qid for qid in self.query_registry if qid not in registry_for_llm]
+            others = f"""
+OTHER QUERIES (names only; if one clearly fits better, return it with the params you can fill):
+{", ".join(other_ids)}
+"""
 
-        response_format = """
+        response_format = f"""
 ==============================================================================
-FULL QUERY REGISTRY (50 queries with parameters)
+{heading}
 ==============================================================================
-""" + json.dumps(registry_for_llm, indent=2) + """
+""" + json.dumps(registry_for_llm, indent=2) + others + """
 
 ==============================================================================
 RESPONSE FORMAT EXAMPLES
@@ -53,7 +108,7 @@ RESPONSE FORMAT EXAMPLES
 3) NEED_MORE_INFO - question is vague, needs primary concept:
 {"decision": "NEED_MORE_INFO", "clarification_question": "I can help with GSI stress indices, load/temperature forecasts, or renewable generation. Which area interests you?"}
 
-4) OUT_OF_SCOPE - not answerable by any of the 50 queries:
+4) OUT_OF_SCOPE - not answerable by any of the queries:
 {"decision": "OUT_OF_SCOPE", "message": "I specialize in ERCOT forecast data including GSI, load, temperature, and renewables. I can't help with [X], but I'd be happy to show you forecast data in one of these areas."}
 
 CRITICAL REMINDERS:
@@ -64,19 +119,12 @@ CRITICAL REMINDERS:
 """
         return SYSTEM_PROMPT + response_format
 
-    def resolve(self, question: str, context: SessionContext | dict | None) -> dict:
-        """
-        Resolve user question to a query decision.
-        
-        Args:
-            question: The user's natural language question
-            context: Either a SessionContext object or dict with conversation history
-            
-        Returns:
-            Decision dict with 'decision' key and relevant data
-        """
-        system_prompt = self._build_system_prompt()
-        
+    def _registry_for(self, query_ids: list[str] | None) -> dict:
+        if query_ids is None:
+            return self.query_registry
+        return {qid: self.query_registry[qid] for qid in query_ids}
+
+    def _pending(self, question: str, context: SessionContext | dict | None) -> _Pending:
         # Convert SessionContext to dict for the prompt
         context_dict = None
         if context:
@@ -84,15 +132,57 @@ CRITICAL REMINDERS:
                 context_dict = context.to_dict()
             else:
                 context_dict = context
-        
-        # Pass full registry dict for categorized summary
+
+        # Only the retrieved candidates (plus the last query) carry full specs
+        query_ids = self.candidate_ids(question, (context_dict or {}).get("last_query_id"))
+        system_prompt = self._build_system_prompt(query_ids)
+
+        # Pass registry dict for categorized summary
         user_prompt = build_user_prompt(
             question, 
-            self.query_registry,  # Pass full dict, not just keys
+            self._registry_for(query_ids),
             context_dict
         )
+        return _Pending(question, context_dict, query_ids, system_prompt, user_prompt)
+
+    def build_prompts(self, question: str, context: SessionContext | dict | None) -> tuple[str, str]:
+        """(system prompt, user prompt) for ``question``."""
+        pending = self._pending(question, context)
+        return pending.system_prompt, pending.user_prompt
+
+    def _invoke_one(self, pending: _Pending) -> dict:
+        return self.llm.invoke(pending.system_prompt, pending.user_prompt)
+
+    def _invoke_batch(self, batch: list[_Pending]):
+        """One LLM call for several questions: the union of their candidates, a JSON array back."""
+        query_ids = None
+        if all(pending.query_ids is not None for pending in batch):
+            query_ids = list(dict.fromkeys(qid for pending in batch for qid in pending.query_ids))
+        user_prompt = build_batch_user_prompt([(pending.question, pending.context) for pending in batch],
+                                              self._registry_for(query_ids))
+        return self.llm.invoke(self._build_system_prompt(query_ids), user_prompt)
+
+    def _ask(self, pending: _Pending) -> dict:
+        """The LLM's raw answer, shared with identical prompts in flight and batched if enabled."""
+        raw = self.flights.do(resolution_key(pending.system_prompt, pending.user_prompt),
+                              lambda: self.batcher.submit(pending, self._invoke_one, pending.batchable))
+        return copy.deepcopy(raw)  # shared with the other callers of the flight
+
+    def stats(self) -> dict:
+        return {"single_flight": self.flights.stats(), "batching": self.batcher.stats()}
+
+    def resolve(self, question: str, context: SessionContext | dict | None) -> dict:
+        """
+        Resolve user question to a query decision.
         
-        raw = self.llm.invoke(system_prompt, user_prompt)
+        Args:
+            question: The user's natural language question
+            context: Either a SessionContext object or dict with conversation history
+            
+        Returns:
+            Decision dict with 'decision' key and relevant data
+        """
+        raw = self._ask(self._pending(question, context))
 
         print("🔍 LLM RAW RESULT:", raw)
 
@@ -1,5 +1,5 @@
 SYSTEM_PROMPT = """
-You are an intent resolver for an ERCOT energy forecasting data API. Your job is to match user questions to one of 50 predefined queries.
+You are an intent resolver for an ERCOT energy forecasting data API. Your job is to match user questions to one of the predefined queries.
 
 ==============================================================================
 SYSTEM CONSTRAINTS
@@ -15,7 +15,7 @@ SYSTEM CONSTRAINTS
 - Forecast horizon: 336 hours from initialization, then seasonal data
 
 ==============================================================================
-QUERY CATEGORIES (50 total queries)
+QUERY CATEGORIES
 ==============================================================================
 When analyzing a user question, FIRST identify which CATEGORY it belongs to based on the PRIMARY CONCEPT mentioned:
 
@@ -39,6 +39,11 @@ When analyzing a user question, FIRST identify which CATEGORY it belongs to base
    Keywords: tail risk, uncertainty, volatility, shortfall, extreme, P95, P05, net demand
    Example queries: net demand uncertainty, tail risk, volatility peak, extreme scenarios
 
+6. DURATION & RUN LENGTH - 3 queries
+   Keywords: consecutive hours, lasting, sustained, run, streak, spell, how long, at least N hours
+   Example queries: probability GSI stays above 0.65 for 6+ hours, longest low-wind spell per path, number of cold spells
+   Works for ANY variable/location/threshold; prefer these when the duration is not exactly what a specific query hard-codes
+
 ==============================================================================
 INTENT MATCHING RULES (CRITICAL)
 ==============================================================================
@@ -50,6 +55,7 @@ Before matching, identify the PRIMARY energy/weather concept in the question:
 - Wind/solar/renewable/GHI → Category 3
 - Zone comparison/spread/constraint → Category 4
 - Tail risk/uncertainty/extreme → Category 5
+- Sustained/consecutive-hour conditions on any variable → Category 6
 
 STEP 2 - APPLY SECONDARY MODIFIERS:
 Time modifiers like "evening", "morning", "ramp" ONLY make sense WITH a primary concept:
@@ -65,7 +71,7 @@ RESPONSE RULES
 ==============================================================================
 - MUST respond in valid JSON ONLY
 - MUST NOT generate SQL
-- MUST NOT invent queries outside the 50 predefined ones
+- MUST NOT invent queries outside the predefined ones
 
 WHEN QUESTION IS VAGUE OR INCOMPLETE:
 If the user's question is ambiguous or lacks a primary concept, return NEED_MORE_INFO with a helpful clarification that guides them toward the available queries.
@@ -108,7 +114,7 @@ For follow-up questions, use conversation context intelligently:
 ==============================================================================
 OUT OF SCOPE HANDLING
 ==============================================================================
-If the question cannot be answered by any of the 50 queries, return OUT_OF_SCOPE with a helpful message:
+If the question cannot be answered by any of the predefined queries, return OUT_OF_SCOPE with a helpful message:
 
 Examples of OUT_OF_SCOPE:
 - Historical actual data (we only have forecasts)
@@ -180,7 +186,7 @@ Return ONE of these formats:
 2. NEED_MORE_INFO - need clarification or missing required param:
 {{"decision": "NEED_MORE_INFO", "clarification_question": "<helpful question>"}}
 
-3. OUT_OF_SCOPE - cannot be answered by any of the 50 queries:
+3. OUT_OF_SCOPE - cannot be answered by any of the predefined queries:
 {{"decision": "OUT_OF_SCOPE", "message": "<polite explanation of what we CAN help with>"}}
 """
 
@@ -194,7 +200,8 @@ def build_query_summary(registry: dict) -> str:
         "LOAD & TEMPERATURE": [],
         "RENEWABLES (Wind & Solar)": [],
         "ZONAL BASIS & CONSTRAINTS": [],
-        "ADVANCED PLANNING & TAILS": []
+        "ADVANCED PLANNING & TAILS": [],
+        "DURATION & RUN LENGTH": []
     }
     
     # Categorize queries based on their names/patterns
@@ -208,7 +215,9 @@ def build_query_summary(registry: dict) -> str:
         entry = f"  - {qid}: {qinfo.get('description', '')}"
         
         # Categorize based on keywords (order matters for priority)
-        if any(kw in qid.upper() for kw in gsi_keywords):
+        if qid.upper().startswith('RUN_LENGTH'):
+            categories["DURATION & RUN LENGTH"].append(entry)
+        elif any(kw in qid.upper() for kw in gsi_keywords):
             if 'GSI' in qid or 'TIGHTEST' in qid or 'NET_DEMAND_PLUS' in qid or 'NONRENEWABLE' in qid:
                 categories["GRID STRESS & SCARCITY (GSI)"].append(entry)
             elif any(kw in qid.upper() for kw in load_temp_keywords):
@@ -251,8 +260,8 @@ def build_query_summary(registry: dict) -> str:
     return "\n".join(lines)
 
 
-def format_context_for_llm(context: dict) -> str:
-    """Format session context into a readable string for the LLM."""
+def format_context_for_llm(context: dict, data_previews: bool = True) -> str:
+    """Format session context into a readable string for the LLM (result rows only with ``data_previews``)."""
     if not context:
         return "None"
     
@@ -285,7 +294,62 @@ def format_context_for_llm(context: dict) -> str:
                 parts.append(f"    Params: {turn.get('params')}")
             if turn.get('summary'):
                 parts.append(f"    Result: {turn.get('summary')}")
-            if turn.get('data_preview'):
+            if data_previews and turn.get('data_preview'):
                 parts.append(f"    Data preview: {turn.get('data_preview')}")
     
     return "\n".join(parts) if parts else "None"
+
+
+def build_batch_user_prompt(
+    items: list[tuple[str, dict | None]],
+    registry: dict
+) -> str:
+    """
+    One user prompt for several unrelated (question, context) pairs, answered
+    with a JSON array. Contexts go in without data previews: the prompt is
+    shared by different users' sessions.
+    """
+    from datetime import datetime
+
+    current_date = datetime.now().strftime("%Y-%m-%d")
+    current_year = datetime.now().year
+    current_month = datetime.now().strftime("%B")
+
+    requests = []
+    for i, (question, context) in enumerate(items, 1):
+        context_str = format_context_for_llm(context, data_previews=False) if context else "None (new conversation)"
+        requests.append(f"""
+==============================================================================
+REQUEST {i}
+==============================================================================
+QUESTION: {question}
+
+CONVERSATION CONTEXT:
+{context_str}
+""")
+
+    return f"""
+TODAY'S DATE: {current_date} (Year: {current_year}, Month: {current_month})
+Use this for relative references like "today", "this month", "current year", "tomorrow", etc.
+
+You are given {len(items)} INDEPENDENT requests from different users. Resolve each one on its own,
+using only its own question and conversation context, exactly as you would a single question:
+identify the PRIMARY CONCEPT, match a query_id from the category, extract or request required parameters.
+
+{build_query_summary(registry)}
+{"".join(requests)}
+==============================================================================
+RESPOND WITH A JSON ARRAY
+==============================================================================
+Return a JSON array of exactly {len(items)} decisions, one per request, in request order.
+Each element is ONE of these formats:
+
+1. EXECUTE - found matching query with all required params:
+{{"decision": "EXECUTE", "query_id": "<query_id>", "params": {{...}}}}
+
+2. NEED_MORE_INFO - need clarification or missing required param:
+{{"decision": "NEED_MORE_INFO", "clarification_question": "<helpful question>"}}
+
+3. OUT_OF_SCOPE - cannot be answered by any of the predefined queries:
+{{"decision": "OUT_OF_SCOPE", "message": "<polite explanation of what we CAN help with>"}}
+"""
@@ -0,0 +1,171 @@
+"""
+Record and replay of intent-resolver LLM calls.
+
+RecordingLLM wraps an LLM client (anything with ``invoke(system, user)``,
+normally BedrockClient) and appends every call to a JSONL file: a hash of the
+prompt, the question, the decision JSON and the latency. ReplayLLM answers
+from such a file without calling Bedrock, after a delay drawn from a latency
+distribution, so /query can be load-tested end to end for free.
+
+The prompt hash leaves out what changes between runs without changing the
+intent: today's date and the result/data-preview lines of the session
+history. A prompt whose hash was not recorded is answered with the latest
+decision recorded for the same question (counted as ``question_matches``);
+otherwise ReplayMiss is raised.
+
+Env (read by llm_from_env, which IntentResolver uses by default):
+- LLM_RECORD=<path>: record Bedrock calls to ``path``
+- LLM_REPLAY=<path>: replay ``path`` instead of calling Bedrock
+- LLM_REPLAY_LATENCY: ``recorded`` (default; each record's own latency),
+  ``empirical`` (random recorded latency), ``fixed:<ms>``,
+  ``lognormal:<median ms>:<sigma>``, or ``none``
+"""
+
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+
+from app.llm.bedrock_client import BedrockClient
+
+LLM_RECORD = os.environ.get("LLM_RECORD") or None
+LLM_REPLAY = os.environ.get("LLM_REPLAY") or None
+LLM_REPLAY_LATENCY = os.environ.get("LLM_REPLAY_LATENCY", "recorded")
+
+# Prompt lines that vary between runs of the same conversation
+_VOLATILE_LINES = re.compile(r"^(TODAY'S DATE:.*|\s*Result:.*|\s*Data preview:.*)$", re.M)
+_QUESTION = re.compile(r"USER QUESTION\n=+\n(.*?)\n\n=+", re.S)
+_BATCH_QUESTION = re.compile(r"^REQUEST \d+\n=+\nQUESTION: (.*?)\n\nCONVERSATION CONTEXT:", re.S | re.M)
+
+
+class ReplayMiss(LookupError):
+    """No recorded decision for a prompt or its question."""
+
+
+def prompt_hash(system_prompt: str, user_prompt: str) -> str:
+    normalized = _VOLATILE_LINES.sub("", user_prompt)
+    return hashlib.sha256(f"{system_prompt}\0{normalized}".encode()).hexdigest()
+
+
+def question_of(user_prompt: str) -> str:
+    """The user's question as embedded by build_user_prompt ('' if not found)."""
+    match = _QUESTION.search(user_prompt)
+    return match.group(1).strip() if match else ""
+
+
+def batch_questions(user_prompt: str) -> list[str]:
+    """The questions of a build_batch_user_prompt prompt, in request order."""
+    return [question.strip() for question in _BATCH_QUESTION.findall(user_prompt)]
+
+
+class RecordingLLM:
+    """Passes calls through to ``llm`` and appends each one to ``path``."""
+
+    def __init__(self, llm, path: str):
+        self.llm = llm
+        self.path = path
+        self.recorded = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, system_prompt: str, user_prompt: str) -> dict:
+        started = time.perf_counter()
+        decision = self.llm.invoke(system_prompt, user_prompt)
+        record = {
+            "prompt_hash": prompt_hash(system_prompt, user_prompt),
+            "question": question_of(user_prompt),
+            "decision": decision,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            # One write per record on an O_APPEND file: workers appending at once do not interleave
+            with open(self.path, "a") as f:
+                f.write(line)
+            self.recorded += 1
+        return decision
+
+    def stats(self) -> dict:
+        return {"mode": "record", "path": self.path, "recorded": self.recorded}
+
+
+def parse_latency(spec: str):
+    """A function returning a replay delay in ms for a record, from an LLM_REPLAY_LATENCY spec."""
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(":") if v]
+    if kind == "recorded":
+        return lambda record, rng, latencies: record["latency_ms"]
+    if kind == "empirical":
+        return lambda record, rng, latencies: rng.choice(latencies)
+    if kind == "fixed" and len(values) == 1:
+        return lambda record, rng, latencies: values[0]
+    if kind == "lognormal" and len(values) == 2:
+        median, sigma = values
+        return lambda record, rng, latencies: rng.lognormvariate(math.log(median), sigma)
+    if kind == "none":
+        return lambda record, rng, latencies: 0.0
+    raise ValueError(f"Unknown replay latency '{spec}'")
+
+
+class ReplayLLM:
+    """Answers from a RecordingLLM file, sleeping per ``latency`` (see parse_latency)."""
+
+    def __init__(self, path: str, latency: str = LLM_REPLAY_LATENCY, seed: int | None = None):
+        self.path = path
+        self.latency = latency
+        self._delay = parse_latency(latency)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.by_prompt: dict[str, dict] = {}
+        self.by_question: dict[str, dict] = {}
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self.by_prompt[record["prompt_hash"]] = record  # later recordings win
+                    if record.get("question"):
+                        self.by_question[record["question"]] = record
+        if not self.by_prompt:
+            raise ValueError(f"No recorded LLM calls in {path}")
+        self.latencies = [record["latency_ms"] for record in self.by_prompt.values()]
+        self.prompt_matches = 0
+        self.question_matches = 0
+        self.misses = 0
+
+    def invoke(self, system_prompt: str, user_prompt: str) -> dict:
+        record = self.by_prompt.get(prompt_hash(system_prompt, user_prompt))
+        with self._lock:
+            if record is not None:
+                self.prompt_matches += 1
+            else:
+                record = self.by_question.get(question_of(user_prompt))
+                if record is None:
+                    self.misses += 1
+                    raise ReplayMiss(f"No recorded decision for question {question_of(user_prompt)!r}")
+                self.question_matches += 1
+            delay_ms = self._delay(record, self._rng, self.latencies)
+        time.sleep(delay_ms / 1000)
+        return json.loads(json.dumps(record["decision"]))  # callers may mutate it
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"mode": "replay", "path": self.path, "latency": self.latency, "records": len(self.by_prompt),
+                    "prompt_matches": self.prompt_matches, "question_matches": self.question_matches,
+                    "misses": self.misses}
+
+
+def llm_from_env():
+    """The intent LLM client configured by LLM_REPLAY / LLM_RECORD (Bedrock otherwise)."""
+    if LLM_REPLAY:
+        print(f"📼 Replaying LLM decisions from {LLM_REPLAY} (latency: {LLM_REPLAY_LATENCY})")
+        return ReplayLLM(LLM_REPLAY)
+    client = BedrockClient()
+    if LLM_RECORD:
+        print(f"📼 Recording LLM calls to {LLM_RECORD}")
+        return RecordingLLM(client, LLM_RECORD)
+    return client
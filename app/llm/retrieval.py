@@ -0,0 +1,121 @@
+"""
+Local retrieval of the registry entries relevant to a question.
+
+The intent prompt used to carry the whole registry (every query with its
+parameter specs), most of which is irrelevant to any one question and all of
+which the LLM pays for in input tokens. REGISTRY_INDEX is a BM25 index over
+each entry's query_id words, description, parameter names and descriptions,
+and its example questions (app.llm.examples). IntentResolver asks it for the
+PROMPT_TOP_K best entries plus the session's last query and puts only those
+specs in the prompt. Everything runs in process: no network, no model.
+
+Questions use plain words ("stress", "demand", "scenario") where the registry
+uses its own terms ("GSI", "load", "path"); SYNONYMS expands the question with
+the registry term before scoring.
+
+PROMPT_RETRIEVAL=0 goes back to the full registry in every prompt.
+"""
+
+import math
+import os
+import re
+from collections import Counter
+
+from app.llm.examples import EXAMPLE_QUESTIONS
+from app.queries.query_registry import QUERY_REGISTRY
+
+PROMPT_RETRIEVAL = os.environ.get("PROMPT_RETRIEVAL", "1") != "0"
+PROMPT_TOP_K = int(os.environ.get("PROMPT_TOP_K", 8))
+
+_STOPWORDS = set(
+    "a an the of in on at for to is are was be by with and or what which how does do any over from "
+    "this that as it its when where than per each me show i can will".split()
+)
+
+# question word -> registry terms it stands for
+SYNONYMS = {
+    "stress": ["gsi"], "stressed": ["gsi"], "scarcity": ["gsi"], "tight": ["gsi", "tightest"],
+    "demand": ["load"], "consumption": ["load"],
+    "scenario": ["path", "ensemble"], "member": ["path", "ensemble"],
+    "worst": ["p99", "extreme"], "median": ["p50"], "typical": ["p50"],
+    "windless": ["wind", "low"], "calm": ["wind", "low"], "sunless": ["solar", "low"], "dark": ["solar", "low"],
+    "gw": ["mw"], "output": ["gen"], "production": ["gen"],
+    "swing": ["volatility", "std"], "variable": ["variance"], "humidity": ["dew"],
+    "straight": ["consecutive", "run"], "stretch": ["consecutive", "run"], "streak": ["consecutive", "run"],
+    "spell": ["consecutive", "run"], "sustained": ["consecutive", "run"], "lasting": ["consecutive", "run"],
+    "cold": ["temperature"], "freeze": ["freezing", "temperature"],
+}
+
+
+def _stem(word: str) -> str:
+    for suffix in ("ing", "ies", "es", "ed", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3 and not word.endswith("ss"):
+            word = word[: -len(suffix)] + ("y" if suffix == "ies" else "")
+            break
+    return word[:-1] if len(word) > 4 and word.endswith("e") else word
+
+
+def tokenize(text: str, expand: bool = False) -> list[str]:
+    """Lower-cased, stemmed words; ``expand`` adds SYNONYMS (used on questions)."""
+    text = text.lower().replace("_", " ")
+    text = re.sub(r"\b(\d{1,2})(?:st|nd|rd|th)? percentile", r"p\1", text)  # "90th percentile" -> p90
+    tokens = []
+    for word in re.findall(r"[a-z][a-z0-9]*", text):
+        if word in _STOPWORDS:
+            continue
+        tokens.append(_stem(word))
+        if expand:
+            tokens.extend(_stem(term) for term in SYNONYMS.get(word, ()))
+    return tokens
+
+
+def entry_text(query_id: str, info: dict, examples: list[str]) -> str:
+    parts = [query_id, query_id, info["description"]]  # id words count twice: they are the names the LLM sees
+    parts += [f"{name} {spec.get('description', '')}" for name, spec in info["parameters"].items()]
+    return " ".join(parts + list(examples))
+
+
+class RegistryIndex:
+    """Okapi BM25 over registry entries."""
+
+    def __init__(self, registry: dict = QUERY_REGISTRY, examples: dict = EXAMPLE_QUESTIONS,
+                 k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.term_counts = {
+            query_id: Counter(tokenize(entry_text(query_id, info, examples.get(query_id, []))))
+            for query_id, info in registry.items()
+        }
+        self.lengths = {query_id: sum(counts.values()) for query_id, counts in self.term_counts.items()}
+        self.average_length = sum(self.lengths.values()) / max(len(self.lengths), 1)
+        document_frequency = Counter(term for counts in self.term_counts.values() for term in counts)
+        n = len(self.term_counts)
+        self.idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in document_frequency.items()}
+
+    def scores(self, question: str) -> dict[str, float]:
+        terms = Counter(tokenize(question, expand=True))
+        scores = {}
+        for query_id, counts in self.term_counts.items():
+            norm = self.k1 * (1 - self.b + self.b * self.lengths[query_id] / self.average_length)
+            score = 0.0
+            for term, weight in terms.items():
+                tf = counts.get(term)
+                if tf:
+                    score += weight * self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            scores[query_id] = score
+        return scores
+
+    def search(self, question: str, k: int = PROMPT_TOP_K) -> list[tuple[str, float]]:
+        """The ``k`` best (query_id, score), best first."""
+        scores = self.scores(question)
+        return sorted(scores.items(), key=lambda item: -item[1])[:k]
+
+    def candidates(self, question: str, last_query_id: str | None = None, k: int = PROMPT_TOP_K) -> list[str]:
+        """Top-``k`` query_ids for ``question``, plus ``last_query_id`` for follow-ups."""
+        query_ids = [query_id for query_id, _ in self.search(question, k)]
+        if last_query_id in self.term_counts and last_query_id not in query_ids:
+            query_ids.append(last_query_id)
+        return query_ids
+
+
+REGISTRY_INDEX = RegistryIndex()
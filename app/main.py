@@ -1,8 +1,25 @@
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import router
+from app.cache.warmer import WARMER
+from app.utils.responses import CompressionMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Precompute templates for new initializations in the background
+    warm = os.environ.get("WARM_CACHE", "").lower() in ("1", "true", "yes")
+    if warm:
+        WARMER.start()
+    yield
+    if warm:
+        WARMER.stop()
 
-app = FastAPI(title="Ensemble Query API")
+
+app = FastAPI(title="Ensemble Query API", lifespan=lifespan)
 
 # Add CORS middleware for frontend
 app.add_middleware(
@@ -13,4 +30,7 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# zstd/gzip for large JSON bodies, per Accept-Encoding
+app.add_middleware(CompressionMiddleware)
+
 app.include_router(router)
@@ -1,8 +1,18 @@
-from pydantic import BaseModel
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+from app.queries.downsampling import MIN_POINTS
 
 class QueryRequest(BaseModel):
     question: str
     session_id: str | None = None
+    approximate: bool = False  # Percentiles from quantile sketches where supported
+    tolerance: float | None = Field(None, gt=0, lt=1)  # Subsample paths for probabilities within ± tolerance
+    sample_size: int | None = Field(None, gt=0)  # Or pick the number of sampled paths directly
+    max_points: int | None = Field(None, ge=MIN_POINTS)  # Downsample long time-series / path-set results to about this many rows
+    format: Literal["json", "arrow", "parquet"] = "json"  # EXECUTE results as an Arrow IPC stream / Parquet file
+    explain_only: bool = False  # Planner cost / rows estimate for the query instead of running it
 
 class QueryResponse(BaseModel):
     decision: str
@@ -12,3 +22,8 @@ class QueryResponse(BaseModel):
     query_id: str | None = None
     sql: str | None = None
     params: dict | None = None
+    approximate: bool | None = None
+    sampling: dict | None = None
+    staleness: dict | None = None
+    downsampling: dict | None = None
+    admission: dict | None = None
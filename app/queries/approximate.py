@@ -0,0 +1,91 @@
+"""
+Approximate percentile mode backed by the hourly quantile sketches.
+
+Each supported query_id reads the matching cells from the sketch table with
+the same filters as its exact template, merges them in app.db.sketches and
+returns the exact template's columns plus ``<column>_lower`` /
+``<column>_upper`` bounds that are guaranteed to contain the exact value.
+"""
+
+from sqlalchemy import text
+
+from app.db.connection import ENGINE
+from app.db.sketches import SKETCH_TABLE, cell_quantiles, merge_quantiles
+
+# Forecast hours of :forecast_init, then seasonal hours of :seasonal_init
+_SEASONAL_CELLS = f"""
+SELECT valid_datetime, n, quantiles
+FROM {SKETCH_TABLE}
+WHERE project_name = 'ercot_generic' AND location = 'rto' AND variable = :variable
+  AND (initialization = :forecast_init
+       OR (initialization = :seasonal_init
+           AND valid_datetime > CAST(:forecast_init AS timestamptz) + interval '336 hours'))
+"""
+
+GSI_P99_PEAK_SEASONAL_SKETCH_SQL = _SEASONAL_CELLS
+
+GSI_P50_P90_MONTH_SKETCH_SQL = _SEASONAL_CELLS + """
+  AND EXTRACT(MONTH FROM valid_datetime) = :month
+"""
+
+P99_RTO_LOAD_MORNING_PEAK_SKETCH_SQL = _SEASONAL_CELLS + """
+  AND EXTRACT(MONTH FROM valid_datetime AT TIME ZONE 'US/Central') = :month
+  AND EXTRACT(HOUR FROM valid_datetime AT TIME ZONE 'US/Central') BETWEEN :hour_start AND :hour_end
+"""
+
+
+def _with_bounds(column: str, entry: dict) -> dict:
+    return {column: entry["value"], f"{column}_lower": entry["lower"], f"{column}_upper": entry["upper"]}
+
+
+def _peak_hour(cells: list, variable_column: str, p: float) -> list[dict]:
+    """Hour with the largest per-hour percentile; no merge needed across hours."""
+    if not cells:
+        return []
+    per_hour = cell_quantiles([n for _, n, _ in cells], [q for _, _, q in cells], p)
+    best = int(per_hour["value"].argmax())
+    entry = {name: float(per_hour[name][best]) for name in ("value", "lower", "upper")}
+    return [{"valid_datetime": cells[best][0], **_with_bounds(variable_column, entry)}]
+
+
+def _pooled(cells: list, columns: dict) -> list[dict]:
+    """Percentiles of all selected hours pooled together; columns = {name: p}."""
+    counts = [n for _, n, _ in cells]
+    quantiles = [q for _, _, q in cells]
+    row = {}
+    for column, entry in zip(columns, merge_quantiles(counts, quantiles, list(columns.values()))):
+        row.update(_with_bounds(column, entry))
+    return [row]
+
+
+# query_id -> (sketch SQL, variable, reducer)
+APPROXIMATE_QUERIES = {
+    "GSI_P99_PEAK_SEASONAL": (
+        GSI_P99_PEAK_SEASONAL_SKETCH_SQL, "gsi",
+        lambda cells: _peak_hour(cells, "p99_gsi", 0.99),
+    ),
+    "GSI_P50_P90_MONTH": (
+        GSI_P50_P90_MONTH_SKETCH_SQL, "gsi",
+        lambda cells: _pooled(cells, {"p50_gsi": 0.5, "p90_gsi": 0.9}),
+    ),
+    "P99_RTO_LOAD_MORNING_PEAK": (
+        P99_RTO_LOAD_MORNING_PEAK_SKETCH_SQL, "load",
+        lambda cells: _pooled(cells, {"percentile_disc": 0.99}),
+    ),
+}
+
+
+def supports_approximate(query_id: str) -> bool:
+    return query_id in APPROXIMATE_QUERIES
+
+
+def execute_approximate(query_id: str, params: dict, conn=None) -> list[dict]:
+    """Run a supported query from sketches instead of raw ensemble rows."""
+    sql, variable, reducer = APPROXIMATE_QUERIES[query_id]
+    bind = {**params, "variable": variable}
+    if conn is not None:
+        cells = conn.execute(text(sql), bind).fetchall()
+    else:
+        with ENGINE.connect() as owned:
+            cells = owned.execute(text(sql), bind).fetchall()
+    return reducer(cells)
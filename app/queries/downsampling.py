@@ -0,0 +1,205 @@
+"""
+Downsampling of long results for charts (QueryRequest.max_points).
+
+Registry entries declare how their rows can be thinned:
+- "time_axis": column holding the timestamp of each row, plus an optional
+  "series_key" column when rows hold several series (e.g. one per location).
+  Each series keeps at most its share of ``max_points`` rows, chosen with
+  Largest-Triangle-Three-Buckets (LTTB) over every numeric column, with each
+  column's minimum and maximum forced in, so a line chart keeps its shape
+  and its extremes.
+- "path_axis": column holding the ensemble path, plus an optional
+  "path_metric" column to rank paths by (default: the path's number of
+  rows). Whole paths are kept: always the most and least extreme ones (even
+  if together they pass ``max_points``), then paths spread evenly over the
+  ranking (median, quartiles, ...) while they fit in ``max_points`` rows.
+
+Results at or under ``max_points`` rows come back unchanged. So do results
+that cannot be brought under ``max_points`` (more series than
+``max_points // MIN_POINTS``, or two paths already over it); their
+description says so with a "reason". The result cache holds full results;
+downsampling runs per request.
+"""
+
+import math
+from datetime import date, datetime
+from decimal import Decimal
+
+from app.queries.query_registry import QUERY_REGISTRY
+
+MIN_POINTS = 3
+
+
+def supports_downsampling(query_id: str) -> bool:
+    info = QUERY_REGISTRY.get(query_id, {})
+    return "time_axis" in info or "path_axis" in info
+
+
+def _number(value) -> float | None:
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float, Decimal)):
+        return float(value)
+    return None
+
+
+def _timestamp(value) -> float:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day).timestamp()
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).timestamp()
+    return float(value)
+
+
+def _numeric_columns(rows: list[dict], exclude: set) -> list[str]:
+    columns = []
+    for column in rows[0]:
+        if column in exclude:
+            continue
+        values = [row[column] for row in rows if row[column] is not None]
+        if values and all(_number(v) is not None for v in values):
+            columns.append(column)
+    return columns
+
+
+def lttb(xs: list[float], ys: list[list[float]], n: int) -> list[int]:
+    """
+    Indices of ``n`` points to keep out of ``len(xs)``, sorted by x. ``ys`` holds
+    one list per value column; a point's triangle area is summed over columns,
+    each scaled by its range so no column dominates. A bucket holding a
+    column's minimum or maximum keeps that point.
+    """
+    total = len(xs)
+    if n >= total or total <= 2:
+        return list(range(total))
+    n = max(n, MIN_POINTS)
+    spans = [(max(col) - min(col)) or 1.0 for col in ys]
+    extremes = set()
+    for col in ys:
+        extremes.add(col.index(max(col)))
+        extremes.add(col.index(min(col)))
+    kept = [0]
+    bucket_size = (total - 2) / (n - 2)
+    a = 0
+    for bucket in range(n - 2):
+        start = int(math.floor(bucket * bucket_size)) + 1
+        end = min(int(math.floor((bucket + 1) * bucket_size)) + 1, total - 1)
+        # Average of the next bucket (the last point for the final bucket)
+        next_start = end
+        next_end = min(int(math.floor((bucket + 2) * bucket_size)) + 1, total)
+        if next_start >= next_end:
+            next_start, next_end = total - 1, total
+        count = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / count
+        avg_ys = [sum(col[next_start:next_end]) / count for col in ys]
+
+        pinned = [i for i in range(start, end) if i in extremes]
+        best, best_area = start, -1.0
+        for i in pinned or range(start, end):
+            area = 0.0
+            for col, avg_y, span in zip(ys, avg_ys, spans):
+                area += abs((xs[a] - avg_x) * (col[i] - col[a]) - (xs[a] - xs[i]) * (avg_y - col[a])) / span
+            if area > best_area:
+                best, best_area = i, area
+        kept.append(best)
+        a = best
+    kept.append(total - 1)
+    return kept
+
+
+def downsample_series(rows: list[dict], time_axis: str, max_points: int, series_key: str | None = None) -> list[dict]:
+    """Rows thinned with LTTB per series, in their original order."""
+    groups: dict = {}
+    for index, row in enumerate(rows):
+        groups.setdefault(row.get(series_key) if series_key else None, []).append(index)
+    budget = max(max_points // len(groups), MIN_POINTS)  # over max_points only if len(groups) > max_points // MIN_POINTS
+    value_columns = _numeric_columns(rows, {time_axis, series_key})
+
+    kept = []
+    for indices in groups.values():
+        ordered = sorted(indices, key=lambda i: _timestamp(rows[i][time_axis]))
+        xs = [_timestamp(rows[i][time_axis]) for i in ordered]
+        if value_columns:
+            ys = [[_number(rows[i][column]) or 0.0 for i in ordered] for column in value_columns]
+            picked = lttb(xs, ys, budget)
+        else:
+            step = max(len(ordered) / budget, 1)
+            picked = sorted({int(k * step) for k in range(min(budget, len(ordered)))})
+        kept.extend(ordered[p] for p in picked)
+    return [rows[i] for i in sorted(kept)]
+
+
+def _spread_order(n: int) -> list[int]:
+    """0..n-1 ordered ends first (0, n-1), then middle, quartiles, octiles, ..."""
+    order, seen = [], set()
+
+    def add(i: int):
+        if i not in seen:
+            seen.add(i)
+            order.append(i)
+
+    add(0)
+    add(n - 1)
+    step = 2
+    while len(order) < n and step <= 2 * n:
+        for k in range(1, step, 2):
+            add(round(k * (n - 1) / step))
+        step *= 2
+    for i in range(n):
+        add(i)
+    return order
+
+
+def reduce_paths(rows: list[dict], path_axis: str, max_points: int,
+                 metric: str | None = None) -> tuple[list[dict], list]:
+    """(rows of the kept paths in their original order, kept paths from most to least extreme first)."""
+    by_path: dict = {}
+    for index, row in enumerate(rows):
+        by_path.setdefault(row[path_axis], []).append(index)
+
+    def score(path):
+        if metric:
+            values = [_number(rows[i][metric]) for i in by_path[path]]
+            return max((v for v in values if v is not None), default=0.0)
+        return len(by_path[path])
+
+    ranked = sorted(by_path, key=lambda path: (-score(path), str(path)))
+    kept_paths, kept, used = [], [], 0
+    for position in _spread_order(len(ranked)):
+        path = ranked[position]
+        size = len(by_path[path])
+        if len(kept_paths) >= 2 and used + size > max_points:
+            continue
+        kept_paths.append(path)
+        kept.extend(by_path[path])
+        used += size
+    return [rows[i] for i in sorted(kept)], kept_paths
+
+
+def downsample(query_id: str, rows: list[dict], max_points: int | None) -> tuple[list[dict], dict | None]:
+    """(rows to send, description of the downsampling or None if rows are unchanged)."""
+    if not max_points or not rows or len(rows) <= max_points:
+        return rows, None
+    info = QUERY_REGISTRY.get(query_id, {})
+    max_points = max(max_points, MIN_POINTS)
+    if "time_axis" in info:
+        description = {"method": "lttb", "time_axis": info["time_axis"], "series_key": info.get("series_key"),
+                       "rows": len(rows)}
+        series = len({row.get(info["series_key"]) for row in rows}) if info.get("series_key") else 1
+        if series * MIN_POINTS > max_points:
+            return rows, {**description, "returned": len(rows),
+                          "reason": f"{series} series need at least {series * MIN_POINTS} rows "
+                                    f"({MIN_POINTS} each) to keep their shape"}
+        reduced = downsample_series(rows, info["time_axis"], max_points, info.get("series_key"))
+        return reduced, {**description, "returned": len(reduced)}
+    if "path_axis" in info:
+        reduced, kept_paths = reduce_paths(rows, info["path_axis"], max_points, info.get("path_metric"))
+        description = {"method": "paths", "path_axis": info["path_axis"], "path_metric": info.get("path_metric"),
+                       "rows": len(rows), "paths": len({row[info["path_axis"]] for row in rows})}
+        if len(reduced) > max_points:
+            return rows, {**description, "returned": len(rows),
+                          "reason": f"the most and least extreme paths alone hold {len(reduced)} rows"}
+        return reduced, {**description, "returned": len(reduced), "kept_paths": kept_paths}
+    return rows, None
@@ -0,0 +1,157 @@
+"""
+Arrow IPC / Parquet export of query results (QueryRequest.format).
+
+Every registry entry declares its result "columns" ({name: type}, with the
+type names its parameters use); ARROW_TYPES turns them into the Arrow
+schema, so each batch is built column by column with no type inference.
+Rows come straight from a server-side cursor in EXPORT_BATCH_ROWS batches
+(or from the result cache on a hit) and every batch is sent as soon as it
+is written:
+- arrow: an Arrow IPC stream, one record batch per cursor batch
+- parquet: a Parquet file, one row group per cursor batch, footer last
+"""
+
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.db.admission import ADMISSION
+from app.db.executor import stream_query
+from app.queries.query_registry import QUERY_REGISTRY
+from app.queries.templates import statement_timeout_ms
+
+EXPORT_BATCH_ROWS = int(os.environ.get("EXPORT_BATCH_ROWS", 10000))
+EXPORT_PARQUET_COMPRESSION = os.environ.get("EXPORT_PARQUET_COMPRESSION", "zstd")
+
+EXPORT_MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+ARROW_TYPES = {
+    "timestamptz": pa.timestamp("us", tz="UTC"),
+    "date": pa.date32(),
+    "float": pa.float64(),
+    "int": pa.int64(),
+    "text": pa.string(),
+    "bool": pa.bool_(),
+}
+
+# Python conversions for values Arrow will not cast itself (Postgres numeric -> Decimal)
+_CONVERT = {"float": float, "int": int}
+
+
+class ExportSchemaError(ValueError):
+    """A result's columns differ from the registry's declared "columns"."""
+
+
+def export_schema(query_id: str) -> pa.Schema:
+    columns = QUERY_REGISTRY[query_id]["columns"]
+    return pa.schema([(name, ARROW_TYPES[kind]) for name, kind in columns.items()])
+
+
+def _array(values, kind: str) -> pa.Array:
+    try:
+        return pa.array(values, type=ARROW_TYPES[kind])
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        convert = _CONVERT.get(kind)
+        if convert is None:
+            raise
+        return pa.array([None if v is None else convert(v) for v in values], type=ARROW_TYPES[kind])
+
+
+def record_batch(query_id: str, rows: list[tuple]) -> pa.RecordBatch:
+    """Row tuples (in declared column order) -> a RecordBatch with the declared schema."""
+    kinds = list(QUERY_REGISTRY[query_id]["columns"].values())
+    columns = list(zip(*rows)) if rows else [()] * len(kinds)
+    return pa.RecordBatch.from_arrays([_array(list(values), kind) for values, kind in zip(columns, kinds)],
+                                      schema=export_schema(query_id))
+
+
+def _check_columns(query_id: str, columns: list[str]):
+    declared = list(QUERY_REGISTRY[query_id]["columns"])
+    if columns != declared:
+        raise ExportSchemaError(f"{query_id} returned columns {columns}, declared {declared}")
+
+
+def _admitted_stream(query_id: str, sql: str, params: dict, batch_rows: int):
+    # Admission (and a heavy-lane slot, if any) is held until the stream is done
+    with ADMISSION.admit(query_id, sql, params):
+        yield from stream_query(sql, params, batch_rows, statement_timeout_ms(query_id), label=query_id)
+
+
+def cursor_batches(query_id: str, sql: str, params: dict, batch_rows: int = EXPORT_BATCH_ROWS):
+    """
+    Row batches of ``sql`` from a server-side cursor. Admission and the
+    statement run (and its columns are checked) here, before the first batch
+    is asked for, so rejections and query errors surface before a response
+    starts.
+    """
+    stream = _admitted_stream(query_id, sql, params, batch_rows)
+    try:
+        _check_columns(query_id, next(stream))
+    except BaseException:
+        stream.close()
+        raise
+    return stream
+
+
+def row_batches(query_id: str, rows: list[dict], batch_rows: int = EXPORT_BATCH_ROWS):
+    """Row batches of an already materialized result (e.g. a result-cache hit)."""
+    columns = list(QUERY_REGISTRY[query_id]["columns"])
+    if rows:
+        _check_columns(query_id, list(rows[0]))
+    for start in range(0, len(rows), batch_rows):
+        yield [tuple(row[c] for c in columns) for row in rows[start:start + batch_rows]]
+
+
+class _Chunks:
+    """Write-only sink; what was written since the last take() is handed out as one chunk."""
+
+    closed = False
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def writable(self) -> bool:
+        return True
+
+    def take(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def encode(query_id: str, batches, fmt: str):
+    """Bytes of ``batches`` in ``fmt`` ("arrow" or "parquet"), one chunk per batch."""
+    schema = export_schema(query_id)
+    sink = _Chunks()
+    try:
+        if fmt == "arrow":
+            writer = pa.ipc.new_stream(sink, schema)
+        else:
+            writer = pq.ParquetWriter(sink, schema, compression=EXPORT_PARQUET_COMPRESSION)
+        with writer:
+            for rows in batches:
+                writer.write_batch(record_batch(query_id, rows))
+                chunk = sink.take()
+                if chunk:
+                    yield chunk
+        yield sink.take()  # end-of-stream marker / Parquet footer
+    finally:
+        if hasattr(batches, "close"):
+            batches.close()  # client gone: release the cursor's connection
@@ -5,6 +5,7 @@ QUERY_REGISTRY = {
     "GSI_PEAK_PROBABILITY_14_DAYS": {
         "description": "Calculates the peak probability of Grid Stress Index (GSI) exceeding a specified threshold within a given number of days from the forecast initialization.",
         "sql_template_name": "GSI_PEAK_PROBABILITY_14_DAYS_SQL",
+        "columns": {"valid_datetime": "timestamptz", "probability": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -28,6 +29,9 @@ QUERY_REGISTRY = {
     "GSI_P99_PEAK_SEASONAL": {
         "description": "Determines the valid datetime of the P99 GSI peak over the seasonal horizon.",
         "sql_template_name": "GSI_P99_PEAK_SEASONAL_SQL",
+        "sql_variants": {"stitched": "GSI_P99_PEAK_SEASONAL_STITCHED_SQL"},
+        "statement_timeout_ms": 120000,  # seasonal horizon: months of hourly paths
+        "columns": {"valid_datetime": "timestamptz", "p99_gsi": "float"},
         "parameters": {
             "forecast_init": {
                 "type": "timestamptz",
@@ -44,6 +48,9 @@ QUERY_REGISTRY = {
     "GSI_PROBABILITY_EVENING_RAMP_NEXT_WEEK": {
         "description": "Calculates the probability of GSI exceeding a threshold during the evening ramp (HB 17-20) in the next week.",
         "sql_template_name": "GSI_PROBABILITY_EVENING_RAMP_NEXT_WEEK_SQL",
+        "sql_variants": {"calendar": "GSI_PROBABILITY_EVENING_RAMP_NEXT_WEEK_CALENDAR_SQL"},
+        "sql_variant": "calendar",
+        "columns": {"hb": "int", "probability": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -79,6 +86,8 @@ QUERY_REGISTRY = {
     "GSI_PATHS_ABOVE_THRESHOLD": {
         "description": "Identifies ensemble paths where GSI exceeds a specified threshold.",
         "sql_template_name": "GSI_PATHS_ABOVE_THRESHOLD_SQL",
+        "path_axis": "ensemble_path",
+        "columns": {"ensemble_path": "int"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -96,6 +105,10 @@ QUERY_REGISTRY = {
     "GSI_P50_P90_MONTH": {
         "description": "Compares the median (P50) and P90 GSI for a specified month.",
         "sql_template_name": "GSI_P50_P90_MONTH_SQL",
+        "sql_variants": {"stitched": "GSI_P50_P90_MONTH_STITCHED_SQL", "calendar": "GSI_P50_P90_MONTH_CALENDAR_SQL"},
+        "sql_variant": "calendar",
+        "statement_timeout_ms": 120000,  # seasonal horizon: months of hourly paths
+        "columns": {"p50_gsi": "float", "p90_gsi": "float"},
         "parameters": {
             "forecast_init": {
                 "type": "timestamptz",
@@ -118,6 +131,7 @@ QUERY_REGISTRY = {
     "GSI_DURATION_WORST_PERCENT": {
         "description": "Calculates the expected duration of GSI exceeding a threshold in the worst X% of outcomes.",
         "sql_template_name": "GSI_DURATION_WORST_PERCENT_SQL",
+        "columns": {"duration_p95": "int"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -141,6 +155,8 @@ QUERY_REGISTRY = {
     "AVG_NET_DEMAND_PLUS_OUTAGES_HIGH_GSI": {
         "description": "Calculates the average net demand plus outages on days when GSI exceeds a specified threshold.",
         "sql_template_name": "AVG_NET_DEMAND_PLUS_OUTAGES_HIGH_GSI_SQL",
+        "sql_variants": {"optimized": "AVG_NET_DEMAND_PLUS_OUTAGES_HIGH_GSI_OPT_SQL"},
+        "columns": {"avg": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -158,6 +174,7 @@ QUERY_REGISTRY = {
     "LIKELIHOOD_NONRENEWABLE_OUTAGE_COLD_SNAP": {
         "description": "Determines the likelihood of nonrenewable outage exceeding a threshold during a cold snap (temp < -5°C).",
         "sql_template_name": "LIKELIHOOD_NONRENEWABLE_OUTAGE_COLD_SNAP_SQL",
+        "columns": {"?column?": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -181,6 +198,7 @@ QUERY_REGISTRY = {
     "TIGHTEST_HOUR_GSI": {
         "description": "Identifies the hour with the highest average GSI.",
         "sql_template_name": "TIGHTEST_HOUR_GSI_SQL",
+        "columns": {"valid_datetime": "timestamptz", "avg_gsi": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -192,6 +210,7 @@ QUERY_REGISTRY = {
     "GSI_PROBABILITY_LASTING_HOURS": {
         "description": "Calculates the probability of GSI exceeding a threshold and lasting for a specified number of consecutive hours.",
         "sql_template_name": "GSI_PROBABILITY_LASTING_HOURS_SQL",
+        "columns": {"?column?": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -219,6 +238,8 @@ QUERY_REGISTRY = {
     "P01_EXTREME_COLD_TEMP_FORECAST": {
         "description": "Gets the P01 (Extreme Cold) temperature forecast for the RTO over a specified number of days.",
         "sql_template_name": "P01_EXTREME_COLD_TEMP_FORECAST_SQL",
+        "time_axis": "valid_datetime",
+        "columns": {"valid_datetime": "timestamptz", "p01_temp": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -236,6 +257,7 @@ QUERY_REGISTRY = {
     "AVG_LOAD_EXTREME_COLD": {
         "description": "Calculates the average RTO Load when temperature drops below a specified threshold.",
         "sql_template_name": "AVG_LOAD_EXTREME_COLD_SQL",
+        "columns": {"avg_load_extreme_cold": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -253,6 +275,7 @@ QUERY_REGISTRY = {
     "ZONE_HIGHEST_FREEZING_PROBABILITY": {
         "description": "Identifies which load zone has the highest probability of seeing temperatures below 0°C next week.",
         "sql_template_name": "ZONE_HIGHEST_FREEZING_PROBABILITY_SQL",
+        "columns": {"location": "text", "prob_freezing": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -276,6 +299,10 @@ QUERY_REGISTRY = {
     "P99_RTO_LOAD_MORNING_PEAK": {
         "description": "Calculates the P99 RTO Load for the morning peak (HB 07-09) for a specified month.",
         "sql_template_name": "P99_RTO_LOAD_MORNING_PEAK_SQL",
+        "sql_variants": {"stitched": "P99_RTO_LOAD_MORNING_PEAK_STITCHED_SQL", "calendar": "P99_RTO_LOAD_MORNING_PEAK_CALENDAR_SQL"},
+        "sql_variant": "calendar",
+        "statement_timeout_ms": 120000,  # seasonal horizon: months of hourly paths
+        "columns": {"percentile_disc": "float"},
         "parameters": {
             "forecast_init": {
                 "type": "timestamptz",
@@ -310,6 +337,7 @@ QUERY_REGISTRY = {
     "CORRELATION_DEW_LOAD_HOUSTON": {
         "description": "Calculates the correlation between dew point temperature and load in the Houston zone.",
         "sql_template_name": "CORRELATION_DEW_LOAD_HOUSTON_SQL",
+        "columns": {"corr": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -327,6 +355,7 @@ QUERY_REGISTRY = {
     "LOAD_SENSITIVITY_TEMP_DROP": {
         "description": "Calculates how much P99 load increases for every 1°C drop in RTO temperature below a threshold.",
         "sql_template_name": "LOAD_SENSITIVITY_TEMP_DROP_SQL",
+        "columns": {"mw_increase_per_degree_drop": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -344,6 +373,10 @@ QUERY_REGISTRY = {
     "LOAD_RANGE_P99_P01_DATE": {
         "description": "Calculates the range (P99 - P01) of Load uncertainty for a specific date.",
         "sql_template_name": "LOAD_RANGE_P99_P01_DATE_SQL",
+        "sql_variants": {"optimized": "LOAD_RANGE_P99_P01_DATE_OPT_SQL"},
+        "time_axis": "valid_datetime",
+        "statement_timeout_ms": 120000,  # seasonal horizon: months of hourly paths
+        "columns": {"valid_datetime": "timestamptz", "load_range": "float"},
         "parameters": {
             "seasonal_init": {
                 "type": "timestamptz",
@@ -360,6 +393,9 @@ QUERY_REGISTRY = {
     "PATHS_NORTH_COLDER_THAN_WEST": {
         "description": "Identifies paths where North Zone temperature is significantly colder than the West Zone.",
         "sql_template_name": "PATHS_NORTH_COLDER_THAN_WEST_SQL",
+        "sql_variants": {"optimized": "PATHS_NORTH_COLDER_THAN_WEST_OPT_SQL"},
+        "path_axis": "ensemble_path",
+        "columns": {"valid_datetime": "timestamptz", "ensemble_path": "int"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -377,6 +413,9 @@ QUERY_REGISTRY = {
     "PROBABILITY_RTO_LOAD_EXCEEDS": {
         "description": "Calculates the probability of RTO Load exceeding a specified threshold.",
         "sql_template_name": "PROBABILITY_RTO_LOAD_EXCEEDS_SQL",
+        "sql_variants": {"stitched": "PROBABILITY_RTO_LOAD_EXCEEDS_STITCHED_SQL"},
+        "statement_timeout_ms": 120000,  # seasonal horizon: months of hourly paths
+        "columns": {"?column?": "float"},
         "parameters": {
             "forecast_init": {
                 "type": "timestamptz",
@@ -399,6 +438,7 @@ QUERY_REGISTRY = {
     "MEDIAN_OUTAGE_LOWEST_1_PERCENT_TEMP": {
         "description": "Calculates the median nonrenewable outage during the lowest 1% of temperature outcomes.",
         "sql_template_name": "MEDIAN_OUTAGE_LOWEST_1_PERCENT_TEMP_SQL",
+        "columns": {"percentile_disc": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -414,6 +454,9 @@ QUERY_REGISTRY = {
     "PROBABILITY_DUNKELFLAUTE": {
         "description": "Calculates the probability of Dunkelflaute (Wind Cap Factor < 5% AND Solar Cap Factor < 5%) during daylight hours.",
         "sql_template_name": "PROBABILITY_DUNKELFLAUTE_SQL",
+        "sql_variants": {"calendar": "PROBABILITY_DUNKELFLAUTE_CALENDAR_SQL"},
+        "sql_variant": "calendar",
+        "columns": {"valid_datetime": "timestamptz", "prob": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -449,6 +492,10 @@ QUERY_REGISTRY = {
     "P10_LOW_WIND_EVENING_RAMP": {
         "description": "Gets the P10 (Low Wind) forecast for wind generation during the evening ramp.",
         "sql_template_name": "P10_LOW_WIND_EVENING_RAMP_SQL",
+        "sql_variants": {"calendar": "P10_LOW_WIND_EVENING_RAMP_CALENDAR_SQL"},
+        "sql_variant": "calendar",
+        "time_axis": "valid_datetime",
+        "columns": {"valid_datetime": "timestamptz", "percentile_disc": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -472,6 +519,9 @@ QUERY_REGISTRY = {
     "SOLAR_RAMP_P50_P90": {
         "description": "Calculates the expected solar ramp (MW change) between specified hours in the P50 vs P90 scenarios.",
         "sql_template_name": "SOLAR_RAMP_P50_P90_SQL",
+        "sql_variants": {"optimized": "SOLAR_RAMP_P50_P90_OPT_SQL"},
+        "sql_variant": "optimized",
+        "columns": {"p50_ramp": "float", "p90_ramp": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -495,6 +545,8 @@ QUERY_REGISTRY = {
     "PROBABILITY_WEST_WIND_BELOW_CUTIN": {
         "description": "Calculates the probability of wind speed dropping below cut-in speed in the West zone.",
         "sql_template_name": "PROBABILITY_WEST_WIND_BELOW_CUTIN_SQL",
+        "time_axis": "valid_datetime",
+        "columns": {"valid_datetime": "timestamptz", "?column?": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -518,6 +570,8 @@ QUERY_REGISTRY = {
     "SOLAR_GEN_AT_RISK_LOW_GHI": {
         "description": "Calculates how much solar generation is at risk if GHI is below a percentage of the P50 forecast.",
         "sql_template_name": "SOLAR_GEN_AT_RISK_LOW_GHI_SQL",
+        "time_axis": "valid_datetime",
+        "columns": {"valid_datetime": "timestamptz", "avg": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -535,6 +589,7 @@ QUERY_REGISTRY = {
     "MAX_DOWNWARD_WIND_RAMP": {
         "description": "Finds the maximum 1-hour downward wind ramp observed in any of the ensemble paths.",
         "sql_template_name": "MAX_DOWNWARD_WIND_RAMP_SQL",
+        "columns": {"max_downward_ramp": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -546,6 +601,7 @@ QUERY_REGISTRY = {
     "PROBABILITY_SOLAR_GEN_DURING_PEAK_GSI": {
         "description": "Calculates the probability that solar generation exceeds a threshold during peak GSI hours.",
         "sql_template_name": "PROBABILITY_SOLAR_GEN_DURING_PEAK_GSI_SQL",
+        "columns": {"?column?": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -569,6 +625,10 @@ QUERY_REGISTRY = {
     "VARIANCE_WIND_VS_SOLAR_MONTH": {
         "description": "Compares the variance of wind generation vs solar generation for a specified month.",
         "sql_template_name": "VARIANCE_WIND_VS_SOLAR_MONTH_SQL",
+        "sql_variants": {"calendar": "VARIANCE_WIND_VS_SOLAR_MONTH_CALENDAR_SQL"},
+        "sql_variant": "calendar",
+        "statement_timeout_ms": 120000,  # seasonal horizon: months of hourly paths
+        "columns": {"variable": "text", "var_pop": "float"},
         "parameters": {
             "seasonal_init": {
                 "type": "timestamptz",
@@ -586,6 +646,7 @@ QUERY_REGISTRY = {
     "PATH_MAX_RENEWABLE_CURTAILMENT_RISK": {
         "description": "Identifies the ensemble path with the maximum renewable curtailment risk (highest wind + solar).",
         "sql_template_name": "PATH_MAX_RENEWABLE_CURTAILMENT_RISK_SQL",
+        "columns": {"ensemble_path": "int", "total_potential_gen": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -597,6 +658,7 @@ QUERY_REGISTRY = {
     "PROBABILITY_LOW_WIND_CAP_FAC_DURATION": {
         "description": "Calculates the probability of wind capacity factor staying below a threshold for more than specified consecutive hours.",
         "sql_template_name": "PROBABILITY_LOW_WIND_CAP_FAC_DURATION_SQL",
+        "columns": {"?column?": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -624,6 +686,8 @@ QUERY_REGISTRY = {
     "NORTH_VS_WEST_LOAD_SPREAD_P99": {
         "description": "Calculates the difference between North Zone Load and West Zone Load in the P99 scenario.",
         "sql_template_name": "NORTH_VS_WEST_LOAD_SPREAD_P99_SQL",
+        "time_axis": "valid_datetime",
+        "columns": {"valid_datetime": "timestamptz", "?column?": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -635,6 +699,8 @@ QUERY_REGISTRY = {
     "WEST_WIND_EXPORT_CONSTRAINT_RISK": {
         "description": "Identifies hours where West Zone wind generation exceeds a percentage of total RTO wind generation (Export Constraint Risk).",
         "sql_template_name": "WEST_WIND_EXPORT_CONSTRAINT_RISK_SQL",
+        "time_axis": "valid_datetime",
+        "columns": {"valid_datetime": "timestamptz", "prob_constraint": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -652,6 +718,8 @@ QUERY_REGISTRY = {
     "PROBABILITY_HOUSTON_LOAD_SHARE": {
         "description": "Calculates the probability that Houston Load exceeds a percentage of total RTO Load.",
         "sql_template_name": "PROBABILITY_HOUSTON_LOAD_SHARE_SQL",
+        "time_axis": "valid_datetime",
+        "columns": {"valid_datetime": "timestamptz", "?column?": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -669,6 +737,8 @@ QUERY_REGISTRY = {
     "PATHS_SOUTH_WARMER_THAN_NORTH": {
         "description": "Finds paths where South Zone temperature is significantly warmer than North Zone.",
         "sql_template_name": "PATHS_SOUTH_WARMER_THAN_NORTH_SQL",
+        "path_axis": "ensemble_path",
+        "columns": {"valid_datetime": "timestamptz", "ensemble_path": "int", "s_temp": "float", "n_temp": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -686,6 +756,8 @@ QUERY_REGISTRY = {
     "SOUTH_VS_WEST_WIND_CAP_FAC_P10": {
         "description": "Compares the wind capacity factor in the South vs the West load zones during the P10 wind scenario.",
         "sql_template_name": "SOUTH_VS_WEST_WIND_CAP_FAC_P10_SQL",
+        "time_axis": "valid_datetime",
+        "columns": {"valid_datetime": "timestamptz", "south_p10": "float", "west_p10": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -697,6 +769,7 @@ QUERY_REGISTRY = {
     "ZONE_HIGHEST_LOAD_VOLATILITY": {
         "description": "Identifies which zone shows the highest volatility (Std Dev) in load over the forecast period.",
         "sql_template_name": "ZONE_HIGHEST_LOAD_VOLATILITY_SQL",
+        "columns": {"location": "text", "stddev": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -708,6 +781,7 @@ QUERY_REGISTRY = {
     "PROBABILITY_NORTH_ZONE_WINTER_PEAK": {
         "description": "Calculates the probability of the North Zone reaching its all-time winter load peak.",
         "sql_template_name": "PROBABILITY_NORTH_ZONE_WINTER_PEAK_SQL",
+        "columns": {"?column?": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -725,6 +799,8 @@ QUERY_REGISTRY = {
     "WEST_SOLAR_AND_WIND_ABOVE_P90": {
         "description": "Identifies hours where West Zone Solar and West Zone Wind are both above their P90 values.",
         "sql_template_name": "WEST_SOLAR_AND_WIND_ABOVE_P90_SQL",
+        "path_axis": "ensemble_path",
+        "columns": {"valid_datetime": "timestamptz", "ensemble_path": "int"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -736,6 +812,7 @@ QUERY_REGISTRY = {
     "CORRELATION_SOUTH_GHI_RTO_GSI": {
         "description": "Calculates the correlation between South Zone GHI and RTO-wide GSI.",
         "sql_template_name": "CORRELATION_SOUTH_GHI_RTO_GSI_SQL",
+        "columns": {"corr": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -747,6 +824,9 @@ QUERY_REGISTRY = {
     "P50_RENEWABLE_GEN_PER_ZONE": {
         "description": "Calculates the P50 total renewable generation (Wind+Solar) for each individual load zone.",
         "sql_template_name": "P50_RENEWABLE_GEN_PER_ZONE_SQL",
+        "time_axis": "valid_datetime",
+        "series_key": "location",
+        "columns": {"location": "text", "valid_datetime": "timestamptz", "percentile_disc": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -762,6 +842,10 @@ QUERY_REGISTRY = {
     "PROBABILITY_NET_DEMAND_EXCEEDS_MONTH": {
         "description": "Calculates the probability of net demand exceeding a threshold in a specified month.",
         "sql_template_name": "PROBABILITY_NET_DEMAND_EXCEEDS_MONTH_SQL",
+        "sql_variants": {"calendar": "PROBABILITY_NET_DEMAND_EXCEEDS_MONTH_CALENDAR_SQL"},
+        "sql_variant": "calendar",
+        "statement_timeout_ms": 120000,  # seasonal horizon: months of hourly paths
+        "columns": {"?column?": "float"},
         "parameters": {
             "seasonal_init": {
                 "type": "timestamptz",
@@ -785,6 +869,8 @@ QUERY_REGISTRY = {
     "NET_DEMAND_UNCERTAINTY_P95_P05": {
         "description": "Calculates the Net Demand Uncertainty: (P95 net_demand - P05 net_demand).",
         "sql_template_name": "NET_DEMAND_UNCERTAINTY_P95_P05_SQL",
+        "time_axis": "valid_datetime",
+        "columns": {"valid_datetime": "timestamptz", "uncertainty": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -796,6 +882,8 @@ QUERY_REGISTRY = {
     "AVG_WEST_WIND_TOP_GSI_PATHS": {
         "description": "Calculates the average wind speed in the West zone for the top 10% of GSI paths.",
         "sql_template_name": "AVG_WEST_WIND_TOP_GSI_PATHS_SQL",
+        "time_axis": "valid_datetime",
+        "columns": {"valid_datetime": "timestamptz", "avg_west_wind": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -813,6 +901,8 @@ QUERY_REGISTRY = {
     "LIKELIHOOD_LOW_WIND_HIGH_OUTAGE": {
         "description": "Calculates the likelihood of a 'Low Wind, High Outage' event occurring simultaneously.",
         "sql_template_name": "LIKELIHOOD_LOW_WIND_HIGH_OUTAGE_SQL",
+        "time_axis": "valid_datetime",
+        "columns": {"valid_datetime": "timestamptz", "?column?": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -824,6 +914,7 @@ QUERY_REGISTRY = {
     "AVG_GSI_FREEZING_TRANSITION": {
         "description": "Calculates the average GSI when temperature is between specified thresholds (The 'Freezing Transition').",
         "sql_template_name": "AVG_GSI_FREEZING_TRANSITION_SQL",
+        "columns": {"avg": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -847,6 +938,9 @@ QUERY_REGISTRY = {
     "DATE_HIGHEST_TAIL_RISK": {
         "description": "Finds the date with the highest Tail Risk (The largest gap between P50 and P99 GSI).",
         "sql_template_name": "DATE_HIGHEST_TAIL_RISK_SQL",
+        "sql_variants": {"calendar": "DATE_HIGHEST_TAIL_RISK_CALENDAR_SQL"},
+        "sql_variant": "calendar",
+        "columns": {"valid_date": "date", "avg_spread": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -858,6 +952,7 @@ QUERY_REGISTRY = {
     "PROBABILITY_ZERO_SOLAR_HIGH_GSI": {
         "description": "Calculates the probability that solar capacity factor is 0 during an hour where GSI exceeds a threshold.",
         "sql_template_name": "PROBABILITY_ZERO_SOLAR_HIGH_GSI_SQL",
+        "columns": {"?column?": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -875,6 +970,8 @@ QUERY_REGISTRY = {
     "EXPECTED_SHORTFALL_HIGH_GSI": {
         "description": "Calculates the expected 'Shortfall' (average net demand plus outages) for paths where GSI exceeds a threshold.",
         "sql_template_name": "EXPECTED_SHORTFALL_HIGH_GSI_SQL",
+        "sql_variants": {"optimized": "EXPECTED_SHORTFALL_HIGH_GSI_OPT_SQL"},
+        "columns": {"avg": "float"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -892,6 +989,7 @@ QUERY_REGISTRY = {
     "HOURS_HIGH_GSI_PROBABILITY": {
         "description": "Counts how many hours have greater than a specified probability of GSI exceeding a threshold.",
         "sql_template_name": "HOURS_HIGH_GSI_PROBABILITY_SQL",
+        "columns": {"count": "int"},
         "parameters": {
             "initialization": {
                 "type": "timestamptz",
@@ -915,6 +1013,9 @@ QUERY_REGISTRY = {
     "VOLATILITY_PEAK_NET_DEMAND": {
         "description": "Identifies the 'Volatility Peak': The hour with the highest standard deviation in net demand across all paths.",
         "sql_template_name": "VOLATILITY_PEAK_NET_DEMAND_SQL",
+        "sql_variants": {"stitched": "VOLATILITY_PEAK_NET_DEMAND_STITCHED_SQL"},
+        "statement_timeout_ms": 120000,  # seasonal horizon: months of hourly paths
+        "columns": {"valid_datetime": "timestamptz", "vol": "float"},
         "parameters": {
             "forecast_init": {
                 "type": "timestamptz",
@@ -927,5 +1028,158 @@ QUERY_REGISTRY = {
                 "required": True
             }
         }
+    },
+
+    # =========================================================================
+    # Section VI: Duration & Run-Length - Queries 51-53
+    # =========================================================================
+    "RUN_LENGTH_LONGEST_PER_PATH": {
+        "description": "For any variable, location and threshold, gives each ensemble path's longest run of consecutive hours beyond the threshold and how many runs last at least the given duration.",
+        "sql_template_name": "RUN_LENGTH_LONGEST_PER_PATH_SQL",
+        "path_axis": "ensemble_path",
+        "path_metric": "longest_run_hours",
+        "columns": {"ensemble_path": "int", "longest_run_hours": "int", "qualifying_runs": "int"},
+        "parameters": {
+            "initialization": {
+                "type": "timestamptz",
+                "description": "The forecast initialization timestamp (e.g., 'YYYY-MM-DD HH:MM').",
+                "required": True
+            },
+            "variable": {
+                "type": "string",
+                "description": "The forecast variable to track (e.g., 'gsi', 'wind_cap_fac', 'temp_2m', 'load').",
+                "required": False,
+                "default": "gsi"
+            },
+            "location": {
+                "type": "string",
+                "description": "The location (e.g., 'rto', 'north_raybn', 'south_lcra_aen_cps', 'west', 'houston').",
+                "required": False,
+                "default": "rto"
+            },
+            "threshold": {
+                "type": "float",
+                "description": "The value the variable must be beyond (e.g., 0.65 for GSI, 0.15 for wind_cap_fac).",
+                "required": False,
+                "default": 0.65
+            },
+            "direction": {
+                "type": "string",
+                "description": "'above' to track hours over the threshold, 'below' for hours under it.",
+                "required": False,
+                "default": "above",
+                "choices": ["above", "below"]
+            },
+            "duration_hours": {
+                "type": "int",
+                "description": "Minimum number of consecutive hours for a run to count (e.g., 4).",
+                "required": False,
+                "default": 4
+            },
+            "days_ahead": {
+                "type": "int",
+                "description": "Number of days ahead from initialization to consider (e.g., 14).",
+                "required": False,
+                "default": 14
+            }
+        }
+    },
+    "RUN_LENGTH_COUNT_DISTRIBUTION": {
+        "description": "For any variable, location and threshold, gives the distribution across paths of how many separate runs of at least the given number of consecutive hours occur.",
+        "sql_template_name": "RUN_LENGTH_COUNT_DISTRIBUTION_SQL",
+        "columns": {"run_count": "int", "paths": "int", "probability": "float"},
+        "parameters": {
+            "initialization": {
+                "type": "timestamptz",
+                "description": "The forecast initialization timestamp (e.g., 'YYYY-MM-DD HH:MM').",
+                "required": True
+            },
+            "variable": {
+                "type": "string",
+                "description": "The forecast variable to track (e.g., 'gsi', 'wind_cap_fac', 'temp_2m', 'load').",
+                "required": False,
+                "default": "gsi"
+            },
+            "location": {
+                "type": "string",
+                "description": "The location (e.g., 'rto', 'north_raybn', 'south_lcra_aen_cps', 'west', 'houston').",
+                "required": False,
+                "default": "rto"
+            },
+            "threshold": {
+                "type": "float",
+                "description": "The value the variable must be beyond (e.g., 0.65 for GSI, 0.15 for wind_cap_fac).",
+                "required": False,
+                "default": 0.65
+            },
+            "direction": {
+                "type": "string",
+                "description": "'above' to track hours over the threshold, 'below' for hours under it.",
+                "required": False,
+                "default": "above",
+                "choices": ["above", "below"]
+            },
+            "duration_hours": {
+                "type": "int",
+                "description": "Minimum number of consecutive hours for a run to count (e.g., 4).",
+                "required": False,
+                "default": 4
+            },
+            "days_ahead": {
+                "type": "int",
+                "description": "Number of days ahead from initialization to consider (e.g., 14).",
+                "required": False,
+                "default": 14
+            }
+        }
+    },
+    "RUN_LENGTH_PROBABILITY": {
+        "description": "For any variable, location and threshold, calculates the probability of at least one run lasting the given number of consecutive hours or longer (e.g., GSI > 0.65 for 4+ hours, wind_cap_fac < 0.15 for 24+ hours).",
+        "sql_template_name": "RUN_LENGTH_PROBABILITY_SQL",
+        "columns": {"probability": "float", "path_count": "int"},
+        "parameters": {
+            "initialization": {
+                "type": "timestamptz",
+                "description": "The forecast initialization timestamp (e.g., 'YYYY-MM-DD HH:MM').",
+                "required": True
+            },
+            "variable": {
+                "type": "string",
+                "description": "The forecast variable to track (e.g., 'gsi', 'wind_cap_fac', 'temp_2m', 'load').",
+                "required": False,
+                "default": "gsi"
+            },
+            "location": {
+                "type": "string",
+                "description": "The location (e.g., 'rto', 'north_raybn', 'south_lcra_aen_cps', 'west', 'houston').",
+                "required": False,
+                "default": "rto"
+            },
+            "threshold": {
+                "type": "float",
+                "description": "The value the variable must be beyond (e.g., 0.65 for GSI, 0.15 for wind_cap_fac).",
+                "required": False,
+                "default": 0.65
+            },
+            "direction": {
+                "type": "string",
+                "description": "'above' to track hours over the threshold, 'below' for hours under it.",
+                "required": False,
+                "default": "above",
+                "choices": ["above", "below"]
+            },
+            "duration_hours": {
+                "type": "int",
+                "description": "Minimum number of consecutive hours for a run to count (e.g., 4).",
+                "required": False,
+                "default": 4
+            },
+            "days_ahead": {
+                "type": "int",
+                "description": "Number of days ahead from initialization to consider (e.g., 14).",
+                "required": False,
+                "default": 14
+            }
+        }
     }
 }
@@ -0,0 +1,209 @@
+"""
+Ensemble path counts and the subsampled execution mode.
+
+Probability templates divide by ``:path_count``: the number of ensemble
+paths actually stored for the initialization, resolved once per
+initialization and cached until its source tables are written (re-ingest).
+
+Subsampling evaluates a template on a deterministic, stratified subset of
+ensemble paths: every ensemble-table reference in the SQL is wrapped in a
+``ensemble_path = ANY(:sample_paths)`` subquery and ``:path_count`` becomes
+the sample size. Probability columns come back with a Wilson interval
+(finite population corrected, since the ensemble is a finite set of paths),
+and the sample size is picked from the requested error tolerance.
+"""
+
+import math
+import random
+import re
+from statistics import NormalDist
+
+from sqlalchemy import text
+
+from app.cache.invalidation import DATA_VERSIONS
+from app.db.connection import ENGINE
+from app.db.schema import ENSEMBLE_TABLES
+
+SAMPLE_SEED = 20240101
+DEFAULT_CONFIDENCE = 0.95
+MIN_SAMPLE_SIZE = 50
+
+# (initialization as passed in params, source table versions) -> path count
+_PATH_COUNTS: dict = {}
+_PATH_COUNT_CACHE_SIZE = 64
+
+# Binomial proportion columns of the sampled templates, keyed by query_id.
+# Templates not listed here can still be sampled but get no interval
+# (their path_count-scaled value is a count of hours, not a probability).
+PROBABILITY_COLUMNS = {
+    "GSI_PEAK_PROBABILITY_14_DAYS": "probability",
+    "GSI_PROBABILITY_EVENING_RAMP_NEXT_WEEK": "probability",
+    "GSI_PROBABILITY_LASTING_HOURS": "?column?",
+    "ZONE_HIGHEST_FREEZING_PROBABILITY": "prob_freezing",
+    "PROBABILITY_DUNKELFLAUTE": "prob",
+    "PROBABILITY_WEST_WIND_BELOW_CUTIN": "?column?",
+    "PROBABILITY_LOW_WIND_CAP_FAC_DURATION": "?column?",
+    "WEST_WIND_EXPORT_CONSTRAINT_RISK": "prob_constraint",
+    "PROBABILITY_HOUSTON_LOAD_SHARE": "?column?",
+    "PROBABILITY_NORTH_ZONE_WINTER_PEAK": "?column?",
+    "LIKELIHOOD_LOW_WIND_HIGH_OUTAGE": "?column?",
+    "RUN_LENGTH_PROBABILITY": "probability",
+}
+
+_TABLE_REF = re.compile(
+    r"\b(FROM|JOIN)\s+(" + "|".join(ENSEMBLE_TABLES) + r")\b"
+    r"(?:\s+(?:AS\s+)?(?!(?:WHERE|ON|JOIN|LEFT|INNER|CROSS|GROUP|ORDER|LIMIT|UNION|WINDOW)\b)(\w+))?",
+    re.IGNORECASE,
+)
+
+
+# ---- Path counts ----
+
+_PATH_COUNT_TABLES = ("energy_forecast_ensemble", "energy_base_ensemble")
+
+def _init_param(params: dict):
+    for name in ("initialization", "forecast_init", "seasonal_init"):
+        if params.get(name):
+            return params[name]
+    return None
+
+
+def resolve_path_count(initialization, conn=None) -> int:
+    """Distinct ensemble paths of an initialization (cached per initialization and source table versions)."""
+    versions = DATA_VERSIONS.table_versions()
+    key = (str(initialization), tuple(versions.get(table) for table in _PATH_COUNT_TABLES))
+    if key in _PATH_COUNTS:
+        return _PATH_COUNTS[key]
+
+    # One hour of one series is enough; forecast inits may already have rolled
+    # over into the seasonal tables, so look in both.
+    sql = text("""
+        SELECT GREATEST(
+            (SELECT COUNT(DISTINCT ensemble_path) FROM energy_forecast_ensemble
+             WHERE initialization = :init AND project_name = 'ercot_generic' AND location = 'rto' AND variable = 'load'
+               AND valid_datetime = (SELECT MIN(valid_datetime) FROM energy_forecast_ensemble
+                                     WHERE initialization = :init AND project_name = 'ercot_generic'
+                                       AND location = 'rto' AND variable = 'load')),
+            (SELECT COUNT(DISTINCT ensemble_path) FROM energy_base_ensemble
+             WHERE initialization = :init AND project_name = 'ercot_generic' AND location = 'rto' AND variable = 'load'
+               AND valid_datetime = (SELECT MIN(valid_datetime) FROM energy_base_ensemble
+                                     WHERE initialization = :init AND project_name = 'ercot_generic'
+                                       AND location = 'rto' AND variable = 'load'))
+        )
+    """)
+    if conn is not None:
+        count = conn.execute(sql, {"init": initialization}).scalar()
+    else:
+        with ENGINE.connect() as owned:
+            count = owned.execute(sql, {"init": initialization}).scalar()
+
+    if not count:
+        return 0  # Nothing loaded yet; not cached so it resolves once data arrives
+    if len(_PATH_COUNTS) >= _PATH_COUNT_CACHE_SIZE:
+        _PATH_COUNTS.clear()
+    _PATH_COUNTS[key] = count
+    return count
+
+
+def bind_path_count(sql: str, params: dict, conn=None) -> dict:
+    """Add ``path_count`` to params when the template needs it."""
+    if ":path_count" not in sql or "path_count" in params:
+        return params
+    count = resolve_path_count(_init_param(params), conn=conn)
+    # NULLIF-free templates would divide by zero on an empty initialization
+    return {**params, "path_count": count or None}
+
+
+# ---- Sampling ----
+
+def supports_sampling(query_id: str, sql: str) -> bool:
+    """Templates whose result is a share of ensemble paths."""
+    return query_id in PROBABILITY_COLUMNS or ":path_count" in sql
+
+
+def sample_size_for(tolerance: float, path_count: int, confidence: float = DEFAULT_CONFIDENCE) -> int:
+    """
+    Smallest sample whose worst-case (p = 0.5) interval half-width is within
+    ``tolerance``, with the finite population correction for ``path_count`` paths.
+    """
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    n0 = z * z * 0.25 / (tolerance * tolerance)
+    n = math.ceil(n0 / (1 + (n0 - 1) / path_count))
+    return max(min(n, path_count), min(MIN_SAMPLE_SIZE, path_count))
+
+
+def stratified_paths(path_count: int, sample_size: int, seed: int = SAMPLE_SEED) -> list[int]:
+    """
+    One path from each of ``sample_size`` equal-width strata of 0..path_count-1.
+    Deterministic for a given (path_count, sample_size, seed), so repeated
+    questions see the same sample.
+    """
+    if sample_size >= path_count:
+        return list(range(path_count))
+    rng = random.Random(f"{seed}:{path_count}:{sample_size}")
+    paths = []
+    for i in range(sample_size):
+        start = (i * path_count) // sample_size
+        end = ((i + 1) * path_count) // sample_size
+        paths.append(rng.randrange(start, end))
+    return paths
+
+
+def sample_sql(sql: str) -> str:
+    """Restrict every ensemble-table reference to ``:sample_paths``."""
+    def restrict(match):
+        keyword, table, alias = match.group(1), match.group(2), match.group(3)
+        subquery = f"(SELECT * FROM {table} WHERE ensemble_path = ANY(:sample_paths))"
+        return f"{keyword} {subquery} {alias or table}"
+    return _TABLE_REF.sub(restrict, sql)
+
+
+def wilson_interval(p: float, n: int, population: int, confidence: float = DEFAULT_CONFIDENCE) -> tuple:
+    """Wilson score interval for a sample proportion, finite population corrected."""
+    if p is None or n <= 0:
+        return None, None
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    if population > 1:
+        z *= math.sqrt(max(population - n, 0) / (population - 1))
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def plan_sample(params: dict, tolerance: float | None = None, sample_size: int | None = None,
+                confidence: float = DEFAULT_CONFIDENCE, conn=None) -> dict:
+    """Resolve the sample for a request: {path_count, sample_size, sample_paths, confidence}."""
+    population = resolve_path_count(_init_param(params), conn=conn)
+    if sample_size is None:
+        sample_size = sample_size_for(tolerance, population, confidence) if population else 0
+    sample_size = min(sample_size, population)
+    return {
+        "path_count": population,
+        "sample_size": sample_size,
+        "sample_paths": stratified_paths(population, sample_size),
+        "confidence": confidence,
+        "tolerance": tolerance,
+    }
+
+
+def execute_sampled(query_id: str, sql: str, params: dict, plan: dict, conn=None) -> list[dict]:
+    """
+    Run ``sql`` on the sampled paths. Probability columns get
+    ``<column>_ci_lower`` / ``<column>_ci_upper``.
+    """
+    bind = {**params, "sample_paths": plan["sample_paths"], "path_count": plan["sample_size"] or None}
+    if conn is not None:
+        rows = [dict(row._mapping) for row in conn.execute(text(sample_sql(sql)), bind)]
+    else:
+        with ENGINE.connect() as owned:
+            rows = [dict(row._mapping) for row in owned.execute(text(sample_sql(sql)), bind)]
+
+    column = PROBABILITY_COLUMNS.get(query_id)
+    if column:
+        for row in rows:
+            if column in row:
+                row[f"{column}_ci_lower"], row[f"{column}_ci_upper"] = wilson_interval(
+                    row[column], plan["sample_size"], plan["path_count"], plan["confidence"]
+                )
+    return rows
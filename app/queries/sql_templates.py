@@ -3,7 +3,7 @@
 # =============================================================================
 
 GSI_PEAK_PROBABILITY_14_DAYS_SQL = """
-SELECT valid_datetime, COUNT(*)::float / 1000.0 as probability
+SELECT valid_datetime, COUNT(*)::float / :path_count as probability
 FROM energy_forecast_ensemble
 WHERE initialization = :initialization
   AND project_name = 'ercot_generic'
@@ -38,7 +38,7 @@ GROUP BY 1 ORDER BY 2 DESC LIMIT 1;
 """
 
 GSI_PROBABILITY_EVENING_RAMP_NEXT_WEEK_SQL = """
-SELECT EXTRACT(HOUR FROM valid_datetime AT TIME ZONE 'US/Central') as hb, COUNT(*)::float / 7000.0 as probability
+SELECT EXTRACT(HOUR FROM valid_datetime AT TIME ZONE 'US/Central') as hb, COUNT(*)::float / (:path_count * :days_ahead) as probability
 FROM energy_forecast_ensemble
 WHERE initialization = :initialization
   AND project_name = 'ercot_generic'
@@ -154,7 +154,7 @@ WITH flagged AS (
       AND location = 'rto'
       AND variable = 'gsi'
 )
-SELECT COUNT(DISTINCT ensemble_path)::float / 1000.0
+SELECT COUNT(DISTINCT ensemble_path)::float / :path_count
 FROM flagged
 WHERE ensemble_value > :gsi_threshold AND h1 > :gsi_threshold AND h2 > :gsi_threshold AND h3 > :gsi_threshold;
 """
@@ -188,7 +188,7 @@ WHERE w.initialization = :initialization
 """
 
 ZONE_HIGHEST_FREEZING_PROBABILITY_SQL = """
-SELECT location, COUNT(*)::float / (1000.0 * :days_ahead * 24.0) as prob_freezing
+SELECT location, COUNT(*)::float / (:path_count * :days_ahead * 24.0) as prob_freezing
 FROM weather_forecast_ensemble
 WHERE initialization = :initialization
   AND project_name = 'ercot_generic'
@@ -305,7 +305,7 @@ WHERE w.initialization = :initialization
 # =============================================================================
 
 PROBABILITY_DUNKELFLAUTE_SQL = """
-SELECT valid_datetime, COUNT(*)::float / 1000.0 as prob
+SELECT valid_datetime, COUNT(*)::float / :path_count as prob
 FROM (
     SELECT valid_datetime, ensemble_path,
            MAX(CASE WHEN variable = 'wind_cap_fac' THEN ensemble_value END) as wind,
@@ -351,7 +351,7 @@ FROM ramps;
 """
 
 PROBABILITY_WEST_WIND_BELOW_CUTIN_SQL = """
-SELECT valid_datetime, COUNT(*)::float / 1000.0
+SELECT valid_datetime, COUNT(*)::float / :path_count
 FROM weather_forecast_ensemble
 WHERE initialization = :initialization
   AND project_name = 'ercot_generic'
@@ -395,7 +395,7 @@ SELECT MIN(ramp) as max_downward_ramp FROM ramps;
 """
 
 PROBABILITY_SOLAR_GEN_DURING_PEAK_GSI_SQL = """
-SELECT COUNT(*)::float / 1000.0
+SELECT COUNT(*)::float / :path_count
 FROM (
    SELECT ensemble_path, valid_datetime,
           MAX(CASE WHEN variable = 'gsi' THEN ensemble_value END) as gsi,
@@ -446,7 +446,7 @@ grouped AS (
            SUM(low_wind) OVER (PARTITION BY ensemble_path ORDER BY valid_datetime ROWS BETWEEN (:duration_hours - 1) PRECEDING AND CURRENT ROW) as rolling_sum
     FROM flagged
 )
-SELECT COUNT(DISTINCT ensemble_path)::float / 1000.0
+SELECT COUNT(DISTINCT ensemble_path)::float / :path_count
 FROM grouped WHERE rolling_sum = :duration_hours;
 """
 
@@ -479,7 +479,7 @@ WITH pivoted AS (
       AND variable = 'wind_gen'
     GROUP BY 1, 2
 )
-SELECT valid_datetime, COUNT(*)::float / 1000.0 as prob_constraint
+SELECT valid_datetime, COUNT(*)::float / :path_count as prob_constraint
 FROM pivoted
 WHERE west_wind > (:percentage_threshold * rto_wind)
 GROUP BY 1;
@@ -497,7 +497,7 @@ WITH pivoted AS (
       AND variable = 'load'
     GROUP BY 1, 2
 )
-SELECT valid_datetime, COUNT(*)::float / 1000.0
+SELECT valid_datetime, COUNT(*)::float / :path_count
 FROM pivoted WHERE h_load > (:percentage_threshold * rto_load)
 GROUP BY 1;
 """
@@ -540,7 +540,7 @@ GROUP BY 1 ORDER BY 2 DESC;
 """
 
 PROBABILITY_NORTH_ZONE_WINTER_PEAK_SQL = """
-SELECT COUNT(*)::float / (1000 * 336)
+SELECT COUNT(*)::float / (:path_count * 336)
 FROM energy_forecast_ensemble
 WHERE initialization = :initialization
   AND project_name = 'ercot_generic'
@@ -651,7 +651,7 @@ WITH stats AS (
    WHERE initialization = :initialization AND project_name = 'ercot_generic' AND location = 'rto'
    GROUP BY 1
 )
-SELECT x.valid_datetime, COUNT(*)::float/1000.0
+SELECT x.valid_datetime, COUNT(*)::float / :path_count
 FROM (
    SELECT valid_datetime, ensemble_path,
           MAX(CASE WHEN variable='wind_gen' THEN ensemble_value END) as w,
@@ -718,7 +718,7 @@ WHERE gsi.initialization = :initialization
 
 HOURS_HIGH_GSI_PROBABILITY_SQL = """
 WITH probs AS (
-    SELECT valid_datetime, COUNT(*)::float / 1000.0 as p
+    SELECT valid_datetime, COUNT(*)::float / :path_count as p
     FROM energy_forecast_ensemble
     WHERE initialization = :initialization
       AND project_name = 'ercot_generic'
@@ -748,3 +748,69 @@ FROM combined
 GROUP BY 1 ORDER BY 2 DESC LIMIT 1;
 """
 
+# =============================================================================
+# Section VI: Duration & Run-Length - Queries 51-53
+# =============================================================================
+
+# Shared gaps-and-islands prefix. Hours past the threshold are numbered per
+# path; valid_datetime minus that row number is constant within a run of
+# consecutive hours, so one window pass labels every run.
+_RUN_LENGTH_CTE = """
+WITH series AS (
+    SELECT ensemble_path, valid_datetime, ensemble_value
+    FROM energy_forecast_ensemble
+    WHERE initialization = :initialization
+      AND project_name = 'ercot_generic'
+      AND location = :location
+      AND variable = :variable
+      AND valid_datetime < CAST(:initialization AS timestamptz) + make_interval(days => :days_ahead)
+    UNION ALL
+    SELECT ensemble_path, valid_datetime, ensemble_value
+    FROM weather_forecast_ensemble
+    WHERE initialization = :initialization
+      AND project_name = 'ercot_generic'
+      AND location = :location
+      AND variable = :variable
+      AND valid_datetime < CAST(:initialization AS timestamptz) + make_interval(days => :days_ahead)
+),
+flagged AS (
+    SELECT ensemble_path,
+           valid_datetime - make_interval(hours => CAST(ROW_NUMBER() OVER (PARTITION BY ensemble_path ORDER BY valid_datetime) AS int)) as island
+    FROM series
+    WHERE CASE WHEN :direction = 'below' THEN ensemble_value < :threshold
+               ELSE ensemble_value > :threshold END
+),
+runs AS (
+    SELECT ensemble_path, COUNT(*) as run_hours
+    FROM flagged
+    GROUP BY ensemble_path, island
+),
+per_path AS (
+    SELECT p.ensemble_path,
+           COALESCE(MAX(r.run_hours), 0) as longest_run_hours,
+           COUNT(r.run_hours) FILTER (WHERE r.run_hours >= :duration_hours) as qualifying_runs
+    FROM (SELECT DISTINCT ensemble_path FROM series) p
+    LEFT JOIN runs r ON r.ensemble_path = p.ensemble_path
+    GROUP BY 1
+)
+"""
+
+RUN_LENGTH_LONGEST_PER_PATH_SQL = _RUN_LENGTH_CTE + """
+SELECT ensemble_path, longest_run_hours, qualifying_runs
+FROM per_path
+ORDER BY longest_run_hours DESC, ensemble_path;
+"""
+
+RUN_LENGTH_COUNT_DISTRIBUTION_SQL = _RUN_LENGTH_CTE + """
+SELECT qualifying_runs as run_count,
+       COUNT(*) as paths,
+       COUNT(*)::float / SUM(COUNT(*)) OVER () as probability
+FROM per_path
+GROUP BY 1 ORDER BY 1;
+"""
+
+RUN_LENGTH_PROBABILITY_SQL = _RUN_LENGTH_CTE + """
+SELECT COUNT(*) FILTER (WHERE qualifying_runs > 0)::float / NULLIF(COUNT(*), 0) as probability,
+       COUNT(*) as path_count
+FROM per_path;
+"""
@@ -0,0 +1,364 @@
+# =============================================================================
+# Optimized variants of registry templates
+#
+# Same parameters and result columns as the originals in sql_templates.py.
+# Selected per template via "sql_variants" / "sql_variant" in QUERY_REGISTRY.
+# =============================================================================
+
+# ---- Self-joins -> single scan with conditional aggregation ----
+
+AVG_NET_DEMAND_PLUS_OUTAGES_HIGH_GSI_OPT_SQL = """
+/* One scan of both variables, pivoted per (hour, path) instead of a self-join */
+SELECT AVG(nd)
+FROM (
+    SELECT MAX(CASE WHEN variable = 'gsi' THEN ensemble_value END) as gsi,
+           MAX(CASE WHEN variable = 'net_demand_plus_outages' THEN ensemble_value END) as nd
+    FROM energy_forecast_ensemble
+    WHERE initialization = :initialization
+      AND project_name = 'ercot_generic'
+      AND location = 'rto'
+      AND variable IN ('gsi', 'net_demand_plus_outages')
+    GROUP BY valid_datetime, ensemble_path
+) x
+WHERE gsi > :gsi_threshold;
+"""
+
+EXPECTED_SHORTFALL_HIGH_GSI_OPT_SQL = """
+/* One scan of both variables, pivoted per (hour, path) instead of a self-join */
+SELECT AVG(nd)
+FROM (
+    SELECT MAX(CASE WHEN variable = 'gsi' THEN ensemble_value END) as gsi,
+           MAX(CASE WHEN variable = 'net_demand_plus_outages' THEN ensemble_value END) as nd
+    FROM energy_forecast_ensemble
+    WHERE initialization = :initialization
+      AND project_name = 'ercot_generic'
+      AND location = 'rto'
+      AND variable IN ('gsi', 'net_demand_plus_outages')
+    GROUP BY valid_datetime, ensemble_path
+) x
+WHERE gsi >= :gsi_threshold;
+"""
+
+PATHS_NORTH_COLDER_THAN_WEST_OPT_SQL = """
+/* location IN (...) scanned once, then pivoted per (hour, path) */
+SELECT valid_datetime, ensemble_path
+FROM (
+    SELECT valid_datetime, ensemble_path,
+           MAX(CASE WHEN location = 'north_raybn' THEN ensemble_value END) as n_temp,
+           MAX(CASE WHEN location = 'west' THEN ensemble_value END) as w_temp
+    FROM weather_forecast_ensemble
+    WHERE initialization = :initialization
+      AND project_name = 'ercot_generic'
+      AND location IN ('north_raybn', 'west')
+      AND variable = 'temp_2m'
+    GROUP BY 1, 2
+) x
+WHERE n_temp < (w_temp - :temp_diff);
+"""
+
+# ---- Self-join on a time offset -> LAG window over the path-ordered index ----
+
+SOLAR_RAMP_P50_P90_OPT_SQL = """
+/* LAG over each path replaces the offset self-join; both percentiles share one sort.
+   hour_end < hour_start looks forward (LEAD), as the self-join's negative offset does;
+   GREATEST keeps every offset non-negative rather than relying on how a negative one is read */
+WITH ramps AS (
+    SELECT valid_datetime,
+           ensemble_value - CASE WHEN :hour_end >= :hour_start
+                                 THEN LAG(ensemble_value, GREATEST(:hour_end - :hour_start, 0)) OVER w
+                                 ELSE LEAD(ensemble_value, GREATEST(:hour_start - :hour_end, 0)) OVER w END as ramp,
+           valid_datetime - CASE WHEN :hour_end >= :hour_start
+                                 THEN LAG(valid_datetime, GREATEST(:hour_end - :hour_start, 0)) OVER w
+                                 ELSE LEAD(valid_datetime, GREATEST(:hour_start - :hour_end, 0)) OVER w END as span
+    FROM energy_forecast_ensemble
+    WHERE initialization = :initialization
+      AND project_name = 'ercot_generic'
+      AND location = 'rto'
+      AND variable = 'solar_gen'
+    WINDOW w AS (PARTITION BY ensemble_path ORDER BY valid_datetime)
+),
+pcts AS (
+    SELECT percentile_disc(ARRAY[0.5, 0.9]) WITHIN GROUP (ORDER BY ramp) as p
+    FROM ramps
+    WHERE EXTRACT(HOUR FROM valid_datetime AT TIME ZONE 'US/Central') = :hour_end
+      AND span = make_interval(hours => (:hour_end - :hour_start))
+)
+SELECT p[1] as p50_ramp, p[2] as p90_ramp FROM pcts;
+"""
+
+# ---- Two percentile_disc calls -> one array-form call (one sort per group) ----
+
+LOAD_RANGE_P99_P01_DATE_OPT_SQL = """
+/* Array-form percentile_disc sorts each hour's values once */
+SELECT valid_datetime, p[2] - p[1] as load_range
+FROM (
+    SELECT valid_datetime,
+           percentile_disc(ARRAY[0.01, 0.99]) WITHIN GROUP (ORDER BY ensemble_value) as p
+    FROM energy_base_ensemble
+    WHERE initialization = :seasonal_init
+      AND project_name = 'ercot_generic'
+      AND location = 'rto'
+      AND variable = 'load'
+      AND valid_datetime >= CAST(:target_date AS date) AND valid_datetime < CAST(:target_date AS date) + interval '1 day'
+    GROUP BY 1
+) x
+ORDER BY 1;
+"""
+
+
+# ---- Stitched forecast + seasonal series (app.db.stitched) ----
+# One index range over the pre-stitched horizon instead of a UNION ALL of a
+# forecast scan and a seasonal scan past forecast_init + 336 h. Only used
+# while the (forecast_init, seasonal_init) pair is materialized and current.
+
+GSI_P99_PEAK_SEASONAL_STITCHED_SQL = """
+SELECT valid_datetime, percentile_disc(0.99) WITHIN GROUP (ORDER BY ensemble_value) as p99_gsi
+FROM energy_stitched_ensemble
+WHERE forecast_init = :forecast_init AND seasonal_init = :seasonal_init
+  AND project_name = 'ercot_generic' AND location = 'rto' AND variable = 'gsi'
+GROUP BY 1 ORDER BY 2 DESC LIMIT 1;
+"""
+
+GSI_P50_P90_MONTH_STITCHED_SQL = """
+/* Month hours from calendar_hours (app.db.calendar), probed in the stitched index */
+WITH span AS (
+    SELECT MIN(valid_datetime) AS first_hour, MAX(valid_datetime) AS last_hour
+    FROM energy_stitched_ensemble
+    WHERE forecast_init = :forecast_init AND seasonal_init = :seasonal_init
+      AND project_name = 'ercot_generic' AND location = 'rto' AND variable = 'gsi'
+)
+SELECT percentile_disc(0.5) WITHIN GROUP (ORDER BY ensemble_value) as p50_gsi,
+       percentile_disc(0.9) WITHIN GROUP (ORDER BY ensemble_value) as p90_gsi
+FROM energy_stitched_ensemble
+WHERE forecast_init = :forecast_init AND seasonal_init = :seasonal_init
+  AND project_name = 'ercot_generic' AND location = 'rto' AND variable = 'gsi'
+  AND valid_datetime = ANY(ARRAY(
+      SELECT c.valid_datetime FROM calendar_hours c, span
+      WHERE c.utc_month = :month AND c.valid_datetime BETWEEN span.first_hour AND span.last_hour));
+"""
+
+P99_RTO_LOAD_MORNING_PEAK_STITCHED_SQL = """
+/* Month/hour selection from calendar_hours (app.db.calendar), probed in the stitched index */
+WITH span AS (
+    SELECT MIN(valid_datetime) AS first_hour, MAX(valid_datetime) AS last_hour
+    FROM energy_stitched_ensemble
+    WHERE forecast_init = :forecast_init AND seasonal_init = :seasonal_init
+      AND project_name = 'ercot_generic' AND location = 'rto' AND variable = 'load'
+)
+SELECT percentile_disc(0.99) WITHIN GROUP (ORDER BY ensemble_value)
+FROM energy_stitched_ensemble
+WHERE forecast_init = :forecast_init AND seasonal_init = :seasonal_init
+  AND project_name = 'ercot_generic' AND location = 'rto' AND variable = 'load'
+  AND valid_datetime = ANY(ARRAY(
+      SELECT c.valid_datetime FROM calendar_hours c, span
+      WHERE c.local_month = :month AND c.hour_beginning BETWEEN :hour_start AND :hour_end
+        AND c.valid_datetime BETWEEN span.first_hour AND span.last_hour));
+"""
+
+PROBABILITY_RTO_LOAD_EXCEEDS_STITCHED_SQL = """
+SELECT COUNT(*) FILTER (WHERE ensemble_value > :load_threshold)::float / COUNT(*)
+FROM energy_stitched_ensemble
+WHERE forecast_init = :forecast_init AND seasonal_init = :seasonal_init
+  AND project_name = 'ercot_generic' AND location = 'rto' AND variable = 'load';
+"""
+
+VOLATILITY_PEAK_NET_DEMAND_STITCHED_SQL = """
+SELECT valid_datetime, stddev(ensemble_value) as vol
+FROM energy_stitched_ensemble
+WHERE forecast_init = :forecast_init AND seasonal_init = :seasonal_init
+  AND project_name = 'ercot_generic' AND location = 'rto' AND variable = 'net_demand'
+GROUP BY 1 ORDER BY 2 DESC LIMIT 1;
+"""
+
+
+# ---- Calendar dimension (app.db.calendar) ----
+# Hour-of-day / month / local-date filters look the matching hours up in
+# calendar_hours and probe the ensemble index with valid_datetime = ANY(...),
+# instead of evaluating EXTRACT(... AT TIME ZONE 'US/Central') on every row.
+# The lookup is bounded by the series' own first/last hour (two index-only
+# probes), so a calendar spanning many years stays cheap. Month filters without
+# a zone use utc_month (ENGINE pins every session to UTC, app.db.connection).
+
+GSI_PROBABILITY_EVENING_RAMP_NEXT_WEEK_CALENDAR_SQL = """
+SELECT CAST(c.hour_beginning AS numeric) as hb, COUNT(*)::float / (:path_count * :days_ahead) as probability
+FROM energy_forecast_ensemble e
+JOIN calendar_hours c ON c.valid_datetime = e.valid_datetime
+WHERE e.initialization = :initialization
+  AND e.project_name = 'ercot_generic'
+  AND e.location = 'rto'
+  AND e.variable = 'gsi'
+  AND e.valid_datetime = ANY(ARRAY(
+      SELECT valid_datetime FROM calendar_hours
+      WHERE hour_beginning BETWEEN :hours_start AND :hours_end
+        AND valid_datetime >= CAST(:initialization AS timestamptz)
+        AND valid_datetime < CAST(:initialization AS timestamptz) + make_interval(days => :days_ahead)))
+  AND e.ensemble_value > :gsi_threshold
+GROUP BY 1 ORDER BY 1;
+"""
+
+P10_LOW_WIND_EVENING_RAMP_CALENDAR_SQL = """
+WITH span AS (
+    SELECT MIN(valid_datetime) AS first_hour, MAX(valid_datetime) AS last_hour
+    FROM energy_forecast_ensemble
+    WHERE initialization = :initialization
+      AND project_name = 'ercot_generic' AND location = 'rto' AND variable = 'wind_gen'
+)
+SELECT valid_datetime, percentile_disc(0.10) WITHIN GROUP (ORDER BY ensemble_value)
+FROM energy_forecast_ensemble
+WHERE initialization = :initialization
+  AND project_name = 'ercot_generic'
+  AND location = 'rto'
+  AND variable = 'wind_gen'
+  AND valid_datetime = ANY(ARRAY(
+      SELECT c.valid_datetime FROM calendar_hours c, span
+      WHERE c.hour_beginning BETWEEN :hours_start AND :hours_end
+        AND c.valid_datetime BETWEEN span.first_hour AND span.last_hour))
+GROUP BY 1;
+"""
+
+PROBABILITY_DUNKELFLAUTE_CALENDAR_SQL = """
+WITH span AS (
+    SELECT MIN(valid_datetime) AS first_hour, MAX(valid_datetime) AS last_hour
+    FROM energy_forecast_ensemble
+    WHERE initialization = :initialization
+      AND project_name = 'ercot_generic' AND location = 'rto' AND variable IN ('wind_cap_fac', 'solar_cap_fac')
+)
+SELECT valid_datetime, COUNT(*)::float / :path_count as prob
+FROM (
+    SELECT valid_datetime, ensemble_path,
+           MAX(CASE WHEN variable = 'wind_cap_fac' THEN ensemble_value END) as wind,
+           MAX(CASE WHEN variable = 'solar_cap_fac' THEN ensemble_value END) as solar
+    FROM energy_forecast_ensemble
+    WHERE initialization = :initialization
+      AND project_name = 'ercot_generic'
+      AND location = 'rto'
+      AND variable IN ('wind_cap_fac', 'solar_cap_fac')
+      AND valid_datetime = ANY(ARRAY(
+          SELECT c.valid_datetime FROM calendar_hours c, span
+          WHERE c.hour_beginning BETWEEN :daylight_start AND :daylight_end
+            AND c.valid_datetime BETWEEN span.first_hour AND span.last_hour))
+    GROUP BY 1, 2
+) x
+WHERE wind < :wind_threshold AND solar < :solar_threshold
+GROUP BY 1;
+"""
+
+DATE_HIGHEST_TAIL_RISK_CALENDAR_SQL = """
+SELECT valid_date, AVG(spread) AS avg_spread
+FROM
+(
+  SELECT c.local_date AS valid_date,
+         percentile_disc(0.99) WITHIN GROUP (ORDER BY e.ensemble_value) -
+             percentile_disc(0.50) WITHIN GROUP (ORDER BY e.ensemble_value) as spread
+  FROM energy_forecast_ensemble e
+  JOIN calendar_hours c ON c.valid_datetime = e.valid_datetime
+  WHERE e.initialization = :initialization
+    AND e.project_name = 'ercot_generic'
+    AND e.location = 'rto'
+    AND e.variable = 'gsi'
+  GROUP BY 1
+) x
+GROUP BY 1 ORDER BY 2 DESC LIMIT 1;
+"""
+
+P99_RTO_LOAD_MORNING_PEAK_CALENDAR_SQL = """
+WITH span AS (
+    SELECT LEAST((SELECT MIN(valid_datetime) FROM energy_forecast_ensemble
+                  WHERE initialization = :forecast_init AND project_name = 'ercot_generic' AND location = 'rto' AND variable = 'load'),
+                 (SELECT MIN(valid_datetime) FROM energy_base_ensemble
+                  WHERE initialization = :seasonal_init AND project_name = 'ercot_generic' AND location = 'rto' AND variable = 'load')) AS first_hour,
+           GREATEST((SELECT MAX(valid_datetime) FROM energy_forecast_ensemble
+                     WHERE initialization = :forecast_init AND project_name = 'ercot_generic' AND location = 'rto' AND variable = 'load'),
+                    (SELECT MAX(valid_datetime) FROM energy_base_ensemble
+                     WHERE initialization = :seasonal_init AND project_name = 'ercot_generic' AND location = 'rto' AND variable = 'load')) AS last_hour
+),
+hours AS (
+    SELECT c.valid_datetime FROM calendar_hours c, span
+    WHERE c.local_month = :month AND c.hour_beginning BETWEEN :hour_start AND :hour_end
+      AND c.valid_datetime BETWEEN span.first_hour AND span.last_hour
+),
+combined AS (
+    SELECT ensemble_value
+    FROM energy_forecast_ensemble
+    WHERE initialization = :forecast_init
+      AND project_name = 'ercot_generic' AND location = 'rto' AND variable = 'load'
+      AND valid_datetime = ANY(ARRAY(SELECT valid_datetime FROM hours))
+    UNION ALL
+    SELECT ensemble_value
+    FROM energy_base_ensemble
+    WHERE initialization = :seasonal_init
+      AND project_name = 'ercot_generic' AND location = 'rto' AND variable = 'load'
+      AND valid_datetime > CAST(:forecast_init AS timestamptz) + interval '336 hours'
+      AND valid_datetime = ANY(ARRAY(SELECT valid_datetime FROM hours))
+)
+SELECT percentile_disc(0.99) WITHIN GROUP (ORDER BY ensemble_value) FROM combined;
+"""
+
+GSI_P50_P90_MONTH_CALENDAR_SQL = """
+WITH span AS (
+    SELECT LEAST((SELECT MIN(valid_datetime) FROM energy_forecast_ensemble
+                  WHERE initialization = :forecast_init AND project_name = 'ercot_generic' AND location = 'rto' AND variable = 'gsi'),
+                 (SELECT MIN(valid_datetime) FROM energy_base_ensemble
+                  WHERE initialization = :seasonal_init AND project_name = 'ercot_generic' AND location = 'rto' AND variable = 'gsi')) AS first_hour,
+           GREATEST((SELECT MAX(valid_datetime) FROM energy_forecast_ensemble
+                     WHERE initialization = :forecast_init AND project_name = 'ercot_generic' AND location = 'rto' AND variable = 'gsi'),
+                    (SELECT MAX(valid_datetime) FROM energy_base_ensemble
+                     WHERE initialization = :seasonal_init AND project_name = 'ercot_generic' AND location = 'rto' AND variable = 'gsi')) AS last_hour
+),
+hours AS (
+    SELECT c.valid_datetime FROM calendar_hours c, span
+    WHERE c.utc_month = :month AND c.valid_datetime BETWEEN span.first_hour AND span.last_hour
+),
+combined_data AS (
+    SELECT ensemble_value FROM energy_forecast_ensemble
+    WHERE initialization = :forecast_init
+      AND project_name = 'ercot_generic' AND location = 'rto' AND variable = 'gsi'
+      AND valid_datetime = ANY(ARRAY(SELECT valid_datetime FROM hours))
+    UNION ALL
+    SELECT ensemble_value FROM energy_base_ensemble
+    WHERE initialization = :seasonal_init
+      AND project_name = 'ercot_generic' AND location = 'rto' AND variable = 'gsi'
+      AND valid_datetime > CAST(:forecast_init AS timestamptz) + interval '336 hours'
+      AND valid_datetime = ANY(ARRAY(SELECT valid_datetime FROM hours))
+)
+SELECT percentile_disc(0.5) WITHIN GROUP (ORDER BY ensemble_value) as p50_gsi,
+       percentile_disc(0.9) WITHIN GROUP (ORDER BY ensemble_value) as p90_gsi
+FROM combined_data;
+"""
+
+PROBABILITY_NET_DEMAND_EXCEEDS_MONTH_CALENDAR_SQL = """
+WITH span AS (
+    SELECT MIN(valid_datetime) AS first_hour, MAX(valid_datetime) AS last_hour
+    FROM energy_base_ensemble
+    WHERE initialization = :seasonal_init
+      AND project_name = 'ercot_generic' AND location = 'rto' AND variable = 'net_demand'
+)
+SELECT COUNT(*) FILTER (WHERE ensemble_value > :net_demand_threshold)::float / COUNT(*)
+FROM energy_base_ensemble
+WHERE initialization = :seasonal_init
+  AND project_name = 'ercot_generic'
+  AND location = 'rto'
+  AND variable = 'net_demand'
+  AND valid_datetime = ANY(ARRAY(
+      SELECT c.valid_datetime FROM calendar_hours c, span
+      WHERE c.utc_month = :month AND c.valid_datetime BETWEEN span.first_hour AND span.last_hour));
+"""
+
+VARIANCE_WIND_VS_SOLAR_MONTH_CALENDAR_SQL = """
+WITH span AS (
+    SELECT MIN(valid_datetime) AS first_hour, MAX(valid_datetime) AS last_hour
+    FROM energy_base_ensemble
+    WHERE initialization = :seasonal_init
+      AND project_name = 'ercot_generic' AND location = 'rto' AND variable IN ('wind_gen', 'solar_gen')
+)
+SELECT variable, var_pop(ensemble_value)
+FROM energy_base_ensemble
+WHERE initialization = :seasonal_init
+  AND project_name = 'ercot_generic'
+  AND location = 'rto'
+  AND variable IN ('wind_gen', 'solar_gen')
+  AND valid_datetime = ANY(ARRAY(
+      SELECT c.valid_datetime FROM calendar_hours c, span
+      WHERE c.utc_month = :month AND c.valid_datetime BETWEEN span.first_hour AND span.last_hour))
+GROUP BY 1;
+"""
@@ -0,0 +1,52 @@
+"""
+SQL template lookup for registry entries.
+
+A registry entry names its base template in "sql_template_name". It may also
+declare alternative implementations in "sql_variants" ({variant: template
+name}) and pick one of them as the default with "sql_variant". Every variant
+takes the same parameters and returns the same columns as the base template.
+"statement_timeout_ms" overrides STATEMENT_TIMEOUT_MS for the entry's runs.
+"""
+
+from app.db.executor import STATEMENT_TIMEOUT_MS
+from app.queries import sql_templates, sql_templates_optimized
+from app.queries.query_registry import QUERY_REGISTRY
+
+BASE_VARIANT = "base"
+
+_TEMPLATE_MODULES = (sql_templates, sql_templates_optimized)
+
+
+def _lookup(template_name: str) -> str:
+    for module in _TEMPLATE_MODULES:
+        if hasattr(module, template_name):
+            return getattr(module, template_name)
+    raise KeyError(f"Unknown SQL template: {template_name}")
+
+
+def template_variants(query_id: str) -> dict:
+    """{variant: template name}, always including the base template."""
+    query_info = QUERY_REGISTRY[query_id]
+    variants = {BASE_VARIANT: query_info["sql_template_name"]}
+    variants.update(query_info.get("sql_variants", {}))
+    return variants
+
+
+def active_variant(query_id: str) -> str:
+    return QUERY_REGISTRY[query_id].get("sql_variant", BASE_VARIANT)
+
+
+def get_sql_template(query_id: str, variant: str | None = None) -> str:
+    """
+    SQL for a registry entry. ``variant`` defaults to the entry's "sql_variant",
+    falling back to the base template.
+    """
+    variants = template_variants(query_id)
+    variant = variant or active_variant(query_id)
+    if variant not in variants:
+        raise KeyError(f"{query_id} has no '{variant}' SQL variant")
+    return _lookup(variants[variant])
+
+
+def statement_timeout_ms(query_id: str) -> int:
+    return QUERY_REGISTRY.get(query_id, {}).get("statement_timeout_ms", STATEMENT_TIMEOUT_MS)
@@ -0,0 +1,140 @@
+"""
+Fast JSON responses and negotiated compression.
+
+FastJSONResponse encodes with orjson: datetimes, dates, UUIDs and NumPy
+arrays/scalars natively (UTC as "Z"); Decimals as strings, as pydantic does.
+fast_response(model) sends a pydantic model through it without FastAPI
+re-validating and re-encoding the model's fields (for /query, the ``data``
+rows), which a route returning the model would do.
+
+CompressionMiddleware compresses response bodies of at least
+RESPONSE_COMPRESS_MIN_BYTES (default 4096) with zstd or gzip, whichever the
+client's Accept-Encoding prefers (zstd on a tie). zstd needs the zstandard
+package; without it only gzip is offered. Streamed bodies (Server-Sent
+Events) and already-encoded responses pass through unchanged.
+"""
+
+import gzip
+import os
+from decimal import Decimal
+
+import orjson
+from pydantic import BaseModel
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+
+try:
+    import zstandard
+except ImportError:  # gzip only
+    zstandard = None
+
+RESPONSE_COMPRESS_MIN_BYTES = int(os.environ.get("RESPONSE_COMPRESS_MIN_BYTES", 4096))
+GZIP_LEVEL = int(os.environ.get("RESPONSE_GZIP_LEVEL", 5))
+ZSTD_LEVEL = int(os.environ.get("RESPONSE_ZSTD_LEVEL", 3))
+
+_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, BaseModel):
+        return model_content(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content, default=_default, option=_OPTIONS)
+
+
+def model_content(model: BaseModel) -> dict:
+    """A model's fields as a dict, values as they are (no validation, no copies)."""
+    return {name: getattr(model, name) for name in type(model).model_fields}
+
+
+class FastJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def fast_response(model: BaseModel, status_code: int = 200) -> FastJSONResponse:
+    return FastJSONResponse(model_content(model), status_code=status_code)
+
+
+def _accepted(accept_encoding: str) -> dict[str, float]:
+    """{coding: q} from an Accept-Encoding header."""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    accepted = _accepted(accept_encoding)
+    offers = (["zstd"] if zstandard is not None else []) + ["gzip"]
+    ranked = [(accepted.get(c, accepted.get("*", 0.0)), -i, c) for i, c in enumerate(offers)]
+    q, _, coding = max(ranked)
+    return coding if q > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """ASGI middleware: zstd/gzip for single-message response bodies above ``minimum_size``."""
+
+    def __init__(self, app, minimum_size: int = RESPONSE_COMPRESS_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message  # held until the body shows whether to compress
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            if message.get("more_body") or "content-encoding" in headers or len(body) < self.minimum_size:
+                # Streamed or small: send as is
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+            body = compress(body, encoding)
+            headers["content-encoding"] = encoding
+            headers["content-length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,564 @@
+"""
+Benchmark CLI.
+
+    python -m bench load --paths 1000 --seasonal-days 120
+    python -m bench run --baseline bench/baseline.json --write-baseline
+    python -m bench run --baseline bench/baseline.json
+    python -m bench plans --baseline bench/plans.json --write-baseline
+    python -m bench plans --show GSI_P99_PEAK_SEASONAL
+    python -m bench plans --verify-indexes
+    python -m bench plans --verify-pruning
+    python -m bench variants
+    python -m bench durations
+    python -m bench sketches
+    python -m bench sampling --tolerance 0.05 --tolerance 0.02
+    python -m bench stream
+    python -m bench warm --insert-init 2026-01-16T00:00+00:00
+    python -m bench staleness
+    python -m bench llm --requests 64 --threads 32
+    python -m bench speculative --llm-seconds 1.0
+    python -m bench workers --workers 1,2,4
+    python -m bench prompts --top-k 8
+    python -m bench loadgen --users 16 --latency lognormal:1200:0.35
+    python -m bench downsampling --max-points 100
+    python -m bench serialization --top 5
+    python -m bench export --top 5
+    python -m bench admission --heavy-clients 12 --heavy-slots 2
+    python -m bench timeouts
+    python -m bench singleflight --users 32
+    python -m bench resolver --users 24 --window-ms 5 --window-ms 20
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime, timezone
+
+
+def _parse_ts(value: str) -> datetime:
+    ts = datetime.fromisoformat(value)
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def _cmd_load(args):
+    from bench.loader import load_dataset
+    from bench.synthetic import DatasetSpec
+
+    spec = DatasetSpec(seed=args.seed, n_paths=args.paths, seasonal_days=args.seasonal_days)
+    if args.forecast_init:
+        spec.forecast_init = _parse_ts(args.forecast_init)
+    if args.seasonal_init:
+        spec.seasonal_init = _parse_ts(args.seasonal_init)
+    load_dataset(spec, truncate=args.truncate, partition_strategy=args.partitioned)
+    if args.indexes:
+        from app.db.connection import ENGINE
+        from app.db.schema import apply_migration, diff_indexes, live_indexes, migration_sql, partitioned_tables
+
+        with ENGINE.connect() as conn:
+            diff = diff_indexes(live_indexes(conn), with_optional=True)
+            partitioned = partitioned_tables(conn)
+        apply_migration(ENGINE, migration_sql(diff, partitioned=partitioned))
+
+
+def _cmd_run(args):
+    from bench.runner import compare_to_baseline, read_baseline, run_benchmarks, write_baseline
+
+    document = run_benchmarks(args.query_id or None, iterations=args.iterations, warmup=args.warmup)
+    if args.write_baseline or not os.path.exists(args.baseline):
+        write_baseline(document, args.baseline)
+        print(f"💾 Baseline written to {args.baseline}")
+        return 0
+
+    findings = compare_to_baseline(document, read_baseline(args.baseline), tolerance=args.tolerance)
+    for f in findings:
+        print(f"⚠️  {f['query_id']}: {f['kind']} {f['baseline']} -> {f['current']}")
+    print(f"{len(findings)} regression(s) against {args.baseline}")
+    return 1 if findings else 0
+
+
+def _cmd_plans(args):
+    from bench.plans import capture_all, compare_plans, format_plan, index_usage, partition_pruning
+    from bench.runner import read_baseline, write_baseline
+
+    document = capture_all(args.query_id or None)
+    if args.verify_indexes:
+        usage = index_usage(document["plans"])
+        for query_id, entry in usage.items():
+            mark = "✅" if entry["ok"] else "❌"
+            print(f"{mark} {query_id}: {sorted(set((s[0], s[2]) for s in entry['scans']), key=str)}")
+        failing = [q for q, entry in usage.items() if not entry["ok"]]
+        print(f"{len(usage) - len(failing)}/{len(usage)} templates use index or index-only scans")
+        return 1 if failing else 0
+    if args.verify_pruning:
+        report = partition_pruning(document["plans"])
+        for query_id, entry in report.items():
+            mark = "✅" if entry["ok"] else "❌"
+            print(f"{mark} {query_id}: {entry['partitions']}")
+        failing = [q for q, entry in report.items() if not entry["ok"]]
+        print(f"{len(report) - len(failing)}/{len(report)} templates prune to one partition per table")
+        return 1 if failing else 0
+
+    for query_id, entry in document["plans"].items():
+        if "error" in entry:
+            print(f"❌ {query_id}: {entry['error']}")
+            continue
+        for issue in entry["issues"]:
+            print(f"⚠️  {query_id}: {issue}")
+        if query_id in (args.show or []):
+            print(format_plan(entry["plan"]))
+
+    if args.write_baseline or not os.path.exists(args.baseline):
+        write_baseline(document, args.baseline)
+        print(f"💾 Plans written to {args.baseline}")
+        return 0
+
+    findings = compare_plans(document, read_baseline(args.baseline))
+    for f in findings:
+        mark = "📏" if f["kind"] == "issue_changed" else "🔀"
+        print(f"{mark} {f['query_id']}: {f['kind']} {f['baseline']} -> {f['current']}")
+    regressions = [f for f in findings if f["kind"] != "issue_changed"]
+    print(f"{len(regressions)} plan regression(s), {len(findings) - len(regressions)} changed issue metric(s) "
+          f"against {args.baseline}")
+    return 1 if regressions else 0
+
+
+def _cmd_variants(args):
+    from bench.variants import run_variants
+
+    report = run_variants(args.query_id or None, iterations=args.iterations, variant_filter=args.variant)
+    failures = 0
+    for query_id, variants in report.items():
+        for variant, entry in variants.items():
+            ok = entry["columns_match"] and entry["rows_match"]
+            failures += not ok
+            print(
+                f"{'✅' if ok else '❌'} {query_id} [{variant}]: "
+                f"{entry['base_p50_ms']:.1f} ms -> {entry['p50_ms']:.1f} ms (x{entry['speedup']}), "
+                f"buffers {entry['base_shared_hit_blocks']} -> {entry['shared_hit_blocks']}, rows {entry['rows']}"
+                + (f" ({entry['error']})" if "error" in entry else "")
+            )
+            for edge in entry["edge_cases"]:
+                edge_ok = edge["columns_match"] and edge["rows_match"]
+                failures += not edge_ok
+                print(f"   {'✅' if edge_ok else '❌'} {edge['params']}: rows {edge['rows']}"
+                      + (f" ({edge['error']})" if "error" in edge else ""))
+    return 1 if failures else 0
+
+
+def _cmd_durations(args):
+    from bench.durations import run_durations
+
+    report = run_durations(iterations=args.iterations)
+    for query_id, entry in report.items():
+        print(
+            f"{'✅' if entry['match'] else '❌'} {query_id} vs RUN_LENGTH_PROBABILITY: "
+            f"{entry['legacy']:.4f} / {entry['run_length']:.4f} over {entry['path_count']} paths, "
+            f"{entry['legacy_p50_ms']:.1f} ms -> {entry['p50_ms']:.1f} ms (x{entry['speedup']})"
+        )
+    return 0 if all(entry["match"] for entry in report.values()) else 1
+
+
+def _cmd_sketches(args):
+    from bench.sketches import run_sketches
+
+    overrides = {"month": args.month} if args.month else None
+    report = run_sketches(args.query_id or None, iterations=args.iterations, overrides=overrides)
+    failures = 0
+    for query_id, entry in report.items():
+        print(f"{query_id}: exact {entry['exact_p50_ms']:.1f} ms -> sketch {entry['approximate_p50_ms']:.1f} ms (x{entry['speedup']})")
+        for column, result in entry["columns"].items():
+            if "match" in result:
+                failures += not result["match"]
+                print(f"  {'✅' if result['match'] else '❌'} {column} matches")
+                continue
+            failures += not result["within_bounds"]
+            print(
+                f"  {'✅' if result['within_bounds'] else '❌'} {column}: exact {result['exact']:.4f}, "
+                f"approx {result['approximate']:.4f} in [{result['lower']:.4f}, {result['upper']:.4f}], "
+                f"error {result['abs_error']:.4f}"
+            )
+    return 1 if failures else 0
+
+
+def _cmd_sampling(args):
+    from bench.sampling import DEFAULT_TOLERANCES, run_sampling
+
+    report = run_sampling(args.query_id or None, tolerances=args.tolerance or DEFAULT_TOLERANCES,
+                          iterations=args.iterations)
+    for query_id, by_tolerance in report.items():
+        for tolerance, entry in by_tolerance.items():
+            error = "n/a" if entry["max_abs_error"] is None else f"{entry['max_abs_error']:.4f}"
+            print(
+                f"{query_id} ±{tolerance}: {entry['sample_size']}/{entry['path_count']} paths, "
+                f"max error {error}, {entry['covered']}/{entry['compared']} inside CI, "
+                f"{entry['exact_p50_ms']:.1f} ms -> {entry['p50_ms']:.1f} ms"
+            )
+    return 0
+
+
+def _cmd_stream(args):
+    from bench.stream import run_stream
+
+    report = run_stream(args.query_id or None, iterations=args.iterations, port=args.port)
+    for query_id, entry in report["queries"].items():
+        first = entry["estimate_ms"] or entry["exact_ms"]
+        print(
+            f"{query_id}: /query {entry['blocking_ms']:.1f} ms | /query/stream first number {first:.1f} ms, "
+            f"exact {entry['exact_ms']:.1f} ms"
+        )
+    ok = report["cancelled_on_disconnect"]
+    print(f"{'✅' if ok else '❌'} query cancelled when the client disconnects")
+    return 0 if ok else 1
+
+
+def _cmd_warm(args):
+    from bench.warmer import insert_forecast_init, run_warmer
+
+    if args.insert_init:
+        insert_forecast_init(_parse_ts(args.insert_init), n_paths=args.paths)
+    report = run_warmer(workers=args.workers)
+    warm = report["warm"] or {}
+    print(f"🆕 {report['initialization']}: warmed {warm.get('warmed')} templates "
+          f"({warm.get('failed')} failed, {warm.get('skipped')} skipped) in {warm.get('seconds')}s, "
+          f"GSI first: {report['first_warmed']}")
+    print(f"❄️  cold: {report['cold_total_ms']} ms total, p50 {report['cold_p50_ms']} ms -> "
+          f"🔥 hit p50 {report['hit_p50_ms']} ms")
+    print(f"🧪 probe {report['probe_idle_p50_ms']} ms idle vs {report['probe_during_warm_p50_ms']} ms "
+          f"during warming ({report['probe_samples_during_warm']} samples)")
+    return 0 if warm.get("warmed") else 1
+
+
+def _cmd_staleness(args):
+    from bench.staleness import run_staleness
+
+    report = run_staleness()
+    checks = ["fingerprinted", "unrelated_detected", "unrelated_revalidated_without_rerun",
+              "late_rows_detected", "stale_served", "refreshed", "fresh_after_refresh", "inline_without_scan"]
+    for check in checks:
+        print(f"{'✅' if report.get(check) else '❌'} {check}")
+    print(f"⏱️  miss {report.get('miss_ms', 0):.1f} ms, stale hit {report.get('stale_hit_ms', 0):.2f} ms "
+          f"(rerun would be {report.get('rerun_ms', 0):.1f} ms), fresh hit {report.get('fresh_hit_ms', 0):.2f} ms, "
+          f"inline revalidation {report.get('inline_ms', 0):.1f} ms")
+    print(f"📊 {report['stats']}")
+    return 0 if all(report.get(check) for check in checks) else 1
+
+
+def _cmd_llm(args):
+    from bench.llm import run_llm
+
+    report = run_llm(requests=args.requests, threads=args.threads, stub_concurrency=args.stub_concurrency,
+                     max_concurrency=args.max_concurrency)
+    for name, entry in report.items():
+        print(f"🤖 {name}: {entry['ok']} ok / {entry['failed']} failed {entry['failure_types'] or ''} "
+              f"p50 {entry['p50_ms']} ms, p95 {entry['p95_ms']} ms, p99 {entry['p99_ms']} ms, wall {entry['wall_s']} s")
+        if "stub_throttled" in entry:
+            print(f"   stub: {entry['stub_throttled']} throttled, peak {entry['stub_max_in_flight']} in flight")
+        if "metrics" in entry:
+            print(f"   metrics: {entry['metrics']}")
+    return 0 if report["hardened"]["failed"] == 0 else 1
+
+
+def _cmd_speculative(args):
+    from bench.speculative import run_speculative
+
+    report = run_speculative(train_sessions=args.train_sessions, replay_sessions=args.sessions, turns=args.turns,
+                             llm_seconds=args.llm_seconds)
+    print(f"{'session':>7} {'turn':>4} {'query_id':45} {'baseline':>9} {'specul.':>9} {'saved':>8}")
+    for t in report["turns"]:
+        mark = "⚡" if t["adopted"] else ("⚡·" if t["speculated_earlier"] else "  ")
+        print(f"{t['session']:>7} {t['turn']:>4} {t['query_id']:45} {t['baseline_ms']:>7.1f}ms "
+              f"{t['speculative_ms']:>7.1f}ms {t['saved_ms']:>6.1f}ms {mark}")
+    print(f"⚡ {report['summary']}")
+    return 0
+
+
+def _cmd_workers(args):
+    from bench.workers import run_workers
+
+    rows = run_workers([int(n) for n in args.workers.split(",")], requests=args.requests, clients=args.clients,
+                       llm_ms=args.llm_ms)
+    print(f"{'workers':>7} {'shared':>6} {'req/s':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'computed':>8} "
+          f"{'PSS MB':>7} {'sessions':>8}")
+    for row in rows:
+        print(f"{row['workers']:>7} {str(row['shared_cache']):>6} {row['rps']:>7.1f} {row['p50_ms']:>6.1f}ms "
+              f"{row['p95_ms']:>6.1f}ms {row['p99_ms']:>6.1f}ms {row['computed']:>8} {row['pss_mb']:>7.1f} "
+              f"{row['sessions_ok']:>8}")
+    return 0
+
+
+def _cmd_prompts(args):
+    from bench.prompts import run_prompts
+
+    report = run_prompts(top_k=args.top_k, llm_ms=args.llm_ms, input_token_ms=args.input_token_ms,
+                         latency_sample=args.latency_sample)
+    print(f"{'set':<12} {'mode':<8} {'tokens':>7} {'in prompt':>9} {'top hit':>7} {'LLM p50':>9} {'LLM p95':>9} "
+          f"{'build':>8}")
+    for name, row in report["sets"].items():
+        for mode in ("full", "trimmed"):
+            r = row[mode]
+            top_hit = f"{r['top_hit']:.3f}" if "top_hit" in r else "-"
+            print(f"{name:<12} {mode:<8} {r['prompt_tokens_mean']:>7} {r['in_prompt']:>9.3f} {top_hit:>7} "
+                  f"{r['llm_p50_ms']:>7.1f}ms {r['llm_p95_ms']:>7.1f}ms {r['build_ms']:>6.2f}ms")
+    return 0
+
+
+def _cmd_loadgen(args):
+    from bench.loadgen import run_loadgen
+
+    report = run_loadgen(recording=args.recording, latency=args.latency, users=args.users, rounds=args.rounds,
+                         workers=args.workers)
+    print(f"{report['requests']} requests in {report['seconds']}s: {report['rps']} req/s, "
+          f"p50 {report['p50_ms']}ms, p99 {report['p99_ms']}ms, errors {report['errors'] or 'none'}")
+    print(f"{'decision':<15} {'requests':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'errors':>7} {'mismatch':>8}")
+    for decision, row in report["by_decision"].items():
+        print(f"{decision:<15} {row['requests']:>8} {row['p50_ms']:>7.1f}ms {row['p95_ms']:>7.1f}ms "
+              f"{row['p99_ms']:>7.1f}ms {row['error_rate']:>7.2%} {row['mismatch_rate']:>8.2%}")
+    print(f"replay: {report['replay']}")
+    return 0
+
+
+def _cmd_downsampling(args):
+    from bench.downsampling import run_downsampling
+
+    rows = run_downsampling(max_points=args.max_points, iterations=args.iterations, query_ids=args.query_id or None)
+    print(f"{'query_id':<36} {'rows':>11} {'bytes':>15} {'api':>17} {'client':>17}  fidelity")
+    for row in rows:
+        f, d = row["full"], row["downsampled"]
+        print(f"{row['query_id']:<36} {f['rows']:>5}->{d['rows']:<5} {f['bytes']:>7}->{d['bytes']:<7} "
+              f"{f['api_ms']:>6.1f}->{d['api_ms']:<6.1f}ms {f['client_ms']:>6.1f}->{d['client_ms']:<6.1f}ms  "
+              f"{row['fidelity']}")
+    return 0
+
+
+def _cmd_serialization(args):
+    from bench.serialization import run_serialization
+
+    rows = run_serialization(top=args.top, iterations=args.iterations)
+    print(f"{'query_id':<34} {'rows':>5} {'encode pydantic->orjson':>24} {'route pydantic->orjson':>23} "
+          f"{'bytes':>7} {'gzip':>14} {'zstd':>14}")
+    for row in rows:
+        zstd = f"{row['zstd_bytes']:>6} {row['zstd_ms']:>5.2f}ms" if "zstd_bytes" in row else "-"
+        print(f"{row['query_id']:<34} {row['rows']:>5} {row['pydantic_ms']:>9.2f}->{row['orjson_ms']:<6.2f}ms "
+              f"{row['route_pydantic_ms']:>11.2f}->{row['route_orjson_ms']:<6.2f}ms {row['orjson_bytes']:>7} "
+              f"{row['gzip_bytes']:>6} {row['gzip_ms']:>5.2f}ms {zstd:>14}")
+    return 0
+
+
+def _cmd_export(args):
+    from bench.export import FORMATS, run_export
+
+    rows = run_export(top=args.top, iterations=args.iterations)
+    print(f"{'query_id':<34} {'rows':>5} " + " ".join(f"{fmt + ' cold/warm ms, bytes':>30}" for fmt in FORMATS))
+    for row in rows:
+        cells = " ".join(f"{row[fmt]['cold_ms']:>10.2f} {row[fmt]['warm_ms']:>8.2f} {row[fmt]['bytes']:>10}"
+                         for fmt in FORMATS)
+        print(f"{row['query_id']:<34} {row['rows']:>5} {cells}")
+    return 0
+
+
+def _cmd_admission(args):
+    from bench.admission import run_admission
+
+    report = run_admission(light_clients=args.light_clients, heavy_clients=args.heavy_clients,
+                           heavy_slots=args.heavy_slots, duration=args.duration)
+    print(f"{'query_id':<42} {'cost':>8} {'lane':>6} {'explain_ms':>10} {'cached_ms':>9} {'run_ms':>8}")
+    for row in sorted(report["estimates"], key=lambda r: r["cost"]):
+        print(f"{row['query_id']:<42} {row['cost']:>8} {row['lane']:>6} {row['explain_ms']:>10} "
+              f"{row['cached_ms']:>9} {row['run_ms']:>8}")
+    print(f"cost vs runtime Spearman rho: {report['spearman']}")
+    for label, flood in report["flood"].items():
+        print(f"admission {label:<3}: {flood}")
+    return 0
+
+
+def _cmd_timeouts(args):
+    from bench.timeouts import run_timeouts
+
+    report = run_timeouts(port=args.port)
+    checks = [name for name, result in report.items() if "ok" in result]
+    failed = [name for name in checks if not report[name]["ok"]]
+    print(f"{len(checks) - len(failed)}/{len(checks)} checks passed" + (f"; failed: {failed}" if failed else ""))
+    return 1 if failed else 0
+
+
+def _cmd_singleflight(args):
+    from bench.singleflight import run_singleflight
+
+    report = run_singleflight(query_id=args.query_id, users=args.users, spread_ms=args.spread_ms)
+    for label, result in report["morning_report"].items():
+        print(f"single-flight {label:<3}: {result}")
+    failed = [check for check in ("async", "error", "cancel") if not report[check]["ok"]]
+    print(f"{3 - len(failed)}/3 checks passed" + (f"; failed: {failed}" if failed else ""))
+    return 1 if failed else 0
+
+
+def _cmd_resolver(args):
+    from bench.resolver import run_resolver
+
+    report = run_resolver(users=args.users, spread_ms=args.spread_ms, windows_ms=tuple(args.window_ms or (5, 20)),
+                          batch_max=args.batch_max, llm_ms=args.llm_ms, llm_slots=args.llm_slots)
+    for scenario in ("identical", "distinct", "lone"):
+        for label, result in report[scenario].items():
+            print(f"{scenario:<9} {label:<13}: {result}")
+    print(f"fallback                : {report['fallback']}")
+    checks = [*report["identical"].values(), *report["distinct"].values(), report["fallback"]]
+    return 0 if all(check["ok"] for check in checks) else 1
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    load = sub.add_parser("load", help="Generate synthetic ensembles and COPY them into Postgres")
+    load.add_argument("--seed", type=int, default=42)
+    load.add_argument("--paths", type=int, default=1000)
+    load.add_argument("--seasonal-days", type=int, default=120)
+    load.add_argument("--forecast-init", help="e.g. 2026-01-15T12:00+00:00")
+    load.add_argument("--seasonal-init", help="e.g. 2025-12-05T00:00+00:00")
+    load.add_argument("--truncate", action="store_true", help="Empty the tables before loading")
+    load.add_argument("--partitioned", choices=["list", "day"],
+                      help="Create missing tables partitioned by initialization")
+    load.add_argument("--indexes", action="store_true", help="Apply app.db.schema indexes after loading")
+    load.set_defaults(func=_cmd_load)
+
+    run = sub.add_parser("run", help="Benchmark every registry template")
+    run.add_argument("--baseline", default="bench/baseline.json")
+    run.add_argument("--write-baseline", action="store_true")
+    run.add_argument("--iterations", type=int, default=5)
+    run.add_argument("--warmup", type=int, default=1)
+    run.add_argument("--tolerance", type=float, default=0.25)
+    run.add_argument("--query-id", action="append", help="Limit to these query_ids (repeatable)")
+    run.set_defaults(func=_cmd_run)
+
+    plans = sub.add_parser("plans", help="Capture EXPLAIN ANALYZE plans and diff against a baseline")
+    plans.add_argument("--baseline", default="bench/plans.json")
+    plans.add_argument("--write-baseline", action="store_true")
+    plans.add_argument("--query-id", action="append", help="Limit to these query_ids (repeatable)")
+    plans.add_argument("--show", action="append", help="Print the plan tree for these query_ids")
+    plans.add_argument("--verify-indexes", action="store_true",
+                       help="Check that every ensemble-table scan is an index or index-only scan")
+    plans.add_argument("--verify-pruning", action="store_true",
+                       help="Check that partitioned tables are pruned to one partition per template")
+    plans.set_defaults(func=_cmd_plans)
+
+    variants = sub.add_parser("variants", help="Parity check and benchmark deltas for SQL variants")
+    variants.add_argument("--query-id", action="append", help="Limit to these query_ids (repeatable)")
+    variants.add_argument("--variant", help="Only check this variant (e.g. optimized)")
+    variants.add_argument("--iterations", type=int, default=5)
+    variants.set_defaults(func=_cmd_variants)
+
+    durations = sub.add_parser("durations", help="Run-length engine vs the fixed-duration templates")
+    durations.add_argument("--iterations", type=int, default=5)
+    durations.set_defaults(func=_cmd_durations)
+
+    sketches = sub.add_parser("sketches", help="Approximate (sketch) vs exact percentile accuracy and latency")
+    sketches.add_argument("--query-id", action="append", help="Limit to these query_ids (repeatable)")
+    sketches.add_argument("--iterations", type=int, default=5)
+    sketches.add_argument("--month", type=int, help="Override the month param (default: registry default)")
+    sketches.set_defaults(func=_cmd_sketches)
+
+    sampling = sub.add_parser("sampling", help="Subsampled probability accuracy, CI coverage and latency")
+    sampling.add_argument("--query-id", action="append", help="Limit to these query_ids (repeatable)")
+    sampling.add_argument("--tolerance", type=float, action="append", help="Requested ± error (repeatable)")
+    sampling.add_argument("--iterations", type=int, default=3)
+    sampling.set_defaults(func=_cmd_sampling)
+
+    stream = sub.add_parser("stream", help="Time-to-first-number of /query/stream vs /query")
+    stream.add_argument("--query-id", action="append", help="Limit to these query_ids (repeatable)")
+    stream.add_argument("--iterations", type=int, default=3)
+    stream.add_argument("--port", type=int, default=8765)
+    stream.set_defaults(func=_cmd_stream)
+
+    warm = sub.add_parser("warm", help="Cache warmer: cold vs warmed latency, probe latency while warming")
+    warm.add_argument("--insert-init", help="First insert a synthetic forecast init, e.g. 2026-01-16T00:00+00:00")
+    warm.add_argument("--paths", type=int, default=50, help="Paths for --insert-init")
+    warm.add_argument("--workers", type=int, default=2)
+    warm.set_defaults(func=_cmd_warm)
+
+    staleness = sub.add_parser("staleness", help="Cache invalidation: unrelated writes, late rows, stale-while-revalidate")
+    staleness.set_defaults(func=_cmd_staleness)
+
+    llm = sub.add_parser("llm", help="Bedrock client under a burst against a throttling local stub")
+    llm.add_argument("--requests", type=int, default=64)
+    llm.add_argument("--threads", type=int, default=32)
+    llm.add_argument("--stub-concurrency", type=int, default=4, help="In-flight calls before the stub throttles")
+    llm.add_argument("--max-concurrency", type=int, default=4, help="BedrockClient concurrency cap")
+    llm.set_defaults(func=_cmd_llm)
+
+    speculative = sub.add_parser("speculative", help="Replay sessions with and without speculative execution")
+    speculative.add_argument("--train-sessions", type=int, default=300)
+    speculative.add_argument("--sessions", type=int, default=8, help="Sessions replayed")
+    speculative.add_argument("--turns", type=int, default=6)
+    speculative.add_argument("--llm-seconds", type=float, default=1.0, help="Simulated LLM latency per turn")
+    speculative.set_defaults(func=_cmd_speculative)
+
+    workers = sub.add_parser("workers", help="gunicorn preset throughput from 1 to N workers")
+    workers.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    workers.add_argument("--requests", type=int, default=400)
+    workers.add_argument("--clients", type=int, default=16, help="Concurrent client threads")
+    workers.add_argument("--llm-ms", type=float, default=50, help="Stub LLM latency per call")
+    workers.set_defaults(func=_cmd_workers)
+
+    prompts = sub.add_parser("prompts", help="Full vs retrieval-trimmed intent prompts: tokens, routing, LLM latency")
+    prompts.add_argument("--top-k", type=int, default=8, help="Candidates with full specs in the trimmed prompt")
+    prompts.add_argument("--llm-ms", type=float, default=300, help="Stub LLM latency per call, before prompt cost")
+    prompts.add_argument("--input-token-ms", type=float, default=0.1, help="Stub latency per prompt token")
+    prompts.add_argument("--latency-sample", type=int, default=12, help="Questions per set sent to the stub")
+    prompts.set_defaults(func=_cmd_prompts)
+
+    loadgen = sub.add_parser("loadgen", help="Async load test of /query with recorded LLM decisions")
+    loadgen.add_argument("--recording", help="LLM recording to replay (recorded from the scenarios if missing)")
+    loadgen.add_argument("--latency", default="lognormal:1200:0.35", help="LLM_REPLAY_LATENCY for the server")
+    loadgen.add_argument("--users", type=int, default=16, help="Concurrent async clients")
+    loadgen.add_argument("--rounds", type=int, default=2, help="Copies of every session")
+    loadgen.add_argument("--workers", type=int, default=1, help="gunicorn workers")
+    loadgen.set_defaults(func=_cmd_loadgen)
+
+    downsampling = sub.add_parser("downsampling", help="Payload size and latency with and without max_points")
+    downsampling.add_argument("--max-points", type=int, default=100)
+    downsampling.add_argument("--iterations", type=int, default=5)
+    downsampling.add_argument("--query-id", action="append")
+    downsampling.set_defaults(func=_cmd_downsampling)
+
+    serialization = sub.add_parser("serialization", help="pydantic vs orjson encode time, bytes, gzip/zstd")
+    serialization.add_argument("--top", type=int, default=5, help="Largest templates by result rows")
+    serialization.add_argument("--iterations", type=int, default=20)
+    serialization.set_defaults(func=_cmd_serialization)
+
+    export = sub.add_parser("export", help="Fetch-to-DataFrame time: JSON vs Arrow IPC vs Parquet")
+    export.add_argument("--top", type=int, default=5, help="Largest templates by result rows")
+    export.add_argument("--iterations", type=int, default=5)
+    export.set_defaults(func=_cmd_export)
+
+    admission = sub.add_parser("admission", help="EXPLAIN-cost estimates and light-query latency under a heavy flood")
+    admission.add_argument("--light-clients", type=int, default=4)
+    admission.add_argument("--heavy-clients", type=int, default=12)
+    admission.add_argument("--heavy-slots", type=int, default=2)
+    admission.add_argument("--duration", type=float, default=20.0, help="Seconds per flood run")
+    admission.set_defaults(func=_cmd_admission)
+
+    timeouts = sub.add_parser("timeouts", help="Statement timeouts and cancel-on-disconnect, checked with pg_sleep")
+    timeouts.add_argument("--port", type=int, default=8766)
+    timeouts.set_defaults(func=_cmd_timeouts)
+
+    singleflight = sub.add_parser("singleflight", help="Identical concurrent executions with and without single-flight")
+    singleflight.add_argument("--query-id", default="P50_RENEWABLE_GEN_PER_ZONE")
+    singleflight.add_argument("--users", type=int, default=32)
+    singleflight.add_argument("--spread-ms", type=float, default=50, help="Arrival spread of the users")
+    singleflight.set_defaults(func=_cmd_singleflight)
+
+    resolver = sub.add_parser("resolver", help="Single-flight and micro-batching of LLM intent resolutions (fake LLM)")
+    resolver.add_argument("--users", type=int, default=24)
+    resolver.add_argument("--spread-ms", type=float, default=20, help="Arrival spread of the users")
+    resolver.add_argument("--window-ms", type=float, action="append", help="Batching window(s); default 5 and 20")
+    resolver.add_argument("--batch-max", type=int, default=8)
+    resolver.add_argument("--llm-ms", type=float, default=400, help="Fake LLM time per call, before tokens")
+    resolver.add_argument("--llm-slots", type=int, default=4, help="Fake LLM calls allowed at once")
+    resolver.set_defaults(func=_cmd_resolver)
+
+    args = parser.parse_args(argv)
+    return args.func(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Cost-based admission control: estimate quality and cheap-query latency under a heavy flood.
+
+1. Estimates: for every registry template (default params), the planner's
+   cost, the lane it lands in, the EXPLAIN round trip (cold) vs a cached
+   estimate, and the measured runtime; the Spearman rank correlation of cost
+   vs runtime says how far cost can stand in for "expensive".
+2. Flood: ``light_clients`` threads loop over light-lane templates while
+   ``heavy_clients`` threads loop over heavy-lane ones, for ``duration``
+   seconds, straight against Postgres (no result cache), once with
+   admission off and once with ``heavy_slots`` heavy-lane slots. Reported:
+   light-query p50/p95/p99, heavy runs completed, heavy-lane wait p95 and
+   queue timeouts.
+"""
+
+import statistics
+import threading
+import time
+
+from sqlalchemy import text
+
+from app.db.admission import AdmissionController, AdmissionTimeout
+from app.db.connection import ENGINE
+from app.db.executor import execute_query
+from app.queries.query_registry import QUERY_REGISTRY
+from app.queries.sampling import bind_path_count
+from bench.params import dataset_inits, default_params, template_sql
+from bench.runner import percentile
+
+
+def _ranks(values: list[float]) -> list[float]:
+    order = sorted(range(len(values)), key=lambda i: values[i])
+    ranks = [0.0] * len(values)
+    for rank, i in enumerate(order):
+        ranks[i] = float(rank)
+    return ranks
+
+
+def spearman(xs: list[float], ys: list[float]) -> float:
+    rx, ry = _ranks(xs), _ranks(ys)
+    mx, my = statistics.mean(rx), statistics.mean(ry)
+    cov = sum((a - mx) * (b - my) for a, b in zip(rx, ry))
+    return cov / ((sum((a - mx) ** 2 for a in rx) * sum((b - my) ** 2 for b in ry)) ** 0.5)
+
+
+def templates() -> dict:
+    """{query_id: (sql, params)} with default params."""
+    with ENGINE.connect() as conn:
+        inits = dataset_inits(conn)
+    out = {}
+    for query_id in QUERY_REGISTRY:
+        sql = template_sql(query_id)
+        out[query_id] = (sql, bind_path_count(sql, default_params(query_id, inits)))
+    return out
+
+
+def estimates(cases: dict, controller: AdmissionController) -> list[dict]:
+    rows = []
+    for query_id, (sql, params) in cases.items():
+        started = time.perf_counter()
+        estimate = controller.estimate(query_id, sql, params)
+        cold_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        controller.estimate(query_id, sql, params)
+        cached_ms = (time.perf_counter() - started) * 1000
+        with ENGINE.connect() as conn:
+            conn.execute(text(sql), params).fetchall()  # warm
+            started = time.perf_counter()
+            conn.execute(text(sql), params).fetchall()
+            run_ms = (time.perf_counter() - started) * 1000
+        rows.append({"query_id": query_id, "cost": round(estimate.cost), "lane": estimate.lane,
+                     "explain_ms": round(cold_ms, 2), "cached_ms": round(cached_ms, 4), "run_ms": round(run_ms, 1)})
+    return rows
+
+
+def flood(cases: dict, lanes: dict, controller: AdmissionController, light_clients: int, heavy_clients: int,
+          duration: float) -> dict:
+    light = [q for q, lane in lanes.items() if lane == "light"]
+    heavy = [q for q, lane in lanes.items() if lane == "heavy"]
+    light_ms, heavy_done, timeouts = [], [0], [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(query_ids: list[str], offset: int, is_heavy: bool):
+        i = offset
+        while time.perf_counter() < deadline:
+            query_id = query_ids[i % len(query_ids)]
+            i += 1
+            sql, params = cases[query_id]
+            started = time.perf_counter()
+            try:
+                controller.admitted(query_id, execute_query)(sql, params)
+            except AdmissionTimeout:
+                with lock:
+                    timeouts[0] += 1
+                continue
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                if is_heavy:
+                    heavy_done[0] += 1
+                else:
+                    light_ms.append(elapsed)
+
+    threads = [threading.Thread(target=client, args=(light, i, False)) for i in range(light_clients)]
+    threads += [threading.Thread(target=client, args=(heavy, i, True)) for i in range(heavy_clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = controller.stats()
+    return {
+        "light_runs": len(light_ms),
+        "light_p50_ms": round(percentile(light_ms, 0.50), 1),
+        "light_p95_ms": round(percentile(light_ms, 0.95), 1),
+        "light_p99_ms": round(percentile(light_ms, 0.99), 1),
+        "heavy_runs": heavy_done[0],
+        "heavy_wait_p95_ms": stats["heavy_wait_p95_ms"],
+        "timeouts": timeouts[0],
+    }
+
+
+def run_admission(light_clients: int = 4, heavy_clients: int = 12, heavy_slots: int = 2,
+                  duration: float = 20.0) -> dict:
+    cases = templates()
+    rows = estimates(cases, AdmissionController(enabled=True))
+    lanes = {row["query_id"]: row["lane"] for row in rows}
+    correlation = spearman([row["cost"] for row in rows], [row["run_ms"] for row in rows])
+    print(f"📐 cost vs runtime Spearman rho = {correlation:.2f}", flush=True)
+
+    results = {}
+    for label, controller in [("off", AdmissionController(enabled=False)),
+                              ("on", AdmissionController(enabled=True, heavy_slots=heavy_slots))]:
+        if controller.enabled:
+            estimates(cases, controller)  # estimates cached up front, as in a warmed-up server
+        results[label] = flood(cases, lanes, controller, light_clients, heavy_clients, duration)
+        print(f"🚦 admission {label}: {results[label]}", flush=True)
+    return {"estimates": rows, "spearman": round(correlation, 3), "flood": results}
@@ -0,0 +1,140 @@
+"""
+Local stand-in for the Bedrock runtime InvokeModel API.
+
+Answers POST /model/{modelId}/invoke with a fixed EXECUTE decision after
+``latency`` seconds (a ``slow_fraction`` of calls take ``slow_latency``
+instead), plus ``input_token_ms`` per prompt token (chars / 4, see
+estimate_tokens) to model prefill cost. Beyond ``max_concurrent`` in-flight calls it answers 429
+ThrottlingException, the way Bedrock does when a model's concurrency quota
+is exhausted. Point a client at it with BEDROCK_ENDPOINT_URL.
+
+A question containing ``bench-decision:<base64 JSON>`` (see question_for)
+gets that JSON back as the decision, so a benchmark can drive the full API
+with a chosen mix of queries.
+"""
+
+import base64
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_DECISION = {"decision": "EXECUTE", "query_id": "GSI_PEAK_PROBABILITY_14_DAYS",
+                 "params": {"initialization": "2026-01-15 12:00"}}
+_DECISION_MARKER = re.compile(rb"bench-decision:([A-Za-z0-9+/=]+)")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for English prompts: about 4 characters per token."""
+    return (len(text) + 3) // 4
+
+
+def _prompt_tokens(body: bytes) -> int:
+    try:
+        request = json.loads(body)
+    except ValueError:
+        return 0
+    text = request.get("system") or ""
+    for message in request.get("messages", []):
+        content = message.get("content")
+        text += content if isinstance(content, str) else json.dumps(content)
+    return estimate_tokens(text)
+
+
+def question_for(decision: dict) -> str:
+    """A question the stub answers with ``decision``."""
+    return "bench-decision:" + base64.b64encode(json.dumps(decision).encode()).decode()
+
+
+@dataclass
+class StubState:
+    latency: float = 0.2
+    slow_fraction: float = 0.0
+    slow_latency: float = 2.0
+    input_token_ms: float = 0.0
+    max_concurrent: int = 4
+    seed: int = 7
+    in_flight: int = 0
+    max_in_flight: int = 0
+    requests: int = 0
+    throttled: int = 0
+    input_tokens: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def __post_init__(self):
+        self.rng = random.Random(self.seed)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state: StubState
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, payload: dict, headers: dict | None = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        marker = _DECISION_MARKER.search(body)
+        decision = json.loads(base64.b64decode(marker.group(1))) if marker else STUB_DECISION
+        state = self.state
+        tokens = _prompt_tokens(body)
+        with state.lock:
+            state.requests += 1
+            state.input_tokens += tokens
+            if state.in_flight >= state.max_concurrent:
+                state.throttled += 1
+                throttle = True
+            else:
+                throttle = False
+                state.in_flight += 1
+                state.max_in_flight = max(state.max_in_flight, state.in_flight)
+                slow = state.rng.random() < state.slow_fraction
+        if throttle:
+            self._send(429, {"message": "Too many requests, please wait before trying again."},
+                       {"x-amzn-ErrorType": "ThrottlingException:http://internal.amazon.com/coral/com.amazon.bedrock/"})
+            return
+        try:
+            time.sleep((state.slow_latency if slow else state.latency) + tokens * state.input_token_ms / 1000)
+            self._send(200, {"content": [{"type": "text", "text": json.dumps(decision)}]})
+        finally:
+            with state.lock:
+                state.in_flight -= 1
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def handle_error(self, request, client_address):
+        pass  # clients hanging up on slow responses (read timeouts) are expected
+
+
+class BedrockStub:
+    """Threaded stub server; ``url`` is the endpoint to pass as BEDROCK_ENDPOINT_URL."""
+
+    def __init__(self, port: int = 0, **state):
+        self.state = StubState(**state)
+        handler = type("StubHandler", (_Handler,), {"state": self.state})
+        self.server = _Server(("127.0.0.1", port), handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def __enter__(self) -> "BedrockStub":
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
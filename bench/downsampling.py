@@ -0,0 +1,150 @@
+"""
+Payload size and end-to-end latency of /query with and without max_points.
+
+Every registry entry with a "time_axis" or "path_axis" whose default-param
+result is longer than ``max_points`` is asked for through the API (FastAPI
+TestClient, LLM replaced by a resolver returning the decision at once), after
+one warm-up call so both sides read the result cache. Reported per template,
+full vs downsampled:
+- bytes: response body size
+- api_ms: request round trip (resolver, cache hit, serialization)
+- client_ms: JSON parse plus building an SVG path with one vertex per row
+  and value column, standing in for the chart's render cost, which grows
+  with the number of points
+- fidelity: for time series, whether every value column's min and max
+  survived and the mean error of the downsampled line against the full one,
+  as a share of the column's range; for path sets, whether the most and
+  least extreme paths were kept
+"""
+
+import contextlib
+import io
+import json
+import statistics
+import time
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+import app.api
+from app.db.connection import ENGINE
+from app.main import app as fastapi_app
+from app.queries.downsampling import supports_downsampling
+from app.queries.query_registry import QUERY_REGISTRY
+from bench.params import dataset_inits, default_params
+from bench.speculative import ReplayResolver
+
+
+def _x(value) -> float:
+    return datetime.fromisoformat(value).timestamp() if isinstance(value, str) else float(value)
+
+
+def _value_columns(rows: list[dict], exclude: set) -> list[str]:
+    return [c for c in rows[0] if c not in exclude and all(isinstance(r[c], (int, float)) or r[c] is None
+                                                           for r in rows)]
+
+
+def render_svg(rows: list[dict], x_column: str | None, width: int = 800, height: int = 300) -> str:
+    """One SVG path per numeric column, one vertex per row."""
+    if not rows:
+        return "<svg/>"
+    columns = _value_columns(rows, {x_column}) or [next(iter(rows[0]))]
+    xs = [_x(r[x_column]) if x_column else i for i, r in enumerate(rows)]
+    x0, x1 = min(xs), max(xs) or 1
+    paths = []
+    for column in columns:
+        ys = [float(r[column] or 0) for r in rows]
+        y0, y1 = min(ys), max(ys)
+        points = " L".join(f"{(x - x0) / ((x1 - x0) or 1) * width:.1f},{height - (y - y0) / ((y1 - y0) or 1) * height:.1f}"
+                           for x, y in zip(xs, ys))
+        paths.append(f'<path d="M{points}"/>')
+    return f'<svg width="{width}" height="{height}">{"".join(paths)}</svg>'
+
+
+def _interpolate(xs: list[float], ys: list[float], x: float) -> float:
+    lo, hi = 0, len(xs) - 1
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if xs[mid] <= x:
+            lo = mid
+        else:
+            hi = mid
+    if xs[hi] == xs[lo]:
+        return ys[lo]
+    return ys[lo] + (ys[hi] - ys[lo]) * (x - xs[lo]) / (xs[hi] - xs[lo])
+
+
+def series_fidelity(full: list[dict], reduced: list[dict], time_axis: str, series_key: str | None) -> dict:
+    columns = _value_columns(full, {time_axis, series_key})
+    extremes_kept, errors = True, []
+    for series in {r.get(series_key) for r in full} if series_key else [None]:
+        f = sorted((r for r in full if not series_key or r[series_key] == series), key=lambda r: _x(r[time_axis]))
+        d = sorted((r for r in reduced if not series_key or r[series_key] == series), key=lambda r: _x(r[time_axis]))
+        fx, dx = [_x(r[time_axis]) for r in f], [_x(r[time_axis]) for r in d]
+        for column in columns:
+            fy, dy = [float(r[column] or 0) for r in f], [float(r[column] or 0) for r in d]
+            extremes_kept &= max(fy) in dy and min(fy) in dy
+            span = (max(fy) - min(fy)) or 1.0
+            errors.append(statistics.mean(abs(_interpolate(dx, dy, x) - y) for x, y in zip(fx, fy)) / span)
+    return {"extremes_kept": extremes_kept, "mean_error_pct": round(100 * statistics.mean(errors), 2)}
+
+
+def path_fidelity(full: list[dict], reduced: list[dict], path_axis: str, metric: str | None) -> dict:
+    scores = {}
+    for r in full:
+        path = r[path_axis]
+        if metric:
+            scores[path] = max(scores.get(path, float("-inf")), float(r[metric] or 0))
+        else:
+            scores[path] = scores.get(path, 0) + 1
+    kept = {r[path_axis] for r in reduced}
+    top, bottom = max(scores.values()), min(scores.values())
+    return {"extremes_kept": any(scores[p] == top for p in kept) and any(scores[p] == bottom for p in kept),
+            "paths": f"{len(kept)}/{len(scores)}"}
+
+
+def _measure(client: TestClient, max_points: int | None, iterations: int, x_column: str | None) -> dict:
+    api_ms, client_ms, body = [], [], None
+    for _ in range(iterations):
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = client.post("/query", json={"question": "bench", "max_points": max_points})
+        api_ms.append((time.perf_counter() - started) * 1000)
+        started = time.perf_counter()
+        body = json.loads(response.content)
+        render_svg(body["data"], x_column)
+        client_ms.append((time.perf_counter() - started) * 1000)
+    return {"rows": len(body["data"]), "bytes": len(response.content), "api_ms": round(statistics.median(api_ms), 2),
+            "client_ms": round(statistics.median(client_ms), 2), "data": body["data"]}
+
+
+def run_downsampling(max_points: int = 100, iterations: int = 5, query_ids: list[str] | None = None) -> list[dict]:
+    with ENGINE.connect() as conn:
+        inits = dataset_inits(conn)
+    resolver = ReplayResolver(0)
+    original = app.api.resolver
+    app.api.resolver = resolver
+    client = TestClient(fastapi_app)
+    rows = []
+    try:
+        for query_id in query_ids or [q for q in QUERY_REGISTRY if supports_downsampling(q)]:
+            info = QUERY_REGISTRY[query_id]
+            resolver.turn = {"query_id": query_id, "params": default_params(query_id, inits)}
+            x_column = info.get("time_axis")
+            full = _measure(client, None, iterations + 1, x_column)  # the first call fills the cache
+            if full["rows"] <= max_points:
+                continue
+            reduced = _measure(client, max_points, iterations, x_column)
+            if "time_axis" in info:
+                fidelity = series_fidelity(full["data"], reduced["data"], info["time_axis"], info.get("series_key"))
+            else:
+                fidelity = path_fidelity(full["data"], reduced["data"], info["path_axis"], info.get("path_metric"))
+            row = {"query_id": query_id,
+                   "full": {k: v for k, v in full.items() if k != "data"},
+                   "downsampled": {k: v for k, v in reduced.items() if k != "data"},
+                   "fidelity": fidelity}
+            rows.append(row)
+            print(f"📉 {row}", flush=True)
+    finally:
+        app.api.resolver = original
+    return rows
@@ -0,0 +1,58 @@
+"""
+Run-length engine vs the fixed-duration templates it generalizes.
+
+GSI_PROBABILITY_LASTING_HOURS (4 hours, hard-coded LEADs) and
+PROBABILITY_LOW_WIND_CAP_FAC_DURATION (rolling SUM window) answer special
+cases of RUN_LENGTH_PROBABILITY; all three divide by the dataset's path count.
+"""
+
+import math
+
+from sqlalchemy import text
+
+from app.db.connection import ENGINE
+from app.queries.templates import get_sql_template
+from bench.params import dataset_inits, default_params
+from bench.runner import benchmark_template
+
+# legacy query_id -> RUN_LENGTH_PROBABILITY params expressing the same question
+EQUIVALENTS = {
+    "GSI_PROBABILITY_LASTING_HOURS": lambda p: {
+        "variable": "gsi", "location": "rto", "direction": "above",
+        "threshold": p["gsi_threshold"], "duration_hours": 4,
+    },
+    "PROBABILITY_LOW_WIND_CAP_FAC_DURATION": lambda p: {
+        "variable": "wind_cap_fac", "location": "rto", "direction": "below",
+        "threshold": p["wind_cap_fac_threshold"], "duration_hours": p["duration_hours"],
+    },
+}
+
+
+def run_durations(iterations: int = 5) -> dict:
+    """{legacy query_id: {legacy, run_length, match, p50 timings, speedup}}"""
+    report = {}
+    with ENGINE.connect() as conn:
+        inits = dataset_inits(conn)
+        for legacy_id, mapping in EQUIVALENTS.items():
+            legacy_params = default_params(legacy_id, inits)
+            params = default_params("RUN_LENGTH_PROBABILITY", inits)
+            params.update(mapping(legacy_params))
+
+            legacy_sql = get_sql_template(legacy_id)
+            sql = get_sql_template("RUN_LENGTH_PROBABILITY")
+            legacy_value = conn.execute(text(legacy_sql), legacy_params).scalar() or 0.0
+            probability, path_count = conn.execute(text(sql), params).one()
+
+            legacy_timing = benchmark_template(conn, legacy_sql, legacy_params, iterations)
+            timing = benchmark_template(conn, sql, params, iterations)
+            report[legacy_id] = {
+                "params": params,
+                "legacy": legacy_value,
+                "run_length": probability,
+                "path_count": path_count,
+                "match": math.isclose(legacy_value, probability or 0.0, abs_tol=1e-9),
+                "legacy_p50_ms": legacy_timing["p50_ms"],
+                "p50_ms": timing["p50_ms"],
+                "speedup": round(legacy_timing["p50_ms"] / timing["p50_ms"], 2) if timing["p50_ms"] else None,
+            }
+    return report
@@ -0,0 +1,100 @@
+"""
+Fetch-to-DataFrame time: JSON /query vs format=arrow / parquet.
+
+The ``top`` registry templates with the most result rows (default params)
+are asked for through the API (FastAPI TestClient, LLM replaced by a
+resolver returning the decision at once), each way ``iterations`` times:
+- cold: result cache cleared first, so exports stream from the cursor and
+  JSON runs the query into the cache
+- warm: result cache hit for both
+Client side, JSON is parsed into pandas with the declared timestamptz / date
+columns converted, so every format ends at the same typed frame; Arrow and
+Parquet go through pyarrow's to_pandas(). Reported: median ms end to end
+(request, body, frame) and body bytes (JSON sent gzip, as most HTTP clients
+ask for it).
+"""
+
+import contextlib
+import io
+import statistics
+import time
+
+import orjson
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from fastapi.testclient import TestClient
+
+import app.api
+from app.cache.results import RESULT_CACHE
+from app.db.connection import ENGINE
+from app.db.executor import execute_query
+from app.main import app as fastapi_app
+from app.queries.query_registry import QUERY_REGISTRY
+from bench.params import dataset_inits, default_params, template_sql
+from bench.speculative import ReplayResolver
+
+FORMATS = ["json", "arrow", "parquet"]
+
+
+def to_frame(query_id: str, fmt: str, body: bytes) -> pd.DataFrame:
+    if fmt == "arrow":
+        return pa.ipc.open_stream(body).read_all().to_pandas()
+    if fmt == "parquet":
+        return pq.read_table(io.BytesIO(body)).to_pandas()
+    frame = pd.DataFrame(orjson.loads(body)["data"])
+    for column, kind in QUERY_REGISTRY[query_id]["columns"].items():
+        if kind in ("timestamptz", "date") and column in frame:
+            frame[column] = pd.to_datetime(frame[column], utc=kind == "timestamptz")
+    return frame
+
+
+def _fetch(client: TestClient, query_id: str, fmt: str) -> tuple[float, int, pd.DataFrame]:
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        response = client.post("/query", json={"question": "bench", "format": fmt},
+                               headers={"Accept-Encoding": "gzip"})
+    response.raise_for_status()
+    frame = to_frame(query_id, fmt, response.content)
+    elapsed = (time.perf_counter() - started) * 1000
+    return elapsed, int(response.headers.get("content-length") or len(response.content)), frame
+
+
+def run_export(top: int = 5, iterations: int = 5) -> list[dict]:
+    with ENGINE.connect() as conn:
+        inits = dataset_inits(conn)
+    sizes = {}
+    for query_id in QUERY_REGISTRY:
+        with contextlib.redirect_stdout(io.StringIO()):
+            sizes[query_id] = len(execute_query(template_sql(query_id), default_params(query_id, inits)))
+    largest = sorted(sizes, key=lambda q: -sizes[q])[:top]
+
+    resolver = ReplayResolver(0)
+    original = app.api.resolver
+    app.api.resolver = resolver
+    client = TestClient(fastapi_app)
+    rows = []
+    try:
+        for query_id in largest:
+            resolver.turn = {"query_id": query_id, "params": default_params(query_id, inits)}
+            row = {"query_id": query_id, "rows": sizes[query_id]}
+            for fmt in FORMATS:
+                cold, warm = [], []
+                for _ in range(iterations):
+                    RESULT_CACHE.clear()
+                    ms, _, frame = _fetch(client, query_id, fmt)
+                    cold.append(ms)
+                    if fmt == "json":
+                        warm.append(_fetch(client, query_id, fmt)[0])
+                    else:
+                        _fetch(client, query_id, "json")  # fill the cache
+                        ms, size, frame = _fetch(client, query_id, fmt)
+                        warm.append(ms)
+                size = _fetch(client, query_id, fmt)[1]
+                row[fmt] = {"cold_ms": round(statistics.median(cold), 2), "warm_ms": round(statistics.median(warm), 2),
+                            "bytes": size, "frame_rows": len(frame)}
+            rows.append(row)
+            print(f"📦 {row}", flush=True)
+    finally:
+        app.api.resolver = original
+    return rows
@@ -0,0 +1,91 @@
+"""
+Bedrock client under a burst, against the local stub (bench/bedrock_stub.py).
+
+Fires ``requests`` InvokeModel calls from ``threads`` threads at a stub that
+throttles past ``stub_concurrency`` in-flight calls, once through a boto3
+client with the previous defaults (no Config: legacy retries, 10 pooled
+connections, 60 s timeouts, no cap) and once through BedrockClient. Reports
+end-to-end latency percentiles, failures, throttled attempts and the peak
+concurrency the stub saw. A second pass makes some responses slower than the
+read timeout to show they are cut off and retried.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+
+from app.llm.bedrock_client import BedrockClient, BedrockSettings, LLMMetrics
+from bench.bedrock_stub import BedrockStub
+from bench.runner import percentile
+
+
+def _dummy_credentials():
+    # The stub does not check signatures, but botocore still signs requests
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "stub")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "stub")
+
+
+def _legacy_invoke(client):
+    def invoke(system_prompt, user_prompt):
+        response = client.invoke_model(
+            modelId="anthropic.claude-3-sonnet-20240229-v1:0",
+            body=json.dumps({"system": system_prompt, "messages": [{"role": "user", "content": user_prompt}],
+                             "max_tokens": 800, "temperature": 0}),
+        )
+        raw = json.loads(response["body"].read())
+        return json.loads(raw["content"][0]["text"])
+    return invoke
+
+
+def _burst(invoke, requests: int, threads: int) -> dict:
+    def one(_):
+        started = time.perf_counter()
+        try:
+            invoke("system", "question")
+            return (time.perf_counter() - started) * 1000, None
+        except Exception as e:
+            return (time.perf_counter() - started) * 1000, type(e).__name__
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(one, range(requests)))
+    latencies = [ms for ms, error in results if error is None]
+    failures = [error for _, error in results if error is not None]
+    return {
+        "ok": len(latencies),
+        "failed": len(failures),
+        "failure_types": sorted(set(failures)),
+        "p50_ms": round(percentile(latencies, 0.50), 1) if latencies else None,
+        "p95_ms": round(percentile(latencies, 0.95), 1) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99), 1) if latencies else None,
+        "wall_s": round(time.perf_counter() - started, 2),
+    }
+
+
+def run_llm(requests: int = 64, threads: int = 32, stub_concurrency: int = 4, latency: float = 0.2,
+            max_concurrency: int = 4) -> dict:
+    _dummy_credentials()
+    report = {}
+
+    with BedrockStub(latency=latency, max_concurrent=stub_concurrency) as stub:
+        legacy = boto3.client("bedrock-runtime", region_name="us-east-1", endpoint_url=stub.url)
+        report["default"] = {**_burst(_legacy_invoke(legacy), requests, threads),
+                             "stub_throttled": stub.state.throttled, "stub_max_in_flight": stub.state.max_in_flight}
+
+    with BedrockStub(latency=latency, max_concurrent=stub_concurrency) as stub:
+        metrics = LLMMetrics()
+        settings = BedrockSettings(endpoint_url=stub.url, max_concurrency=max_concurrency)
+        client = BedrockClient(settings=settings, metrics=metrics)
+        report["hardened"] = {**_burst(client.invoke, requests, threads), "metrics": metrics.snapshot(),
+                              "stub_throttled": stub.state.throttled, "stub_max_in_flight": stub.state.max_in_flight}
+
+    # Slow tail: 10% of responses take 5 s; a 1 s read timeout cuts them off and retries
+    with BedrockStub(latency=latency, slow_fraction=0.1, slow_latency=5.0, max_concurrent=stub_concurrency) as stub:
+        metrics = LLMMetrics()
+        settings = BedrockSettings(endpoint_url=stub.url, max_concurrency=max_concurrency, read_timeout=1.0)
+        client = BedrockClient(settings=settings, metrics=metrics)
+        report["slow_tail"] = {**_burst(client.invoke, requests // 2, threads), "metrics": metrics.snapshot()}
+    return report
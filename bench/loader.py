@@ -0,0 +1,128 @@
+"""
+Bulk COPY loader for synthetic ensemble data into a local Postgres.
+
+Uses the app's ENGINE (configured via DB_* env vars; set DB_SSLMODE=disable
+for a local server) and streams generator output straight into
+``COPY ... FROM STDIN`` without staging files.
+"""
+
+import io
+import time
+from typing import Iterable, Iterator
+
+from sqlalchemy import text
+
+from app.cache.invalidation import DATA_VERSIONS
+from app.db.calendar import ensure_calendar
+from app.db.connection import ENGINE
+from app.db.partitions import PartitionManager
+from app.db.schema import TABLE_DDL
+from app.db.sketches import build_sketches
+from app.db.stitched import STITCHED_SOURCES, STITCHED_TABLE, build_stitched
+from bench.synthetic import COLUMNS, TABLES, DatasetSpec, generate_arrays, iter_table_chunks, row_count
+
+
+class _ChunkStream(io.RawIOBase):
+    """File-like adapter so copy_expert can pull text chunks lazily."""
+
+    def __init__(self, chunks: Iterable[str]):
+        self._chunks: Iterator[str] = iter(chunks)
+        self._buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._buffer:
+            try:
+                self._buffer = next(self._chunks).encode()
+            except StopIteration:
+                return 0
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+
+def create_tables(partition_strategy: str | None = None):
+    """
+    Create the four ensemble tables if they do not exist, optionally as
+    initialization-partitioned parents (see app.db.partitions).
+    """
+    with ENGINE.begin() as conn:
+        for table in TABLES:
+            if partition_strategy:
+                PartitionManager(partition_strategy).create_parent(conn, table)
+            else:
+                conn.execute(text(TABLE_DDL.format(table=table)))
+
+
+def copy_chunks(table: str, chunks: Iterable[str]):
+    """COPY tab-separated text chunks into ``table``."""
+    raw = ENGINE.raw_connection()
+    try:
+        with raw.cursor() as cur:
+            cur.copy_expert(
+                f"COPY {table} ({', '.join(COLUMNS)}) FROM STDIN",
+                io.BufferedReader(_ChunkStream(chunks), buffer_size=1 << 20),
+            )
+        raw.commit()
+    finally:
+        raw.close()
+
+
+def load_dataset(spec: DatasetSpec, truncate: bool = False, partition_strategy: str | None = None,
+                 tables: list[str] | None = None) -> dict:
+    """
+    Generate and load all four tables. Returns per-table row counts and seconds.
+
+    With ``truncate`` the tables are emptied first; otherwise only the
+    initializations in ``spec`` are replaced, so several datasets can coexist.
+    Partitioned tables get their initialization partition created on the fly.
+    ``tables`` limits the load to some tables (e.g. a new forecast run only).
+    """
+    create_tables(partition_strategy)
+    manager = PartitionManager(partition_strategy or "list")
+    stats = {}
+    arrays_by_horizon = {}
+    selected = {t: v for t, v in TABLES.items() if tables is None or t in tables}
+    for table, (_, horizon) in selected.items():
+        init = spec.forecast_init if horizon == "forecast" else spec.seasonal_init
+        with ENGINE.begin() as conn:
+            if manager.is_partitioned(conn, table):
+                manager.ensure_partition(conn, table, init)
+            if truncate:
+                conn.execute(text(f"TRUNCATE {table}"))
+            else:
+                conn.execute(
+                    text(f"DELETE FROM {table} WHERE initialization = :init"),
+                    {"init": init},
+                )
+
+        if horizon not in arrays_by_horizon:
+            arrays_by_horizon = {horizon: generate_arrays(spec, horizon)}
+        started = time.perf_counter()
+        copy_chunks(table, iter_table_chunks(spec, table, arrays_by_horizon[horizon]))
+        elapsed = time.perf_counter() - started
+        stats[table] = {"rows": row_count(spec, table), "seconds": round(elapsed, 2)}
+        print(f"📦 {table}: {stats[table]['rows']} rows in {elapsed:.1f}s")
+
+    # Hourly quantile sketches (approximate percentile mode) and calendar hours are part of ingest
+    with ENGINE.begin() as conn:
+        for table, (_, horizon) in selected.items():
+            init = spec.forecast_init if horizon == "forecast" else spec.seasonal_init
+            build_sketches(conn, init, tables=[table])
+            ensure_calendar(conn, init, tables=[table])
+
+    # So is the stitched forecast + seasonal series of the loaded init pair
+    stitched = any(table in selected for table in STITCHED_SOURCES)
+    if stitched:
+        with ENGINE.begin() as conn:
+            rows = build_stitched(conn, spec.forecast_init, spec.seasonal_init, DATA_VERSIONS.table_versions(refresh=True))
+        print(f"🧵 {STITCHED_TABLE}: {rows} rows")
+
+    # VACUUM sets the visibility map so covering indexes can do index-only scans
+    with ENGINE.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in list(selected) + ([STITCHED_TABLE] if stitched else []):
+            conn.execute(text(f"VACUUM (ANALYZE) {table}"))
+    return stats
@@ -0,0 +1,246 @@
+"""
+End-to-end load test of /query with recorded LLM decisions (app.llm.recording).
+
+Sessions mirror tests/TEST_SCENARIOS.md: direct questions (section 1), vague
+ones (2), a follow-up conversation (3), out-of-scope questions (4), the
+15-turn extended conversation (11) and edge cases (12), plus one single-turn
+session per sample question (app.llm.examples). Each turn carries the
+decision a correct resolver returns, with params filled from the dataset.
+
+1. record: the sessions run once in process through app.api.query, with
+   the LLM replaced by ScriptedLLM (returns each question's decision) wrapped
+   in RecordingLLM, so the file holds the exact prompts the server will build.
+   Against real Bedrock the same file comes from running the API with
+   LLM_RECORD set.
+2. load: a gunicorn server (gunicorn.conf.py) starts with LLM_REPLAY on that
+   file and LLM_REPLAY_LATENCY, and ``users`` asyncio clients run ``rounds``
+   copies of every session, turns in order, one fresh session_id each.
+
+Reported: requests/s, and per expected decision type the count, latency
+percentiles, error rate (HTTP or transport failure) and mismatch rate (wrong
+decision or query_id).
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+import httpx
+
+import app.api
+from app.context.memory import clear_context
+from app.db.connection import ENGINE
+from app.llm.examples import EXAMPLE_QUESTIONS
+from app.llm.intent_resolver import IntentResolver
+from app.llm.recording import RecordingLLM, question_of
+from app.models import QueryRequest
+from bench.params import dataset_inits, default_params
+from bench.runner import percentile
+from bench.workers import start_server
+
+NEED_MORE_INFO = {"decision": "NEED_MORE_INFO", "clarification_question": "Which data would you like to see?"}
+OUT_OF_SCOPE = {"decision": "OUT_OF_SCOPE", "message": "I can help with ERCOT forecast data."}
+
+# name -> sessions; a turn is (question, query_id and param changes for EXECUTE, or a fixed decision)
+SCENARIOS = {
+    "basic": [
+        [("What is the peak probability of GSI exceeding 0.60 over the next 14 days starting from 2026-01-15 12:00?",
+          ("GSI_PEAK_PROBABILITY_14_DAYS", {}))],
+        [("Show me the tightest hour - the hour with highest average GSI - starting from 2026-01-15 12:00",
+          ("TIGHTEST_HOUR_GSI", {}))],
+        [("What is the P01 extreme cold temperature forecast for RTO for the next 10 days starting 2026-01-20 00:00?",
+          ("P01_EXTREME_COLD_TEMP_FORECAST", {}))],
+        [("What is the probability of Dunkelflaute from 2026-01-18 12:00?", ("PROBABILITY_DUNKELFLAUTE", {}))],
+    ],
+    "vague": [
+        [("What about the evening?", NEED_MORE_INFO)],
+        [("Show me the forecast", NEED_MORE_INFO)],
+        [("What is the GSI probability for the next 14 days?", NEED_MORE_INFO)],
+        [("What's happening tomorrow?", NEED_MORE_INFO)],
+        [("Tell me about Houston zone", NEED_MORE_INFO)],
+    ],
+    "follow_up": [[
+        ("What is the probability of GSI exceeding 0.60 during evening ramp for the next week starting "
+         "2026-01-15 12:00?", ("GSI_PROBABILITY_EVENING_RAMP_NEXT_WEEK", {})),
+        ("What about if GSI threshold is 0.75?", ("GSI_PROBABILITY_EVENING_RAMP_NEXT_WEEK", {"gsi_threshold": 0.75})),
+        ("Same thing but for the late evening", ("GSI_PROBABILITY_EVENING_RAMP_NEXT_WEEK",
+                                                 {"gsi_threshold": 0.75, "hours_start": 19, "hours_end": 22})),
+        ("Now show me the tightest hour", ("TIGHTEST_HOUR_GSI", {})),
+        ("What's the average net demand during that hour?", ("AVG_NET_DEMAND_PLUS_OUTAGES_HIGH_GSI", {})),
+    ]],
+    "out_of_scope": [
+        [("What will the electricity price be tomorrow?", OUT_OF_SCOPE)],
+        [("What was the actual load yesterday?", OUT_OF_SCOPE)],
+        [("Why is GSI high during cold snaps?", OUT_OF_SCOPE)],
+        [("What's the GSI for PJM?", OUT_OF_SCOPE)],
+        [("What's the weather in New York?", OUT_OF_SCOPE)],
+    ],
+    "extended": [[
+        ("What is the peak probability of GSI above 0.6 over the next 14 days?", ("GSI_PEAK_PROBABILITY_14_DAYS", {})),
+        ("What about above 0.7?", ("GSI_PEAK_PROBABILITY_14_DAYS", {"gsi_threshold": 0.7})),
+        ("How likely is GSI to stay above 0.65 for 4 hours?", ("GSI_PROBABILITY_LASTING_HOURS", {})),
+        ("How cold does it get in the extreme case?", ("P01_EXTREME_COLD_TEMP_FORECAST", {})),
+        ("Which zone is most likely to freeze?", ("ZONE_HIGHEST_FREEZING_PROBABILITY", {})),
+        ("What's the average load when RTO drops below -5C?", ("AVG_LOAD_EXTREME_COLD", {})),
+        ("What's the Dunkelflaute risk?", ("PROBABILITY_DUNKELFLAUTE", {})),
+        ("And the low-case wind during the evening ramp?", ("P10_LOW_WIND_EVENING_RAMP", {})),
+        ("What's the biggest 1-hour downward wind ramp?", ("MAX_DOWNWARD_WIND_RAMP", {})),
+        ("Back to GSI - what's the tightest hour?", ("TIGHTEST_HOUR_GSI", {})),
+        ("Which paths go above 0.75?", ("GSI_PATHS_ABOVE_THRESHOLD", {})),
+        ("Same but for 0.8", ("GSI_PATHS_ABOVE_THRESHOLD", {"gsi_threshold": 0.8})),
+        ("What's the net demand uncertainty (P95 - P05)?", ("NET_DEMAND_UNCERTAINTY_P95_P05", {})),
+        ("Which date has the highest tail risk?", ("DATE_HIGHEST_TAIL_RISK", {})),
+        ("What's the expected shortfall when GSI >= 0.65?", ("EXPECTED_SHORTFALL_HIGH_GSI", {})),
+    ]],
+    "edge": [
+        [("???", NEED_MORE_INFO)],
+        [("Same for...", NEED_MORE_INFO)],
+        [("whats teh GSI probabiilty over the next 14 days", ("GSI_PEAK_PROBABILITY_14_DAYS", {}))],
+    ],
+}
+
+
+def build_sessions(inits: dict) -> list[dict]:
+    """[{scenario, turns: [{question, decision}]}] with EXECUTE params filled from ``inits``."""
+    scenarios = dict(SCENARIOS)
+    scenarios["sample_questions"] = [[(question, (query_id, {}))]
+                                     for query_id, questions in EXAMPLE_QUESTIONS.items() for question in questions]
+    sessions = []
+    for name, scenario_sessions in scenarios.items():
+        for turns in scenario_sessions:
+            built = []
+            for question, outcome in turns:
+                if isinstance(outcome, tuple):
+                    query_id, changes = outcome
+                    params = {k: v for k, v in default_params(query_id, inits).items() if k != "path_count"}
+                    decision = {"decision": "EXECUTE", "query_id": query_id, "params": {**params, **changes}}
+                else:
+                    decision = outcome
+                built.append({"question": question, "decision": decision})
+            sessions.append({"scenario": name, "turns": built})
+    return sessions
+
+
+class ScriptedLLM:
+    """LLM stand-in for recording: answers each known question with its scripted decision."""
+
+    def __init__(self, decisions: dict[str, dict]):
+        self.decisions = decisions
+
+    def invoke(self, system_prompt: str, user_prompt: str) -> dict:
+        return dict(self.decisions[question_of(user_prompt)])
+
+
+def record(sessions: list[dict], path: str) -> int:
+    """Run every session once in process, recording the LLM calls to ``path``. Returns calls recorded."""
+    decisions = {turn["question"]: turn["decision"] for session in sessions for turn in session["turns"]}
+    recorder = RecordingLLM(ScriptedLLM(decisions), path)
+    original_resolver, original_enabled = app.api.resolver, app.api.speculator.enabled
+    app.api.resolver, app.api.speculator.enabled = IntentResolver(llm=recorder), False
+    try:
+        for index, session in enumerate(sessions):
+            session_id = f"loadgen-record-{index}"
+            clear_context(session_id)
+            for turn in session["turns"]:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    app.api.query(QueryRequest(question=turn["question"], session_id=session_id))
+            clear_context(session_id)
+    finally:
+        app.api.resolver, app.api.speculator.enabled = original_resolver, original_enabled
+    return recorder.recorded
+
+
+async def _run_session(client: httpx.AsyncClient, session: dict, session_id: str, results: list):
+    for turn in session["turns"]:
+        expected = turn["decision"]
+        started = time.perf_counter()
+        row = {"expected": expected["decision"], "error": None, "mismatch": False}
+        try:
+            response = await client.post("/query", json={"question": turn["question"], "session_id": session_id})
+            if response.status_code != 200:
+                row["error"] = f"HTTP {response.status_code}"
+            else:
+                body = response.json()
+                row["mismatch"] = (body.get("decision") != expected["decision"]
+                                   or body.get("query_id") != expected.get("query_id"))
+        except httpx.HTTPError as e:
+            row["error"] = type(e).__name__
+        row["ms"] = (time.perf_counter() - started) * 1000
+        results.append(row)
+
+
+async def load(base_url: str, sessions: list[dict], users: int, rounds: int, seed: int) -> dict:
+    queue = [session for _ in range(rounds) for session in sessions]
+    random.Random(seed).shuffle(queue)
+    results = []
+
+    async def user(user_index: int, client: httpx.AsyncClient):
+        n = 0
+        while queue:
+            session = queue.pop()
+            await _run_session(client, session, f"loadgen-{user_index}-{n}", results)
+            n += 1
+
+    limits = httpx.Limits(max_connections=users)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=300) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(user(i, client) for i in range(users)))
+        seconds = time.perf_counter() - started
+
+    by_type = {}
+    for decision_type in sorted({row["expected"] for row in results}):
+        rows = [row for row in results if row["expected"] == decision_type]
+        latencies = [row["ms"] for row in rows]
+        by_type[decision_type] = {
+            "requests": len(rows),
+            "p50_ms": round(percentile(latencies, 0.50), 1),
+            "p95_ms": round(percentile(latencies, 0.95), 1),
+            "p99_ms": round(percentile(latencies, 0.99), 1),
+            "error_rate": round(sum(row["error"] is not None for row in rows) / len(rows), 4),
+            "mismatch_rate": round(sum(row["mismatch"] for row in rows) / len(rows), 4),
+        }
+    latencies = [row["ms"] for row in results]
+    return {
+        "requests": len(results),
+        "seconds": round(seconds, 2),
+        "rps": round(len(results) / seconds, 2),
+        "p50_ms": round(percentile(latencies, 0.50), 1),
+        "p99_ms": round(percentile(latencies, 0.99), 1),
+        "mean_ms": round(statistics.mean(latencies), 1),
+        "errors": sorted({row["error"] for row in results if row["error"]}),
+        "by_decision": by_type,
+    }
+
+
+def run_loadgen(recording: str | None = None, latency: str = "lognormal:1200:0.35", users: int = 16,
+                rounds: int = 2, workers: int = 1, port: int = 8791, seed: int = 3) -> dict:
+    with ENGINE.connect() as conn:
+        inits = dataset_inits(conn)
+    sessions = build_sessions(inits)
+    report = {"sessions": len(sessions), "turns": sum(len(s["turns"]) for s in sessions), "latency": latency}
+
+    recording = recording or os.path.join(tempfile.gettempdir(), "nlsql-llm-recording.jsonl")
+    if not os.path.exists(recording):
+        started = time.perf_counter()
+        report["recorded"] = record(sessions, recording)
+        print(f"📼 Recorded {report['recorded']} LLM calls to {recording} in {time.perf_counter() - started:.1f}s")
+    report["recording"] = recording
+
+    shared_dir = tempfile.mkdtemp(prefix="nlsql-bench-", dir="/dev/shm")
+    log_path = os.path.join(tempfile.gettempdir(), "bench-loadgen.log")
+    extra_env = {"LLM_REPLAY": recording, "LLM_REPLAY_LATENCY": latency}
+    process = start_server(workers, port, True, "", shared_dir, log_path, extra_env=extra_env)
+    try:
+        report.update(asyncio.run(load(f"http://127.0.0.1:{port}", sessions, users, rounds, seed)))
+        report["replay"] = httpx.get(f"http://127.0.0.1:{port}/llm/stats").json().get("record_replay")
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+        shutil.rmtree(shared_dir, ignore_errors=True)
+    return report
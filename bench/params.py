@@ -0,0 +1,60 @@
+"""
+Default parameter sets for running registry templates against a dataset.
+
+Optional parameters use their registry defaults. Required parameters have no
+default in QUERY_REGISTRY, so they are filled from the dataset's
+initializations (read from the database, falling back to DatasetSpec).
+"""
+
+from datetime import timedelta
+
+from sqlalchemy import text
+
+from app.queries.query_registry import QUERY_REGISTRY
+from app.queries.sampling import resolve_path_count
+from app.queries.templates import get_sql_template
+from bench.synthetic import DatasetSpec
+
+_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M%z"
+
+
+def dataset_inits(conn, spec: DatasetSpec | None = None) -> dict:
+    """Latest forecast/seasonal initializations present in the database."""
+    spec = spec or DatasetSpec()
+    forecast_init = conn.execute(text("SELECT MAX(initialization) FROM energy_forecast_ensemble")).scalar()
+    seasonal_init = conn.execute(text("SELECT MAX(initialization) FROM energy_base_ensemble")).scalar()
+    forecast_init = forecast_init or spec.forecast_init
+    seasonal_init = seasonal_init or spec.seasonal_init
+    seasonal_end = conn.execute(
+        text("SELECT MAX(valid_datetime) FROM energy_base_ensemble WHERE initialization = :init"),
+        {"init": seasonal_init},
+    ).scalar() or seasonal_init + timedelta(days=spec.seasonal_days)
+    # A date inside the seasonal horizon, past the forecast window when the horizon allows
+    target_date = min(forecast_init + timedelta(days=21), seasonal_end - timedelta(days=1))
+    return {
+        "initialization": forecast_init.strftime(_TIMESTAMP_FORMAT),
+        "forecast_init": forecast_init.strftime(_TIMESTAMP_FORMAT),
+        "seasonal_init": seasonal_init.strftime(_TIMESTAMP_FORMAT),
+        "target_date": target_date.strftime("%Y-%m-%d"),
+        "path_count": resolve_path_count(forecast_init, conn=conn) or spec.n_paths,
+    }
+
+
+def default_params(query_id: str, inits: dict) -> dict:
+    """Registry defaults plus dataset values for required params."""
+    params = {}
+    for name, info in QUERY_REGISTRY[query_id]["parameters"].items():
+        if "default" in info:
+            params[name] = info["default"]
+        elif name in inits:
+            params[name] = inits[name]
+        else:
+            raise KeyError(f"No benchmark value for required param '{name}' of {query_id}")
+    if ":path_count" in template_sql(query_id):
+        params["path_count"] = inits["path_count"]
+    return params
+
+
+def template_sql(query_id: str, variant: str | None = None) -> str:
+    """SQL text of a registry entry; the registry-selected variant by default."""
+    return get_sql_template(query_id, variant)
@@ -0,0 +1,194 @@
+"""
+EXPLAIN plan capture and plan-regression checks for registry templates.
+
+Runs ``EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)`` for every QUERY_REGISTRY
+entry, normalizes the plan down to its shape (node types, relations,
+indexes, join/sort strategy; no costs or timings), and flags:
+- seq scans on the ensemble tables
+- sorts and hashes that spilled to disk
+- plan-shape changes against a stored baseline
+"""
+
+import hashlib
+import json
+from typing import Iterator
+
+from sqlalchemy import text
+
+from app.db.connection import ENGINE
+from app.db.schema import ENSEMBLE_TABLES
+from app.queries.query_registry import QUERY_REGISTRY
+from bench.params import dataset_inits, default_params, template_sql
+
+# Keys that describe the plan's shape; everything else (costs, timings,
+# buffer counts, row estimates) varies run to run and is dropped.
+_SHAPE_KEYS = (
+    "Node Type", "Parent Relationship", "Relation Name", "Index Name",
+    "Join Type", "Strategy", "Partial Mode", "Scan Direction",
+)
+
+
+def capture_plan(conn, sql: str, params: dict, analyze: bool = True) -> dict:
+    """Top-level plan dict (the ``Plan`` key plus timing fields) for one statement."""
+    options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+    return conn.execute(text(f"EXPLAIN ({options}) " + sql), params).scalar()[0]
+
+
+def iter_nodes(node: dict) -> Iterator[dict]:
+    """Depth-first walk over a plan node and its children."""
+    yield node
+    for child in node.get("Plans", []):
+        yield from iter_nodes(child)
+
+
+def normalize_plan(node: dict) -> dict:
+    """Shape-only copy of a plan node tree."""
+    shape = {k: node[k] for k in _SHAPE_KEYS if k in node}
+    if "Plans" in node:
+        shape["Plans"] = [normalize_plan(child) for child in node["Plans"]]
+    return shape
+
+
+def plan_signature(normalized: dict) -> str:
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def ensemble_parent(relation: str | None) -> str | None:
+    """The ensemble table ``relation`` is, or is a partition of (partitions are named <table>_...); else None."""
+    for table in ENSEMBLE_TABLES:
+        if relation == table or (relation or "").startswith(table + "_"):
+            return table
+    return None
+
+
+def plan_issues(node: dict) -> list[dict]:
+    """Seq scans on ensemble tables and operations that spilled to disk."""
+    issues = []
+    for n in iter_nodes(node):
+        node_type = n.get("Node Type", "")
+        relation = ensemble_parent(n.get("Relation Name"))
+        if node_type.endswith("Seq Scan") and relation:
+            issues.append({"kind": "seq_scan", "relation": relation})
+        if n.get("Sort Space Type") == "Disk" or "external" in n.get("Sort Method", ""):
+            issues.append({
+                "kind": "sort_spill",
+                "sort_method": n.get("Sort Method"),
+                "space_kb": n.get("Sort Space Used"),
+            })
+        if n.get("Hash Batches", 1) > 1:
+            issues.append({"kind": "hash_spill", "batches": n["Hash Batches"]})
+    return issues
+
+
+def index_usage(plans: dict) -> dict:
+    """
+    Per template, the scan node types used on ensemble tables and whether
+    every one of them is an Index Scan or Index Only Scan.
+    """
+    usage = {}
+    for query_id, entry in plans.items():
+        if "error" in entry:
+            continue
+        scans = [
+            (n["Node Type"], n["Relation Name"], n.get("Index Name"))
+            for n in iter_nodes(entry["plan"])
+            if ensemble_parent(n.get("Relation Name"))
+        ]
+        usage[query_id] = {
+            "scans": scans,
+            "ok": bool(scans) and all(s[0] in ("Index Scan", "Index Only Scan") for s in scans),
+        }
+    return usage
+
+
+def partition_pruning(plans: dict) -> dict:
+    """
+    Per template, the partitions scanned for each partitioned ensemble table.
+    Every template pins one initialization per table, so pruning worked when
+    no parent contributes more than one partition.
+    """
+    report = {}
+    for query_id, entry in plans.items():
+        if "error" in entry:
+            continue
+        scanned = {}
+        for n in iter_nodes(entry["plan"]):
+            relation = n.get("Relation Name")
+            parent = ensemble_parent(relation)
+            if parent and relation != parent:
+                scanned.setdefault(parent, set()).add(relation)
+        report[query_id] = {
+            "partitions": {parent: sorted(names) for parent, names in scanned.items()},
+            "ok": all(len(names) <= 1 for names in scanned.values()),
+        }
+    return report
+
+
+def capture_all(query_ids: list[str] | None = None) -> dict:
+    """Normalized plans, signatures and issues for registry templates."""
+    query_ids = query_ids or list(QUERY_REGISTRY)
+    plans = {}
+    with ENGINE.connect() as conn:
+        inits = dataset_inits(conn)
+        for query_id in query_ids:
+            try:
+                explained = capture_plan(conn, template_sql(query_id), default_params(query_id, inits))
+            except Exception as e:
+                conn.rollback()
+                plans[query_id] = {"error": str(e).splitlines()[0]}
+                continue
+            normalized = normalize_plan(explained["Plan"])
+            plans[query_id] = {
+                "signature": plan_signature(normalized),
+                "execution_ms": explained.get("Execution Time"),
+                "issues": plan_issues(explained["Plan"]),
+                "plan": normalized,
+            }
+    return {"inits": inits, "plans": plans}
+
+
+def issue_identity(issue: dict) -> tuple:
+    """What makes two issues the same one: kind and relation, not metrics that vary run to run."""
+    return issue["kind"], issue.get("relation")
+
+
+def compare_plans(current: dict, baseline: dict) -> list[dict]:
+    """
+    Plan-shape changes and newly appearing issues relative to ``baseline``.
+    An issue already in the baseline whose metrics moved (space_kb, batches,
+    sort_method) is reported as ``issue_changed``, not as a new issue.
+    """
+    findings = []
+    for query_id, cur in current["plans"].items():
+        base = baseline.get("plans", {}).get(query_id)
+        if base is None or "error" in cur or "error" in base:
+            continue
+        if cur["signature"] != base["signature"]:
+            findings.append({
+                "query_id": query_id, "kind": "plan_changed",
+                "baseline": base["signature"], "current": cur["signature"],
+            })
+        known = {}
+        for issue in base["issues"]:
+            known.setdefault(issue_identity(issue), []).append(issue)
+        for issue in cur["issues"]:
+            matches = known.get(issue_identity(issue))
+            if not matches:
+                findings.append({"query_id": query_id, "kind": "new_issue", "baseline": None, "current": issue})
+                continue
+            previous = matches.pop(0)
+            if previous != issue:
+                findings.append({"query_id": query_id, "kind": "issue_changed", "baseline": previous, "current": issue})
+    return findings
+
+
+def format_plan(node: dict, depth: int = 0) -> str:
+    """Indented one-line-per-node rendering of a normalized plan."""
+    label = node.get("Node Type", "?")
+    for key in ("Relation Name", "Index Name", "Join Type", "Strategy"):
+        if key in node:
+            label += f" [{node[key]}]"
+    lines = ["  " * depth + label]
+    for child in node.get("Plans", []):
+        lines.append(format_plan(child, depth + 1))
+    return "\n".join(lines)
@@ -0,0 +1,160 @@
+"""
+Full vs retrieval-trimmed intent prompts (app.llm.retrieval).
+
+Questions come from three sets:
+- corpus: the sample-question corpus (app.llm.examples). Each question is
+  routed by an index built without that question (leave-one-out), so the
+  retriever never sees the question it is tested on.
+- paraphrases: PARAPHRASES, the same intents in the words an analyst would use
+- follow_ups: FOLLOW_UPS, short follow-ups that only make sense with the
+  session's last query (TEST_SCENARIOS.md section 3)
+
+Reported per set and prompt mode:
+- prompt tokens (system + user, estimate_tokens) as IntentResolver builds them
+- routing: share of questions whose expected query_id has its full spec in the
+  prompt (always 1.0 for the full prompt), and share where it is the top hit
+- LLM latency: ``latency_sample`` questions resolved through BedrockClient
+  against the stub, which sleeps ``llm_ms`` plus ``input_token_ms`` per prompt
+  token, a latency model in which prefill cost grows with prompt length
+- build_ms: time to pick candidates and build both prompts
+"""
+
+import contextlib
+import io
+import os
+import statistics
+import time
+
+from app.llm.bedrock_client import BedrockClient, BedrockSettings, LLMMetrics
+from app.llm.examples import EXAMPLE_QUESTIONS
+from app.llm.intent_resolver import IntentResolver
+from app.llm.retrieval import PROMPT_TOP_K, RegistryIndex
+from bench.bedrock_stub import BedrockStub, estimate_tokens
+from bench.runner import percentile
+
+PARAPHRASES = [
+    ("How likely is the grid to get stressed above 0.6 in the next two weeks?", "GSI_PEAK_PROBABILITY_14_DAYS"),
+    ("When is the worst-case stress index highest this season?", "GSI_P99_PEAK_SEASONAL"),
+    ("Chance of stress over 0.6 between 5 and 8 pm next week", "GSI_PROBABILITY_EVENING_RAMP_NEXT_WEEK"),
+    ("List the scenarios where stress tops 0.75", "GSI_PATHS_ABOVE_THRESHOLD"),
+    ("Median vs 90th percentile grid stress in January", "GSI_P50_P90_MONTH"),
+    ("How many hours does stress stay above 0.7 in the worst scenarios?", "GSI_DURATION_WORST_PERCENT"),
+    ("What's the hour with the highest mean grid stress?", "TIGHTEST_HOUR_GSI"),
+    ("How cold could it get in the extreme case over the next 10 days?", "P01_EXTREME_COLD_TEMP_FORECAST"),
+    ("Average demand when ERCOT-wide temperature is below -5C", "AVG_LOAD_EXTREME_COLD"),
+    ("Which zone is most likely to freeze?", "ZONE_HIGHEST_FREEZING_PROBABILITY"),
+    ("Worst-case system load between 7 and 9 am in February", "P99_RTO_LOAD_MORNING_PEAK"),
+    ("Is Houston humidity related to Houston demand?", "CORRELATION_DEW_LOAD_HOUSTON"),
+    ("How much extra load per degree colder?", "LOAD_SENSITIVITY_TEMP_DROP"),
+    ("Chance that system demand goes over 75 GW this winter", "PROBABILITY_RTO_LOAD_EXCEEDS"),
+    ("Odds of a windless, sunless period", "PROBABILITY_DUNKELFLAUTE"),
+    ("Low-case wind output during the evening ramp", "P10_LOW_WIND_EVENING_RAMP"),
+    ("How fast does solar come up in the morning?", "SOLAR_RAMP_P50_P90"),
+    ("Biggest hourly drop in wind output", "MAX_DOWNWARD_WIND_RAMP"),
+    ("Is wind or solar more variable in February?", "VARIANCE_WIND_VS_SOLAR_MONTH"),
+    ("Chance wind capacity factor stays under 15% for a day", "PROBABILITY_LOW_WIND_CAP_FAC_DURATION"),
+    ("Gap between North and West demand in the extreme case", "NORTH_VS_WEST_LOAD_SPREAD_P99"),
+    ("When does West wind make up most of the system wind?", "WEST_WIND_EXPORT_CONSTRAINT_RISK"),
+    ("Which zone's demand swings the most?", "ZONE_HIGHEST_LOAD_VOLATILITY"),
+    ("Median wind plus solar output by zone", "P50_RENEWABLE_GEN_PER_ZONE"),
+    ("Odds net demand tops 60 GW in March", "PROBABILITY_NET_DEMAND_EXCEEDS_MONTH"),
+    ("Spread between the 95th and 5th percentile of net load", "NET_DEMAND_UNCERTAINTY_P95_P05"),
+    ("Which day has the widest tail between extreme and median?", "DATE_HIGHEST_TAIL_RISK"),
+    ("Expected MW shortfall in stressed scenarios", "EXPECTED_SHORTFALL_HIGH_GSI"),
+    ("Hour with the most uncertain net demand", "VOLATILITY_PEAK_NET_DEMAND"),
+    ("How likely is wind capacity factor to stay below 10% for 12 hours straight?", "RUN_LENGTH_PROBABILITY"),
+    ("Longest stretch of temperature below freezing in each scenario", "RUN_LENGTH_LONGEST_PER_PATH"),
+    ("How many separate cold spells of 6+ hours per path?", "RUN_LENGTH_COUNT_DISTRIBUTION"),
+]
+
+# (question, last query_id in the session, expected query_id)
+FOLLOW_UPS = [
+    ("What about if GSI threshold is 0.75?", "GSI_PROBABILITY_EVENING_RAMP_NEXT_WEEK",
+     "GSI_PROBABILITY_EVENING_RAMP_NEXT_WEEK"),
+    ("Same thing but for January 20th", "GSI_PROBABILITY_EVENING_RAMP_NEXT_WEEK",
+     "GSI_PROBABILITY_EVENING_RAMP_NEXT_WEEK"),
+    ("Now show me the tightest hour", "GSI_PROBABILITY_EVENING_RAMP_NEXT_WEEK", "TIGHTEST_HOUR_GSI"),
+    ("And for March?", "P99_RTO_LOAD_MORNING_PEAK", "P99_RTO_LOAD_MORNING_PEAK"),
+    ("Run it again with 80,000", "PROBABILITY_RTO_LOAD_EXCEEDS", "PROBABILITY_RTO_LOAD_EXCEEDS"),
+    ("Same for the West zone", "PROBABILITY_WEST_WIND_BELOW_CUTIN", "PROBABILITY_WEST_WIND_BELOW_CUTIN"),
+]
+
+CONTEXT_PARAMS = {"initialization": "2026-01-15 12:00"}
+
+
+def cases() -> dict[str, list[dict]]:
+    """{set name: [{question, expected, last_query_id, held_out}]}"""
+    corpus = [{"question": question, "expected": query_id, "last_query_id": None, "held_out": query_id}
+              for query_id, questions in EXAMPLE_QUESTIONS.items() for question in questions]
+    paraphrases = [{"question": question, "expected": query_id, "last_query_id": None, "held_out": None}
+                   for question, query_id in PARAPHRASES]
+    follow_ups = [{"question": question, "expected": expected, "last_query_id": last, "held_out": None}
+                  for question, last, expected in FOLLOW_UPS]
+    return {"corpus": corpus, "paraphrases": paraphrases, "follow_ups": follow_ups}
+
+
+def _context(case: dict) -> dict | None:
+    if not case["last_query_id"]:
+        return None
+    return {"history": [], "last_params": CONTEXT_PARAMS, "last_query_id": case["last_query_id"]}
+
+
+def routing(set_cases: list[dict], top_k: int) -> dict:
+    """Share of cases whose expected query_id is among the candidates, and the top hit."""
+    full_index = RegistryIndex()
+    in_prompt = top_hit = 0
+    for case in set_cases:
+        index = full_index
+        if case["held_out"]:
+            index = RegistryIndex(examples={q: e for q, e in EXAMPLE_QUESTIONS.items() if q != case["held_out"]})
+        candidates = index.candidates(case["question"], case["last_query_id"], top_k)
+        in_prompt += case["expected"] in candidates
+        top_hit += candidates[0] == case["expected"]
+    return {"in_prompt": round(in_prompt / len(set_cases), 3), "top_hit": round(top_hit / len(set_cases), 3)}
+
+
+def prompt_sizes(resolver: IntentResolver, set_cases: list[dict]) -> dict:
+    tokens, build_ms = [], []
+    for case in set_cases:
+        started = time.perf_counter()
+        system_prompt, user_prompt = resolver.build_prompts(case["question"], _context(case))
+        build_ms.append((time.perf_counter() - started) * 1000)
+        tokens.append(estimate_tokens(system_prompt) + estimate_tokens(user_prompt))
+    return {"prompt_tokens_mean": round(statistics.mean(tokens)), "prompt_tokens_max": max(tokens),
+            "build_ms": round(statistics.mean(build_ms), 2)}
+
+
+def llm_latency(resolver: IntentResolver, sample: list[dict]) -> dict:
+    latencies = []
+    for case in sample:
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            resolver.resolve(case["question"], _context(case))
+        latencies.append((time.perf_counter() - started) * 1000)
+    return {"llm_p50_ms": round(percentile(latencies, 0.50), 1), "llm_p95_ms": round(percentile(latencies, 0.95), 1)}
+
+
+def run_prompts(top_k: int = PROMPT_TOP_K, llm_ms: float = 300, input_token_ms: float = 0.1,
+                latency_sample: int = 12) -> dict:
+    # The stub does not check signatures, but botocore still signs requests
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "stub")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "stub")
+    sets = cases()
+    report = {"top_k": top_k, "sets": {}}
+    with BedrockStub(latency=llm_ms / 1000, input_token_ms=input_token_ms, max_concurrent=64) as stub:
+        client = BedrockClient(settings=BedrockSettings(endpoint_url=stub.url), metrics=LLMMetrics())
+        resolvers = {"full": IntentResolver(llm=client, retrieval=False),
+                     "trimmed": IntentResolver(llm=client, retrieval=True, top_k=top_k)}
+        for name, set_cases in sets.items():
+            row = {}
+            for mode, resolver in resolvers.items():
+                row[mode] = {
+                    **prompt_sizes(resolver, set_cases),
+                    **(routing(set_cases, top_k) if mode == "trimmed" else {"in_prompt": 1.0}),
+                    **llm_latency(resolver, set_cases[:latency_sample]),
+                }
+            row["token_reduction"] = round(
+                1 - row["trimmed"]["prompt_tokens_mean"] / row["full"]["prompt_tokens_mean"], 3)
+            report["sets"][name] = row
+            print(f"📝 {name}: {row}", flush=True)
+    return report
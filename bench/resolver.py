@@ -0,0 +1,131 @@
+"""
+Single-flight and micro-batching of intent resolutions, against a fake LLM.
+
+FakeLLM answers each paraphrase (bench.prompts.PARAPHRASES) with an EXECUTE
+of its expected query_id, one decision per question for a batch prompt. A
+call takes ``llm_ms`` plus ``input_token_ms`` per prompt token plus
+``decision_ms`` per decision it writes, and at most ``llm_slots`` calls run
+at once (a Bedrock concurrency quota; the rest queue). It counts calls and
+prompt tokens.
+
+Scenarios (``users`` threads, arrivals spread over ``spread_ms``):
+- identical: everyone asks the same question with no session context,
+  single-flight off vs on
+- distinct: every user asks a different paraphrase, batching off vs each
+  window in ``windows_ms``; reported is whether every user got its own
+  query_id back
+- lone: questions one at a time, batching off vs the largest window, which
+  shows what the window costs a question that arrives alone
+- fallback: a fake that drops the last decision of every batch; every user
+  must still get its own query_id (asked again on its own)
+
+Each reports LLM calls, prompt tokens, per-request latency p50/p95 and wall time.
+"""
+
+import contextlib
+import io
+import threading
+import time
+
+from app.llm.intent_resolver import IntentResolver
+from app.llm.recording import batch_questions, question_of
+from bench.bedrock_stub import estimate_tokens
+from bench.prompts import PARAPHRASES
+from bench.runner import percentile
+from bench.singleflight import concurrently
+
+EXPECTED = dict(PARAPHRASES)
+
+
+class FakeLLM:
+    def __init__(self, llm_ms: float, input_token_ms: float, decision_ms: float, llm_slots: int,
+                 drop_last: bool = False):
+        self.llm_ms = llm_ms
+        self.input_token_ms = input_token_ms
+        self.decision_ms = decision_ms
+        self.drop_last = drop_last
+        self._slots = threading.BoundedSemaphore(llm_slots)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.tokens = 0
+
+    def invoke(self, system_prompt: str, user_prompt: str):
+        questions = batch_questions(user_prompt)
+        batched = bool(questions)
+        questions = questions or [question_of(user_prompt)]
+        tokens = estimate_tokens(system_prompt) + estimate_tokens(user_prompt)
+        with self._lock:
+            self.calls += 1
+            self.tokens += tokens
+        with self._slots:
+            time.sleep((self.llm_ms + tokens * self.input_token_ms + len(questions) * self.decision_ms) / 1000)
+        decisions = [{"decision": "EXECUTE", "query_id": EXPECTED.get(q, "UNKNOWN"), "params": {}} for q in questions]
+        if not batched:
+            return decisions[0]
+        return decisions[:-1] if self.drop_last else decisions
+
+
+def _burst(resolver: IntentResolver, questions: list[str], spread_ms: float) -> dict:
+    """One user per question, arriving within ``spread_ms``; checks every user got its own query_id back."""
+    answers = {}
+    pending = iter(questions)
+    lock = threading.Lock()
+
+    def ask():
+        with lock:
+            question = next(pending)
+        decision = resolver.resolve(question, None)
+        with lock:
+            answers[question] = decision.get("query_id")
+        return decision
+
+    llm = resolver.llm
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, latencies, wall = concurrently(len(questions), spread_ms, ask)
+    own = sum(answers.get(q) == EXPECTED[q] for q in questions)
+    return {"llm_calls": llm.calls, "prompt_tokens": llm.tokens, "own_answer": f"{own}/{len(questions)}",
+            "p50_ms": round(percentile(latencies, 0.50), 1), "p95_ms": round(percentile(latencies, 0.95), 1),
+            "wall_ms": round(wall, 1), **{k: v for k, v in resolver.stats()["batching"].items()
+                                          if k in ("batches", "solo", "fallbacks", "max_size")},
+            "ok": own == len(questions)}
+
+
+def _lone(resolver: IntentResolver, questions: list[str]) -> dict:
+    latencies = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for question in questions:
+            started = time.perf_counter()
+            resolver.resolve(question, None)
+            latencies.append((time.perf_counter() - started) * 1000)
+    return {"llm_calls": resolver.llm.calls, "p50_ms": round(percentile(latencies, 0.50), 1)}
+
+
+def run_resolver(users: int = 24, spread_ms: float = 20, windows_ms: tuple = (5, 20), batch_max: int = 8,
+                 llm_ms: float = 400, input_token_ms: float = 0.05, decision_ms: float = 150,
+                 llm_slots: int = 4) -> dict:
+    def fake(**kwargs):
+        return FakeLLM(llm_ms, input_token_ms, decision_ms, llm_slots, **kwargs)
+
+    questions = [question for question, _ in PARAPHRASES][:users]
+    report = {"identical": {}, "distinct": {}, "lone": {}}
+    for label, single_flight in [("off", False), ("on", True)]:
+        resolver = IntentResolver(llm=fake(), single_flight=single_flight, batch_window_ms=0)
+        report["identical"][label] = _burst(resolver, [questions[0]] * users, spread_ms)
+        print(f"🧠 identical, single-flight {label}: {report['identical'][label]}", flush=True)
+
+    for window in (0, *windows_ms):
+        label = f"window_{window:g}ms" if window else "off"
+        resolver = IntentResolver(llm=fake(), batch_window_ms=window, batch_max=batch_max)
+        report["distinct"][label] = _burst(resolver, questions, spread_ms)
+        print(f"🧠 distinct, batching {label}: {report['distinct'][label]}", flush=True)
+
+    for window in (0, max(windows_ms)):
+        label = f"window_{window:g}ms" if window else "off"
+        resolver = IntentResolver(llm=fake(), batch_window_ms=window, batch_max=batch_max)
+        report["lone"][label] = _lone(resolver, questions[:8])
+        print(f"🧠 lone, batching {label}: {report['lone'][label]}", flush=True)
+
+    resolver = IntentResolver(llm=fake(drop_last=True), batch_window_ms=max(windows_ms), batch_max=batch_max)
+    report["fallback"] = _burst(resolver, questions, spread_ms)
+    print(f"🧠 fallback: {report['fallback']}", flush=True)
+    return report
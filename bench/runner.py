@@ -0,0 +1,131 @@
+"""
+Template benchmark runner.
+
+Executes every QUERY_REGISTRY template with its default params, records
+p50/p95/max latency, result rows and shared buffers hit, and writes or
+compares against a JSON baseline.
+"""
+
+import json
+import time
+from datetime import datetime
+
+from sqlalchemy import text
+
+from app.db.connection import ENGINE
+from app.queries.query_registry import QUERY_REGISTRY
+from bench.params import dataset_inits, default_params, template_sql
+
+# A template regresses when it is this much slower than baseline...
+DEFAULT_TOLERANCE = 0.25
+# ...and the absolute slowdown exceeds this noise floor
+MIN_REGRESSION_MS = 5.0
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(q * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def explain_buffers(conn, sql: str, params: dict) -> dict:
+    """Shared buffer hit/read counts from EXPLAIN (ANALYZE, BUFFERS)."""
+    plan = conn.execute(text("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql), params).scalar()
+    top = plan[0]["Plan"]
+    return {
+        "shared_hit_blocks": top.get("Shared Hit Blocks", 0),
+        "shared_read_blocks": top.get("Shared Read Blocks", 0),
+    }
+
+
+def benchmark_template(conn, sql: str, params: dict, iterations: int = 5, warmup: int = 1) -> dict:
+    """Time one template; the warmup runs are discarded."""
+    for _ in range(warmup):
+        conn.execute(text(sql), params).fetchall()
+
+    timings = []
+    rows = 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        rows = len(conn.execute(text(sql), params).fetchall())
+        timings.append((time.perf_counter() - started) * 1000.0)
+
+    result = {
+        "p50_ms": round(percentile(timings, 0.50), 3),
+        "p95_ms": round(percentile(timings, 0.95), 3),
+        "max_ms": round(max(timings), 3),
+        "rows": rows,
+    }
+    result.update(explain_buffers(conn, sql, params))
+    return result
+
+
+def run_benchmarks(query_ids: list[str] | None = None, iterations: int = 5, warmup: int = 1) -> dict:
+    """Benchmark registry templates; returns a baseline-shaped document."""
+    query_ids = query_ids or list(QUERY_REGISTRY)
+    results = {}
+    with ENGINE.connect() as conn:
+        inits = dataset_inits(conn)
+        for query_id in query_ids:
+            params = default_params(query_id, inits)
+            try:
+                results[query_id] = benchmark_template(conn, template_sql(query_id), params, iterations, warmup)
+            except Exception as e:
+                conn.rollback()
+                results[query_id] = {"error": str(e).splitlines()[0]}
+            print(f"⏱️  {query_id}: {results[query_id]}")
+
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "iterations": iterations,
+        "inits": inits,
+        "results": results,
+    }
+
+
+def compare_to_baseline(
+    current: dict,
+    baseline: dict,
+    tolerance: float = DEFAULT_TOLERANCE,
+    min_regression_ms: float = MIN_REGRESSION_MS,
+) -> list[dict]:
+    """
+    Flag templates that got slower, read more buffers, changed row counts or started failing.
+
+    Returns one dict per finding: {"query_id", "kind", "baseline", "current"}.
+    """
+    findings = []
+    for query_id, cur in current["results"].items():
+        base = baseline.get("results", {}).get(query_id)
+        if base is None:
+            continue
+        if "error" in cur:
+            if "error" not in base:
+                findings.append({"query_id": query_id, "kind": "error", "baseline": None, "current": cur["error"]})
+            continue
+        if "error" in base:
+            continue
+
+        for metric in ("p50_ms", "p95_ms"):
+            if (cur[metric] > base[metric] * (1 + tolerance)
+                    and cur[metric] - base[metric] > min_regression_ms):
+                findings.append({"query_id": query_id, "kind": metric, "baseline": base[metric], "current": cur[metric]})
+        if cur["rows"] != base["rows"]:
+            findings.append({"query_id": query_id, "kind": "rows", "baseline": base["rows"], "current": cur["rows"]})
+        if cur["shared_hit_blocks"] > base["shared_hit_blocks"] * (1 + tolerance):
+            findings.append({
+                "query_id": query_id, "kind": "shared_hit_blocks",
+                "baseline": base["shared_hit_blocks"], "current": cur["shared_hit_blocks"],
+            })
+    return findings
+
+
+def write_baseline(document: dict, path: str):
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+
+
+def read_baseline(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,72 @@
+"""
+Accuracy, interval coverage and latency of subsampled probability templates.
+
+Runs every sampleable template exactly and on stratified path samples sized
+for each tolerance, matches rows on their non-probability columns, and
+reports the largest absolute error, how many exact values fall inside the
+returned intervals, and p50 latency.
+"""
+
+import time
+
+from sqlalchemy import text
+
+from app.db.connection import ENGINE
+from app.queries.query_registry import QUERY_REGISTRY
+from app.queries.sampling import PROBABILITY_COLUMNS, execute_sampled, plan_sample
+from app.queries.templates import get_sql_template
+from bench.params import dataset_inits, default_params
+from bench.runner import benchmark_template, percentile
+
+DEFAULT_TOLERANCES = (0.05, 0.02)
+
+
+def _key(row: dict, column: str) -> tuple:
+    # path_count (RUN_LENGTH_PROBABILITY) is the sample size in sampled rows
+    return tuple((k, str(v)) for k, v in row.items()
+                 if k not in (column, "path_count") and not k.startswith(f"{column}_ci_"))
+
+
+def _time_sampled(conn, query_id, sql, params, plan, iterations: int) -> float:
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        execute_sampled(query_id, sql, params, plan, conn=conn)
+        timings.append((time.perf_counter() - started) * 1000)
+    return percentile(timings, 50)
+
+
+def run_sampling(query_ids: list[str] | None = None, tolerances=DEFAULT_TOLERANCES, iterations: int = 3) -> dict:
+    """{query_id: {tolerance: {sample_size, max_abs_error, covered, compared, p50_ms, exact_p50_ms}}}"""
+    report = {}
+    with ENGINE.connect() as conn:
+        inits = dataset_inits(conn)
+        for query_id in query_ids or [q for q in QUERY_REGISTRY if q in PROBABILITY_COLUMNS]:
+            column = PROBABILITY_COLUMNS[query_id]
+            sql = get_sql_template(query_id)
+            params = default_params(query_id, inits)
+            exact = {_key(row, column): row[column] for row in
+                     (dict(r._mapping) for r in conn.execute(text(sql), params))}
+            exact_p50 = benchmark_template(conn, sql, params, iterations)["p50_ms"]
+
+            report[query_id] = {}
+            for tolerance in tolerances:
+                plan = plan_sample(params, tolerance=tolerance, conn=conn)
+                rows = execute_sampled(query_id, sql, params, plan, conn=conn)
+                errors, covered = [], 0
+                for row in rows:
+                    key = _key(row, column)
+                    if key not in exact or row[column] is None or exact[key] is None:
+                        continue
+                    errors.append(abs(row[column] - exact[key]))
+                    covered += row[f"{column}_ci_lower"] - 1e-12 <= exact[key] <= row[f"{column}_ci_upper"] + 1e-12
+                report[query_id][tolerance] = {
+                    "sample_size": plan["sample_size"],
+                    "path_count": plan["path_count"],
+                    "compared": len(errors),
+                    "max_abs_error": max(errors) if errors else None,
+                    "covered": covered,
+                    "p50_ms": _time_sampled(conn, query_id, sql, params, plan, iterations),
+                    "exact_p50_ms": exact_p50,
+                }
+    return report
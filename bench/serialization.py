@@ -0,0 +1,97 @@
+"""
+Encode time and bytes of /query responses for the largest templates.
+
+The ``top`` registry templates with the most result rows (default params)
+are executed once; each result is wrapped in the QueryResponse /query would
+return. Reported per template:
+- encode: pydantic (validate the model, then dump JSON, as FastAPI does for
+  a route returning the model) vs orjson (FastJSONResponse over the model's
+  fields), median ms and the bytes each produces
+- route: in-process round trip through two otherwise identical routes, one
+  returning the model with response_model, one returning fast_response
+- compression: bytes and ms for gzip and zstd (RESPONSE_GZIP_LEVEL /
+  RESPONSE_ZSTD_LEVEL)
+"""
+
+import contextlib
+import io
+import statistics
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+from app.db.connection import ENGINE
+from app.db.executor import execute_query
+from app.models import QueryResponse
+from app.queries.query_registry import QUERY_REGISTRY
+from app.utils.responses import compress, dumps, fast_response, model_content, zstandard
+from bench.params import dataset_inits, default_params, template_sql
+
+
+def _median_ms(fn, iterations: int) -> float:
+    times = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(times), 3)
+
+
+def _bench_app(responses: dict) -> FastAPI:
+    bench_app = FastAPI()
+
+    @bench_app.get("/pydantic/{query_id}", response_model=QueryResponse)
+    def pydantic_route(query_id: str):
+        return responses[query_id]
+
+    @bench_app.get("/orjson/{query_id}", response_model=QueryResponse)
+    def orjson_route(query_id: str):
+        return fast_response(responses[query_id])
+
+    return bench_app
+
+
+def run_serialization(top: int = 5, iterations: int = 20) -> list[dict]:
+    with ENGINE.connect() as conn:
+        inits = dataset_inits(conn)
+    results = {}
+    for query_id in QUERY_REGISTRY:
+        with contextlib.redirect_stdout(io.StringIO()):
+            params = default_params(query_id, inits)
+            results[query_id] = (execute_query(template_sql(query_id), params), params)
+    largest = sorted(results, key=lambda q: -len(results[q][0]))[:top]
+
+    responses = {}
+    for query_id in largest:
+        data, params = results[query_id]
+        responses[query_id] = QueryResponse(decision="EXECUTE", query_id=query_id, sql=template_sql(query_id).strip(),
+                                            params=params, data=data,
+                                            summary=f"Successfully executed query '{query_id}'.")
+    adapter = TypeAdapter(QueryResponse)
+    client = TestClient(_bench_app(responses))
+
+    rows = []
+    for query_id in largest:
+        response = responses[query_id]
+        pydantic_body = adapter.dump_json(adapter.validate_python(response))
+        orjson_body = dumps(model_content(response))
+        row = {
+            "query_id": query_id,
+            "rows": len(response.data),
+            "pydantic_ms": _median_ms(lambda: adapter.dump_json(adapter.validate_python(response)), iterations),
+            "orjson_ms": _median_ms(lambda: dumps(model_content(response)), iterations),
+            "pydantic_bytes": len(pydantic_body),
+            "orjson_bytes": len(orjson_body),
+            "route_pydantic_ms": _median_ms(lambda: client.get(f"/pydantic/{query_id}"), iterations),
+            "route_orjson_ms": _median_ms(lambda: client.get(f"/orjson/{query_id}"), iterations),
+            "gzip_bytes": len(compress(orjson_body, "gzip")),
+            "gzip_ms": _median_ms(lambda: compress(orjson_body, "gzip"), iterations),
+        }
+        if zstandard is not None:
+            row["zstd_bytes"] = len(compress(orjson_body, "zstd"))
+            row["zstd_ms"] = _median_ms(lambda: compress(orjson_body, "zstd"), iterations)
+        rows.append(row)
+        print(f"🧾 {row}", flush=True)
+    return rows
@@ -0,0 +1,140 @@
+"""
+Single-flight de-duplication of identical DB executions.
+
+Morning report: ``users`` threads ask for the same heavy template (default
+params) within ``spread_ms`` of each other, against an empty ResultCache,
+with single-flight off and on. Reported: DB executions, coalesced calls,
+per-user latency p50/p95 and wall time.
+
+Plus checks on a bare SingleFlight, each with an ``ok`` flag:
+- async: ``users`` coroutines awaiting do_async share one execution
+- error: the leader's error reaches every follower, with one execution
+- cancel: the leader's statement (pg_sleep) is cancelled mid-run; followers
+  are not failed, one of them reruns it, and the leader gets QueryCancelled
+"""
+
+import asyncio
+import random
+import threading
+import time
+
+from app.cache.results import ResultCache
+from app.cache.singleflight import SingleFlight
+from app.db.connection import ENGINE
+from app.db.executor import CancellableQuery, QueryCancelled, execute_query
+from app.queries.sampling import bind_path_count
+from bench.params import dataset_inits, default_params, template_sql
+from bench.runner import percentile
+
+DEFAULT_QUERY_ID = "P50_RENEWABLE_GEN_PER_ZONE"
+
+
+def concurrently(users: int, spread_ms: float, fn) -> tuple[list, list[float], float]:
+    """Call ``fn()`` from ``users`` threads, each starting at a random offset within ``spread_ms``."""
+    results, latencies = [None] * users, [0.0] * users
+    barrier = threading.Barrier(users)
+    offsets = [random.uniform(0, spread_ms / 1000) for _ in range(users)]
+
+    def user(i: int):
+        barrier.wait()
+        time.sleep(offsets[i])
+        started = time.perf_counter()
+        try:
+            results[i] = fn()
+        except Exception as e:
+            results[i] = e
+        latencies[i] = (time.perf_counter() - started) * 1000
+
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(users)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, latencies, (time.perf_counter() - started) * 1000
+
+
+def morning_report(query_id: str, users: int, spread_ms: float) -> dict:
+    with ENGINE.connect() as conn:
+        inits = dataset_inits(conn)
+    sql = template_sql(query_id)
+    params = bind_path_count(sql, default_params(query_id, inits))
+    report = {}
+    for label, single_flight in [("off", False), ("on", True)]:
+        cache = ResultCache(versions=None, single_flight=single_flight)
+        executions = [0]
+        lock = threading.Lock()
+
+        def run(sql: str, params: dict):
+            with lock:
+                executions[0] += 1
+            return execute_query(sql, params)
+
+        results, latencies, wall = concurrently(users, spread_ms,
+                                                 lambda: cache.cached_run(query_id, sql, params, run)[0])
+        report[label] = {"db_executions": executions[0], "coalesced": cache.flights.coalesced,
+                         "cache_hits": cache.hits, "errors": sum(isinstance(r, Exception) for r in results),
+                         "p50_ms": round(percentile(latencies, 0.50), 1), "p95_ms": round(percentile(latencies, 0.95), 1),
+                         "wall_ms": round(wall, 1)}
+        print(f"🛫 single-flight {label}: {report[label]}", flush=True)
+    return report
+
+
+def check_async(users: int) -> dict:
+    flights = SingleFlight()
+
+    def slow():
+        time.sleep(0.3)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*(flights.do_async("key", slow) for _ in range(users)))
+
+    results = asyncio.run(main())
+    stats = flights.stats()
+    return {**stats, "ok": stats["executions"] == 1 and results == ["result"] * users}
+
+
+def check_error(users: int) -> dict:
+    flights = SingleFlight()
+
+    def failing():
+        time.sleep(0.2)
+        raise ValueError("boom")
+
+    results, _, _ = concurrently(users, 20, lambda: flights.do("key", failing))
+    stats = flights.stats()
+    errors = sum(isinstance(r, ValueError) for r in results)
+    return {**stats, "errors_raised": errors, "ok": stats["executions"] == 1 and errors == users}
+
+
+def check_cancel(users: int) -> dict:
+    flights = SingleFlight(retry_on=(QueryCancelled,))
+    queries = []
+    lock = threading.Lock()
+
+    def run():
+        query = CancellableQuery(label="pg_sleep")
+        with lock:
+            queries.append(query)
+        return query.run("SELECT pg_sleep(0.5) AS slept", {})
+
+    def cancel_leader():
+        time.sleep(0.2)
+        queries[0].cancel()
+
+    threading.Thread(target=cancel_leader).start()
+    results, _, _ = concurrently(users, 20, lambda: flights.do("key", run))
+    stats = flights.stats()
+    cancelled = sum(isinstance(r, QueryCancelled) for r in results)
+    answered = sum(isinstance(r, list) for r in results)
+    return {**stats, "cancelled": cancelled, "answered": answered,
+            "ok": stats["executions"] == 2 and cancelled == 1 and answered == users - 1}
+
+
+def run_singleflight(query_id: str = DEFAULT_QUERY_ID, users: int = 32, spread_ms: float = 50) -> dict:
+    report = {"morning_report": morning_report(query_id, users, spread_ms),
+              "async": check_async(users), "error": check_error(users), "cancel": check_cancel(users)}
+    for check in ("async", "error", "cancel"):
+        print(f"🛫 {check}: {report[check]}", flush=True)
+    return report
@@ -0,0 +1,70 @@
+"""
+Accuracy and latency of approximate (sketch) percentiles vs exact percentile_disc.
+
+For each query in app.queries.approximate, runs the exact template and the
+sketch merge with the same default params, and reports the absolute error,
+whether the exact value falls inside the returned bounds, and p50 latency.
+"""
+
+import time
+
+from sqlalchemy import text
+
+from app.db.connection import ENGINE
+from app.queries.approximate import APPROXIMATE_QUERIES, execute_approximate
+from app.queries.templates import get_sql_template
+from bench.params import dataset_inits, default_params
+from bench.runner import benchmark_template, percentile
+
+
+def _time_approximate(conn, query_id: str, params: dict, iterations: int) -> float:
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        execute_approximate(query_id, params, conn=conn)
+        timings.append((time.perf_counter() - started) * 1000)
+    return percentile(timings, 50)
+
+
+def run_sketches(query_ids: list[str] | None = None, iterations: int = 5, overrides: dict | None = None) -> dict:
+    """{query_id: {columns: {col: {exact, approximate, lower, upper, abs_error, within_bounds}}, p50s, speedup}}"""
+    report = {}
+    with ENGINE.connect() as conn:
+        inits = dataset_inits(conn)
+        for query_id in query_ids or list(APPROXIMATE_QUERIES):
+            params = default_params(query_id, inits)
+            params.update({k: v for k, v in (overrides or {}).items() if k in params})
+            sql = get_sql_template(query_id)
+            exact_rows = [dict(row._mapping) for row in conn.execute(text(sql), params)]
+            approx_rows = execute_approximate(query_id, params, conn=conn)
+
+            columns = {}
+            if exact_rows and approx_rows:
+                exact, approx = exact_rows[0], approx_rows[0]
+                for column, value in exact.items():
+                    if f"{column}_lower" not in approx or value is None:
+                        continue
+                    estimate = approx[column]
+                    lower, upper = approx[f"{column}_lower"], approx[f"{column}_upper"]
+                    columns[column] = {
+                        "exact": value,
+                        "approximate": estimate,
+                        "lower": lower,
+                        "upper": upper,
+                        "abs_error": abs(estimate - value),
+                        "within_bounds": lower - 1e-9 <= value <= upper + 1e-9,
+                    }
+                if "valid_datetime" in exact:
+                    # Hours tied on the percentile are equally correct answers
+                    tied = all(c.get("within_bounds") for c in columns.values())
+                    columns["valid_datetime"] = {"match": exact["valid_datetime"] == approx.get("valid_datetime") or tied}
+
+            exact_p50 = benchmark_template(conn, sql, params, iterations)["p50_ms"]
+            approx_p50 = _time_approximate(conn, query_id, params, iterations)
+            report[query_id] = {
+                "columns": columns,
+                "exact_p50_ms": exact_p50,
+                "approximate_p50_ms": approx_p50,
+                "speedup": round(exact_p50 / approx_p50, 2) if approx_p50 else None,
+            }
+    return report
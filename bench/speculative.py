@@ -0,0 +1,173 @@
+"""
+Replay of recorded sessions with and without speculative execution.
+
+Sessions are generated from a small analyst model (ANALYST_FLOWS): mostly the
+same query with one parameter changed, or a usual follow-up, with a share of
+unpredictable jumps. The transition model is trained on ``train_sessions``
+sessions, then ``replay_sessions`` other sessions are replayed turn by turn
+through app.api.query with the LLM replaced by a resolver that sleeps
+``llm_seconds`` and returns the recorded decision. Each session starts with an
+empty result cache. Reported per turn: latency after the decision arrives,
+without and with speculation, the difference, and whether the turn adopted a
+speculative run or hit a result speculated during an earlier turn.
+"""
+
+import contextlib
+import io
+import random
+import statistics
+import time
+
+import app.api
+from app.cache.results import RESULT_CACHE
+from app.cache.speculative import TRANSITIONS
+from app.context.memory import clear_context
+from app.db.connection import ENGINE
+from app.models import QueryRequest
+from app.queries.query_registry import QUERY_REGISTRY
+from bench.params import dataset_inits
+
+# query_id -> [(weight, next query_id, {param: candidate values} for a one-param change)]
+ANALYST_FLOWS = {
+    "GSI_PEAK_PROBABILITY_14_DAYS": [
+        (5, "GSI_PEAK_PROBABILITY_14_DAYS", {"gsi_threshold": [0.7, 0.8]}),
+        (3, "GSI_PROBABILITY_LASTING_HOURS", {}),
+        (2, "TIGHTEST_HOUR_GSI", {}),
+    ],
+    "GSI_PROBABILITY_LASTING_HOURS": [
+        (5, "GSI_PROBABILITY_LASTING_HOURS", {"duration_hours": [6, 8]}),
+        (3, "GSI_DURATION_WORST_PERCENT", {}),
+        (2, "GSI_PEAK_PROBABILITY_14_DAYS", {}),
+    ],
+    "GSI_P50_P90_MONTH": [
+        (6, "GSI_P50_P90_MONTH", {"month": [1, 3, 4]}),
+        (4, "P99_RTO_LOAD_MORNING_PEAK", {}),
+    ],
+    "P99_RTO_LOAD_MORNING_PEAK": [
+        (5, "P99_RTO_LOAD_MORNING_PEAK", {"month": [1, 3, 4]}),
+        (3, "PROBABILITY_RTO_LOAD_EXCEEDS", {}),
+        (2, "GSI_P50_P90_MONTH", {}),
+    ],
+    "PROBABILITY_RTO_LOAD_EXCEEDS": [
+        (6, "PROBABILITY_RTO_LOAD_EXCEEDS", {"load_threshold": [70000, 80000]}),
+        (4, "VOLATILITY_PEAK_NET_DEMAND", {}),
+    ],
+}
+START_QUERY_IDS = ["GSI_PEAK_PROBABILITY_14_DAYS", "GSI_P50_P90_MONTH", "P99_RTO_LOAD_MORNING_PEAK",
+                   "PROBABILITY_RTO_LOAD_EXCEEDS"]
+JUMP_QUERY_IDS = ["WEST_WIND_EXPORT_CONSTRAINT_RISK", "P10_LOW_WIND_EVENING_RAMP", "DATE_HIGHEST_TAIL_RISK",
+                  "NET_DEMAND_UNCERTAINTY_P95_P05", "ZONE_HIGHEST_LOAD_VOLATILITY"]
+
+
+def generate_session(rng: random.Random, inits: dict, turns: int, jump_rate: float) -> list[dict]:
+    """Executed turns ({query_id, params}) of one analyst session, params filled as the API would."""
+    last_params = {name: inits[name] for name in ("initialization", "forecast_init", "seasonal_init")}
+    query_id, change = rng.choice(START_QUERY_IDS), {}
+    history = []
+    for _ in range(turns):
+        params = {}
+        for name, info in QUERY_REGISTRY[query_id]["parameters"].items():
+            params[name] = change.get(name, last_params.get(name, info.get("default")))
+        history.append({"query_id": query_id, "params": params})
+        last_params.update(params)
+
+        flows = ANALYST_FLOWS.get(query_id)
+        if not flows or rng.random() < jump_rate:
+            query_id, change = rng.choice(JUMP_QUERY_IDS + START_QUERY_IDS), {}
+            continue
+        _, query_id, changes = rng.choices(flows, weights=[w for w, _, _ in flows])[0]
+        change = {}
+        if changes:
+            name = rng.choice(list(changes))
+            values = [v for v in changes[name] if v != last_params.get(name)]
+            change = {name: rng.choice(values)}
+    return history
+
+
+class ReplayResolver:
+    """Resolver stand-in: sleeps like the LLM, then returns the recorded decision."""
+
+    def __init__(self, llm_seconds: float):
+        self.llm_seconds = llm_seconds
+        self.turn = None
+        self.decided_at = None
+
+    def resolve(self, question, context):
+        time.sleep(self.llm_seconds)
+        self.decided_at = time.perf_counter()
+        return {"decision": "EXECUTE", "query_id": self.turn["query_id"], "params": dict(self.turn["params"])}
+
+
+def replay(sessions: list[list[dict]], resolver: ReplayResolver, speculate: bool) -> list[dict]:
+    """Post-decision latency (ms) and speculation outcome of every turn."""
+    app.api.resolver = resolver
+    app.api.speculator.enabled = speculate
+    rows = []
+    for index, history in enumerate(sessions):
+        session_id = f"bench-speculative-{index}"
+        clear_context(session_id)
+        RESULT_CACHE.clear()
+        for turn_index, turn in enumerate(history):
+            resolver.turn = turn
+            adopted_before = app.api.speculator.adopted
+            with contextlib.redirect_stdout(io.StringIO()):
+                response = app.api.query(QueryRequest(question=f"turn {turn_index}", session_id=session_id))
+            rows.append({
+                "session": index, "turn": turn_index, "query_id": turn["query_id"],
+                "post_decision_ms": (time.perf_counter() - resolver.decided_at) * 1000,
+                "adopted": app.api.speculator.adopted > adopted_before,
+                "cached": bool((response.staleness or {}).get("cached")),
+            })
+        clear_context(session_id)
+    return rows
+
+
+def run_speculative(train_sessions: int = 300, replay_sessions: int = 8, turns: int = 6, llm_seconds: float = 1.0,
+                    jump_rate: float = 0.15, seed: int = 11) -> dict:
+    with ENGINE.connect() as conn:
+        inits = dataset_inits(conn)
+    rng = random.Random(seed)
+    training = [generate_session(rng, inits, turns, jump_rate) for _ in range(train_sessions)]
+    held_out = [generate_session(rng, inits, turns, jump_rate) for _ in range(replay_sessions)]
+
+    original_resolver, original_enabled = app.api.resolver, app.api.speculator.enabled
+    resolver = ReplayResolver(llm_seconds)
+    try:
+        results = {}
+        for mode, speculate in (("baseline", False), ("speculative", True)):
+            # Same trained model for both modes; replayed turns are learned online as in the API
+            TRANSITIONS.clear()
+            for history in training:
+                TRANSITIONS.learn(history)
+            results[mode] = replay(held_out, resolver, speculate)
+        stats = app.api.speculator.stats()
+    finally:
+        app.api.resolver, app.api.speculator.enabled = original_resolver, original_enabled
+        RESULT_CACHE.clear()
+        TRANSITIONS.clear()
+
+    turns_report = []
+    for base, spec in zip(results["baseline"], results["speculative"]):
+        turns_report.append({
+            "session": base["session"], "turn": base["turn"], "query_id": base["query_id"],
+            "baseline_ms": round(base["post_decision_ms"], 1), "speculative_ms": round(spec["post_decision_ms"], 1),
+            "saved_ms": round(base["post_decision_ms"] - spec["post_decision_ms"], 1), "adopted": spec["adopted"],
+            # Hit on a result speculated in an earlier turn (not a repeat the baseline also hits)
+            "speculated_earlier": spec["cached"] and not spec["adopted"] and not base["cached"],
+        })
+    baseline = [t["baseline_ms"] for t in turns_report]
+    speculative = [t["speculative_ms"] for t in turns_report]
+    return {
+        "turns": turns_report,
+        "summary": {
+            "turns": len(turns_report),
+            "adopted": sum(t["adopted"] for t in turns_report),
+            "speculated_earlier": sum(t["speculated_earlier"] for t in turns_report),
+            "baseline_mean_ms": round(statistics.mean(baseline), 1),
+            "speculative_mean_ms": round(statistics.mean(speculative), 1),
+            "baseline_median_ms": round(statistics.median(baseline), 1),
+            "speculative_median_ms": round(statistics.median(speculative), 1),
+            "saved_per_turn_ms": round(statistics.mean(t["saved_ms"] for t in turns_report), 1),
+            "executor": stats,
+        },
+    }
@@ -0,0 +1,130 @@
+"""
+Cache invalidation check against a local database.
+
+Caches a stitched forecast + seasonal template, then writes to its tables
+twice and follows what the cache does:
+
+1. rows for an unrelated initialization: the entry must be revalidated by
+   fingerprint, without rerunning the query;
+2. late rows for the entry's own seasonal initialization: the next hit must
+   return the old result immediately, marked stale, and a background refresh
+   must replace it with the exact new result;
+3. another write once the entry is past the stale-while-revalidate window:
+   the hit is revalidated inline, without fingerprinting (scanning) an
+   initialization on the request thread.
+
+The inserted rows are deleted again at the end. Needs seasonal hours past
+forecast_init + 336 h (e.g. the default 120-day load), or the late rows fall
+outside the stitched window and the result does not change.
+"""
+
+import threading
+import time
+from datetime import timedelta
+
+from sqlalchemy import text
+
+from app.cache.invalidation import DataVersions
+from app.cache.results import ResultCache
+from app.cache.warmer import latest_initializations, warm_params
+from app.db.connection import ENGINE
+from app.db.executor import execute_query
+from app.queries.sampling import bind_path_count
+from app.queries.templates import get_sql_template
+
+QUERY_ID = "VOLATILITY_PEAK_NET_DEMAND"
+WAIT_SECONDS = 20.0
+
+# Copies the last seasonal net_demand hour one hour later, values tripled, so
+# the new hour has the highest stddev and becomes the answer.
+_LATE_ROWS_SQL = """
+INSERT INTO energy_base_ensemble (initialization, project_name, location, variable, valid_datetime, ensemble_path, ensemble_value)
+SELECT :target_init, project_name, location, variable, valid_datetime + interval '1 hour', ensemble_path, ensemble_value * 3
+FROM energy_base_ensemble
+WHERE initialization = :seasonal_init AND project_name = 'ercot_generic' AND location = 'rto' AND variable = 'net_demand'
+  AND valid_datetime = (SELECT MAX(valid_datetime) FROM energy_base_ensemble
+                        WHERE initialization = :seasonal_init AND variable = 'net_demand' AND location = 'rto')
+"""
+
+_CLEANUP_SQL = """
+DELETE FROM energy_base_ensemble
+WHERE (initialization = :other_init)
+   OR (initialization = :seasonal_init AND valid_datetime > :last_hour)
+"""
+
+
+def _timed(cache: ResultCache, sql: str, params: dict) -> tuple:
+    started = time.perf_counter()
+    data, staleness = cache.cached_run(QUERY_ID, sql, params, execute_query)
+    return data, staleness, (time.perf_counter() - started) * 1000
+
+
+def _wait(predicate, seconds: float = WAIT_SECONDS) -> bool:
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.2)
+    return False
+
+
+def _write(sql: str, params: dict):
+    with ENGINE.begin() as conn:
+        conn.execute(text(sql), params)
+
+
+def run_staleness() -> dict:
+    with ENGINE.connect() as conn:
+        inits = latest_initializations(conn)
+        last_hour = conn.execute(text(
+            "SELECT MAX(valid_datetime) FROM energy_base_ensemble WHERE initialization = :init"
+        ), {"init": inits["seasonal_init"]}).scalar()
+    sql = get_sql_template(QUERY_ID)
+    params = bind_path_count(sql, warm_params(QUERY_ID, inits))
+    cache = ResultCache(versions=DataVersions(ttl_seconds=0.2))
+    other_init = inits["seasonal_init"] - timedelta(days=1)
+    report = {}
+
+    try:
+        original, _, report["miss_ms"] = _timed(cache, sql, params)
+        entry = next(iter(cache._entries.values()))
+        report["fingerprinted"] = _wait(lambda: len(entry.fingerprints) == len(entry.deps))
+
+        # 1. Unrelated initialization
+        _write(_LATE_ROWS_SQL, {"target_init": other_init, "seasonal_init": inits["seasonal_init"]})
+        report["unrelated_detected"] = _wait(lambda: cache.versions.changed_tables(entry.versions))
+        data, staleness, report["unrelated_hit_ms"] = _timed(cache, sql, params)
+        _wait(lambda: cache.stats()["refreshing"] == 0)
+        stats = cache.stats()
+        report["unrelated_revalidated_without_rerun"] = (
+            staleness["stale"] and stats["revalidated"] == 1 and stats["refreshes"] == 0 and data == original
+        )
+
+        # 2. Late rows of the entry's own seasonal initialization
+        _write(_LATE_ROWS_SQL, {"target_init": inits["seasonal_init"], "seasonal_init": inits["seasonal_init"]})
+        report["late_rows_detected"] = _wait(lambda: cache.versions.changed_tables(entry.versions))
+        data, staleness, report["stale_hit_ms"] = _timed(cache, sql, params)
+        report["stale_served"] = staleness["stale"] and data == original
+        report["refreshed"] = _wait(lambda: cache.stats()["refreshes"] == 1 and cache.stats()["refreshing"] == 0)
+        started = time.perf_counter()
+        expected = execute_query(sql, params)
+        report["rerun_ms"] = (time.perf_counter() - started) * 1000
+        data, staleness, report["fresh_hit_ms"] = _timed(cache, sql, params)
+        report["fresh_after_refresh"] = not staleness["stale"] and data == expected and data != original
+
+        # 3. Past the stale-while-revalidate window: inline, no scan on this thread
+        scans = []
+        scan = cache.versions.fingerprint
+        cache.versions.fingerprint = lambda *dep: scans.append(threading.current_thread()) or scan(*dep)
+        cache.stale_seconds = 0
+        _write(_LATE_ROWS_SQL, {"target_init": other_init, "seasonal_init": inits["seasonal_init"]})
+        entry = next(iter(cache._entries.values()))  # the refreshed one
+        _wait(lambda: cache.versions.changed_tables(entry.versions))
+        data, staleness, report["inline_ms"] = _timed(cache, sql, params)
+        report["inline_without_scan"] = (staleness.get("revalidated") and data == expected
+                                         and threading.current_thread() not in scans)
+    finally:
+        _write(_CLEANUP_SQL, {"other_init": other_init, "seasonal_init": inits["seasonal_init"], "last_hour": last_hour})
+
+    report["stats"] = cache.stats()
+    return report
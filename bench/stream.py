@@ -0,0 +1,120 @@
+"""
+Time-to-first-number: blocking /query vs progressive /query/stream.
+
+Serves the app with uvicorn on a local port and replaces the LLM resolver
+with one that always returns EXECUTE for the query under test (default
+params), so only the data path is measured. Also checks that closing the
+stream mid-query cancels the statement in Postgres.
+"""
+
+import json
+import threading
+import time
+
+import httpx
+import uvicorn
+from sqlalchemy import text
+
+import app.api
+from app.db.connection import ENGINE
+from app.main import app as fastapi_app
+from bench.params import dataset_inits, default_params
+
+DEFAULT_QUERY_IDS = ["P99_RTO_LOAD_MORNING_PEAK", "GSI_P50_P90_MONTH", "WEST_WIND_EXPORT_CONSTRAINT_RISK"]
+
+
+class FixedResolver:
+    """Resolver stand-in: always EXECUTE ``query_id`` with ``params``."""
+
+    def __init__(self, query_id: str, params: dict):
+        self.decision = {"decision": "EXECUTE", "query_id": query_id, "params": params}
+
+    def resolve(self, question, context):
+        return dict(self.decision)
+
+
+def serve(port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(fastapi_app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def _iter_events(response):
+    event = None
+    for line in response.iter_lines():
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: "):
+            yield event, json.loads(line[len("data: "):])
+
+
+def time_blocking(client: httpx.Client) -> float:
+    started = time.perf_counter()
+    client.post("/query", json={"question": "bench"}).raise_for_status()
+    return (time.perf_counter() - started) * 1000
+
+
+def time_stream(client: httpx.Client) -> dict:
+    """{event: ms since request} for each event received."""
+    started = time.perf_counter()
+    timings = {}
+    with client.stream("POST", "/query/stream", json={"question": "bench"}) as response:
+        for event, _ in _iter_events(response):
+            timings[event] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+def check_cancellation(client: httpx.Client, marker_sql: str = "SELECT pg_sleep(30)") -> bool:
+    """Close a stream mid-query; True if Postgres no longer runs the statement."""
+    app.api.resolver = FixedResolver("__sleep__", {})
+    original = app.api.QUERY_REGISTRY.get("__sleep__")
+    app.api.QUERY_REGISTRY["__sleep__"] = {"description": "bench sleep", "sql_template_name": "", "parameters": {}}
+    original_template = app.api.get_sql_template
+    app.api.get_sql_template = lambda query_id, variant=None: marker_sql if query_id == "__sleep__" else original_template(query_id, variant)
+    try:
+        with client.stream("POST", "/query/stream", json={"question": "bench"}) as response:
+            for event, _ in _iter_events(response):
+                if event == "decision":
+                    time.sleep(0.5)  # let the statement start
+                    break
+        time.sleep(1.0)
+        with ENGINE.connect() as conn:
+            running = conn.execute(
+                text("SELECT COUNT(*) FROM pg_stat_activity WHERE query = :q AND state = 'active'"),
+                {"q": marker_sql},
+            ).scalar()
+        return running == 0
+    finally:
+        app.api.get_sql_template = original_template
+        if original is None:
+            app.api.QUERY_REGISTRY.pop("__sleep__", None)
+
+
+def run_stream(query_ids: list[str] | None = None, iterations: int = 3, port: int = 8765) -> dict:
+    """{query_id: {blocking_ms, decision_ms, estimate_ms, exact_ms}} (medians), plus cancellation."""
+    server = serve(port)
+    original_resolver = app.api.resolver
+    report = {"queries": {}}
+    try:
+        with ENGINE.connect() as conn:
+            inits = dataset_inits(conn)
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=120) as client:
+            for query_id in query_ids or DEFAULT_QUERY_IDS:
+                params = default_params(query_id, inits)
+                params.pop("path_count", None)
+                app.api.resolver = FixedResolver(query_id, params)
+                time_blocking(client)  # warm up
+                blocking = sorted(time_blocking(client) for _ in range(iterations))
+                streams = [time_stream(client) for _ in range(iterations)]
+                entry = {"blocking_ms": blocking[len(blocking) // 2]}
+                for event in ("decision", "estimate", "exact"):
+                    values = sorted(s[event] for s in streams if event in s)
+                    entry[f"{event}_ms"] = values[len(values) // 2] if values else None
+                report["queries"][query_id] = entry
+            report["cancelled_on_disconnect"] = check_cancellation(client)
+    finally:
+        app.api.resolver = original_resolver
+        server.should_exit = True
+    return report
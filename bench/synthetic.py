@@ -0,0 +1,235 @@
+"""
+Seeded synthetic ensemble data for the four ensemble tables.
+
+The generator mimics the production layout closely enough for the SQL
+templates to exercise the same plans:
+- weather_forecast_ensemble / energy_forecast_ensemble: 336 h from the
+  forecast initialization
+- weather_seasonal_ensemble / energy_base_ensemble: seasonal horizon from
+  the seasonal initialization
+
+Values are built path-major (paths x hours) with numpy so that physically
+linked variables stay consistent: load follows temperature, solar follows
+GHI, wind follows 100 m wind speed, and GSI follows net demand plus outages.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+import numpy as np
+
+PROJECT_NAME = "ercot_generic"
+LOCATIONS = ["rto", "north_raybn", "south_lcra_aen_cps", "west", "houston"]
+ZONES = LOCATIONS[1:]
+
+WEATHER_VARIABLES = [
+    "temp_2m", "dew_2m", "wind_10m_mps", "ghi",
+    "wind_100m_mps", "ghi_gen", "temp_2m_gen",
+]
+ENERGY_VARIABLES = [
+    "load", "wind_gen", "solar_gen", "net_demand",
+    "wind_cap_fac", "solar_cap_fac",
+]
+RTO_ONLY_ENERGY_VARIABLES = [
+    "nonrenewable_outage_mw", "nonrenewable_outage_pct",
+    "net_demand_plus_outages", "gsi",
+]
+
+COLUMNS = [
+    "initialization", "project_name", "location", "variable",
+    "valid_datetime", "ensemble_path", "ensemble_value",
+]
+
+FORECAST_HOURS = 336
+
+# Per-zone climate and installed capacity (rough ERCOT winter shape)
+_ZONE_PROFILE = {
+    "north_raybn":        {"temp": 8.0,  "load": 22000, "wind": 9000,  "solar": 4000, "share": 0.36},
+    "south_lcra_aen_cps": {"temp": 12.0, "load": 14000, "wind": 6000,  "solar": 3000, "share": 0.22},
+    "west":               {"temp": 9.0,  "load": 5000,  "wind": 22000, "solar": 14000, "share": 0.08},
+    "houston":            {"temp": 13.0, "load": 16000, "wind": 1000,  "solar": 1000, "share": 0.34},
+}
+_THERMAL_CAPACITY_MW = 78000.0
+_CENTRAL_UTC_OFFSET_HOURS = -6
+
+
+@dataclass
+class DatasetSpec:
+    """Shape of a synthetic dataset. Defaults match the production layout."""
+    seed: int = 42
+    n_paths: int = 1000
+    forecast_init: datetime = field(
+        default_factory=lambda: datetime(2026, 1, 15, 12, tzinfo=timezone.utc)
+    )
+    seasonal_init: datetime = field(
+        default_factory=lambda: datetime(2025, 12, 5, 0, tzinfo=timezone.utc)
+    )
+    forecast_hours: int = FORECAST_HOURS
+    seasonal_days: int = 120
+
+    @property
+    def seasonal_hours(self) -> int:
+        return self.seasonal_days * 24
+
+    def to_dict(self) -> dict:
+        return {
+            "seed": self.seed,
+            "n_paths": self.n_paths,
+            "forecast_init": self.forecast_init.isoformat(),
+            "seasonal_init": self.seasonal_init.isoformat(),
+            "forecast_hours": self.forecast_hours,
+            "seasonal_days": self.seasonal_days,
+        }
+
+
+def _ar1(rng: np.random.Generator, n_paths: int, n_hours: int, phi: float, sigma: float) -> np.ndarray:
+    """Path-major AR(1) noise; persistent anomalies give realistic cold snaps and lulls."""
+    shocks = rng.normal(0.0, sigma, size=(n_paths, n_hours))
+    out = np.empty_like(shocks)
+    out[:, 0] = shocks[:, 0] / np.sqrt(1 - phi ** 2)
+    for h in range(1, n_hours):
+        out[:, h] = phi * out[:, h - 1] + shocks[:, h]
+    return out
+
+
+def _local_hours(init: datetime, n_hours: int) -> np.ndarray:
+    return (init.hour + _CENTRAL_UTC_OFFSET_HOURS + np.arange(n_hours)) % 24
+
+
+def _series(rng: np.random.Generator, init: datetime, n_paths: int, n_hours: int) -> dict:
+    """
+    Build every (location, group, variable) -> (paths x hours) array for one horizon.
+
+    group is "weather" or "energy" so callers can route arrays to the right table.
+    """
+    hod = _local_hours(init, n_hours)
+    diurnal = np.cos((hod - 15) / 24.0 * 2 * np.pi)              # peaks mid-afternoon
+    daylight = np.clip(np.sin((hod - 6) / 13.0 * np.pi), 0, None)  # ~07-19 local
+    morning_evening = np.exp(-((hod - 8) ** 2) / 4.0) + np.exp(-((hod - 19) ** 2) / 6.0)
+
+    # Shared large-scale weather regime so zones co-move
+    regime = _ar1(rng, n_paths, n_hours, phi=0.995, sigma=0.6)
+    out = {}
+    totals = {"load": 0.0, "wind_gen": 0.0, "solar_gen": 0.0}
+    temp_rto = 0.0
+    weather_rto = {v: 0.0 for v in WEATHER_VARIABLES}
+    wind_cap_total = sum(p["wind"] for p in _ZONE_PROFILE.values())
+    solar_cap_total = sum(p["solar"] for p in _ZONE_PROFILE.values())
+
+    for zone, prof in _ZONE_PROFILE.items():
+        local = _ar1(rng, n_paths, n_hours, phi=0.97, sigma=0.5)
+        temp = prof["temp"] + 5.0 * diurnal + 2.5 * regime + local
+        dew = temp - np.abs(rng.normal(4.0, 1.5, size=temp.shape))
+        cloud = np.clip(0.5 + 0.25 * _ar1(rng, n_paths, n_hours, phi=0.9, sigma=0.3), 0, 1)
+        ghi = 950.0 * daylight * (1 - 0.8 * cloud)
+        wind100 = np.clip(7.5 + 2.0 * _ar1(rng, n_paths, n_hours, phi=0.96, sigma=0.35) - 0.4 * regime, 0, None)
+        wind10 = wind100 * 0.7
+
+        wind_cf = np.clip(((wind100 - 3.0) / 9.0) ** 3, 0, 1)
+        wind_cf[wind100 < 3.0] = 0.0
+        solar_cf = np.clip(ghi / 1000.0, 0, 1)
+        heating = np.clip(15.0 - temp, 0, None)
+        load = prof["load"] * (0.85 + 0.15 * morning_evening) + 0.035 * prof["load"] * heating
+        wind_gen = prof["wind"] * wind_cf
+        solar_gen = prof["solar"] * solar_cf
+
+        weather = {
+            "temp_2m": temp, "dew_2m": dew, "wind_10m_mps": wind10, "ghi": ghi,
+            "wind_100m_mps": wind100, "ghi_gen": ghi * 1.05, "temp_2m_gen": temp + 0.5,
+        }
+        energy = {
+            "load": load, "wind_gen": wind_gen, "solar_gen": solar_gen,
+            "net_demand": load - wind_gen - solar_gen,
+            "wind_cap_fac": wind_cf, "solar_cap_fac": solar_cf,
+        }
+        for var, arr in weather.items():
+            out[(zone, "weather", var)] = arr
+            weather_rto[var] = weather_rto[var] + prof["share"] * arr
+        for var, arr in energy.items():
+            out[(zone, "energy", var)] = arr
+        for var in totals:
+            totals[var] = totals[var] + energy[var]
+        temp_rto = temp_rto + prof["share"] * temp
+
+    for var, arr in weather_rto.items():
+        out[("rto", "weather", var)] = arr
+
+    outage_pct = np.clip(0.12 + 0.05 * _ar1(rng, n_paths, n_hours, phi=0.99, sigma=0.2)
+                         + 0.01 * np.clip(-temp_rto, 0, None), 0.02, 0.6)
+    outage_mw = outage_pct * _THERMAL_CAPACITY_MW
+    net_demand = totals["load"] - totals["wind_gen"] - totals["solar_gen"]
+    ndpo = net_demand + outage_mw
+    gsi = 1.0 / (1.0 + np.exp(-(ndpo - 0.80 * _THERMAL_CAPACITY_MW) / 6000.0))
+
+    out[("rto", "energy", "load")] = totals["load"]
+    out[("rto", "energy", "wind_gen")] = totals["wind_gen"]
+    out[("rto", "energy", "solar_gen")] = totals["solar_gen"]
+    out[("rto", "energy", "net_demand")] = net_demand
+    out[("rto", "energy", "wind_cap_fac")] = totals["wind_gen"] / wind_cap_total
+    out[("rto", "energy", "solar_cap_fac")] = totals["solar_gen"] / solar_cap_total
+    out[("rto", "energy", "nonrenewable_outage_mw")] = outage_mw
+    out[("rto", "energy", "nonrenewable_outage_pct")] = outage_pct
+    out[("rto", "energy", "net_demand_plus_outages")] = ndpo
+    out[("rto", "energy", "gsi")] = gsi
+    return out
+
+
+# table -> (group, horizon)
+TABLES = {
+    "weather_forecast_ensemble": ("weather", "forecast"),
+    "energy_forecast_ensemble": ("energy", "forecast"),
+    "weather_seasonal_ensemble": ("weather", "seasonal"),
+    "energy_base_ensemble": ("energy", "seasonal"),
+}
+
+
+def _horizon(spec: DatasetSpec, horizon: str) -> tuple[datetime, int]:
+    if horizon == "forecast":
+        return spec.forecast_init, spec.forecast_hours
+    return spec.seasonal_init, spec.seasonal_hours
+
+
+def generate_arrays(spec: DatasetSpec, horizon: str) -> dict:
+    """All (location, group, variable) arrays for one horizon, deterministic per seed."""
+    init, n_hours = _horizon(spec, horizon)
+    seed_offset = 0 if horizon == "forecast" else 1
+    rng = np.random.default_rng([spec.seed, seed_offset])
+    return _series(rng, init, spec.n_paths, n_hours)
+
+
+def iter_table_chunks(spec: DatasetSpec, table: str, arrays: dict | None = None) -> Iterator[str]:
+    """
+    Yield tab-separated COPY text for one table, one (location, variable) series per chunk.
+
+    Pass ``arrays`` from :func:`generate_arrays` to share one generation
+    between the weather and energy table of the same horizon.
+    """
+    group, horizon = TABLES[table]
+    init, n_hours = _horizon(spec, horizon)
+    if arrays is None:
+        arrays = generate_arrays(spec, horizon)
+
+    init_str = init.isoformat()
+    stamps = [(init + timedelta(hours=h)).isoformat() for h in range(n_hours)]
+    for (location, arr_group, variable), values in arrays.items():
+        if arr_group != group:
+            continue
+        prefix = f"{init_str}\t{PROJECT_NAME}\t{location}\t{variable}\t"
+        formatted = np.char.mod("%.4f", values)
+        lines = []
+        for path in range(values.shape[0]):
+            suffix = f"\t{path}\t"
+            row = formatted[path]
+            lines.extend(prefix + stamps[h] + suffix + row[h] for h in range(n_hours))
+        yield "\n".join(lines) + "\n"
+
+
+def row_count(spec: DatasetSpec, table: str) -> int:
+    group, horizon = TABLES[table]
+    _, n_hours = _horizon(spec, horizon)
+    if group == "weather":
+        n_series = len(LOCATIONS) * len(WEATHER_VARIABLES)
+    else:
+        n_series = len(LOCATIONS) * len(ENERGY_VARIABLES) + len(RTO_ONLY_ENERGY_VARIABLES)
+    return n_series * n_hours * spec.n_paths
@@ -0,0 +1,132 @@
+"""
+Statement timeouts and cancellation, checked with pg_sleep.
+
+Direct (CancellableQuery, no HTTP):
+- timeout: ``SELECT pg_sleep(5)`` with a 300 ms statement timeout raises
+  QueryTimeout after ~300 ms
+- cancel: the same statement cancelled from another thread after 300 ms
+  raises QueryCancelled right away
+
+Through /query (uvicorn on a local port, resolver fixed to a bench-only
+"__sleep__" template, as bench.stream does):
+- timeout: a 3 s pg_sleep on a template with a 500 ms "statement_timeout_ms"
+  comes back as 504 after ~500 ms
+- disconnect: a client that gives up after 1 s on a 30 s pg_sleep; reported
+  is how long until Postgres no longer runs the statement and the pooled
+  connection is checked back in
+
+Every check reports elapsed ms and whether it behaved; GET /execution/stats
+is included at the end.
+"""
+
+import threading
+import time
+
+import httpx
+from sqlalchemy import text
+
+import app.api
+from app.cache.results import RESULT_CACHE
+from app.db.connection import ENGINE
+from app.db.executor import QUERY_METRICS, CancellableQuery, QueryCancelled, QueryTimeout
+from bench.stream import FixedResolver, serve
+
+SLEEP_QUERY_ID = "__sleep__"
+
+
+def _active(marker_sql: str) -> int:
+    with ENGINE.connect() as conn:
+        return conn.execute(text("SELECT COUNT(*) FROM pg_stat_activity WHERE query = :q AND state = 'active'"),
+                            {"q": marker_sql}).scalar()
+
+
+def direct_timeout(timeout_ms: int = 300) -> dict:
+    started = time.perf_counter()
+    try:
+        CancellableQuery(statement_timeout_ms=timeout_ms, label="pg_sleep").run("SELECT pg_sleep(5)", {})
+        raised = None
+    except Exception as e:
+        raised = type(e).__name__
+    elapsed = (time.perf_counter() - started) * 1000
+    return {"elapsed_ms": round(elapsed, 1), "raised": raised, "ok": raised == QueryTimeout.__name__}
+
+
+def direct_cancel(after_ms: int = 300) -> dict:
+    query = CancellableQuery(label="pg_sleep")
+    outcome = {}
+
+    def run():
+        try:
+            query.run("SELECT pg_sleep(5)", {})
+        except Exception as e:
+            outcome["raised"] = type(e).__name__
+        outcome["finished"] = time.perf_counter()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    time.sleep(after_ms / 1000)
+    cancelled_at = time.perf_counter()
+    query.cancel()
+    thread.join()
+    return {"cancel_to_return_ms": round((outcome["finished"] - cancelled_at) * 1000, 1),
+            "raised": outcome.get("raised"), "ok": outcome.get("raised") == QueryCancelled.__name__}
+
+
+def _sleep_template(sql: str, timeout_ms: int, get_sql_template) -> str:
+    """Point the "__sleep__" registry entry (and app.api.get_sql_template) at ``sql``."""
+    app.api.QUERY_REGISTRY[SLEEP_QUERY_ID] = {"description": "bench sleep", "sql_template_name": "",
+                                              "parameters": {}, "statement_timeout_ms": timeout_ms}
+    app.api.get_sql_template = (lambda query_id, variant=None: sql if query_id == SLEEP_QUERY_ID
+                                else get_sql_template(query_id, variant))
+    app.api.resolver = FixedResolver(SLEEP_QUERY_ID, {})
+    RESULT_CACHE.clear()
+    return sql
+
+
+def http_timeout(client: httpx.Client, get_sql_template, sleep_s: float = 3, timeout_ms: int = 500) -> dict:
+    _sleep_template(f"SELECT pg_sleep({sleep_s})", timeout_ms, get_sql_template)
+    started = time.perf_counter()
+    response = client.post("/query", json={"question": "bench"})
+    elapsed = (time.perf_counter() - started) * 1000
+    return {"status": response.status_code, "elapsed_ms": round(elapsed, 1), "detail": response.json().get("detail"),
+            "ok": response.status_code == 504 and elapsed < sleep_s * 1000}
+
+
+def http_disconnect(port: int, get_sql_template, sleep_s: float = 30, give_up_s: float = 1.0) -> dict:
+    marker_sql = _sleep_template(f"SELECT pg_sleep({sleep_s})", int(sleep_s * 2000), get_sql_template)
+    checked_out = ENGINE.pool.checkedout()
+    try:
+        httpx.post(f"http://127.0.0.1:{port}/query", json={"question": "bench"}, timeout=give_up_s)
+    except httpx.TimeoutException:
+        pass
+    gave_up = time.perf_counter()
+    running_at_disconnect = _active(marker_sql)
+    gone_ms = None
+    while time.perf_counter() - gave_up < sleep_s:
+        if not _active(marker_sql):
+            gone_ms = round((time.perf_counter() - gave_up) * 1000, 1)
+            break
+        time.sleep(0.05)
+    time.sleep(0.2)
+    return {"statement_running_at_disconnect": running_at_disconnect, "statement_gone_after_ms": gone_ms,
+            "pool_checked_out_before": checked_out, "pool_checked_out_after": ENGINE.pool.checkedout(),
+            "ok": bool(running_at_disconnect) and gone_ms is not None and gone_ms < sleep_s * 1000 / 2}
+
+
+def run_timeouts(port: int = 8766) -> dict:
+    QUERY_METRICS.reset()
+    report = {"direct_timeout": direct_timeout(), "direct_cancel": direct_cancel()}
+    server = serve(port)
+    original_resolver, original_template = app.api.resolver, app.api.get_sql_template
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+            report["http_timeout"] = http_timeout(client, original_template)
+            report["http_disconnect"] = http_disconnect(port, original_template)
+            report["execution_stats"] = client.get("/execution/stats").json()
+    finally:
+        app.api.resolver, app.api.get_sql_template = original_resolver, original_template
+        app.api.QUERY_REGISTRY.pop(SLEEP_QUERY_ID, None)
+        server.should_exit = True
+    for check, result in report.items():
+        print(f"⏱️  {check}: {result}", flush=True)
+    return report
@@ -0,0 +1,97 @@
+"""
+Parity and benchmark deltas for alternative SQL variants.
+
+For every registry entry that declares "sql_variants", runs the base
+template and each variant with the same default params, checks the result
+sets match (order-insensitive, floats compared with a relative tolerance),
+and reports the p50 latency of each. EDGE_CASES adds parity-only runs with
+params the defaults do not reach.
+"""
+
+import math
+
+from sqlalchemy import text
+
+from app.db.connection import ENGINE
+from app.queries.query_registry import QUERY_REGISTRY
+from app.queries.templates import BASE_VARIANT, get_sql_template, template_variants
+from bench.params import dataset_inits, default_params
+from bench.runner import benchmark_template
+
+REL_TOLERANCE = 1e-9
+
+# query_id -> param overrides checked for parity only (no timing)
+EDGE_CASES = {
+    "SOLAR_RAMP_P50_P90": [{"hour_start": 9, "hour_end": 7}, {"hour_start": 8, "hour_end": 8}],
+}
+
+
+def _canonical(value):
+    if isinstance(value, float):
+        return float(f"{value:.9g}") if math.isfinite(value) else value
+    return value
+
+
+def _rows(conn, sql: str, params: dict) -> tuple[list, list]:
+    result = conn.execute(text(sql), params)
+    columns = list(result.keys())
+    rows = [tuple(_canonical(v) for v in row) for row in result.fetchall()]
+    return columns, sorted(rows, key=repr)
+
+
+def rows_match(left: list, right: list, rel_tol: float = REL_TOLERANCE) -> bool:
+    if len(left) != len(right):
+        return False
+    for a_row, b_row in zip(left, right):
+        for a, b in zip(a_row, b_row):
+            if isinstance(a, float) and isinstance(b, float):
+                if not math.isclose(a, b, rel_tol=rel_tol, abs_tol=1e-9):
+                    return False
+            elif a != b:
+                return False
+    return True
+
+
+def check_parity(conn, query_id: str, params: dict, variant: str) -> dict:
+    """Compare one variant's result set with the base template's."""
+    base_cols, base_rows = _rows(conn, get_sql_template(query_id, BASE_VARIANT), params)
+    try:
+        cols, rows = _rows(conn, get_sql_template(query_id, variant), params)
+    except Exception as e:
+        conn.rollback()
+        return {"columns_match": False, "rows_match": False, "rows": 0, "error": str(e).splitlines()[0]}
+    return {
+        "columns_match": cols == base_cols,
+        "rows_match": rows_match(base_rows, rows),
+        "rows": len(rows),
+    }
+
+
+def run_variants(query_ids: list[str] | None = None, iterations: int = 5, variant_filter: str | None = None) -> dict:
+    """{query_id: {variant: {parity..., p50_ms, base_p50_ms, speedup}}}"""
+    query_ids = query_ids or [q for q in QUERY_REGISTRY if len(template_variants(q)) > 1]
+    report = {}
+    with ENGINE.connect() as conn:
+        inits = dataset_inits(conn)
+        for query_id in query_ids:
+            params = default_params(query_id, inits)
+            base = benchmark_template(conn, get_sql_template(query_id, BASE_VARIANT), params, iterations)
+            report[query_id] = {}
+            for variant in template_variants(query_id):
+                if variant == BASE_VARIANT or (variant_filter and variant != variant_filter):
+                    continue
+                entry = check_parity(conn, query_id, params, variant)
+                entry["edge_cases"] = [
+                    {"params": overrides, **check_parity(conn, query_id, {**params, **overrides}, variant)}
+                    for overrides in EDGE_CASES.get(query_id, [])
+                ]
+                timing = benchmark_template(conn, get_sql_template(query_id, variant), params, iterations)
+                entry.update({
+                    "base_p50_ms": base["p50_ms"],
+                    "p50_ms": timing["p50_ms"],
+                    "base_shared_hit_blocks": base["shared_hit_blocks"],
+                    "shared_hit_blocks": timing["shared_hit_blocks"],
+                    "speedup": round(base["p50_ms"] / timing["p50_ms"], 2) if timing["p50_ms"] else None,
+                })
+                report[query_id][variant] = entry
+    return report
@@ -0,0 +1,90 @@
+"""
+Cache warmer check against a local database.
+
+Optionally inserts a synthetic forecast initialization (forecast tables
+only), then measures: cold latency of every warmable template, the warm-up
+pass itself, cache-hit latency afterwards, and the latency of an
+interactive probe query while warming runs, compared with idle.
+"""
+
+import threading
+import time
+from datetime import datetime
+
+from app.cache.results import ResultCache
+from app.cache.warmer import CacheWarmer, latest_initializations, template_priority, warm_params
+from app.db.connection import ENGINE
+from app.db.executor import execute_query
+from app.db.schema import FORECAST_TABLES
+from app.queries.query_registry import QUERY_REGISTRY
+from app.queries.sampling import bind_path_count
+from app.queries.templates import get_sql_template
+from bench.loader import load_dataset
+from bench.runner import percentile
+from bench.synthetic import DatasetSpec
+
+PROBE_QUERY_ID = "GSI_PEAK_PROBABILITY_14_DAYS"
+
+
+def insert_forecast_init(forecast_init: datetime, n_paths: int, seed: int = 7) -> dict:
+    """Synthetic insert of one new forecast initialization, as ingest would land it."""
+    spec = DatasetSpec(seed=seed, n_paths=n_paths, forecast_init=forecast_init)
+    return load_dataset(spec, tables=FORECAST_TABLES)
+
+
+def _timed_run(cache: ResultCache, query_id: str, inits: dict) -> float | None:
+    params = warm_params(query_id, inits)
+    if params is None:
+        return None
+    sql = get_sql_template(query_id)
+    params = bind_path_count(sql, params)
+    started = time.perf_counter()
+    try:
+        cache.cached_run(query_id, sql, params, execute_query)
+    except Exception:
+        return None
+    return (time.perf_counter() - started) * 1000
+
+
+def _probe(inits: dict, stop: threading.Event, timings: list):
+    while not stop.is_set():
+        timings.append(_timed_run(ResultCache(), PROBE_QUERY_ID, inits))
+        time.sleep(0.05)
+
+
+def run_warmer(workers: int = 2) -> dict:
+    with ENGINE.connect() as conn:
+        inits = latest_initializations(conn)
+    order = sorted(QUERY_REGISTRY, key=template_priority)
+
+    # Cold: every template misses
+    cold = {q: _timed_run(ResultCache(), q, inits) for q in order}
+
+    # Interactive probe, idle
+    idle = [_timed_run(ResultCache(), PROBE_QUERY_ID, inits) for _ in range(5)]
+
+    # Warm pass with the probe running alongside
+    cache = ResultCache()
+    warmer = CacheWarmer(cache=cache, workers=workers)
+    stop, during = threading.Event(), []
+    probe = threading.Thread(target=_probe, args=(inits, stop, during), daemon=True)
+    probe.start()
+    stats = warmer.poll_once()
+    stop.set()
+    probe.join()
+
+    hot = {q: _timed_run(cache, q, inits) for q in order}
+    cold_ms = [v for v in cold.values() if v is not None]
+    hot_ms = [v for v in hot.values() if v is not None]
+    return {
+        "initialization": str(inits["initialization"]),
+        "warm": stats,
+        "first_warmed": order[:3],
+        "cold_total_ms": round(sum(cold_ms), 1),
+        "cold_p50_ms": round(percentile(cold_ms, 50), 2),
+        "hit_p50_ms": round(percentile(hot_ms, 50), 3),
+        "cache": cache.stats(),
+        "probe_idle_p50_ms": round(percentile([t for t in idle if t], 50), 2),
+        "probe_during_warm_p50_ms": round(percentile([t for t in during if t], 50), 2) if during else None,
+        "probe_samples_during_warm": len(during),
+    }
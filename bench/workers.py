@@ -0,0 +1,155 @@
+"""
+API throughput from 1 to N gunicorn workers on one box (gunicorn.conf.py).
+
+Each configuration starts gunicorn in a subprocess, with the LLM pointed at
+the local Bedrock stub (bench/bedrock_stub.py, ``llm_ms`` per call), and
+fires ``requests`` /query calls from ``clients`` threads, each over a fresh
+connection so the kernel spreads them across workers. The mix is QUERY_IDS
+with default params, in random order. Reported per configuration:
+- requests/s and latency percentiles
+- computed: responses not served from a cache. With the shared cache each
+  template is computed about once; with per-worker caches, up to once per
+  worker.
+- pss_mb: proportional set size of the master plus workers
+- sessions_ok: session follow-ups (no params) that found their context,
+  out of ``follow_ups``
+"""
+
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from app.db.connection import ENGINE
+from bench.bedrock_stub import BedrockStub, question_for
+from bench.params import dataset_inits, default_params
+from bench.runner import percentile
+
+QUERY_IDS = [
+    "GSI_PEAK_PROBABILITY_14_DAYS", "GSI_PROBABILITY_LASTING_HOURS", "GSI_P50_P90_MONTH",
+    "P99_RTO_LOAD_MORNING_PEAK", "PROBABILITY_RTO_LOAD_EXCEEDS", "VOLATILITY_PEAK_NET_DEMAND",
+    "WEST_WIND_EXPORT_CONSTRAINT_RISK", "P10_LOW_WIND_EVENING_RAMP", "DATE_HIGHEST_TAIL_RISK",
+    "NET_DEMAND_UNCERTAINTY_P95_P05",
+]
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _children(pid: int) -> list[int]:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+
+
+def _pss_mb(pids: list[int]) -> float:
+    total_kb = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/smaps_rollup") as f:
+                total_kb += sum(int(line.split()[1]) for line in f if line.startswith("Pss:"))
+        except OSError:
+            pass
+    return round(total_kb / 1024, 1)
+
+
+def start_server(workers: int, port: int, shared: bool, stub_url: str, shared_dir: str, log_path: str,
+                 extra_env: dict | None = None):
+    env = {
+        **os.environ,
+        "WEB_CONCURRENCY": str(workers), "BIND": f"127.0.0.1:{port}",
+        "SHARED_CACHE": "1" if shared else "0", "SHARED_CACHE_DIR": shared_dir,
+        "BEDROCK_ENDPOINT_URL": stub_url, "WARM_CACHE": "0", "SPECULATE": "0",
+        **(extra_env or {}),
+    }
+    env.setdefault("AWS_ACCESS_KEY_ID", "stub")
+    env.setdefault("AWS_SECRET_ACCESS_KEY", "stub")
+    log = open(log_path, "w")
+    process = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"],
+                               cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited, see {log_path}")
+        if len(_children(process.pid)) == workers:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/cache/stats", timeout=1).status_code == 200:
+                    time.sleep(1.0)  # let the last workers finish booting
+                    return process
+            except httpx.HTTPError:
+                pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"gunicorn did not start, see {log_path}")
+
+
+def _ask(client: httpx.Client, decision: dict, session_id: str | None = None) -> tuple[float, dict]:
+    started = time.perf_counter()
+    response = client.post("/query", json={"question": question_for(decision), "session_id": session_id})
+    response.raise_for_status()
+    return (time.perf_counter() - started) * 1000, response.json()
+
+
+def load(port: int, decisions: list[dict], clients: int, follow_ups: int, session_decision: dict) -> dict:
+    fresh_connections = httpx.Limits(max_keepalive_connections=0)
+    with httpx.Client(base_url=f"http://127.0.0.1:{port}", limits=fresh_connections, timeout=120) as client:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            results = list(pool.map(lambda d: _ask(client, d), decisions))
+        seconds = time.perf_counter() - started
+
+        # One session: full params once, then follow-ups that rely on the session's last_params
+        session_id = f"bench-workers-{port}"
+        _ask(client, session_decision, session_id)
+        follow_up = {"decision": "EXECUTE", "query_id": session_decision["query_id"], "params": {}}
+        sessions_ok = sum(
+            _ask(client, follow_up, session_id)[1]["decision"] == "EXECUTE" for _ in range(follow_ups)
+        )
+
+    latencies = [ms for ms, _ in results]
+    return {
+        "requests": len(results),
+        "rps": round(len(results) / seconds, 1),
+        "p50_ms": round(percentile(latencies, 0.50), 1),
+        "p95_ms": round(percentile(latencies, 0.95), 1),
+        "p99_ms": round(percentile(latencies, 0.99), 1),
+        "computed": sum(not (body.get("staleness") or {}).get("cached") for _, body in results),
+        "sessions_ok": sessions_ok,
+    }
+
+
+def run_workers(worker_counts: list[int], requests: int = 400, clients: int = 16, llm_ms: float = 50,
+                follow_ups: int = 12, port: int = 8790, seed: int = 5) -> list[dict]:
+    with ENGINE.connect() as conn:
+        inits = dataset_inits(conn)
+    templates = []
+    for query_id in QUERY_IDS:
+        params = {k: v for k, v in default_params(query_id, inits).items() if k != "path_count"}
+        templates.append({"decision": "EXECUTE", "query_id": query_id, "params": params})
+    rng = random.Random(seed)
+    decisions = [rng.choice(templates) for _ in range(requests)]
+
+    # Every worker count with the shared cache, the largest also without it
+    configs = [(n, True) for n in worker_counts] + [(max(worker_counts), False)]
+    rows = []
+    with BedrockStub(latency=llm_ms / 1000, max_concurrent=1000) as stub:
+        for workers, shared in configs:
+            shared_dir = tempfile.mkdtemp(prefix="nlsql-bench-", dir="/dev/shm")
+            log_path = os.path.join(tempfile.gettempdir(), f"bench-workers-{workers}-{int(shared)}.log")
+            process = start_server(workers, port, shared, stub.url, shared_dir, log_path)
+            try:
+                stats = load(port, decisions, clients, follow_ups, templates[0])
+                stats["pss_mb"] = _pss_mb([process.pid] + _children(process.pid))
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+                shutil.rmtree(shared_dir, ignore_errors=True)
+            rows.append({"workers": workers, "shared_cache": shared, **stats})
+            print(f"👷 {rows[-1]}", flush=True)
+    return rows
@@ -65,10 +65,11 @@ module.exports = {
     {
       name: 'nlsql-backend',
       cwd: '${SCRIPT_DIR}',
-      script: '${SCRIPT_DIR}/venv/bin/uvicorn',
-      args: 'app.main:app --host 0.0.0.0 --port 8000',
+      script: '${SCRIPT_DIR}/venv/bin/gunicorn',
+      args: '-c gunicorn.conf.py app.main:app',
       interpreter: 'none',
-      env_file: '${SCRIPT_DIR}/.env'
+      env_file: '${SCRIPT_DIR}/.env',
+      env: { WARM_CACHE: '1' }
     },
     {
       name: 'nlsql-frontend',
@@ -0,0 +1,56 @@
+"""
+Production server preset: gunicorn managing uvicorn workers.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+- WEB_CONCURRENCY workers (default: one per CPU), bound to BIND (0.0.0.0:8000)
+- SHARED_CACHE=1: result cache and session store shared by all workers
+  through files in SHARED_CACHE_DIR (app.cache.shared)
+- The app is imported once in the master (preload_app) and forked. With
+  WARM_CACHE=1 the master runs one cache-warming pass before forking, so every
+  worker starts with the shared cache filled; afterwards one worker keeps
+  polling for new initializations.
+"""
+
+import multiprocessing
+import os
+
+# Read by app modules at import, which preload_app does right after this file
+os.environ.setdefault("SHARED_CACHE", "1")
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+graceful_timeout = 30
+keepalive = 5
+
+# Pickled entries are tied to the code version: a deploy starts from empty shared stores
+for _name in ("results", "sessions"):
+    _path = os.path.join(os.environ.get("SHARED_CACHE_DIR", "/dev/shm"), f"nlsql-{_name}")
+    if os.path.exists(_path):
+        os.unlink(_path)
+
+
+def when_ready(server):
+    """Master, after preload and before the first fork."""
+    from app.cache.results import RESULT_CACHE
+    from app.cache.warmer import WARMER
+    from app.db.connection import ENGINE
+
+    if os.environ.get("WARM_CACHE", "").lower() in ("1", "true", "yes"):
+        server.log.info("Warming the shared result cache before forking workers")
+        try:
+            WARMER.poll_once()
+        except Exception as e:
+            server.log.warning(f"Pre-fork warm-up failed: {e}")
+        RESULT_CACHE.drain()  # no background threads across fork
+    # Workers open their own connections
+    ENGINE.dispose()
+
+
+def post_fork(server, worker):
+    from app.db.connection import ENGINE
+
+    ENGINE.dispose(close=False)